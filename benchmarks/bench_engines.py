@@ -0,0 +1,213 @@
+"""
+bench_engines.py
+Description: End-to-end latency of the Process CSV pipeline with the threaded and the asyncio engines,
+against latency-injecting stand-ins for Benchling (SDK calls and blob downloads).
+
+Run from the repository root:
+    python -m benchmarks.bench_engines --jobs 8 --files 5 --latency 0.05
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from benchmarks.fakes import sleep_latency
+from local_app.benchling_app import canvas_interaction, checkpoint_utils
+from local_app.benchling_app.async_engine import AsyncEngine, process_csv_async
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+FILE_KEYS = [
+    "crRNA_metadata",
+    "receiver_primers_metadata",
+    "screening_primers_metadata",
+    "crRNA_plate_specs",
+    "primers_plate_specs",
+    "strain_names_mapping",
+    "plate_location_mapping",
+]
+
+# Round trips of each stage, in multiples of --latency (registration lists and bulk creates
+# several entity types, filling the plates gets three plates then transfers...)
+STAGE_ROUND_TRIPS = {"register": 10, "upload": 3, "plates": 8, "notebook": 6}
+
+
+def fake_app(latency):
+    def get_by_id(entity_id):
+        sleep_latency(latency)
+        return SimpleNamespace(
+            name=entity_id,
+            fields={
+                "CSV": SimpleNamespace(
+                    value=f"blob_{entity_id}", display_value=f"{entity_id}.csv"
+                )
+            },
+        )
+
+    def download_url(blob_id):
+        sleep_latency(latency)
+        return SimpleNamespace(download_url=f"https://blobs.local/{blob_id}")
+
+    app = MagicMock()
+    app.benchling.custom_entities.get_by_id.side_effect = get_by_id
+    app.benchling.custom_entities.bulk_get.return_value = []
+    app.benchling.blobs.download_url.side_effect = download_url
+    return app
+
+
+def blob_transport(latency):
+    async def handler(request):
+        await asyncio.sleep(2 * latency)
+        return httpx.Response(200, content=b"a,b\n1,2\n")
+
+    return httpx.MockTransport(handler)
+
+
+def patched_stages(latency):
+    """The stage functions of canvas_interaction, replaced by sleeps of the same round trips."""
+
+    def download_csv(app, entit_id, destination_dict, csv_entity=None):
+        app.benchling.custom_entities.get_by_id(entit_id)
+        sleep_latency(2 * latency)
+        Path(destination_dict[entit_id]).write_bytes(b"a,b\n1,2\n")
+
+    def stage(name, result):
+        def run(*args, **kwargs):
+            sleep_latency(STAGE_ROUND_TRIPS[name] * latency)
+            return result
+
+        return run
+
+    frames = (None,) * 5
+    return [
+        patch.object(canvas_interaction, "download_csv", download_csv),
+        patch.object(canvas_interaction, "check_all_csv_exist", lambda files: None),
+        patch.object(
+            canvas_interaction, "load_and_clean_data", lambda d: frames + (None,)
+        ),
+        patch.object(
+            canvas_interaction,
+            "create_and_register_entities",
+            stage("register", frames[:4] + (None,)),
+        ),
+        patch.object(
+            canvas_interaction, "upload_csv", stage("upload", ({}, 1, "file"))
+        ),
+        patch.object(
+            canvas_interaction, "find_and_fill_plates", stage("plates", ({}, None))
+        ),
+        patch.object(canvas_interaction, "process_notebook", stage("notebook", None)),
+        patch.object(canvas_interaction, "notebook_resolver", MagicMock()),
+    ]
+
+
+def new_run(app, files, directory):
+    keys = FILE_KEYS[:files]
+    run = canvas_interaction.ProcessCsvRun(
+        app,
+        f"canvas_{directory.name}",
+        {
+            "input_block_metadata": keys,
+            "input_block_genome_mapping": [],
+            "input_block_plate_specs": [],
+            "input_block_plates": ["plate"],
+            "input_block_notebook_name": "Notebook",
+        },
+    )
+    run.destination_dict = {key: str(directory / f"{key}.csv") for key in keys}
+    return run
+
+
+def run_jobs(n_jobs, process_job):
+    """Runs the jobs at once, one thread each like the webhook handler. Returns their latencies."""
+    latencies = [None] * n_jobs
+
+    def job(i):
+        start = time.perf_counter()
+        process_job(i)
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(n_jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def run(n_jobs, files, latency, concurrency):
+    app = fake_app(latency)
+    engine = AsyncEngine(concurrency=concurrency, transport=blob_transport(latency))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        job_dirs = [root / f"job{i}" for i in range(n_jobs)]
+        for directory in job_dirs:
+            directory.mkdir()
+
+        patches = patched_stages(latency)
+        for p in patches:
+            p.start()
+        try:
+            # Separate checkpoints, or the second engine would resume the first one's runs
+            with patch.object(
+                checkpoint_utils, "CHECKPOINT_DIR", str(root / "threads")
+            ):
+                threaded = run_jobs(
+                    n_jobs, lambda i: new_run(app, files, job_dirs[i]).process()
+                )
+            with patch.object(
+                checkpoint_utils, "CHECKPOINT_DIR", str(root / "asyncio")
+            ):
+                asynchronous = run_jobs(
+                    n_jobs,
+                    lambda i: engine.run(
+                        process_csv_async(new_run(app, files, job_dirs[i]), engine)
+                    ),
+                )
+        finally:
+            for p in patches:
+                p.stop()
+            engine.close()
+    return threaded, asynchronous
+
+
+def describe(latencies):
+    p95 = sorted(latencies)[max(0, int(round(0.95 * len(latencies))) - 1)]
+    return f"p50 {statistics.median(latencies):.3f}s  p95 {p95:.3f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=8, help="jobs started at once")
+    parser.add_argument("--files", type=int, default=5, help="tagged CSVs per job")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per call")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("clc-registration-app").setLevel(logging.WARNING)
+
+    threaded, asynchronous = run(args.jobs, args.files, args.latency, args.concurrency)
+    print(f"threads: {describe(threaded)}")
+    print(f"asyncio: {describe(asynchronous)}")
+    print(
+        f"speed-up (p50): {statistics.median(threaded) / statistics.median(asynchronous):.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
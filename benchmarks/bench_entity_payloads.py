@@ -0,0 +1,108 @@
+"""
+bench_entity_payloads.py
+Description: Per-row SDK models vs columnar EntityPayloadSpec when building the bodies of a bulk create.
+
+Run from the repository root:
+    python -m benchmarks.bench_entity_payloads --entities 10000
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import time
+
+import pandas as pd
+from benchling_sdk.helpers.serialization_helpers import fields
+from benchling_sdk.models import DnaSequenceBulkCreate
+
+from local_app.benchling_app.create_register_entites import registry_kwargs
+from local_app.benchling_app.entity_payloads import EntityPayloadSpec
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+FOLDER_ID = "lib_bench"
+SCHEMA_ID = "ts_bench"
+REGISTRY_ID = "src_bench"
+
+
+def crrna_frame(n):
+    return pd.DataFrame(
+        {
+            "crRNA_id": [
+                f"CLCact{i:05d}" if i % 10 == 0 else f"CLC{i:05d}" for i in range(n)
+            ],
+            "crRNA": ["ACGTACGTACGTACGTACGT"] * n,
+            "crRNA_strand": ["+" if i % 2 else "-" for i in range(n)],
+            "crRNA_loc": list(range(n)),
+        }
+    )
+
+
+def per_row(df):
+    """What register_crrna used to do: one SDK model per row, serialized by bulk_create."""
+    bodies = []
+    for _, row in df.iterrows():
+        kwargs = {}
+        if not row["crRNA_id"].startswith("CLCact"):
+            kwargs["fields"] = fields(
+                {
+                    "Target strand": {"value": str(row["crRNA_strand"])},
+                    "Target position": {"value": int(row["crRNA_loc"])},
+                }
+            )
+        entity = DnaSequenceBulkCreate(
+            folder_id=FOLDER_ID,
+            name=row["crRNA_id"],
+            schema_id=SCHEMA_ID,
+            bases=row["crRNA"],
+            is_circular=False,
+            **kwargs,
+            **registry_kwargs(REGISTRY_ID),
+        )
+        bodies.append(entity.to_dict())
+    return bodies
+
+
+def columnar(df):
+    spec = EntityPayloadSpec(
+        name_column="crRNA_id",
+        folder_id=FOLDER_ID,
+        schema_id=SCHEMA_ID,
+        bases_column="crRNA",
+        fields={
+            "Target strand": ("crRNA_strand", str),
+            "Target position": ("crRNA_loc", int),
+        },
+        fields_mask=lambda df: ~df["crRNA_id"].str.startswith("CLCact"),
+        static={"is_circular": False, **registry_kwargs(REGISTRY_ID)},
+    )
+    return [payload.to_dict() for payload in spec.build(df)]
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=10000)
+    args = parser.parse_args()
+
+    df = crrna_frame(args.entities)
+    row_bodies, row_s = timed(per_row, df)
+    col_bodies, col_s = timed(columnar, df)
+
+    assert row_bodies == col_bodies
+    print(f"entities: {args.entities}")
+    print(f"per row:  {row_s:.3f}s")
+    print(f"columnar: {col_s:.3f}s ({row_s / col_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
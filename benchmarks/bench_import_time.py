@@ -0,0 +1,80 @@
+"""
+bench_import_time.py
+Description: Import time of the entry points of the app, in fresh interpreters (python -X importtime),
+with the slowest imports. With --max-ms, exits with an error when importing local_app.app takes longer,
+to catch an eager import of pandas or the SDK creeping back into the startup path.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time --runs 5 --max-ms 400
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = (
+    # What a gunicorn worker imports before answering /health
+    "local_app.app",
+    # The first job: canvas webhooks, then interactions (the pipeline)
+    "local_app.benchling_app.handler",
+    "local_app.benchling_app.canvas_interaction",
+)
+
+
+def import_times(module):
+    """{module: cumulative microseconds} of one import of `module` in a new interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument(
+        "--max-ms", type=float, help="fail above this median for local_app.app"
+    )
+    args = parser.parse_args()
+
+    medians = {}
+    for module in ENTRY_POINTS:
+        runs = [import_times(module) for _ in range(args.runs)]
+        medians[module] = statistics.median(run[module] for run in runs) / 1000
+        slowest = sorted(runs[-1].items(), key=lambda item: -item[1])[1 : args.top + 1]
+        print(f"{module}: {medians[module]:.0f} ms (median of {args.runs})")
+        for name, cumulative in slowest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+    if args.max_ms is not None and medians["local_app.app"] > args.max_ms:
+        sys.exit(
+            f"Importing local_app.app takes {medians['local_app.app']:.0f} ms, "
+            f"over the {args.max_ms:.0f} ms budget"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+bench_logging.py
+Description: Cost of the logging of one large order on the thread handling it: the synchronous text
+logger of before (full webhook payload at INFO, one line and one print per existing entity) against the
+queue-based JSON logger (truncated payload, one summary line), all writing to a file. "queued" sends
+the lines of before through the queue-based logger, to separate the handler from the fewer lines.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging --rows 2000 --jobs 20
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+from local_app.lib.logger import (
+    TEXT_FORMAT,
+    AsyncLogHandler,
+    JsonFormatter,
+    log_context,
+    new_job_id,
+    summarize_items,
+)
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def order_payload(rows):
+    return {
+        "message": {
+            "type": "v2.canvas.userInteracted",
+            "canvasId": "cnvs_bench",
+            "rows": [
+                {"crRNA_id": f"CLC{i:05d}", "crRNA": "ACGT" * 8, "strand": "+"}
+                for i in range(rows)
+            ],
+        }
+    }
+
+
+def log_before(logger, payload, names):
+    logger.info(f"Webhook data: {payload}")
+    for name in names:
+        print(f"{name} already exists.")
+        logger.info(f"{name} already exists.")
+
+
+def log_after(logger, payload, names):
+    with log_context(job_id=new_job_id(), canvas_id="cnvs_bench"):
+        logger.info("Webhook of type %s", payload["message"]["type"])
+        logger.debug("Webhook data: %s", payload)
+        logger.info(
+            "%d of %d dna entities already exist: %s",
+            len(names),
+            len(names),
+            summarize_items(names),
+        )
+
+
+def run(handler, log_fn, payload, names, jobs):
+    logger = logging.getLogger(f"bench-{id(handler)}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(jobs):
+            log_fn(logger, payload, names)
+    caller_s = time.perf_counter() - start
+    handler.flush()
+    return caller_s / jobs, (time.perf_counter() - start) / jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = order_payload(args.rows)
+    names = [row["crRNA_id"] for row in payload["message"]["rows"]]
+    with tempfile.TemporaryDirectory() as tmp:
+        before_handler = logging.FileHandler(os.path.join(tmp, "before.log"))
+        before_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        before = run(before_handler, log_before, payload, names, args.jobs)
+
+        # The lines of before through the queue: what the handler alone saves
+        queued_file = logging.FileHandler(os.path.join(tmp, "queued.log"))
+        queued_file.setFormatter(JsonFormatter())
+        queued = run(
+            AsyncLogHandler(queued_file), log_before, payload, names, args.jobs
+        )
+
+        after_file = logging.FileHandler(os.path.join(tmp, "after.log"))
+        after_file.setFormatter(JsonFormatter())
+        after = run(AsyncLogHandler(after_file), log_after, payload, names, args.jobs)
+
+        sizes = {
+            name: os.path.getsize(os.path.join(tmp, f"{name}.log")) / args.jobs / 1024
+            for name in ("before", "queued", "after")
+        }
+
+    print(f"rows per order:  {args.rows}")
+    for name, (caller_s, _) in (
+        ("before", before),
+        ("queued", queued),
+        ("after", after),
+    ):
+        print(
+            f"{name + ':':<16} {caller_s * 1e3:8.2f} ms/job on the job thread, "
+            f"{sizes[name]:8.1f} KiB/job written"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+bench_pagination.py
+Description: Sequential vs read-ahead paging of a Benchling list call against a latency-injecting stand-in.
+
+Run from the repository root:
+    python -m benchmarks.bench_pagination --items 2000 --page-size 50 --latency 0.05 --work 0.02
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import time
+
+from benchmarks.fakes import latency_list_func, sleep_latency
+from local_app.benchling_app.pagination_utils import prefetch_pages
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def consume(pages, work):
+    name_to_id = {}
+    for page in pages:
+        # Per-page processing on the caller side (building dicts, DataFrame lookups...)
+        sleep_latency(work)
+        name_to_id.update({item.name: item.id for item in page})
+    return name_to_id
+
+
+def run(items, page_size, latency, work, prefetch):
+    list_func = latency_list_func(items, latency=latency)
+
+    start = time.perf_counter()
+    sequential = consume(list_func(page_size=page_size), work)
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with prefetch_pages(list_func, page_size=page_size, prefetch=prefetch) as pages:
+        prefetched = consume(pages, work)
+    prefetched_s = time.perf_counter() - start
+
+    assert sequential == prefetched
+    return sequential_s, prefetched_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per page")
+    parser.add_argument("--work", type=float, default=0.02, help="seconds per page")
+    parser.add_argument("--prefetch", type=int, default=2)
+    args = parser.parse_args()
+
+    sequential_s, prefetched_s = run(
+        args.items, args.page_size, args.latency, args.work, args.prefetch
+    )
+    print(f"pages:      {-(-args.items // args.page_size)}")
+    print(f"sequential: {sequential_s:.3f}s")
+    print(f"prefetch:   {prefetched_s:.3f}s ({sequential_s / prefetched_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+bench_pipeline.py
+Description: Time of each stage of the Process CSV pipeline, from load_and_clean_data through
+create_and_register_entities, on synthetic orders of increasing size (see synthetic_order.py) against an
+in-memory Benchling registry answering after --latency seconds. The medians are saved as JSON, and
+--compare prints the ratio to a previous result file, to check a change against the baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --clusters 10,100,500,2000 --runs 3
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/bench_pipeline-<date>.json
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.fakes import FakeRegistry
+from benchmarks.synthetic_order import generate_order, write_order
+from local_app.benchling_app import create_register_entites
+from local_app.benchling_app.create_register_entites import (
+    create_and_register_entities,
+    load_and_clean_data,
+)
+from local_app.benchling_app.entity_index import EntityIndexCache
+from local_app.lib.metrics import PIPELINE_STAGE_SECONDS
+from local_app.lib.tracing import tracer
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# pipeline_stage names, in the order they run
+STAGES = (
+    "load_and_clean_data",
+    "register_crrna",
+    "register_receivers",
+    "register_clc_receivers",
+    "register_screening",
+    "find_genomes",
+    "register_dna_fragments",
+    "register_clc_bac",
+)
+
+
+def new_registry(order, latency, name):
+    """A registry holding the strains of the order, half in each strain folder."""
+    registry = FakeRegistry(latency, app_id=f"app_{name}")
+    strains = order["strain_names_mapping"]["benchling_name"].tolist()
+    registry.add_existing(strains[::2], "CLC strains storage folder", "Strain schema")
+    registry.add_existing(strains[1::2], "NBC strains storage folder", "Strain schema")
+    return registry
+
+
+def run_once(n_clusters, latency, seed):
+    """{stage: seconds, "total": seconds} of one order of `n_clusters` clusters."""
+    order = generate_order(n_clusters, seed=seed)
+    registry = new_registry(order, latency, f"{n_clusters}_{seed}")
+    PIPELINE_STAGE_SECONDS.clear()
+
+    # Nothing listed by the previous run is reused
+    with tempfile.TemporaryDirectory() as tmp, patch.object(
+        create_register_entites, "entity_index", EntityIndexCache()
+    ):
+        destination_dict = write_order(order, tmp)
+        start = time.perf_counter()
+        *frames, errors = load_and_clean_data(destination_dict)
+        if errors:
+            raise RuntimeError(f"Synthetic order rejected by the cleaning: {errors}")
+        *registered, error = create_and_register_entities(registry.app, *frames)
+        total = time.perf_counter() - start
+    if error:
+        raise RuntimeError(f"Synthetic order rejected by the registration: {error}")
+
+    timings = {stage: PIPELINE_STAGE_SECONDS.sum(stage=stage) for stage in STAGES}
+    timings["total"] = total
+    return timings
+
+
+def run(sizes, runs, latency):
+    """{clusters: {stage: median seconds}}."""
+    results = {}
+    for n_clusters in sizes:
+        timings = [run_once(n_clusters, latency, seed) for seed in range(runs)]
+        results[str(n_clusters)] = {
+            key: statistics.median(t[key] for t in timings) for key in timings[0]
+        }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    sizes = list(results)
+    print(f"{'stage':<24}" + "".join(f"{size + ' clusters':>18}" for size in sizes))
+    for key in STAGES + ("total",):
+        cells = []
+        for size in sizes:
+            cell = f"{results[size][key] * 1e3:.1f} ms"
+            previous = (baseline or {}).get(size, {}).get(key)
+            if previous:
+                cell += f" ({results[size][key] / previous:.2f}x)"
+            cells.append(f"{cell:>18}")
+        print(f"{key:<24}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--clusters", default="10,100,500,2000", help="order sizes, comma-separated"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="orders per size")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds per Benchling request"
+    )
+    parser.add_argument("--output", help="result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    args = parser.parse_args()
+    logging.getLogger("clc-registration-app").setLevel(logging.WARNING)
+    # Time the pipeline, not the span exporter
+    tracer.exporter = None
+
+    sizes = [int(size) for size in args.clusters.split(",")]
+    results = run(sizes, args.runs, args.latency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print(f"latency per request: {args.latency * 1e3:.0f} ms, median of {args.runs}")
+    print_table(results, baseline)
+
+    output = Path(
+        args.output
+        or RESULTS_DIR / f"bench_pipeline-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w") as f:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "latency": args.latency,
+                "runs": args.runs,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
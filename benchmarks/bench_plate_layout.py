@@ -0,0 +1,125 @@
+"""
+bench_plate_layout.py
+Description: DataFrame merge vs array-backed PlateWells when planning the transfers of a plate.
+
+Run from the repository root:
+    python -m benchmarks.bench_plate_layout --wells 1536 --plates 1
+    python -m benchmarks.bench_plate_layout --wells 384 --plates 12
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import time
+
+import pandas as pd
+from benchling_sdk.models import ContainerQuantityUnits
+
+from benchmarks.fakes import FakePlate
+from local_app.benchling_app.plate_layout import LAYOUTS, PlateWells
+from local_app.benchling_app.plate_utils import fill_plate
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+KEEP_COLUMNS = ["well_crrna_idt", "crRNA_b_id", "ug"]
+
+
+def order_frame(layout):
+    return pd.DataFrame(
+        {
+            "well_crrna_idt": layout.names,
+            "crRNA_b_id": [f"seq_{i}" for i in range(layout.size)],
+            "ug": [1.5] * layout.size,
+        }
+    )
+
+
+def dataframe_plan(plate_info, df):
+    """What find_and_fill_plates used to do: wells to DataFrame, string normalisation, merge, iterrows."""
+    plate_df = pd.DataFrame(
+        [
+            {
+                "well_position": key,
+                "barcode": well.barcode,
+                "well_api_name": well.name,
+                "well_api_id": well.id,
+            }
+            for key, well in plate_info.wells.additional_properties.items()
+        ]
+    )
+    plate_df["well_position_merge"] = plate_df["well_position"].str[
+        0
+    ].str.upper() + plate_df["well_position"].str[1:].str.zfill(2)
+    plate_df = pd.merge(
+        plate_df,
+        df[KEEP_COLUMNS],
+        how="left",
+        left_on="well_position_merge",
+        right_on=KEEP_COLUMNS[0],
+    ).dropna(subset=[KEEP_COLUMNS[1]])
+    return [
+        (row["well_api_id"], row[KEEP_COLUMNS[1]], row[KEEP_COLUMNS[2]])
+        for _, row in plate_df.iterrows()
+    ]
+
+
+def array_plan(plate_info, df):
+    plate_wells = PlateWells.from_plate(plate_info)
+    destination_ids, entity_ids, quantities, _ = plate_wells.diff_transfers(
+        df[KEEP_COLUMNS[0]], df[KEEP_COLUMNS[1]], df[KEEP_COLUMNS[2]]
+    )
+    return list(zip(destination_ids, entity_ids, quantities))
+
+
+def array_transfers(plate_info, df):
+    """The full fill_plate path, including the SDK transfer models."""
+    return fill_plate(
+        PlateWells.from_plate(plate_info), df, KEEP_COLUMNS, ContainerQuantityUnits.UG
+    )
+
+
+def timed(func, plates, df):
+    start = time.perf_counter()
+    result = [func(plate, df) for plate in plates]
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wells", type=int, choices=sorted(LAYOUTS), default=1536)
+    parser.add_argument("--plates", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    layout = LAYOUTS[args.wells]
+    df = order_frame(layout)
+    plates = [FakePlate(f"PlateA{i}_crRNA", layout) for i in range(args.plates)]
+
+    dataframe_s = array_s = transfers_s = 0.0
+    for _ in range(args.repeat):
+        by_dataframe, seconds = timed(dataframe_plan, plates, df)
+        dataframe_s += seconds
+        by_array, seconds = timed(array_plan, plates, df)
+        array_s += seconds
+        _, seconds = timed(array_transfers, plates, df)
+        transfers_s += seconds
+    print(f"plates:          {args.plates} x {args.wells} wells")
+    # The string normalisation turns AA1 into AA1 (not AA01), so the DataFrame path loses
+    # the AA-AF rows of 1536-well plates
+    print(
+        f"wells planned:   dataframe {sum(map(len, by_dataframe))}, "
+        f"array {sum(map(len, by_array))}"
+    )
+    print(f"dataframe plan:  {dataframe_s / args.repeat:.4f}s")
+    print(
+        f"array plan:      {array_s / args.repeat:.4f}s ({dataframe_s / array_s:.1f}x)"
+    )
+    print(f"array + models:  {transfers_s / args.repeat:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
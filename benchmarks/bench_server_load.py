@@ -0,0 +1,317 @@
+"""
+bench_server_load.py
+Description: The real handle_webhook under load, against the local Benchling stand-in (benchling_server.py):
+each job is a press of Process on its own canvas, tagging the CSVs of a synthetic order (synthetic_order.py),
+its 3 plates and its notebook, so every request goes through the SDK, the rate-limited client and the
+stand-in's latency and 429s. The jobs are run with each pipeline engine and number of concurrent jobs, and
+the wall time, job latencies, requests served and 429s are compared.
+
+The app reads its tuning variables at import, set them in the environment, e.g. from the repository root:
+    BENCHLING_RATE_LIMIT_PER_SECOND=50 python -m benchmarks.bench_server_load --jobs 8 \
+        --concurrency 1,4 --latency lognormal:0.05:0.5 --rate-limit 40
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.benchling_server import BenchlingServer, LatencyModel
+from benchmarks.synthetic_order import FILE_NAMES, generate_order
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+APP_ID = "app_standin"
+# Every configuration path the pipeline reads; the stand-in holds an ID made from its name
+CONFIG_PATHS = (
+    "CSV files storage folder",
+    "CSV Entity schema",
+    "Result schema",
+    "Project schema",
+    "Registry schema",
+    "crRNA storage folder",
+    "gRNA schema",
+    "Primers storage folder",
+    "Primer schema",
+    "Receivers assemblies storage folder",
+    "CLC Receiver schema",
+    "CLC strains storage folder",
+    "NBC strains storage folder",
+    "Strain schema",
+    "DNA fragments storage folder",
+    "DNA fragment schema",
+    "BACs storage folder",
+    "CLC BAC schema",
+)
+# Canvas input block of each file of the order
+FILE_BLOCKS = {
+    "crRNA_metadata": "input_block_metadata",
+    "receiver_primers_metadata": "input_block_metadata",
+    "screening_primers_metadata": "input_block_metadata",
+    "crRNA_plate_specs": "input_block_plate_specs",
+    "primers_plate_specs": "input_block_plate_specs",
+    "strain_names_mapping": "input_block_genome_mapping",
+    "plate_location_mapping": "input_block_genome_mapping",
+}
+
+
+def config_id(path, app_id=APP_ID):
+    return f"cfg_{app_id}_" + path.lower().replace(" ", "_")
+
+
+def seed_tenant(state, app_id=APP_ID):
+    for path in CONFIG_PATHS:
+        state.set_config(app_id, [path], config_id(path, app_id))
+
+
+def seed_order(state, order, app_id=APP_ID):
+    """
+    Adds the CSV entities, strains, plates, notebook and canvas of `order` to the stand-in, in the
+    folders configured for `app_id`. Returns the ID of the canvas.
+    """
+    from local_app.benchling_app.plate_layout import PLATE_384
+    from local_app.benchling_app.views.canvas_initialize import input_blocks
+
+    order_number = order["crRNA_metadata"]["Order ID"].iloc[0]
+    inputs = {block: [] for block in FILE_BLOCKS.values()}
+    for key, df in order.items():
+        entity = state.add_csv_entity(
+            f"{key}_{order_number}",
+            FILE_NAMES[key],
+            df.to_csv(index=False).encode(),
+            config_id("CSV files storage folder", app_id),
+            config_id("CSV Entity schema", app_id),
+        )
+        inputs[FILE_BLOCKS[key]].append(entity["id"])
+
+    # The strains are already registered, half in each strain folder
+    strains = order["strain_names_mapping"]["benchling_name"].tolist()
+    for k, strain in enumerate(strains):
+        folder = config_id(
+            "CLC strains storage folder" if k % 2 else "NBC strains storage folder",
+            app_id,
+        )
+        query = {"folderId": folder, "name": strain}
+        if not state.list_entities("custom", query):
+            state.create_entity(
+                "custom",
+                {
+                    "name": strain,
+                    "folderId": folder,
+                    "schemaId": config_id("Strain schema", app_id),
+                },
+            )
+
+    # A01 -> A1, like the API
+    wells = [name[:-2] + str(int(name[-2:])) for name in PLATE_384.names]
+    inputs["input_block_plates"] = [
+        state.add_plate(f"Plate{letter}{order_number}_{suffix}", wells)["id"]
+        for letter, suffix in (("A", "crRNA"), ("B", "REC"), ("C", "SCR"))
+    ]
+    notebook_name = f"Full run {order_number} - Material Preparation"
+    state.add_entry(notebook_name, config_id("Result schema", app_id))
+    inputs["input_block_notebook_name"] = notebook_name
+
+    blocks = []
+    for block in input_blocks():
+        if block.id in inputs:
+            block.value = inputs[block.id]
+        blocks.append(block.to_dict())
+    return state.add_canvas(app_id, blocks)["id"]
+
+
+def process_webhook(base_url, canvas_id, app_id=APP_ID):
+    from local_app.benchling_app.views.constants import PROCESS_BUTTON_ID
+
+    return {
+        "version": "0",
+        "baseURL": base_url,
+        "tenantId": "ten_standin",
+        "app": {"id": app_id},
+        "appDefinition": {"id": "appdef_standin", "versionNumber": "0.0.1"},
+        "channel": "app_signals",
+        "message": {
+            "type": "v2.canvas.userInteracted",
+            "buttonId": PROCESS_BUTTON_ID,
+            "canvasId": canvas_id,
+            "featureId": "feat_standin",
+            "resourceId": "etr_standin",
+            "user": {"id": "ent_standin"},
+            "deprecated": False,
+            "excludedProperties": [],
+        },
+    }
+
+
+def isolated_runs(directory):
+    """
+    Patches that give each run its own copy of the pipeline files: the app keeps them at fixed
+    paths (/external, /processed), shared by the runs of a worker process.
+    """
+    from local_app.benchling_app import canvas_interaction
+
+    class IsolatedRun(canvas_interaction.ProcessCsvRun):
+        def __init__(self, app, canvas_id, *args, **kwargs):
+            super().__init__(app, canvas_id, *args, **kwargs)
+            run_dir = Path(directory) / canvas_id
+            self.destination_dict = {
+                key: str(run_dir / Path(path).name)
+                for key, path in self.destination_dict.items()
+            }
+
+    upload_csv = canvas_interaction.upload_csv
+
+    def isolated_upload_csv(app, df, destination_dict, path):
+        path = Path(destination_dict["crRNA_metadata"]).with_name(Path(path).name)
+        return upload_csv(app=app, df=df, destination_dict=destination_dict, path=path)
+
+    return [
+        patch.object(canvas_interaction, "ProcessCsvRun", IsolatedRun),
+        patch.object(canvas_interaction, "upload_csv", isolated_upload_csv),
+    ]
+
+
+def run(engine, n_jobs, concurrency, n_clusters, server_options):
+    """Latencies (s) of the jobs, wall time (s), canvases updated with results and server counts."""
+    from local_app.benchling_app import (
+        canvas_interaction,
+        checkpoint_utils,
+        create_register_entites,
+    )
+    from local_app.benchling_app.entity_index import EntityIndexCache
+    from local_app.benchling_app.handler import handle_webhook
+    from local_app.benchling_app.notebook_utils import notebook_resolver
+    from local_app.lib.leases import LeaseManager, MemoryLeases
+
+    # A new tenant (base URL) for every run: nothing is reused from the previous one
+    notebook_resolver.invalidate()
+    with BenchlingServer(
+        **server_options
+    ) as server, tempfile.TemporaryDirectory() as tmp:
+        # Every order holds the same clusters: each job gets its own app installation, so that its
+        # entities go to their own folders
+        apps = [f"{APP_ID}_{i}" for i in range(n_jobs)]
+        canvases = []
+        for i, app_id in enumerate(apps):
+            seed_tenant(server.state, app_id)
+            canvases.append(
+                seed_order(server.state, generate_order(n_clusters, seed=i), app_id)
+            )
+        patches = isolated_runs(tmp) + [
+            patch.object(canvas_interaction, "PIPELINE_ENGINE", engine),
+            patch.object(canvas_interaction, "leases", LeaseManager(MemoryLeases())),
+            patch.object(checkpoint_utils, "CHECKPOINT_DIR", f"{tmp}/checkpoints"),
+            patch.object(checkpoint_utils, "MEMO_DIR", f"{tmp}/run_memo"),
+            patch.object(create_register_entites, "entity_index", EntityIndexCache()),
+        ]
+        for p in patches:
+            p.start()
+
+        def job(canvas_id, app_id):
+            start = time.perf_counter()
+            handle_webhook(process_webhook(server.base_url, canvas_id, app_id))
+            return time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                latencies = list(executor.map(job, canvases, apps))
+            wall = time.perf_counter() - start
+        finally:
+            for p in patches:
+                p.stop()
+            notebook_resolver.close()
+
+        succeeded = sum(
+            any(
+                block["id"] == "results_display"
+                for block in server.state.canvases[canvas_id]["blocks"]
+            )
+            for canvas_id in canvases
+        )
+        return {
+            "latencies": latencies,
+            "wall": wall,
+            "succeeded": succeeded,
+            "requests": sum(server.requests.values()),
+            "throttled": sum(server.throttled.values()),
+        }
+
+
+def describe(latencies):
+    p95 = sorted(latencies)[max(0, int(round(0.95 * len(latencies))) - 1)]
+    return f"p50 {statistics.median(latencies):6.2f}s  p95 {p95:6.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=8, help="canvases processed")
+    parser.add_argument("--clusters", type=int, default=40, help="clusters per order")
+    parser.add_argument("--engines", default="threads,asyncio")
+    parser.add_argument(
+        "--concurrency", default="1,4", help="jobs at the same time, comma-separated"
+    )
+    parser.add_argument(
+        "--latency",
+        default="lognormal:0.05:0.5",
+        help='seconds per request: "<mean>" or "<distribution>:<mean>[:<spread>]"',
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="stand-in requests/s (0: none)"
+    )
+    parser.add_argument(
+        "--throttle-probability",
+        type=float,
+        default=0.0,
+        help="fraction of the requests answering 429 anyway",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("CLIENT_ID", "standin")
+    secret = tempfile.NamedTemporaryFile("w", suffix=".secret", delete=False)
+    secret.write("standin-secret")
+    secret.close()
+    os.environ.setdefault("CLIENT_SECRET_FILE", secret.name)
+    os.environ.setdefault("BENCHLING_APP_LOG_LEVEL", "WARNING")
+    from local_app.lib.tracing import tracer
+
+    # Time the app, not the span exporter
+    tracer.exporter = None
+
+    server_options = {
+        "latency": LatencyModel.parse(args.latency),
+        "rate_limit": args.rate_limit,
+        "throttle_probability": args.throttle_probability,
+    }
+    print(
+        f"{args.jobs} jobs of {args.clusters} clusters, latency {args.latency}, "
+        f"rate limit {args.rate_limit or 'none'}"
+    )
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            for engine in args.engines.split(","):
+                result = run(
+                    engine, args.jobs, concurrency, args.clusters, server_options
+                )
+                print(
+                    f"{engine:<8} x{concurrency:<3} wall {result['wall']:7.2f}s  "
+                    f"{describe(result['latencies'])}  "
+                    f"{result['succeeded']}/{args.jobs} done  "
+                    f"{result['requests']} requests  {result['throttled']} 429s"
+                )
+    finally:
+        os.unlink(secret.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+bench_tracing.py
+Description: Overhead of a span (a pipeline stage or a Benchling API call) with tracing off, and with
+the JSONL exporter writing in the background.
+
+Run from the repository root:
+    python -m benchmarks.bench_tracing --spans 100000
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import tempfile
+import time
+
+from local_app.lib.tracing import JsonlExporter, Tracer, annotate
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def run(tracer, spans):
+    start = time.perf_counter()
+    with tracer.span("job"):
+        for i in range(spans):
+            with tracer.span("GET /plates/{id}", status=200):
+                annotate(response_bytes=i)
+    return (time.perf_counter() - start) / spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spans", type=int, default=100000)
+    args = parser.parse_args()
+
+    off_s = run(Tracer(exporter=None), args.spans)
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = JsonlExporter(tmp, max_bytes=10**9)
+        jsonl_s = run(Tracer(exporter), args.spans)
+        start = time.perf_counter()
+        exporter.flush()
+        flush_s = time.perf_counter() - start
+
+    print(f"spans:         {args.spans}")
+    print(f"tracing off:   {off_s * 1e6:.2f} us/span")
+    print(f"jsonl:         {jsonl_s * 1e6:.2f} us/span (+{flush_s:.3f}s left to flush)")
+    print(f"dropped:       {exporter.dropped}")
+
+
+if __name__ == "__main__":
+    main()
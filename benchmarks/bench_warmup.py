@@ -0,0 +1,139 @@
+"""
+bench_warmup.py
+Description: Latency of the first job of a new worker, cold (PIPELINE_PREWARM=false: the job imports the
+pipeline, fetches the verification keys, the OAuth token and the app configuration) against warm (the
+same work done by the warm-up before /ready answers 200). Each run is a new interpreter; the imports
+and HTTP clients are real, the Benchling round trips are sleeps of the given latencies.
+
+Run from the repository root:
+    python -m benchmarks.bench_warmup --runs 5 --latency 0.15
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+ROOT = Path(__file__).resolve().parent.parent
+BASE_URL = "https://bench.benchling.com"
+APP_ID = "app_bench"
+
+
+class FakeTenant:
+    """The Benchling calls of a first job: each is paid once per worker, then cached."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.token = self.config = False
+
+    def fetch_jwks(self, app_definition_id):
+        from benchmarks.fakes import sleep_latency
+
+        sleep_latency(self.latency)
+        return {"keys": []}
+
+    def fetch_token(self, base_url):
+        from benchmarks.fakes import sleep_latency
+
+        if not self.token:
+            sleep_latency(self.latency)
+            self.token = True
+
+    def fetch_config(self, app_id, base_url):
+        from benchmarks.fakes import sleep_latency
+        from local_app.benchling_app import setup
+
+        setup._rate_limited_client(base_url, app_id)
+        if not self.config:
+            # TLS handshake, then the configuration request
+            sleep_latency(2 * self.latency)
+            self.config = True
+
+
+def child(mode, latency):
+    """Starts a worker, then times its first job; prints the timings as JSON."""
+    start = time.perf_counter()
+    os.environ["PIPELINE_PREWARM"] = "true" if mode == "warm" else "false"
+    os.environ["APP_DEFINITION_ID"] = "appdef_bench"
+    os.environ["WARMUP_TENANTS"] = f"{BASE_URL}={APP_ID}"
+    from local_app.benchling_app import warmup
+
+    tenant = FakeTenant(latency)
+    warmup.jwks_cache._fetch = tenant.fetch_jwks
+    warmup.fetch_token = tenant.fetch_token
+    warmup.fetch_config = tenant.fetch_config
+
+    from local_app.app import create_app
+
+    client = create_app().test_client()
+    client.get("/health")
+    up = time.perf_counter() - start
+
+    # Traffic is routed to the worker once /ready answers 200
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.005)
+    ready = time.perf_counter() - start
+
+    job_start = time.perf_counter()
+    from local_app.lib.lazy_imports import import_modules
+
+    import_modules()
+    warmup.jwks_cache("appdef_bench")
+    tenant.fetch_token(BASE_URL)
+    tenant.fetch_config(APP_ID, BASE_URL)
+    first_job = time.perf_counter() - job_start
+    print(json.dumps({"up_s": up, "ready_s": ready, "first_job_s": first_job}))
+
+
+def run(mode, latency):
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_warmup", "--child", mode]
+        + ["--latency", str(latency)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.15, help="seconds per Benchling round trip"
+    )
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.latency)
+        return
+
+    print(f"latency per round trip: {args.latency * 1e3:.0f} ms, {args.runs} runs")
+    for mode in ("cold", "warm"):
+        runs = [run(mode, args.latency) for _ in range(args.runs)]
+        medians = {
+            key: statistics.median(r[key] for r in runs) * 1e3 for key in runs[0]
+        }
+        print(
+            f"{mode + ':':<6} /health after {medians['up_s']:6.0f} ms, "
+            f"/ready after {medians['ready_s']:6.0f} ms, "
+            f"first job {medians['first_job_s']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,818 @@
+"""
+benchling_server.py
+Description: Local stand-in for the Benchling API, to run the real app (handle_webhook, the SDK, the rate
+limiter, the asyncio engine) offline under load. It serves every endpoint the app calls: the OAuth token,
+custom entities and DNA sequences (list with pagination and filters, get, bulk get, create, bulk create as
+tasks), tasks, blobs and their downloads, plates, container transfers, entries, assay results, canvases,
+app sessions and app configuration items. Each request waits for a sample of a latency distribution
+(globally or per endpoint), and a token bucket and/or a random fraction of the requests answer 429 with a
+Retry-After header, like the real rate limits.
+
+Serve it in the background of a benchmark or test:
+    with BenchlingServer(latency=LatencyModel(0.05, "lognormal", 0.5)) as server:
+        init_app(app_id, server.base_url)...
+or on its own, from the repository root:
+    python -m benchmarks.benchling_server --port 8765 --latency lognormal:0.05:0.5 --rate-limit 10
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import base64
+import hashlib
+import itertools
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Largest pageSize the list endpoints accept, and the one used when none is given
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 50
+# Creator of everything in the stand-in tenant
+STANDIN_USER = {"id": "ent_standin", "handle": "standin", "name": "Stand-in user"}
+
+
+class LatencyModel:
+    """
+    Seconds a request takes before it is answered:
+    "fixed"        always `mean`
+    "uniform"      `mean` +/- a `spread` fraction
+    "lognormal"    median `mean`, `spread` the sigma of the log (a long tail of slow requests)
+    "exponential"  mean `mean`
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+    def __init__(self, mean=0.0, distribution="fixed", spread=0.0, seed=None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.mean = mean
+        self.distribution = distribution
+        self.spread = spread
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec):
+        """From "<mean>" or "<distribution>:<mean>[:<spread>]", e.g. "lognormal:0.05:0.5"."""
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls(float(parts[0]))
+        return cls(
+            float(parts[1]), parts[0], float(parts[2]) if len(parts) > 2 else 0.0
+        )
+
+    def sample(self):
+        if self.mean <= 0:
+            return 0.0
+        with self._lock:
+            if self.distribution == "uniform":
+                return max(
+                    0.0,
+                    self._random.uniform(
+                        self.mean * (1 - self.spread), self.mean * (1 + self.spread)
+                    ),
+                )
+            if self.distribution == "lognormal":
+                return self.mean * math.exp(self._random.gauss(0.0, self.spread))
+            if self.distribution == "exponential":
+                return self._random.expovariate(1 / self.mean)
+            return self.mean
+
+    def __repr__(self):
+        return f"{self.distribution}:{self.mean}:{self.spread}"
+
+
+class RateLimit:
+    """
+    Token bucket of `per_second` requests refilled continuously, up to `burst`. `take()` returns 0
+    when a request may go through, else the seconds until a token is available (its Retry-After).
+    """
+
+    def __init__(self, per_second, burst=None):
+        self.per_second = per_second
+        self.burst = per_second if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.per_second
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.per_second
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _parse_time(value):
+    return datetime.strptime(value.rstrip("Z")[:19], "%Y-%m-%dT%H:%M:%S").replace(
+        tzinfo=timezone.utc
+    )
+
+
+class BenchlingState:
+    """
+    The data of the stand-in tenant, in the shape of the API responses. The `add_*` methods seed
+    what the app expects to find (the tagged CSV entities and their blobs, plates, notebook
+    entries, canvases, the app configuration); the routes create and update the rest.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self.entities = {}  # ID -> custom entity / DNA sequence
+        self.kinds = {}  # entity ID -> "custom" / "dna"
+        self.modified = {}  # entity ID -> epoch seconds of its last change
+        self.blobs = {}  # ID -> Blob
+        self.blob_content = {}  # blob ID -> bytes
+        self.plates = {}  # ID -> Plate
+        self.containers = {}  # container ID -> (plate ID, well position)
+        self.entries = {}  # ID -> Entry
+        self.assay_results = {}  # results table ID -> [assay result]
+        self.canvases = {}  # ID -> AppCanvas
+        self.sessions = {}  # ID -> AppSession
+        self.config_items = []  # AppConfigItem
+        self.tasks = {}  # ID -> AsyncTask
+
+    def new_id(self, prefix):
+        return f"{prefix}_{next(self._ids):08d}"
+
+    # ---------------------------------- entities
+    def create_entity(self, kind, body):
+        with self.lock:
+            entity_id = self.new_id("bfi" if kind == "custom" else "seq")
+            now = _now()
+            entity = {
+                "id": entity_id,
+                "name": body["name"],
+                "folderId": body.get("folderId"),
+                "schema": {"id": body.get("schemaId"), "name": body.get("schemaId")},
+                "fields": {
+                    name: self._field(field.get("value"))
+                    for name, field in (body.get("fields") or {}).items()
+                },
+                "customFields": {},
+                "aliases": body.get("aliases", []),
+                "authors": [],
+                "archiveRecord": None,
+                "registryId": body.get("registryId"),
+                "entityRegistryId": None,
+                "createdAt": now,
+                "modifiedAt": now,
+                "webURL": f"https://benchling.local/{entity_id}",
+                "apiURL": f"https://benchling.local/api/v2/{entity_id}",
+                "creator": STANDIN_USER,
+                "registrationOrigin": None,
+            }
+            if kind == "dna":
+                entity.update(
+                    bases=body.get("bases", ""),
+                    isCircular=body.get("isCircular", False),
+                    length=len(body.get("bases", "")),
+                    annotations=[],
+                    parts=[],
+                    primers=[],
+                    transcriptions=[],
+                    translations=[],
+                )
+            self.entities[entity_id] = entity
+            self.kinds[entity_id] = kind
+            self.modified[entity_id] = time.time()
+            return entity
+
+    def _field(self, value):
+        """Field of an entity: blob links show the name of their file."""
+        blob = self.blobs.get(value) if isinstance(value, str) else None
+        display = value if blob is None else blob["name"]
+        return {
+            "value": value,
+            "displayValue": None if display is None else str(display),
+            "isMulti": isinstance(value, list),
+            "textValue": None if display is None else str(display),
+            "type": "text" if blob is None else "blob_link",
+        }
+
+    def list_entities(self, kind, args):
+        """The entities of `kind` matching the list filters of the API."""
+        names = set(args.get("names.anyOf", "").split(",")) - {""}
+        modified_after = None
+        if args.get("modifiedAt", "").startswith(">"):
+            modified_after = _parse_time(
+                args["modifiedAt"].lstrip("> =").strip()
+            ).timestamp()
+        with self.lock:
+            found = []
+            for entity_id, entity in self.entities.items():
+                if self.kinds[entity_id] != kind:
+                    continue
+                if args.get("folderId") and entity["folderId"] != args["folderId"]:
+                    continue
+                if args.get("schemaId") and entity["schema"]["id"] != args["schemaId"]:
+                    continue
+                if args.get("name") and entity["name"] != args["name"]:
+                    continue
+                if names and entity["name"] not in names:
+                    continue
+                if modified_after and self.modified[entity_id] <= modified_after:
+                    continue
+                found.append(entity)
+            return found
+
+    # ---------------------------------- blobs
+    def add_blob(self, name, content, mime_type="text/csv"):
+        with self.lock:
+            blob_id = self.new_id("blob")
+            self.blobs[blob_id] = {
+                "id": blob_id,
+                "name": name,
+                "mimeType": mime_type,
+                "type": "RAW_FILE",
+                "uploadStatus": "COMPLETE",
+            }
+            self.blob_content[blob_id] = content
+            return self.blobs[blob_id]
+
+    def add_csv_entity(self, name, file_name, content, folder_id, schema_id):
+        """A CSV Entity: a custom entity whose "CSV" field links the blob of the file."""
+        blob = self.add_blob(file_name, content)
+        return self.create_entity(
+            "custom",
+            {
+                "name": name,
+                "folderId": folder_id,
+                "schemaId": schema_id,
+                "fields": {"CSV": {"value": blob["id"]}},
+            },
+        )
+
+    # ---------------------------------- plates and containers
+    def add_plate(self, name, well_names, schema_id="pltsch_standin"):
+        """An empty plate with a container in each of `well_names` ("A1", "A2"...)."""
+        with self.lock:
+            plate_id = self.new_id("plt")
+            wells = {}
+            for well in well_names:
+                container_id = self.new_id("con")
+                wells[well] = {
+                    "resourceType": "container",
+                    "id": container_id,
+                    "name": f"{name}:{well}",
+                    "barcode": container_id,
+                    "contents": [],
+                    "quantity": {"value": None, "units": None},
+                    "parentStorageId": plate_id,
+                    "archiveRecord": None,
+                }
+                self.containers[container_id] = (plate_id, well)
+            self.plates[plate_id] = {
+                "id": plate_id,
+                "name": name,
+                "barcode": plate_id,
+                "schema": {"id": schema_id, "name": schema_id},
+                "fields": {},
+                "wells": wells,
+                "archiveRecord": None,
+            }
+            return self.plates[plate_id]
+
+    def transfer(self, transfers):
+        with self.lock:
+            for transfer in transfers:
+                plate_id, well = self.containers[transfer["destinationContainerId"]]
+                container = self.plates[plate_id]["wells"][well]
+                quantity = transfer.get("transferQuantity") or {}
+                container["contents"].append(
+                    {
+                        "entity": self.entities.get(transfer.get("sourceEntityId")),
+                        "concentration": {"value": None, "units": None},
+                    }
+                )
+                container["quantity"] = {
+                    "value": (container["quantity"]["value"] or 0)
+                    + (quantity.get("value") or 0),
+                    "units": quantity.get("units"),
+                }
+
+    # ---------------------------------- entries and results
+    def add_entry(self, name, result_schema_id):
+        """A notebook entry holding one results table of the assay result schema."""
+        with self.lock:
+            entry_id = self.new_id("etr")
+            table_id = self.new_id("rtbl")
+            self.assay_results[table_id] = []
+            now = _now()
+            self.entries[entry_id] = {
+                "id": entry_id,
+                "name": name,
+                "displayId": entry_id.upper(),
+                "folderId": "lib_standin",
+                "createdAt": now,
+                "modifiedAt": now,
+                "authors": [],
+                "customFields": {},
+                "fields": {},
+                "schema": None,
+                "archiveRecord": None,
+                "webURL": f"https://benchling.local/{entry_id}",
+                "days": [
+                    {
+                        "date": now[:10],
+                        "notes": [
+                            {
+                                "type": "results_table",
+                                "apiId": table_id,
+                                "assayResultSchemaId": result_schema_id,
+                                "name": "Results",
+                                "columnLabels": [],
+                                "links": [],
+                                "text": "",
+                            }
+                        ],
+                    }
+                ],
+            }
+            return self.entries[entry_id]
+
+    # ---------------------------------- canvases, sessions and configuration
+    def add_canvas(self, app_id, blocks, resource_id=None):
+        """A canvas of app `app_id` showing `blocks` (UI blocks as API dicts)."""
+        return self.save_canvas(
+            {"appId": app_id, "blocks": blocks, "resourceId": resource_id}
+        )
+
+    def save_canvas(self, body, canvas_id=None):
+        with self.lock:
+            if canvas_id is None:
+                canvas_id = self.new_id("cnvs")
+                self.canvases[canvas_id] = {
+                    "id": canvas_id,
+                    "app": {"id": body.get("appId")},
+                    "featureId": body.get("featureId", "feat_standin"),
+                    "resourceId": body.get("resourceId"),
+                    "sessionId": None,
+                    "enabled": True,
+                    "blocks": [],
+                    "data": None,
+                    "archiveRecord": None,
+                }
+            canvas = self.canvases[canvas_id]
+            for key in ("blocks", "enabled", "sessionId", "data"):
+                if key in body:
+                    canvas[key] = body[key]
+            return canvas
+
+    def set_config(self, app_id, path, value, item_type="text"):
+        """Sets the app configuration item at `path` (a list of names) to `value`."""
+        with self.lock:
+            self.config_items = [
+                item
+                for item in self.config_items
+                if not (item["app"]["id"] == app_id and item["path"] == list(path))
+            ]
+            now = _now()
+            self.config_items.append(
+                {
+                    "id": self.new_id("aci"),
+                    "app": {"id": app_id},
+                    "path": list(path),
+                    "type": item_type,
+                    "value": value,
+                    "apiURL": "",
+                    "createdAt": now,
+                    "modifiedAt": now,
+                }
+            )
+
+    def complete_task(self, response):
+        with self.lock:
+            task_id = self.new_id("task")
+            self.tasks[task_id] = {
+                "id": task_id,
+                "status": "SUCCEEDED",
+                "message": "",
+                "response": response,
+            }
+            return task_id
+
+
+class BenchlingServer:
+    """
+    The stand-in API of one tenant, served by werkzeug on a background thread once started (or
+    used as a context manager). `latency` applies to every request, `endpoint_latency` overrides
+    it per route (the names of the route functions, e.g. {"list_entities": ...}). Requests beyond
+    the token bucket of `rate_limit` requests/s (0: none) and a `throttle_probability` fraction of
+    the others answer 429. `requests` and `throttled` count the requests per route.
+    """
+
+    def __init__(
+        self,
+        state=None,
+        latency=None,
+        endpoint_latency=None,
+        rate_limit=0.0,
+        burst=None,
+        throttle_probability=0.0,
+        retry_after=1,
+        seed=None,
+    ):
+        self.state = state or BenchlingState()
+        self.latency = latency or LatencyModel()
+        self.endpoint_latency = endpoint_latency or {}
+        self.rate_limit = RateLimit(rate_limit, burst) if rate_limit else None
+        self.throttle_probability = throttle_probability
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self.requests = Counter()
+        self.throttled = Counter()
+        self._stats_lock = threading.Lock()
+        self.flask_app = self._create_app()
+        self._server = None
+        self._thread = None
+        self.base_url = None
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serves in a background thread; returns the base URL of the tenant."""
+        self._server = make_server(
+            host, port, self.flask_app, threaded=True, request_handler=_QuietHandler
+        )
+        self.base_url = f"http://{host}:{self._server.server_port}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="benchling-standin", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        if self._server is None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # ---------------------------------- latency and rate limits
+    def _throttle(self):
+        """Seconds of Retry-After when this request is rate limited, else None."""
+        if self.rate_limit is not None:
+            wait = self.rate_limit.take()
+            if wait:
+                return max(wait, self.retry_after)
+        if self.throttle_probability:
+            with self._stats_lock:
+                throttled = self._random.random() < self.throttle_probability
+            if throttled:
+                return self.retry_after
+        return None
+
+    def _before_request(self):
+        endpoint = request.endpoint or "unknown"
+        with self._stats_lock:
+            self.requests[endpoint] += 1
+        time.sleep(self.endpoint_latency.get(endpoint, self.latency).sample())
+        if endpoint in ("token", "blob_file", "unknown"):
+            return None
+        retry_after = self._throttle()
+        if retry_after is not None:
+            with self._stats_lock:
+                self.throttled[endpoint] += 1
+            response = jsonify(
+                error={
+                    "type": "invalid_request_error",
+                    "message": "Rate limit exceeded, please retry later",
+                }
+            )
+            response.status_code = 429
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return _error(401, "Missing bearer token")
+        return None
+
+    # ---------------------------------- routes
+    def _create_app(self):
+        app = Flask("benchling_standin")
+        app.before_request(self._before_request)
+        state = self.state
+        api = "/api/v2"
+
+        @app.post(f"{api}/token")
+        def token():
+            if request.form.get("grant_type") != "client_credentials":
+                return _error(400, "Unsupported grant type")
+            return jsonify(
+                access_token=state.new_id("tok"), token_type="Bearer", expires_in=900
+            )
+
+        # -------- custom entities and DNA sequences
+        def register(kind, collection, path):
+            def list_entities():
+                entities = state.list_entities(kind, request.args)
+                return jsonify(_page(collection, entities, request.args))
+
+            def get_entity(entity_id):
+                entity = state.entities.get(entity_id)
+                if entity is None or state.kinds[entity_id] != kind:
+                    return _error(404, f"{entity_id} not found")
+                return jsonify(entity)
+
+            def bulk_get_entities():
+                ids = request.args.get(f"{_singular(collection)}Ids", "").split(",")
+                missing = [i for i in ids if i not in state.entities]
+                if missing:
+                    return _error(404, f"{missing} not found")
+                return jsonify({collection: [state.entities[i] for i in ids]})
+
+            def create_entity():
+                entity = state.create_entity(kind, request.get_json())
+                return jsonify(entity), 201
+
+            def bulk_create_entities():
+                body = request.get_json()[collection]
+                created = [state.create_entity(kind, entity) for entity in body]
+                return jsonify(taskId=state.complete_task({collection: created})), 202
+
+            for view, rule, methods in (
+                (list_entities, path, ["GET"]),
+                (get_entity, f"{path}/<entity_id>", ["GET"]),
+                (bulk_get_entities, f"{path}:bulk-get", ["GET"]),
+                (create_entity, path, ["POST"]),
+                (bulk_create_entities, f"{path}:bulk-create", ["POST"]),
+            ):
+                app.add_url_rule(
+                    f"{api}{rule}",
+                    endpoint=f"{view.__name__}_{kind}",
+                    view_func=view,
+                    methods=methods,
+                )
+
+        register("custom", "customEntities", "/custom-entities")
+        register("dna", "dnaSequences", "/dna-sequences")
+
+        @app.get(f"{api}/tasks/<task_id>")
+        def get_task(task_id):
+            task = state.tasks.get(task_id)
+            if task is None:
+                return _error(404, f"{task_id} not found")
+            return jsonify(task)
+
+        # -------- blobs
+        @app.post(f"{api}/blobs")
+        def create_blob():
+            body = request.get_json()
+            content = base64.b64decode(body["data64"])
+            if body.get("md5") and hashlib.md5(content).hexdigest() != body["md5"]:
+                return _error(400, "MD5 does not match")
+            blob = state.add_blob(body["name"], content, body.get("mimeType"))
+            return jsonify(blob)
+
+        @app.get(f"{api}/blobs/<blob_id>")
+        def get_blob(blob_id):
+            if blob_id not in state.blobs:
+                return _error(404, f"{blob_id} not found")
+            return jsonify(state.blobs[blob_id])
+
+        @app.get(f"{api}/blobs/<blob_id>/download-url")
+        def blob_download_url(blob_id):
+            if blob_id not in state.blobs:
+                return _error(404, f"{blob_id} not found")
+            # Pre-signed, like the S3 URLs of Benchling: no bearer token, no rate limit
+            return jsonify(
+                downloadURL=f"{request.host_url}blob-files/{blob_id}",
+                expiresAt=_now(),
+            )
+
+        @app.get(f"{api}/blobs/<blob_id>/download")
+        def blob_download(blob_id):
+            if blob_id not in state.blob_content:
+                return _error(404, f"{blob_id} not found")
+            return Response(
+                state.blob_content[blob_id], mimetype=state.blobs[blob_id]["mimeType"]
+            )
+
+        @app.get("/blob-files/<blob_id>")
+        def blob_file(blob_id):
+            if blob_id not in state.blob_content:
+                return _error(404, f"{blob_id} not found")
+            return Response(state.blob_content[blob_id])
+
+        # -------- plates and transfers
+        @app.get(f"{api}/plates/<plate_id>")
+        def get_plate(plate_id):
+            if plate_id not in state.plates:
+                return _error(404, f"{plate_id} not found")
+            # Serialized under the lock: transfers may be filling its wells
+            with state.lock:
+                return jsonify(state.plates[plate_id])
+
+        @app.post(f"{api}/transfers")
+        def transfer_into_containers():
+            transfers = request.get_json()["transfers"]
+            unknown = [
+                t["destinationContainerId"]
+                for t in transfers
+                if t["destinationContainerId"] not in state.containers
+            ]
+            if unknown:
+                return _error(400, f"Unknown containers {unknown}")
+            state.transfer(transfers)
+            return jsonify(taskId=state.complete_task({"containers": []})), 202
+
+        # -------- entries and assay results
+        @app.get(f"{api}/entries")
+        def list_entries():
+            with state.lock:
+                entries = [
+                    entry
+                    for entry in state.entries.values()
+                    if not request.args.get("name")
+                    or entry["name"] == request.args["name"]
+                ]
+            return jsonify(_page("entries", entries, request.args))
+
+        @app.get(f"{api}/entries/<entry_id>")
+        def get_entry(entry_id):
+            if entry_id not in state.entries:
+                return _error(404, f"{entry_id} not found")
+            return jsonify(entry=state.entries[entry_id])
+
+        @app.post(f"{api}/assay-results:bulk-create")
+        def bulk_create_assay_results():
+            body = request.get_json()
+            if body.get("tableId") not in state.assay_results:
+                return _error(400, f"Unknown results table {body.get('tableId')}")
+            ids = []
+            with state.lock:
+                for result in body["assayResults"]:
+                    result_id = state.new_id("res")
+                    state.assay_results[body["tableId"]].append(
+                        dict(result, id=result_id)
+                    )
+                    ids.append(result_id)
+            return jsonify(taskId=state.complete_task({"assayResultIds": ids})), 202
+
+        # -------- canvases, sessions and configuration
+        @app.post(f"{api}/app-canvases")
+        def create_canvas():
+            return jsonify(state.save_canvas(request.get_json())), 201
+
+        @app.get(f"{api}/app-canvases/<canvas_id>")
+        def get_canvas(canvas_id):
+            if canvas_id not in state.canvases:
+                return _error(404, f"{canvas_id} not found")
+            with state.lock:
+                return jsonify(state.canvases[canvas_id])
+
+        @app.patch(f"{api}/app-canvases/<canvas_id>")
+        def update_canvas(canvas_id):
+            if canvas_id not in state.canvases:
+                return _error(404, f"{canvas_id} not found")
+            with state.lock:
+                return jsonify(state.save_canvas(request.get_json(), canvas_id))
+
+        @app.post(f"{api}/app-sessions")
+        def create_session():
+            body = request.get_json()
+            with state.lock:
+                session_id = state.new_id("sesn")
+                now = _now()
+                state.sessions[session_id] = {
+                    "id": session_id,
+                    "app": {"id": body["appId"]},
+                    "name": body.get("name"),
+                    "status": "RUNNING",
+                    "timeoutSeconds": body.get("timeoutSeconds"),
+                    "messages": body.get("messages", []),
+                    "createdAt": now,
+                    "modifiedAt": now,
+                }
+            return jsonify(state.sessions[session_id]), 201
+
+        @app.patch(f"{api}/app-sessions/<session_id>")
+        def update_session(session_id):
+            if session_id not in state.sessions:
+                return _error(404, f"{session_id} not found")
+            body = request.get_json()
+            with state.lock:
+                session = state.sessions[session_id]
+                session["messages"] = session["messages"] + body.get("messages", [])
+                for key in ("status", "timeoutSeconds"):
+                    if key in body:
+                        session[key] = body[key]
+                session["modifiedAt"] = _now()
+            return jsonify(session)
+
+        @app.get(f"{api}/app-configuration-items")
+        def list_app_configuration_items():
+            with state.lock:
+                items = [
+                    item
+                    for item in state.config_items
+                    if not request.args.get("appId")
+                    or item["app"]["id"] == request.args["appId"]
+                ]
+            return jsonify(_page("appConfigurationItems", items, request.args))
+
+        return app
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """No access log: `requests` and `throttled` count the requests."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _singular(collection):
+    """customEntities -> customEntity, dnaSequences -> dnaSequence (the bulk-get ID parameter)."""
+    return collection[:-3] + "y" if collection.endswith("ies") else collection[:-1]
+
+
+def _page(collection, items, args):
+    """One page of `items`: the nextToken is the offset of the next page, "" after the last."""
+    page_size = min(int(args.get("pageSize", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    start = int(args.get("nextToken") or 0)
+    end = start + page_size
+    return {
+        collection: items[start:end],
+        "nextToken": str(end) if end < len(items) else "",
+    }
+
+
+def _error(status, message):
+    response = jsonify(error={"type": "invalid_request_error", "message": message})
+    response.status_code = status
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency",
+        default="0",
+        help='seconds per request: "<mean>" or "<distribution>:<mean>[:<spread>]"',
+    )
+    parser.add_argument(
+        "--endpoint-latency",
+        action="append",
+        default=[],
+        metavar="ROUTE=SPEC",
+        help="latency of one route, e.g. list_entities_dna=lognormal:0.3:0.5",
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="requests/s (0: none)"
+    )
+    parser.add_argument("--burst", type=float, default=None)
+    parser.add_argument(
+        "--throttle-probability",
+        type=float,
+        default=0.0,
+        help="fraction of the requests answering 429 anyway",
+    )
+    args = parser.parse_args()
+
+    server = BenchlingServer(
+        latency=LatencyModel.parse(args.latency),
+        endpoint_latency={
+            route: LatencyModel.parse(spec)
+            for route, spec in (item.split("=", 1) for item in args.endpoint_latency)
+        },
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        throttle_probability=args.throttle_probability,
+    )
+    print(f"Benchling stand-in on http://{args.host}:{args.port}")
+    server.flask_app.run(args.host, args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+fakes.py
+Description: Latency-injecting local stand-ins for the Benchling calls timed by the benchmarks
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import random
+import time
+from types import SimpleNamespace
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def sleep_latency(mean, jitter=0.0):
+    """Sleeps like a network round trip: `mean` seconds +/- a uniform `jitter` fraction."""
+    if mean <= 0:
+        return
+    time.sleep(max(0.0, random.uniform(mean * (1 - jitter), mean * (1 + jitter))))
+
+
+class LatencyPages:
+    """
+    Stand-in for a benchling_sdk PageIterator: yields `n_items` fake entities (or the given
+    `items`) in pages of `page_size`, sleeping `latency` seconds per page request.
+    """
+
+    def __init__(self, n_items, page_size=50, latency=0.05, jitter=0.0, items=None):
+        self.n_items = n_items if items is None else len(items)
+        self.items = items
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.pages_fetched = 0
+        self._offset = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._offset >= self.n_items:
+            raise StopIteration
+        sleep_latency(self.latency, self.jitter)
+        end = min(self._offset + self.page_size, self.n_items)
+        if self.items is not None:
+            page = self.items[self._offset : end]
+        else:
+            page = [
+                FakeEntity(f"ent_{i}", f"Entity {i}") for i in range(self._offset, end)
+            ]
+        self._offset = end
+        self.pages_fetched += 1
+        return page
+
+
+class FakeEntity:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+def latency_list_func(n_items, latency=0.05, jitter=0.0):
+    """Returns a fake `list(...)` endpoint honouring page_size, like app.benchling.dna_sequences.list."""
+
+    def list_func(page_size=50, **kwargs):
+        return LatencyPages(n_items, page_size=page_size, latency=latency, jitter=jitter)
+
+    return list_func
+
+
+class FakeWell:
+    __slots__ = ("id", "name", "barcode")
+
+    def __init__(self, id, name, barcode):
+        self.id = id
+        self.name = name
+        self.barcode = barcode
+
+
+class FakePlate:
+    """Stand-in for a benchling_sdk Plate: `plate.wells.additional_properties` maps "A1"... to wells."""
+
+    def __init__(self, name, layout):
+        self.id = f"plt_{name}"
+        self.name = name
+        wells = {}
+        for i, well_name in enumerate(layout.names):
+            key = well_name[:-2] + str(int(well_name[-2:]))  # A01 -> A1, like the API
+            wells[key] = FakeWell(f"con_{name}_{i}", f"{name}:{key}", f"bc_{name}_{i}")
+        self.wells = type("Wells", (), {"additional_properties": wells})()
+
+
+class _Value:
+    def __init__(self, value):
+        self._value = value
+
+    def required(self):
+        return self
+
+    def value_str(self):
+        return self._value
+
+
+class FakeConfigStore:
+    """app.config_store of a fake app: every configuration path is set, to an ID made from its name."""
+
+    def config_by_path(self, path):
+        return _Value("cfg_" + "_".join(path).lower().replace(" ", "_"))
+
+
+class _Task:
+    def __init__(self, response, latency):
+        self._response = response
+        self._latency = latency
+
+    def wait_for_response(self):
+        sleep_latency(self._latency)
+        return self._response
+
+
+class FakeEntities:
+    """
+    Stand-in for app.benchling.dna_sequences / custom_entities: `list` pages through the entities
+    of a folder and schema, `bulk_create` stores new ones. Each page, creation request and task
+    poll sleeps `latency` seconds.
+    """
+
+    def __init__(self, registry, kind, latency):
+        self.registry = registry
+        self.kind = kind
+        self.latency = latency
+
+    def list(self, folder_id=None, schema_id=None, page_size=50, **kwargs):
+        entities = list(self.registry.entities.get((folder_id, schema_id), {}).values())
+        return LatencyPages(0, page_size, self.latency, items=entities)
+
+    def bulk_create(self, entities):
+        sleep_latency(self.latency)
+        created = [self.registry.add(entity.to_dict()) for entity in entities]
+        return _Task(SimpleNamespace(**{self.kind: created}), self.latency)
+
+
+class FakeRegistry:
+    """In-memory Benchling registry behind a fake App, as used by create_and_register_entities."""
+
+    def __init__(self, latency=0.0, app_id="app_fake"):
+        self.entities = {}  # (folder ID, schema ID) -> {name: FakeEntity}
+        self._next_id = 0
+        self.app = SimpleNamespace(
+            id=app_id,
+            config_store=FakeConfigStore(),
+            benchling=SimpleNamespace(
+                dna_sequences=FakeEntities(self, "dna_sequences", latency),
+                custom_entities=FakeEntities(self, "custom_entities", latency),
+            ),
+        )
+
+    def add(self, body):
+        self._next_id += 1
+        entity = FakeEntity(f"ent_{self._next_id}", body["name"])
+        folder = self.entities.setdefault((body["folderId"], body["schemaId"]), {})
+        folder[entity.name] = entity
+        return entity
+
+    def add_existing(self, names, folder_path, schema_path):
+        """Registers entities (e.g. the strains) in the folder and schema of these config paths."""
+        config = self.app.config_store.config_by_path
+        for name in names:
+            self.add(
+                {
+                    "name": name,
+                    "folderId": config([folder_path]).value_str(),
+                    "schemaId": config([schema_path]).value_str(),
+                }
+            )
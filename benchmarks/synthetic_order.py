@@ -0,0 +1,258 @@
+"""
+synthetic_order.py
+Description: Synthetic CLC orders for the benchmarks: the seven CSVs read by load_and_clean_data (crRNA,
+receiver and screening primer metadata, the crRNA and primer plate specs, the genome mapping and the
+384-to-96 mapping), for any number of clusters, with the CLCact controls. The files agree with each other
+(wells, sequences and IDs of the plate specs match the metadata, the mapping matches clc_bac_layout), so an
+order goes through the cleaning and the registration without errors. The same seed gives the same order.
+
+Write an order to a folder, from the repository root:
+    python -m benchmarks.synthetic_order --clusters 83 --out /tmp/order
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import argparse
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from local_app.benchling_app.create_register_entites import clc_bac_layout
+from local_app.benchling_app.plate_layout import (
+    PLATE_96,
+    PLATE_384,
+    quadrant_96_to_384,
+)
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# destination_dict keys of ProcessCsvRun, and the file of each
+FILE_NAMES = {
+    "crRNA_metadata": "crrna_metadata.csv",
+    "receiver_primers_metadata": "rec_metadata.csv",
+    "screening_primers_metadata": "scr_metadata.csv",
+    "crRNA_plate_specs": "crrna_specs.csv",
+    "primers_plate_specs": "primers_specs.csv",
+    "strain_names_mapping": "genome.csv",
+    "plate_location_mapping": "mapping.csv",
+}
+
+# IDT notation of the crRNAs: the tracr-binding part, then the spacer as RNA triplets
+ALT_R1 = "/AltR1/rUrArA rUrUrU rCrUrA rCrUrA rArGrU rGrUrA rGrArU "
+ALT_R2 = " /AltR2/"
+# The act controls (cleaning_crrna sets the same sequences) and their strain
+ACT_CRRNAS = {"U": "GAATATGGGGCCACCCCCCAC", "D": "GCCTTTGCTTGCCTGGGCCAA"}
+ACT_STRAIN = "Streptomyces coelicolor M145"
+# Clusters sharing a strain, on average
+CLUSTERS_PER_STRAIN = 8
+# First cluster of the orders, as on the current CLC BAC plates
+FIRST_CLUSTER = 113
+
+
+def _bases(rng, n):
+    return "".join(rng.choices("ACGT", k=n))
+
+
+def idt_crrna(dna):
+    """IDT plate spec sequence of the crRNA of spacer `dna`."""
+    rna = ["r" + base for base in dna.replace("T", "U")]
+    triplets = ["".join(rna[i : i + 3]) for i in range(0, len(rna), 3)]
+    return ALT_R1 + " ".join(triplets) + ALT_R2
+
+
+def idt_primer(dna):
+    """IDT plate spec sequence of a primer: groups of 10 bases, the cleaning drops the spaces."""
+    return " ".join(dna[i : i + 10] for i in range(0, len(dna), 10))
+
+
+class _Plate:
+    """Hands out the wells of 384-well plates in row order, starting a new plate once full."""
+
+    def __init__(self):
+        self.used = 0
+
+    def next_well(self):
+        well = PLATE_384.names[self.used % PLATE_384.size]
+        self.used += 1
+        return well
+
+
+def generate_order(n_clusters, first_cluster=None, seed=0):
+    """
+    {destination_dict key: DataFrame} of an order of `n_clusters` consecutive clusters from
+    `first_cluster` (FIRST_CLUSTER by default), each with its U and D crRNAs, receiver primers and
+    C screening primers, plus the act controls. Orders larger than a CLC BAC plate continue on the
+    next plates, as in clc_bac_layout.
+    """
+    first_cluster = FIRST_CLUSTER if first_cluster is None else first_cluster
+    if first_cluster < 100:
+        # register_clc_bac matches the cleaned cluster numbers against 3-digit names
+        raise ValueError("Cluster numbers start at 100")
+    rng = random.Random(seed)
+    clusters = list(range(first_cluster, first_cluster + n_clusters))
+    # Numeric like the IDT order numbers: find_and_fill_plates looks for it in the plate names
+    order_id = 10_000 + seed
+    n_strains = max(1, -(-n_clusters // CLUSTERS_PER_STRAIN))
+    # Selection name (in the crRNA metadata) -> Benchling name of each strain
+    strains = {f"S{k:04d}": f"Streptomyces sp. CLC-S{k:04d}" for k in range(n_strains)}
+    selection_names = list(strains)
+
+    crrna_plate, primer_plate = _Plate(), _Plate()
+    crrna_rows, crrna_specs = [], []
+    receiver_rows, screening_rows, primer_specs = [], [], []
+    for cluster in clusters:
+        strain = selection_names[rng.randrange(n_strains)]
+        for prefix in ("U", "D"):
+            crrna_id = f"CLC{cluster}crRNA{prefix}"
+            spacer = _bases(rng, 20)
+            well = crrna_plate.next_well()
+            crrna_rows.append(
+                {
+                    "BGC_number": cluster,
+                    "strain_name": strain,
+                    "crRNA_prefix": prefix,
+                    "crRNA_strand": rng.choice("+-"),
+                    "crRNA_loc": rng.randrange(10_000, 9_000_000),
+                    "crRNA_id": crrna_id,
+                    "crRNA": spacer,
+                    "Well Position": well,
+                    "Order ID": order_id,
+                }
+            )
+            crrna_specs.append(
+                {
+                    "Well Position": well,
+                    "Sequence Name": crrna_id,
+                    "Sequence": idt_crrna(spacer),
+                    "µg": 2.0,
+                }
+            )
+
+            primer_id = f"CLC{cluster}rec{prefix}"
+            sequence = _bases(rng, 40)
+            well = primer_plate.next_well()
+            receiver_rows.append(
+                {
+                    "BGC_number": cluster,
+                    "receiver_primer_id": primer_id,
+                    "crRNA_prefix": prefix,
+                    "receiver_primer_seq": sequence,
+                    "Well Position": well,
+                }
+            )
+            primer_specs.append(
+                {
+                    "Well Position": well,
+                    "Sequence Name": primer_id,
+                    "Sequence": idt_primer(sequence),
+                    "Final Volume µL ": 50,
+                }
+            )
+
+        screening = {"BGC_num": cluster, "locus tag": f"CLC{cluster}C"}
+        for direction in ("f", "r"):
+            primer_id = f"CLC{cluster}C{direction.upper()}"
+            sequence = _bases(rng, 22)
+            well = primer_plate.next_well()
+            screening.update(
+                {
+                    f"{direction}_primer_name": primer_id,
+                    f"{direction}_primer_sequences(5-3)": sequence,
+                    f"{direction}_well_position": well,
+                }
+            )
+            primer_specs.append(
+                {
+                    "Well Position": well,
+                    "Sequence Name": primer_id,
+                    "Sequence": idt_primer(sequence),
+                    "Final Volume µL ": 50,
+                }
+            )
+        screening_rows.append(screening)
+
+    # The act controls are only on the plates: the cleaning fills in their metadata
+    for prefix, sequence in ACT_CRRNAS.items():
+        crrna_specs.append(
+            {
+                "Well Position": crrna_plate.next_well(),
+                "Sequence Name": f"CLCactcrRNA{prefix}001",
+                "Sequence": idt_crrna(sequence),
+                "µg": 2.0,
+            }
+        )
+    for control in ("CLCact48_001", "CLCact45_001", "CLCactCF_001", "CLCactCR_001"):
+        primer_specs.append(
+            {
+                "Well Position": primer_plate.next_well(),
+                "Sequence Name": control,
+                "Sequence": idt_primer(_bases(rng, 30)),
+                "Final Volume µL ": 50,
+            }
+        )
+
+    used_strains = sorted({row["strain_name"] for row in crrna_rows})
+    genomes = pd.DataFrame(
+        {
+            "benchling_name": [strains[name] for name in used_strains] + [ACT_STRAIN],
+            "selection_name": used_strains + [ACT_STRAIN],
+        }
+    )
+
+    wells, plates = clc_bac_layout(clusters)
+    plates = [plates[cluster] for cluster in clusters]
+    indices_96 = PLATE_96.indices([wells[cluster] for cluster in clusters])
+    mapping = pd.DataFrame(
+        {
+            "BGC_number": clusters,
+            "384_well_formatted": PLATE_384.names[
+                quadrant_96_to_384([plate % 4 for plate in plates], indices_96)
+            ],
+            "96_plate": [plate + 1 for plate in plates],
+            "96_well_formatted": [wells[cluster] for cluster in clusters],
+        }
+    )
+
+    return {
+        "crRNA_metadata": pd.DataFrame(crrna_rows),
+        "receiver_primers_metadata": pd.DataFrame(receiver_rows),
+        "screening_primers_metadata": pd.DataFrame(screening_rows),
+        "crRNA_plate_specs": pd.DataFrame(crrna_specs),
+        "primers_plate_specs": pd.DataFrame(primer_specs),
+        "strain_names_mapping": genomes,
+        "plate_location_mapping": mapping,
+    }
+
+
+def write_order(order, directory):
+    """Writes the CSVs of `order` to `directory`; returns the destination_dict of ProcessCsvRun."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    destination_dict = {}
+    for key, df in order.items():
+        path = directory / FILE_NAMES[key]
+        df.to_csv(path, index=False)
+        destination_dict[key] = str(path)
+    return destination_dict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clusters", type=int, default=83)
+    parser.add_argument("--first-cluster", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="folder of the CSVs")
+    args = parser.parse_args()
+
+    order = generate_order(args.clusters, args.first_cluster, args.seed)
+    for key, path in write_order(order, args.out).items():
+        print(f"{key:<28} {len(order[key]):6d} rows  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,31 +22,76 @@ from pathlib import Path
 # if not app_def_id:
 #     print("WARNING: APP_DEFINITION_ID is not set!")
 
-from threading import Thread
+import time
 
-from benchling_sdk.apps.helpers.webhook_helpers import verify
 from flask import Flask, request, jsonify
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from local_app.benchling_app.handler import handle_webhook
-from local_app.benchling_app.setup import app_definition_id
-from local_app.lib.logger import get_logger
+from local_app.benchling_app.warmup import WarmUp, jwks_cache
+from local_app.benchling_app.views.constants import (
+    FORCE_PROCESS_BUTTON_ID,
+    PROCESS_BUTTON_ID,
+)
+from local_app.lib.job_queue import FAST_LANE, HEAVY_LANE, job_queue
+from local_app.lib.lazy_imports import PIPELINE_PREWARM, lazy_function
+from local_app.lib.logger import get_logger, log_context, new_job_id
+from local_app.lib.metrics import (
+    REGISTRY,
+    WEBHOOK_ACK_SECONDS,
+    WEBHOOK_VERIFY_SECONDS,
+)
+from local_app.lib.tracing import in_current_context
 
 logger = get_logger()
 
+# The SDK (webhook verification, models) and the pipeline (pandas) are imported on the first webhook,
+# or in the background by create_app, so that a new worker answers /health right away
+verify = lazy_function("benchling_sdk.apps.helpers.webhook_helpers", "verify")
+app_definition_id = lazy_function("local_app.benchling_app.setup", "app_definition_id")
+handle_webhook = lazy_function("local_app.benchling_app.handler", "handle_webhook")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buttons starting a Process CSV run (minutes), every other webhook is a quick canvas update
+HEAVY_BUTTON_IDS = (PROCESS_BUTTON_ID, FORCE_PROCESS_BUTTON_ID)
+
 
 def create_app() -> Flask:
     app = Flask("clc-registration-app")
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    # Imports, verification keys, tokens and configurations ready before the first webhook
+    warm_up = WarmUp()
+    if PIPELINE_PREWARM:
+        warm_up.start_in_background()
+    else:
+        warm_up.done.set()
 
     @app.route("/health")
     def health_check() -> tuple[str, int]:
         # Just a route allowing us to check that Flask itself is up and running
         return "OK", 200
 
+    @app.route("/ready")
+    def readiness_check() -> tuple[str, int]:
+        # 503 until the worker is warmed up, to route traffic to it only then
+        status = warm_up.status()
+        return jsonify(status), 200 if status["ready"] else 503
+
     @app.route("/1/webhooks/<path:target>", methods=["POST"])
     def receive_webhooks(target: str) -> tuple[str, int]:
-        logger.info(f"Received webhook request for target: {target}")
+        start = time.perf_counter()
+        # Every line logged for this webhook, here and in its job, carries the same job_id
+        with log_context(job_id=new_job_id()):
+            response, status = _receive_webhook(target)
+        WEBHOOK_ACK_SECONDS.observe(time.perf_counter() - start, status=status)
+        return response, status
+
+    @app.route("/metrics")
+    def metrics() -> tuple[str, int, dict]:
+        return REGISTRY.render(), 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+
+    def _receive_webhook(target: str) -> tuple[str, int]:
+        logger.info("Received webhook request for target: %s", target)
         try:
             # For security, don't do anything else without first verifying the webhook
             app_def_id = app_definition_id()
@@ -61,7 +106,8 @@ def create_app() -> Flask:
 
             try:
                 # Important! To verify webhooks, we need to pass the body as an unmodified string
-                verify(app_def_id, raw_body, request.headers)
+                with WEBHOOK_VERIFY_SECONDS.time():
+                    _verify_webhook(app_def_id, raw_body, request.headers)
             except Exception as e:
                 logger.error(f"Webhook verification failed: {app_def_id}")
                 logger.error(f"Webhook verification failed: {raw_body}")
@@ -71,7 +117,12 @@ def create_app() -> Flask:
             # Parse JSON only after verification
             try:
                 webhook_data = request.json
-                logger.info(f"Webhook data: {webhook_data}")
+                logger.info(
+                    "Webhook of type %s (%d bytes)",
+                    webhook_data.get("message", {}).get("type"),
+                    len(raw_body),
+                )
+                logger.debug("Webhook data: %s", webhook_data)
             except Exception as e:
                 logger.error(f"Failed to parse webhook JSON: {str(e)}")
                 return jsonify({"error": "Invalid JSON in request"}), 400
@@ -90,16 +141,48 @@ def create_app() -> Flask:
     return app
 
 
+def _verify_webhook(app_def_id, raw_body, headers) -> None:
+    # The verification keys are cached rather than fetched for every webhook
+    try:
+        verify(app_def_id, raw_body, headers, jwk_function=jwks_cache)
+    except Exception:
+        # Benchling may have rotated its keys since they were fetched: try once with new ones
+        if not jwks_cache.refresh_if_stale(app_def_id):
+            raise
+        verify(app_def_id, raw_body, headers, jwk_function=jwks_cache)
+
+
+def job_lane(webhook_data) -> str:
+    message = webhook_data.get("message") or {}
+    if (
+        message.get("type") == "v2.canvas.userInteracted"
+        and message.get("buttonId") in HEAVY_BUTTON_IDS
+    ):
+        return HEAVY_LANE
+    return FAST_LANE
+
+
+def job_tenant(webhook_data) -> tuple:
+    """(base URL, app ID) of the installation the webhook comes from."""
+    return (
+        (webhook_data.get("baseURL") or "").rstrip("/"),
+        (webhook_data.get("app") or {}).get("id") or "",
+    )
+
+
 def _enqueue_work(webhook_data) -> None:
-    # PRODUCTION NOTE: A high volume of webhooks may spawn too many threads and lead to processing failures
-    # In production, we recommend a more robust queueing system for scale
+    # A fixed pool of JOB_WORKERS threads runs the jobs, a burst of webhooks waits in the queue.
+    # Canvas renders go to the fast lane, so they do not wait behind the Process CSV runs, and
+    # each tenant has its own queue, so a large order of one tenant does not hold up the others
     try:
-        thread = Thread(
-            target=handle_webhook,
-            args=(webhook_data,),
+        lane = job_lane(webhook_data)
+        job_queue.submit(
+            in_current_context(handle_webhook),
+            webhook_data,
+            lane=lane,
+            tenant=job_tenant(webhook_data),
         )
-        thread.start()
-        logger.debug("Successfully enqueued webhook for processing")
+        logger.debug("Successfully enqueued webhook in the %s lane", lane)
     except Exception as e:
         logger.error(f"Failed to enqueue work: {str(e)}")
         logger.error(traceback.format_exc())
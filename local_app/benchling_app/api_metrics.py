@@ -0,0 +1,113 @@
+"""
+api_metrics.py
+Description: Counts and times every Benchling API request by endpoint, and records it as a span of the
+current trace, through httpx event hooks. Requests that get no response (timeouts, connection errors)
+are counted apart and end their span with the error.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import re
+import time
+
+import httpx
+
+from local_app.lib.metrics import (
+    BENCHLING_API_ERRORS,
+    BENCHLING_API_REQUESTS,
+    BENCHLING_API_SECONDS,
+)
+from local_app.lib.tracing import tracer
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Benchling API IDs (seq_Ab12Cd, plt_..., etr_...), task UUIDs and numbers
+_ID_SEGMENT = re.compile(
+    r"^([a-z]+_[A-Za-z0-9]+|[0-9a-f]{8}-[0-9a-f-]{27}|[0-9]+)(:[\w-]+)?$"
+)
+_API_PREFIX = re.compile(r"^/api/v\d+(-beta|-alpha)?")
+
+
+def endpoint_label(path):
+    """
+    Endpoint of a request path with the IDs replaced, so the metrics have one series per
+    endpoint: /api/v2/plates/plt_X1 -> /plates/{id}, /api/v2/tasks/<uuid> -> /tasks/{id}.
+    """
+    path = _API_PREFIX.sub("", path)
+    segments = [
+        _ID_SEGMENT.sub(lambda match: "{id}" + (match.group(2) or ""), segment)
+        for segment in path.split("/")
+    ]
+    return "/".join(segments) or "/"
+
+
+def instrument_client(client):
+    """
+    Adds the metrics and tracing hooks to an httpx.Client, after its existing hooks. The response
+    hook never runs when the transport raises, so `send` is wrapped to end the span of the failed
+    request with the error and count it in BENCHLING_API_ERRORS.
+    """
+
+    def before_request(request):
+        request.extensions["metrics_start"] = time.perf_counter()
+        request.extensions["span"] = tracer.start_span(
+            f"{request.method} {endpoint_label(request.url.path)}",
+            request_bytes=int(request.headers.get("content-length", 0)),
+        )
+
+    def after_response(response):
+        request = response.request
+        endpoint = endpoint_label(request.url.path)
+        BENCHLING_API_REQUESTS.inc(
+            method=request.method, endpoint=endpoint, status=response.status_code
+        )
+        start = request.extensions.pop("metrics_start", None)
+        if start is not None:
+            BENCHLING_API_SECONDS.observe(
+                time.perf_counter() - start, method=request.method, endpoint=endpoint
+            )
+        span = request.extensions.pop("span", None)
+        if span is not None:
+            span.set(
+                status=response.status_code,
+                response_bytes=int(response.headers.get("content-length", 0)),
+            )
+            tracer.end_span(span)
+
+    def on_error(request, error):
+        request.extensions.pop("metrics_start", None)
+        span = request.extensions.pop("span", None)
+        if span is None:
+            # Raised before the request hook ran, or already ended by the response hook
+            return
+        BENCHLING_API_ERRORS.inc(
+            method=request.method,
+            endpoint=endpoint_label(request.url.path),
+            error=type(error).__name__,
+        )
+        tracer.end_span(span, error=error)
+
+    send = client.send
+
+    def instrumented_send(request, **kwargs):
+        try:
+            return send(request, **kwargs)
+        except Exception as e:
+            # After a redirect the request that failed is not `request`
+            try:
+                failed = e.request if isinstance(e, httpx.RequestError) else request
+            except RuntimeError:
+                failed = request
+            on_error(failed, e)
+            raise
+
+    client.send = instrumented_send
+    client.event_hooks = {
+        "request": client.event_hooks["request"] + [before_request],
+        "response": client.event_hooks["response"] + [after_response],
+    }
+    return client
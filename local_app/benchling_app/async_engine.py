@@ -0,0 +1,181 @@
+"""
+async_engine.py
+Description: Optional asyncio engine for the Process CSV pipeline (PIPELINE_ENGINE=asyncio). All the
+jobs of a worker share one event loop and one limit of stages running at once; within a job the files
+are downloaded concurrently and the notebook is written while the plates are filled. The Benchling SDK
+is synchronous: each stage still runs it in a thread of the engine, only the blob downloads are
+asynchronous (httpx.AsyncClient).
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from benchling_sdk.apps.status.errors import AppUserFacingError
+
+from local_app.benchling_app.csv_utils import download_csv_async
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# "threads" runs the stages one after the other in the webhook thread, "asyncio" uses AsyncEngine
+PIPELINE_ENGINE = os.getenv("PIPELINE_ENGINE", "threads").lower()
+# Stages (each making its SDK calls one after the other in a thread) and blob downloads running at
+# once, across all the jobs. A stage holds its slot until it ends, whatever its number of API calls
+ASYNC_STAGE_CONCURRENCY = int(os.getenv("ASYNC_STAGE_CONCURRENCY", "16"))
+ASYNC_HTTP_TIMEOUT_SECONDS = float(os.getenv("ASYNC_HTTP_TIMEOUT_SECONDS", "60"))
+
+
+class AsyncEngine:
+    """
+    Event loop running in a background thread, started on first use. Webhook threads hand it a
+    pipeline coroutine with `run()` and wait for the result. The SDK is blocking, so each stage goes
+    through `call()`, which runs it in the engine's thread pool; at most `concurrency` stages and
+    downloads run at once.
+    `transport` replaces the HTTP transport of the blob downloads (benchmarks, tests).
+    """
+
+    def __init__(self, concurrency=None, transport=None):
+        self.concurrency = (
+            ASYNC_STAGE_CONCURRENCY if concurrency is None else concurrency
+        )
+        self.transport = transport
+        self.http = None
+        self._budget = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _started_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(
+                    ThreadPoolExecutor(
+                        self.concurrency, thread_name_prefix="async-engine"
+                    )
+                )
+                self._budget = asyncio.Semaphore(self.concurrency)
+                self.http = httpx.AsyncClient(
+                    transport=self.transport, timeout=ASYNC_HTTP_TIMEOUT_SECONDS
+                )
+                threading.Thread(
+                    target=loop.run_forever, name="async-engine-loop", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro):
+        """Runs `coro` on the shared loop, blocks the calling thread until it is done."""
+        return asyncio.run_coroutine_threadsafe(coro, self._started_loop()).result()
+
+    async def call(self, fn, *args, **kwargs):
+        """Runs the blocking `fn(*args, **kwargs)` (a whole stage) in a worker thread, within the limit."""
+        async with self._budget:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def download(self, app, entit_id, destination_dict, csv_entity=None):
+        async with self._budget:
+            return await download_csv_async(
+                app, entit_id, destination_dict, self.http, csv_entity
+            )
+
+    def close(self):
+        """Stops the loop (tests, benchmarks). The engine starts again on the next run()."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(loop), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _shutdown(self, loop):
+        await self.http.aclose()
+        await loop.shutdown_default_executor()
+
+
+async_engine = AsyncEngine()
+
+
+def _raise_first(outcomes):
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return outcomes
+
+
+async def _download_all(run, engine):
+    """Downloads every tagged file at once, stops at the first file that cannot be used."""
+    try:
+        async with asyncio.TaskGroup() as group:
+            for ent_id in run.files_apis:
+                group.create_task(_download(run, engine, ent_id))
+    except BaseExceptionGroup as errors:
+        raise errors.exceptions[0]
+
+
+async def _download(run, engine, ent_id):
+    error_download_csv = await engine.download(
+        run.app, ent_id, run.destination_dict, run.csv_entities.get(ent_id)
+    )
+    if error_download_csv:
+        logger.warning(error_download_csv)
+        raise AppUserFacingError(error_download_csv)
+
+
+async def _upload_and_fill_plates(run, engine, registered_frames, plates_valid):
+    loop = asyncio.get_running_loop()
+    order_number, api_file_id = await engine.call(run.upload, registered_frames[0])
+    fill_summary = await engine.call(
+        run.fill_plates,
+        registered_frames,
+        order_number,
+        lambda: loop.call_soon_threadsafe(plates_valid.set),
+    )
+    return api_file_id, order_number, fill_summary
+
+
+async def process_csv_async(run, engine):
+    """
+    Same stages as ProcessCsvRun.process(), returns (api_file_id, order_number, fill_summary).
+    The notebook only needs the registered CLC BACs and the right plates: it is written as soon as
+    every plate is validated, while the transfers are submitted. A wrong or missing plate fails the
+    run before anything is written to the notebook, as with the threads engine. Once both branches
+    run, they always run to the end (their writes are not cancellable) before the first error, if
+    any, is raised.
+    """
+    if await engine.call(run.start):
+        await _download_all(run, engine)
+    await engine.call(run.check_downloads)
+    cleaned_frames = await engine.call(run.clean)
+    registered_frames = await engine.call(run.register, cleaned_frames)
+
+    plates_valid = asyncio.Event()
+    plates = asyncio.create_task(
+        _upload_and_fill_plates(run, engine, registered_frames, plates_valid)
+    )
+    validated = asyncio.create_task(plates_valid.wait())
+    await asyncio.wait((plates, validated), return_when=asyncio.FIRST_COMPLETED)
+    validated.cancel()
+    if not plates_valid.is_set():
+        # The plates failed before being validated (raised here), or were filled without the
+        # callback: the notebook is then written after them
+        await plates
+
+    plates, _ = _raise_first(
+        await asyncio.gather(
+            plates,
+            engine.call(run.write_notebook, registered_frames[0]),
+            return_exceptions=True,
+        )
+    )
+    return plates
@@ -20,23 +20,51 @@ from benchling_sdk.models import (
     ChipUiBlockType,
 )
 
+from local_app.benchling_app.async_engine import (
+    PIPELINE_ENGINE,
+    async_engine,
+    process_csv_async,
+)
+from local_app.benchling_app.checkpoint_utils import (
+    CLEANED_FRAMES,
+    DOWNLOADS,
+    NOTEBOOK,
+    PLATES,
+    REGISTRATION,
+    UPLOAD,
+    PipelineCheckpoint,
+    RunMemo,
+    input_hash,
+    restore_files,
+    snapshot_files,
+)
 from local_app.benchling_app.csv_utils import (
     download_csv,
+    csv_blob_ids,
+    get_csv_entities,
     check_all_csv_exist,
     upload_csv,
     delete_csvs,
     # process_csv,
 )
-from local_app.benchling_app.notebook_utils import process_notebook
+from local_app.benchling_app.notebook_utils import (
+    notebook_resolver,
+    process_notebook,
+)
 from local_app.benchling_app.create_register_entites import (
     load_and_clean_data,
     create_and_register_entities,
 )
 from local_app.benchling_app.plate_utils import find_and_fill_plates
 
-from local_app.benchling_app.views.constants import PROCESS_BUTTON_ID, TEXT_INPUT_ID
+from local_app.benchling_app.views.constants import (
+    FORCE_PROCESS_BUTTON_ID,
+    PROCESS_BUTTON_ID,
+    TEXT_INPUT_ID,
+)
 from local_app.benchling_app.views.canvas_initialize import input_blocks
 
+from local_app.lib.leases import LeaseLostError, leases
 from local_app.lib.logger import get_logger
 
 logger = get_logger()
@@ -46,75 +74,118 @@ class UnsupportedButtonError(Exception):
     pass
 
 
-def route_interaction_webhook(
-    app: App, canvas_interaction: CanvasInteractionWebhookV2
-) -> None:
-    canvas_id = canvas_interaction.canvas_id
-
-    # When the button is pressed, do this here:
-    if canvas_interaction.button_id == PROCESS_BUTTON_ID:
-        with app.create_session_context("Process CSV", timeout_seconds=20) as session:
-
-            session.attach_canvas(canvas_id)
-            canvas_builder = _canvas_builder_from_canvas_id(app, canvas_id)
-            canvas_inputs = (
-                canvas_builder.inputs_to_dict()
-            )  # .inputs_to_dict_single_value()
-
-            # Extract the API IDs of the files given to canvas
-            files_apis = (
-                canvas_inputs["input_block_metadata"]
-                + canvas_inputs["input_block_genome_mapping"]
-                + canvas_inputs["input_block_plate_specs"]
+class ProcessCsvRun:
+    """
+    One press of Process on a canvas: its inputs, the checkpoint keys of each stage and one method
+    per stage. Every stage resumes from its checkpoint when it already completed for the same
+    inputs, and raises AppUserFacingError when it fails. `process()` runs the stages one after the
+    other; the asyncio engine (async_engine.process_csv_async) overlaps the independent ones.
+    The stages writing to Benchling first check that the run still holds the `lease` of the canvas.
+    """
+
+    def __init__(self, app: App, canvas_id, canvas_inputs, lease=None):
+        self.app = app
+        self.canvas_id = canvas_id
+        self.lease = lease
+
+        # Extract the API IDs of the files given to canvas
+        self.files_apis = (
+            canvas_inputs["input_block_metadata"]
+            + canvas_inputs["input_block_genome_mapping"]
+            + canvas_inputs["input_block_plate_specs"]
+        )
+        self.plate_list = canvas_inputs["input_block_plates"]
+        self.notebook_name = canvas_inputs["input_block_notebook_name"]
+
+        self.destination_dict = {
+            #  "crRNA_metadata": {
+            #     "path": "external/crrna_dummy.csv",
+            # },
+            # dummies
+            # "crRNA_metadata": "/external/113_195_crRNA_metadata_2025_02_27_188_189_act_dummy.csv",
+            # "receiver_primers_metadata": "/external/rec_dummy.csv",
+            # "screening_primers_metadata": "/external/crrna_plate_specs_dummy.csv",
+            # "crRNA_plate_specs": "/external/crrna_specs_dummy.csv",
+            # "primers_plate_specs": "/external/primers_specs_dummy.csv",
+            # "strain_names_mapping": "/external/genome_dummy.csv",
+            # "plate_location_mapping": "/external/mapping_dummy.csv",
+            "crRNA_metadata": "/external/crrna_metadata.csv",
+            "receiver_primers_metadata": "/external/rec_metadata.csv",
+            "screening_primers_metadata": "/external/scr_metadata.csv",
+            "crRNA_plate_specs": "/external/crrna_specs.csv",
+            "primers_plate_specs": "/external/primers_specs.csv",
+            "strain_names_mapping": "/external/genome.csv",
+            "plate_location_mapping": "/external/mapping.csv",
+        }
+        # Every stage below is checkpointed for this canvas: a retry with the same files only
+        # redoes the stages that did not complete last time
+        self.checkpoint = PipelineCheckpoint(canvas_id)
+        self.csv_entities = get_csv_entities(app, self.files_apis)
+        self.files_key = input_hash(csv_blob_ids(self.csv_entities.values()))
+        self.plates_key = input_hash(self.files_key, self.plate_list)
+        self.notebook_key = input_hash(self.files_key, self.notebook_name)
+        self.run_key = input_hash(self.files_key, self.plate_list, self.notebook_name)
+
+    def start(self):
+        """
+        Starts the notebook lookup and clears the files of a previous run. Returns True when the
+        files still have to be downloaded, False when they were restored from the checkpoint.
+        """
+        # Look up the notebook and its results table while the files are processed
+        if not self.checkpoint.has(NOTEBOOK, self.notebook_key):
+            notebook_resolver.prefetch(
+                self.app,
+                self.notebook_name,
+                self.app.config_store.config_by_path(["Result schema"])
+                .required()
+                .value_str(),
             )
-            plate_list = canvas_inputs["input_block_plates"]
-            notebook_name = canvas_inputs["input_block_notebook_name"]
-
-            destination_dict = {
-                #  "crRNA_metadata": {
-                #     "path": "external/crrna_dummy.csv",
-                # },
-                # dummies
-                # "crRNA_metadata": "/external/113_195_crRNA_metadata_2025_02_27_188_189_act_dummy.csv",
-                # "receiver_primers_metadata": "/external/rec_dummy.csv",
-                # "screening_primers_metadata": "/external/crrna_plate_specs_dummy.csv",
-                # "crRNA_plate_specs": "/external/crrna_specs_dummy.csv",
-                # "primers_plate_specs": "/external/primers_specs_dummy.csv",
-                # "strain_names_mapping": "/external/genome_dummy.csv",
-                # "plate_location_mapping": "/external/mapping_dummy.csv",
-                "crRNA_metadata": "/external/crrna_metadata.csv",
-                "receiver_primers_metadata": "/external/rec_metadata.csv",
-                "screening_primers_metadata": "/external/scr_metadata.csv",
-                "crRNA_plate_specs": "/external/crrna_specs.csv",
-                "primers_plate_specs": "/external/primers_specs.csv",
-                "strain_names_mapping": "/external/genome.csv",
-                "plate_location_mapping": "/external/mapping.csv",
-            }
-            # erase preloaded files
-            for key, value in destination_dict.items():
-                if os.path.isfile(value):
-                    delete_csvs(value)
-
-            #  Download all files
-
-            for ent_id in files_apis:
 
-                error_download_csv = download_csv(
-                    app=app, entit_id=ent_id, destination_dict=destination_dict
-                )
+        # erase preloaded files
+        for key, value in self.destination_dict.items():
+            if os.path.isfile(value):
+                delete_csvs(value)
 
-                if error_download_csv:
-                    logger.warning(error_download_csv)
-                    raise AppUserFacingError(error_download_csv)
+        self.downloaded_files = self.checkpoint.load(DOWNLOADS, self.files_key)
+        if self.downloaded_files is not None:
+            restore_files(self.downloaded_files)
+            return False
+        return True
+
+    def download(self, ent_id):
+        error_download_csv = download_csv(
+            app=self.app,
+            entit_id=ent_id,
+            destination_dict=self.destination_dict,
+            csv_entity=self.csv_entities.get(ent_id),
+        )
 
-            # commen tthis for when testing and not uploading all the files:
-            # Check that all necessary files have been uploaded
-            error_missing_csv = check_all_csv_exist(destination_dict)
-            if error_missing_csv:
-                logger.warning(error_missing_csv)
-                raise AppUserFacingError(error_missing_csv)
+        if error_download_csv:
+            logger.warning(error_download_csv)
+            raise AppUserFacingError(error_download_csv)
+
+    def check_downloads(self):
+        # commen tthis for when testing and not uploading all the files:
+        # Check that all necessary files have been uploaded
+        error_missing_csv = check_all_csv_exist(
+            {
+                key: value
+                for key, value in self.destination_dict.items()
+                if key not in _OPTIONAL_CSVS
+            }
+        )
+        if error_missing_csv:
+            logger.warning(error_missing_csv)
+            raise AppUserFacingError(error_missing_csv)
+        if self.downloaded_files is None:
+            self.checkpoint.save(
+                DOWNLOADS, self.files_key, snapshot_files(self.destination_dict)
+            )
 
-            # Read the files, check they contain all the necessary information
+    def clean(self):
+        """Reads the files, checks they contain all the necessary information."""
+        cleaned_frames = self.checkpoint.load(CLEANED_FRAMES, self.files_key)
+        if cleaned_frames is None:
             (
                 crrna_df_merge,
                 receivers_df_merge,
@@ -122,93 +193,156 @@ def route_interaction_webhook(
                 genomes_df,
                 mapping_df,
                 error_load_data,
-            ) = load_and_clean_data(destination_dict)
+            ) = load_and_clean_data(self.destination_dict)
             if error_load_data:
                 logger.warning(error_load_data)
                 raise AppUserFacingError(error_load_data)
+            cleaned_frames = (
+                crrna_df_merge,
+                receivers_df_merge,
+                screening_df_merge,
+                genomes_df,
+                mapping_df,
+            )
+            self.checkpoint.save(CLEANED_FRAMES, self.files_key, cleaned_frames)
+        return cleaned_frames
+
+    def check_lease(self):
+        if self.lease is None:
+            return
+        try:
+            self.lease.check()
+        except LeaseLostError as e:
+            logger.error(str(e))
+            raise AppUserFacingError(
+                "Processing of this canvas was interrupted. Press Process again to resume it."
+            )
 
-            # Register the entities
-            # TODO uncomment lines to actually register the entities in the registries, currently just creating entities
+    def register(self, cleaned_frames):
+        """
+        Registers the entities. Returns (clc_bac_df, crrna_df_merge, receivers_df_merge,
+        screening_df_merge).
+        """
+        # TODO uncomment lines to actually register the entities in the registries, currently just creating entities
+        registered_frames = self.checkpoint.load(REGISTRATION, self.files_key)
+        if registered_frames is None:
+            self.check_lease()
             (
                 clc_bac_df,
                 crrna_df_merge,
                 receivers_df_merge,
                 screening_df_merge,
                 error_create_and_register_entities,
-            ) = create_and_register_entities(
-                app,
-                crrna_df_merge,
-                receivers_df_merge,
-                screening_df_merge,
-                genomes_df,
-                mapping_df,
-            )
+            ) = create_and_register_entities(self.app, *cleaned_frames)
 
             if error_create_and_register_entities:
                 logger.warning(str(error_create_and_register_entities))
                 raise AppUserFacingError(error_create_and_register_entities)
-
-            destination_dict, order_number, api_file_id = upload_csv(
-                app=app,
+            registered_frames = (
+                clc_bac_df,
+                crrna_df_merge,
+                receivers_df_merge,
+                screening_df_merge,
+            )
+            self.checkpoint.save(REGISTRATION, self.files_key, registered_frames)
+        return registered_frames
+
+    def upload(self, clc_bac_df):
+        """Uploads the file with the API IDs, returns (order_number, api_file_id)."""
+        uploaded = self.checkpoint.load(UPLOAD, self.files_key)
+        if uploaded is None:
+            self.check_lease()
+            self.destination_dict, order_number, api_file_id = upload_csv(
+                app=self.app,
                 df=clc_bac_df,
-                destination_dict=destination_dict,
+                destination_dict=self.destination_dict,
                 path="/processed/api_ids.csv",
                 # folder_id=  b_api_ids.my_folder_id,  # "my_folder",
                 # schema_id= b_api_ids.schema_id,  #"ts_WDtkRWgc",
             )
-
-            # erase unnecessary files
-            for key, value in destination_dict.items():
-                delete_csvs(value)
-
-            # Find and fill the plates with the corresponding oligos
-
-            error_find_and_fill_plates = find_and_fill_plates(
-                app=app,
+            self.checkpoint.save(UPLOAD, self.files_key, (order_number, api_file_id))
+        else:
+            order_number, api_file_id = uploaded
+
+        # erase unnecessary files
+        for key, value in self.destination_dict.items():
+            delete_csvs(value)
+        return order_number, api_file_id
+
+    def fill_plates(self, registered_frames, order_number, on_validated=None):
+        """
+        Finds and fills the plates with the corresponding oligos. `on_validated()` is called once
+        the plates are known to be the right ones (see find_and_fill_plates).
+        """
+        _, crrna_df_merge, receivers_df_merge, screening_df_merge = registered_frames
+        fill_summary = self.checkpoint.load(PLATES, self.plates_key)
+        if fill_summary is None:
+            self.check_lease()
+            fill_summary, error_find_and_fill_plates = find_and_fill_plates(
+                app=self.app,
                 crrna_df_merge=crrna_df_merge,
                 receivers_df_merge=receivers_df_merge,
                 screening_df_merge=screening_df_merge,
-                plate_list=plate_list,
+                plate_list=self.plate_list,
                 order_number=order_number,
+                on_validated=on_validated,
             )
 
             if error_find_and_fill_plates:
                 logger.warning(str(error_find_and_fill_plates))
                 raise AppUserFacingError(error_find_and_fill_plates)
-
-            # Find the results table and return the created entities as tags
-
+            self.checkpoint.save(PLATES, self.plates_key, fill_summary)
+        elif on_validated is not None:
+            on_validated()
+        return fill_summary
+
+    def write_notebook(self, clc_bac_df):
+        """Finds the results table and returns the created entities as tags."""
+        if not self.checkpoint.has(NOTEBOOK, self.notebook_key):
+            self.check_lease()
             error_process_notebook = process_notebook(
-                app=app, notebook_name=notebook_name, clc_bac_df=clc_bac_df
+                app=self.app,
+                notebook_name=self.notebook_name,
+                clc_bac_df=clc_bac_df,
+                checkpoint=self.checkpoint,
+                checkpoint_key=self.notebook_key,
             )
             if error_process_notebook:
                 logger.warning(error_process_notebook)
                 raise AppUserFacingError(error_process_notebook)
+            self.checkpoint.save(NOTEBOOK, self.notebook_key, True)
 
-                # api_file_id
-
-            results_blocks = [
-                MarkdownUiBlock(
-                    id="results_display",
-                    type=MarkdownUiBlockType.MARKDOWN,
-                    value="""
-                    Success!!!\n Please click the plug icon in the toolbar of the **CLC BAC Entities Registration Output** results 
-                    table (just underneath) to integrate pending results. It might take a couple of seconds for the icon to activate, if 
-                    it doesn't, refresh the page to activate it. \n Also please check that the plates have been filled up (hovering 
-                    on top of their tags should already show that they are not empty anymore).
-                    
-                
-                    The following file will be necessary if many/all of the entities that you just created 
-                    need to be modified or achived computationally.
-                    """,
-                ),
-                ChipUiBlock(
-                    id="file_with_apis", type=ChipUiBlockType.CHIP, value=api_file_id
-                ),
-            ]
-
-            canvas_update = canvas_builder.with_blocks(results_blocks).to_update()
-            session.app.benchling.apps.update_canvas(canvas_id, canvas_update)
+    def process(self):
+        """Runs every stage in order, returns (api_file_id, order_number, fill_summary)."""
+        if self.start():
+            #  Download all files
+            for ent_id in self.files_apis:
+                self.download(ent_id)
+        self.check_downloads()
+        registered_frames = self.register(self.clean())
+        clc_bac_df = registered_frames[0]
+        order_number, api_file_id = self.upload(clc_bac_df)
+        fill_summary = self.fill_plates(registered_frames, order_number)
+        self.write_notebook(clc_bac_df)
+        return api_file_id, order_number, fill_summary
+
+
+def route_interaction_webhook(
+    app: App, canvas_interaction: CanvasInteractionWebhookV2
+) -> None:
+    canvas_id = canvas_interaction.canvas_id
+
+    # When the button is pressed, do this here:
+    if canvas_interaction.button_id in (PROCESS_BUTTON_ID, FORCE_PROCESS_BUTTON_ID):
+        force = canvas_interaction.button_id == FORCE_PROCESS_BUTTON_ID
+        # One run per canvas across the workers and replicas: a second press (or a redelivered
+        # webhook) while it runs only gets a note, the running one updates the canvas
+        with leases.hold(canvas_id) as lease:
+            if lease is None:
+                logger.info("Canvas %s is already being processed", canvas_id)
+                _show_already_processing(app, canvas_id)
+                return
+            _process_canvas(app, canvas_id, force, lease)
 
     else:
         # Re-enable the Canvas, or it will stay disabled and the user will be stuck
@@ -219,6 +353,65 @@ def route_interaction_webhook(
         )
 
 
+def _show_already_processing(app: App, canvas_id):
+    """
+    Tells the user the canvas is already being processed, and re-enables it (Benchling disables it
+    on every press). The running job replaces these blocks with its results.
+    """
+    canvas_builder = _canvas_builder_from_canvas_id(app, canvas_id)
+    canvas_builder.blocks.filter(lambda block: block.id in _RESULT_BLOCK_IDS).remove()
+    canvas_builder.blocks.append(_already_processing_blocks())
+    app.benchling.apps.update_canvas(
+        canvas_id, canvas_builder.with_enabled().to_update()
+    )
+
+
+def _process_canvas(app: App, canvas_id, force, lease):
+    with app.create_session_context("Process CSV", timeout_seconds=20) as session:
+
+        session.attach_canvas(canvas_id)
+        canvas_builder = _canvas_builder_from_canvas_id(app, canvas_id)
+        canvas_inputs = (
+            canvas_builder.inputs_to_dict()
+        )  # .inputs_to_dict_single_value()
+        run = ProcessCsvRun(app, canvas_id, canvas_inputs, lease=lease)
+
+        # Exactly these files, plates and notebook were already processed successfully:
+        # show the results again instead of redoing everything (unless forced)
+        run_memo = RunMemo()
+        previous_run = None if force else run_memo.get(run.run_key)
+        if previous_run:
+            logger.info("Inputs of canvas %s already processed", canvas_id)
+            canvas_builder.blocks.filter(
+                lambda block: block.id in _RESULT_BLOCK_IDS
+            ).remove()
+            canvas_builder.blocks.append(
+                _results_blocks(
+                    previous_run["api_file_id"], previous_run["order_number"]
+                )
+                + _already_processed_blocks()
+            )
+            canvas_update = canvas_builder.with_enabled().to_update()
+            session.app.benchling.apps.update_canvas(canvas_id, canvas_update)
+            return
+
+        if PIPELINE_ENGINE == "asyncio":
+            api_file_id, order_number, fill_summary = async_engine.run(
+                process_csv_async(run, async_engine)
+            )
+        else:
+            api_file_id, order_number, fill_summary = run.process()
+
+        results_blocks = _results_blocks(api_file_id, order_number, fill_summary)
+
+        canvas_update = canvas_builder.with_blocks(results_blocks).to_update()
+        session.app.benchling.apps.update_canvas(canvas_id, canvas_update)
+
+        # The whole run went through, nothing left to resume
+        run.checkpoint.clear()
+        run_memo.record(run.run_key, api_file_id=api_file_id, order_number=order_number)
+
+
 """
 if canvas_interaction.button_id == "PROCESS_BUTTON_ID":
         # Optionally start the container (only if not running)
@@ -242,6 +435,74 @@ if canvas_interaction.button_id == "PROCESS_BUTTON_ID":
 #     ]
 
 
+# Files that may be left out of the tagged inputs
+_OPTIONAL_CSVS = {"plate_location_mapping"}
+
+# Blocks added to the canvas once the pipeline has run
+_RESULT_BLOCK_IDS = {
+    "results_display",
+    "file_with_apis",
+    "already_processed",
+    "already_processing",
+    FORCE_PROCESS_BUTTON_ID,
+}
+
+
+def _fill_summary_text(fill_summary):
+    if not fill_summary:
+        return ""
+    lines = [
+        f"- {plate_name}: {counts['submitted']} wells filled, {counts['skipped']} already filled"
+        for plate_name, counts in fill_summary.items()
+    ]
+    return "\n\n Plates:\n" + "\n".join(lines) + "\n"
+
+
+def _results_blocks(api_file_id, order_number, fill_summary=None):
+    return [
+        MarkdownUiBlock(
+            id="results_display",
+            type=MarkdownUiBlockType.MARKDOWN,
+            value=f"""
+            Success!!! (order number {order_number})\n Please click the plug icon in the toolbar of the **CLC BAC Entities Registration Output** results 
+            table (just underneath) to integrate pending results. It might take a couple of seconds for the icon to activate, if 
+            it doesn't, refresh the page to activate it. \n Also please check that the plates have been filled up (hovering 
+            on top of their tags should already show that they are not empty anymore).
+            
+
+            The following file will be necessary if many/all of the entities that you just created 
+            need to be modified or achived computationally.
+            """ + _fill_summary_text(fill_summary),
+        ),
+        ChipUiBlock(id="file_with_apis", type=ChipUiBlockType.CHIP, value=api_file_id),
+    ]
+
+
+def _already_processed_blocks():
+    return [
+        MarkdownUiBlock(
+            id="already_processed",
+            type=MarkdownUiBlockType.MARKDOWN,
+            value="These files, plates and notebook were already processed, nothing has been registered again. Click below only if you really need to run everything again.",
+        ),
+        ButtonUiBlock(
+            id=FORCE_PROCESS_BUTTON_ID,
+            text="Process again anyway",
+            type=ButtonUiBlockType.BUTTON,
+        ),
+    ]
+
+
+def _already_processing_blocks():
+    return [
+        MarkdownUiBlock(
+            id="already_processing",
+            type=MarkdownUiBlockType.MARKDOWN,
+            value="These files are already being processed, the results will show up here once the run finishes.",
+        ),
+    ]
+
+
 def _canvas_builder_from_canvas_id(app: App, canvas_id: str) -> CanvasBuilder:
     current_canvas = app.benchling.apps.get_canvas_by_id(canvas_id)
     return CanvasBuilder.from_canvas(current_canvas)
@@ -0,0 +1,197 @@
+"""
+checkpoint_utils.py
+Description: Persist the outputs of each stage of the Process CSV pipeline, so a retry after a
+late failure (wrong plate, mistyped notebook name...) resumes where the previous run stopped,
+and remember complete runs so an identical re-run can be answered without redoing any work.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+CHECKPOINT_DIR = os.getenv("PIPELINE_CHECKPOINT_DIR", "/processed/checkpoints")
+CHECKPOINT_TTL_SECONDS = int(
+    os.getenv("PIPELINE_CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600))
+)
+MEMO_DIR = os.getenv("PIPELINE_MEMO_DIR", "/processed/run_memo")
+MEMO_TTL_SECONDS = int(os.getenv("PIPELINE_MEMO_TTL_SECONDS", str(7 * 24 * 3600)))
+MEMO_MAX_ENTRIES = int(os.getenv("PIPELINE_MEMO_MAX_ENTRIES", "500"))
+
+# Stages of route_interaction_webhook, in the order they run
+DOWNLOADS = "downloads"
+CLEANED_FRAMES = "cleaned_frames"
+REGISTRATION = "registration"
+UPLOAD = "upload"
+PLATES = "plates"
+NOTEBOOK = "notebook"
+# Assay result chunks already accepted by Benchling, within the notebook stage
+NOTEBOOK_CHUNK = "notebook_chunk"
+
+
+def input_hash(*parts):
+    """Short, stable hash of JSON-able inputs (lists are hashed as given, sort them first if needed)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class PipelineCheckpoint:
+    """
+    Stage outputs of one canvas, stored as `<root>/<canvas_id>/<stage>-<input hash>.pkl`.
+    A stage only counts as done for the exact inputs it ran with. Failing to read or write a
+    checkpoint is logged and treated as "not done", never as a pipeline error. The checkpoints of
+    canvases that failed or were abandoned are evicted once untouched for `ttl_seconds`.
+    """
+
+    def __init__(self, canvas_id, root=None, ttl_seconds=None):
+        self.canvas_id = canvas_id
+        self.root = Path(root or CHECKPOINT_DIR)
+        self.directory = self.root / canvas_id
+        self.ttl_seconds = (
+            CHECKPOINT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+
+    def _path(self, stage, key):
+        return self.directory / f"{stage}-{key}.pkl"
+
+    def has(self, stage, key):
+        return self._path(stage, key).is_file()
+
+    def load(self, stage, key, default=None):
+        path = self._path(stage, key)
+        if not path.is_file():
+            return default
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning("Ignoring unreadable checkpoint %s: %s", path, e)
+            return default
+        logger.info("Resuming %s for canvas %s from checkpoint", stage, self.canvas_id)
+        return value
+
+    def save(self, stage, key, value):
+        path = self._path(stage, key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open("wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not write checkpoint %s: %s", path, e)
+            return
+        self.evict()
+
+    def clear(self):
+        """Drops every checkpoint of the canvas, once the whole pipeline has succeeded."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def evict(self):
+        """Drops the checkpoints of every canvas not written to for `ttl_seconds`."""
+        try:
+            directories = [
+                (p.stat().st_mtime, p) for p in self.root.iterdir() if p.is_dir()
+            ]
+        except OSError:
+            return
+        now = time.time()
+        for mtime, directory in directories:
+            if now - mtime > self.ttl_seconds:
+                logger.info("Evicting stale checkpoints %s", directory)
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+def snapshot_files(destination_dict):
+    """Reads the downloaded CSVs into memory so they can be stored as the downloads checkpoint."""
+    files = {}
+    for key, value in destination_dict.items():
+        path = Path(value)
+        if path.is_file():
+            files[str(path)] = path.read_bytes()
+    return files
+
+
+def restore_files(files):
+    """Writes back the CSVs of a downloads checkpoint to their original paths."""
+    for value, content in files.items():
+        path = Path(value)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+# ================================== Memo of complete runs ==================================
+
+
+class RunMemo:
+    """
+    Results of complete, successful runs (`<root>/<run hash>.json`), keyed by the hash of everything
+    a run depends on. Entries older than `ttl_seconds` are stale and only the `max_entries` most
+    recent ones are kept.
+    """
+
+    def __init__(self, root=None, ttl_seconds=None, max_entries=None):
+        self.directory = Path(root or MEMO_DIR)
+        self.ttl_seconds = MEMO_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = MEMO_MAX_ENTRIES if max_entries is None else max_entries
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        """Returns the recorded results of the run, or None if there is no fresh entry."""
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable run memo %s: %s", path, e)
+            return None
+
+        if time.time() - entry.get("completed_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def record(self, key, **results):
+        """Stores the results of a successful run, then evicts stale and surplus entries."""
+        path = self._path(key)
+        entry = dict(results, completed_at=time.time())
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open("w") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not write run memo %s: %s", path, e)
+            return
+        self.evict()
+
+    def evict(self):
+        try:
+            entries = [(p.stat().st_mtime, p) for p in self.directory.glob("*.json")]
+        except OSError:
+            return
+        now = time.time()
+        entries.sort(reverse=True)
+        for rank, (mtime, path) in enumerate(entries):
+            if rank >= self.max_entries or now - mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
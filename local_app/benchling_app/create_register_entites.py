@@ -10,20 +10,20 @@ Date: April 11, 2025
 # ==================================
 
 
+import numpy as np
 import pandas as pd
 import os
 
 from benchling_sdk.apps.framework import App
-from benchling_sdk.helpers.serialization_helpers import fields
 from benchling_sdk.helpers.task_helpers import TaskHelper
-from benchling_sdk.models import (
-    CustomEntityBulkCreate,
-    DnaSequenceBulkCreate,
-    NamingStrategy,
-)
+from benchling_sdk.models import NamingStrategy
 
 import local_app.benchling_app.benchling_api_ids as b_api_ids
-from local_app.lib.logger import get_logger
+from local_app.benchling_app.entity_index import entity_index
+from local_app.benchling_app.entity_payloads import EntityPayloadSpec
+from local_app.benchling_app.plate_layout import PLATE_96, fill_order
+from local_app.lib.logger import get_logger, summarize_items
+from local_app.lib.tracing import annotate, pipeline_stage
 
 
 # ==================================
@@ -296,7 +296,8 @@ def cleaning_screening(
     screening_df, primers_plate_specs_df_clean, only_make_idt_excel_for_C_primers=True
 ):
 
-    screening_df["BGC_number"] = screening_df["locus tag"].str.extract(r"CLC(\d{3})")
+    # Every digit: orders spanning several CLC BAC plates reach cluster 1000 (CLC1000)
+    screening_df["BGC_number"] = screening_df["locus tag"].str.extract(r"CLC(\d+)")
 
     # keep only C screening primers
     if only_make_idt_excel_for_C_primers:
@@ -387,6 +388,7 @@ def cleaning_screening(
         return pd.DataFrame(), error
 
 
+@pipeline_stage("load_and_clean_data")
 def load_and_clean_data(destination_dict):
     only_make_idt_excel_for_C_primers = True
     errors_load_and_clean_data = []
@@ -464,13 +466,16 @@ def load_and_clean_data(destination_dict):
     if error_load_genomes_df:
         errors_load_and_clean_data.append(error_load_genomes_df)
 
-    mapping_df, error_load_mapping_df = read_and_basic_qc(
-        # filepath="/downloaded_files/113_195_384_96_mapping_2025_02_27_188_189_act_dummy.csv",
-        filepath=destination_dict["plate_location_mapping"],
-        min_cols=["BGC_number", "96_well_formatted"],
-    )
-    if error_load_mapping_df:
-        errors_load_and_clean_data.append(error_load_mapping_df)
+    # The BAC wells are computed (clc_bac_wells), the mapping file is optional and only cross-checked
+    mapping_df = pd.DataFrame(columns=["BGC_number", "96_well_formatted"])
+    if os.path.isfile(destination_dict.get("plate_location_mapping", "")):
+        mapping_df, error_load_mapping_df = read_and_basic_qc(
+            # filepath="/downloaded_files/113_195_384_96_mapping_2025_02_27_188_189_act_dummy.csv",
+            filepath=destination_dict["plate_location_mapping"],
+            min_cols=["BGC_number", "96_well_formatted"],
+        )
+        if error_load_mapping_df:
+            errors_load_and_clean_data.append(error_load_mapping_df)
 
     if errors_load_and_clean_data:
         return (
@@ -536,38 +541,51 @@ def bulk_register_entities(
     output_column,
     folder_id,
     schema_id,
-    entity_builder_fn,
+    entity_builder_fn=None,
+    payload_spec=None,
 ):
     """
     Generic helper to bulk register DNA or custom entities in Benchling.
+    The entities to create are either built all at once from the new rows with `payload_spec`
+    (an EntityPayloadSpec), or one by one with `entity_builder_fn(row)`.
     """
-    list_func = {
-        "dna": app.benchling.dna_sequences.list,
-        "custom": app.benchling.custom_entities.list,
-    }[entity_type]
-
     create_func = {
         "dna": app.benchling.dna_sequences.bulk_create,
         "custom": app.benchling.custom_entities.bulk_create,
     }[entity_type]
 
-    pre_existing = list_func(folder_id=folder_id, schema_id=schema_id)
-    name_to_id = {item.name: item.id for batch in pre_existing for item in batch}
+    # Usually listed in the background when the canvas was opened, then only refreshed
+    name_to_id = entity_index.name_to_id(app, entity_type, folder_id, schema_id)
 
     df[output_column] = None
     bulk_entities = []
+    existing_names = []
 
-    for idx, row in df.iterrows():
-        entity_name = row[name_column]
-
+    for idx, entity_name in df[name_column].items():
         if entity_name in name_to_id:
-            print(f"{entity_name} already exists.")
-            logger.info(f"{entity_name} already exists.")
+            existing_names.append(entity_name)
             df.at[idx, output_column] = name_to_id[entity_name]
-        else:
-            entity = entity_builder_fn(row)
+        elif payload_spec is None:
+            entity = entity_builder_fn(df.loc[idx])
             bulk_entities.append(entity)
 
+    if existing_names:
+        logger.info(
+            "%d of %d %s entities already exist: %s",
+            len(existing_names),
+            len(df),
+            entity_type,
+            summarize_items(existing_names),
+        )
+    if payload_spec is not None:
+        bulk_entities = payload_spec.build(df[~df[name_column].isin(name_to_id)])
+
+    annotate(
+        entity_type=entity_type,
+        rows=len(df),
+        existing=len(name_to_id),
+        created=len(bulk_entities),
+    )
     if bulk_entities:
         task = create_func(bulk_entities)
         response = task.wait_for_response()
@@ -587,50 +605,43 @@ def bulk_register_entities(
     return df
 
 
+@pipeline_stage("register_crrna")
 def register_crrna(app, df, folder_id, schema_id, registry):
-    def build_entity(row):
-        if row["crRNA_id"].startswith("CLCact"):
-            return DnaSequenceBulkCreate(
-                folder_id=folder_id,
-                name=row["crRNA_id"],
-                is_circular=False,
-                bases=row["crRNA"],
-                schema_id=schema_id,
-                **registry_kwargs(registry),
-                # registry_id= registry, #biosustain_registry,
-                # naming_strategy=NamingStrategy.NEW_IDS
-            )
-        else:
-            return DnaSequenceBulkCreate(
-                folder_id=folder_id,
-                name=row["crRNA_id"],
-                is_circular=False,
-                bases=row["crRNA"],
-                schema_id=schema_id,
-                **registry_kwargs(registry),
-                fields=fields(
-                    {
-                        "Target strand": {"value": str(row["crRNA_strand"])},
-                        "Target position": {"value": int(row["crRNA_loc"])},
-                    }
-                ),
-            )
+    payload_spec = EntityPayloadSpec(
+        name_column="crRNA_id",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        bases_column="crRNA",
+        fields={
+            "Target strand": ("crRNA_strand", str),
+            "Target position": ("crRNA_loc", int),
+        },
+        # The act crRNAs are registered without target strand and position
+        fields_mask=lambda df: ~df["crRNA_id"].str.startswith("CLCact"),
+        static={"is_circular": False, **registry_kwargs(registry)},
+    )
 
     return bulk_register_entities(
-        app, "dna", df, "crRNA_id", "crRNA_b_id", folder_id, schema_id, build_entity
+        app,
+        "dna",
+        df,
+        "crRNA_id",
+        "crRNA_b_id",
+        folder_id,
+        schema_id,
+        payload_spec=payload_spec,
     )
 
 
+@pipeline_stage("register_receivers")
 def register_receivers(app, df, folder_id, schema_id, registry):
-    def build_entity(row):
-        return DnaSequenceBulkCreate(
-            folder_id=folder_id,
-            name=row["receiver_primer_id"],
-            is_circular=False,
-            bases=row["primer_seq_idt"],
-            schema_id=schema_id,
-            **registry_kwargs(registry),
-        )
+    payload_spec = EntityPayloadSpec(
+        name_column="receiver_primer_id",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        bases_column="primer_seq_idt",
+        static={"is_circular": False, **registry_kwargs(registry)},
+    )
 
     return bulk_register_entities(
         app=app,
@@ -640,7 +651,7 @@ def register_receivers(app, df, folder_id, schema_id, registry):
         output_column="receiver_primer_b_id",
         folder_id=folder_id,
         schema_id=schema_id,
-        entity_builder_fn=build_entity,
+        payload_spec=payload_spec,
     )
 
 
@@ -656,6 +667,7 @@ def register_receivers(app, df, folder_id, schema_id, registry):
 #         }
 #     else:
 #         return {}
+@pipeline_stage("register_clc_receivers")
 def register_clc_receivers(app, df, folder_id, schema_id, registry):
     # Step 1: Preprocess DataFrame to calculate clc_receiver_name
     def calc_receiver_name(row):
@@ -664,90 +676,64 @@ def register_clc_receivers(app, df, folder_id, schema_id, registry):
 
     df["clc_receiver_name"] = df.apply(calc_receiver_name, axis=1)
 
-    if TESTING:
+    def backbone_plasmid(crrna_prefix):
+        if crrna_prefix == "U":
+            return b_api_ids.backbone_plasmid48
+        return b_api_ids.backbone_plasmid45
 
-        def build_entity(row):
-            if row["crRNA_prefix"] == "U":
-                backbone_primer = b_api_ids.backbone_primer48
-                backbone_plasmid = b_api_ids.backbone_plasmid48
-            else:
-                backbone_primer = b_api_ids.backbone_primer45
-                backbone_plasmid = b_api_ids.backbone_plasmid45
-
-            return DnaSequenceBulkCreate(
-                folder_id=folder_id,
-                name=row["clc_receiver_name"],
-                fields=fields(
-                    {
-                        "Backbone": {"value": backbone_plasmid},
-                        "Backbone primer": {"value": backbone_primer},
-                        "Homology primer": {"value": row["receiver_primer_b_id"]},
-                    }
-                ),
-                schema_id=schema_id,
-                bases="",  # not always necessary
-                is_circular=False,  # also might be unnecessary later
-                # **clc_bac_clc_receivers_kwargs(),
-                **registry_kwargs(registry),
-            )
+    def backbone_primer(crrna_prefix):
+        if crrna_prefix == "U":
+            return b_api_ids.backbone_primer48
+        return b_api_ids.backbone_primer45
 
-        return bulk_register_entities(
-            app=app,
-            entity_type="dna",  # custome
-            df=df,
-            name_column="clc_receiver_name",
-            output_column="clc_receiver_b_id",
-            folder_id=folder_id,
-            schema_id=schema_id,
-            entity_builder_fn=build_entity,
-        )
+    fields_map = {
+        "Backbone": ("crRNA_prefix", backbone_plasmid),
+        "Backbone primer": ("crRNA_prefix", backbone_primer),
+        "Homology primer": "receiver_primer_b_id",
+    }
 
+    if TESTING:
+        # In the test tenant the receiver assemblies are DNA sequences
+        entity_type = "dna"
+        static = {
+            "bases": "",  # not always necessary
+            "is_circular": False,  # also might be unnecessary later
+            # **clc_bac_clc_receivers_kwargs(),
+            **registry_kwargs(registry),
+        }
     else:
+        entity_type = "custom"
+        static = registry_kwargs(registry)
 
-        def build_entity(row):
-            if row["crRNA_prefix"] == "U":
-                backbone_primer = b_api_ids.backbone_primer48
-                backbone_plasmid = b_api_ids.backbone_plasmid48
-            else:
-                backbone_primer = b_api_ids.backbone_primer45
-                backbone_plasmid = b_api_ids.backbone_plasmid45
-
-            return CustomEntityBulkCreate(
-                folder_id=folder_id,
-                name=row["clc_receiver_name"],
-                fields=fields(
-                    {
-                        "Backbone": {"value": backbone_plasmid},
-                        "Backbone primer": {"value": backbone_primer},
-                        "Homology primer": {"value": row["receiver_primer_b_id"]},
-                    }
-                ),
-                schema_id=schema_id,
-                **registry_kwargs(registry),
-            )
+    payload_spec = EntityPayloadSpec(
+        name_column="clc_receiver_name",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        fields=fields_map,
+        static=static,
+    )
 
-        return bulk_register_entities(
-            app=app,
-            entity_type="custom",
-            df=df,
-            name_column="clc_receiver_name",
-            output_column="clc_receiver_b_id",
-            folder_id=folder_id,
-            schema_id=schema_id,
-            entity_builder_fn=build_entity,
-        )
+    return bulk_register_entities(
+        app=app,
+        entity_type=entity_type,
+        df=df,
+        name_column="clc_receiver_name",
+        output_column="clc_receiver_b_id",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        payload_spec=payload_spec,
+    )
 
 
+@pipeline_stage("register_screening")
 def register_screening(app, df, folder_id, schema_id, registry):
-    def build_entity(row):
-        return DnaSequenceBulkCreate(
-            folder_id=folder_id,
-            name=row["primer_id"],
-            is_circular=False,
-            bases=row["primer_seq_idt"],
-            schema_id=schema_id,
-            **registry_kwargs(registry),
-        )
+    payload_spec = EntityPayloadSpec(
+        name_column="primer_id",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        bases_column="primer_seq_idt",
+        static={"is_circular": False, **registry_kwargs(registry)},
+    )
 
     return bulk_register_entities(
         app=app,
@@ -757,28 +743,18 @@ def register_screening(app, df, folder_id, schema_id, registry):
         output_column="primer_b_id",
         folder_id=folder_id,
         schema_id=schema_id,
-        entity_builder_fn=build_entity,
+        payload_spec=payload_spec,
     )
 
 
+@pipeline_stage("find_genomes")
 def find_genomes(app, df, folder_clc_id, folder_nbc_id, schema_id):
-    pre_recorded_strains_clc = app.benchling.custom_entities.list(
-        folder_id=folder_clc_id, schema_id=schema_id
+    # Both indexes are listed (or refreshed) at the same time
+    strains_clc, strains_nbc = entity_index.name_to_ids(
+        app,
+        [("custom", folder_clc_id, schema_id), ("custom", folder_nbc_id, schema_id)],
     )
-    pre_recorded_strains_nbc = app.benchling.custom_entities.list(
-        folder_id=folder_nbc_id, schema_id=schema_id
-    )
-
-    pre_recorded_strains_dict = {}
-    for g in pre_recorded_strains_clc:
-        for info in g:
-
-            pre_recorded_strains_dict[info.name] = info.id
-
-    for g in pre_recorded_strains_nbc:
-        for info in g:
-
-            pre_recorded_strains_dict[info.name] = info.id
+    pre_recorded_strains_dict = {**strains_clc, **strains_nbc}
 
     df["genome_b_id"] = None
     for idx, row in df.iterrows():
@@ -794,19 +770,17 @@ def find_genomes(app, df, folder_clc_id, folder_nbc_id, schema_id):
     return df, None
 
 
+@pipeline_stage("register_dna_fragments")
 def register_dna_fragments(app, df, folder_id, schema_id, registry):
     df["dna_fragment"] = df["benchling_name"] + " gDNA"
 
-    def build_entity(row):
-        return DnaSequenceBulkCreate(
-            folder_id=folder_id,
-            name=row["dna_fragment"],
-            is_circular=False,
-            bases="",
-            schema_id=schema_id,
-            fields=fields({"Template strains": {"value": [row["genome_b_id"]]}}),
-            **registry_kwargs(registry),
-        )
+    payload_spec = EntityPayloadSpec(
+        name_column="dna_fragment",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        fields={"Template strains": ("genome_b_id", lambda genome_id: [genome_id])},
+        static={"is_circular": False, "bases": "", **registry_kwargs(registry)},
+    )
 
     return bulk_register_entities(
         app=app,
@@ -816,17 +790,93 @@ def register_dna_fragments(app, df, folder_id, schema_id, registry):
         output_column="dna_fragment_b_id",
         folder_id=folder_id,
         schema_id=schema_id,
-        entity_builder_fn=build_entity,
+        payload_spec=payload_spec,
     )
 
 
+# Layout of the CLC BAC 96-well plates: the clusters of an order fill the plates in order ("row": A01, A02...,
+# "column": A01, B01...) from its lowest cluster, or from CLC_BAC_FIRST_CLUSTER when set, CLC_BAC_CLUSTERS_PER_PLATE
+# per plate and then on the next plate; the act control takes the next well of the first plate (G12 with the defaults)
+CLC_BAC_FIRST_CLUSTER = (
+    int(os.environ["CLC_BAC_FIRST_CLUSTER"])
+    if os.getenv("CLC_BAC_FIRST_CLUSTER")
+    else None
+)
+CLC_BAC_CLUSTERS_PER_PLATE = int(os.getenv("CLC_BAC_CLUSTERS_PER_PLATE", "83"))
+CLC_BAC_WELL_ORDER = os.getenv("CLC_BAC_WELL_ORDER", "row")
+
+
+def clc_bac_layout(clusters, first_cluster=None, per_plate=None, by=None):
+    """
+    96-well position and plate (0 for the first) of the CLC BAC of each cluster number, plus the
+    well of the "act" control. Returns ({cluster number: well, ..., "act": well}, {cluster number: plate}).
+    """
+    clusters = np.asarray(clusters, dtype=int)
+    if first_cluster is None:
+        first_cluster = CLC_BAC_FIRST_CLUSTER
+    if first_cluster is None:
+        first_cluster = int(clusters.min()) if clusters.size else 0
+    per_plate = CLC_BAC_CLUSTERS_PER_PLATE if per_plate is None else per_plate
+    plate_wells = PLATE_96.names[
+        fill_order(PLATE_96, per_plate + 1, by=by or CLC_BAC_WELL_ORDER)
+    ]
+
+    plates, offsets = np.divmod(clusters - first_cluster, per_plate)
+    wells = dict(zip(clusters.tolist(), plate_wells[offsets]))
+    wells["act"] = plate_wells[per_plate]
+    return wells, dict(zip(clusters.tolist(), plates.tolist()))
+
+
+def clc_bac_wells(clusters, first_cluster=None, per_plate=None, by=None):
+    """96-well position of the CLC BAC of each cluster number, plus the "act" control (see clc_bac_layout)."""
+    return clc_bac_layout(clusters, first_cluster, per_plate, by)[0]
+
+
+def check_plate_location_mapping(wells, mapping_df):
+    """
+    Cross-checks the computed BAC wells against the plate_location_mapping file, when one was uploaded.
+    Returns an error message listing the clusters in a different well, or None.
+    """
+    if mapping_df.empty:
+        return None
+
+    mapping_df = mapping_df.reset_index(drop="BGC_number" in mapping_df.columns)
+    clusters = pd.to_numeric(mapping_df["BGC_number"], errors="coerce")
+    csv_wells = PLATE_96.normalise(mapping_df["96_well_formatted"].astype(str))
+    mismatches = [
+        f"{int(cluster)}: {csv_well} (expected {wells[int(cluster)]})"
+        for cluster, csv_well in zip(clusters, csv_wells)
+        if pd.notna(cluster)
+        and int(cluster) in wells
+        and csv_well != wells[int(cluster)]
+    ]
+    if mismatches:
+        return f"The plate location mapping file does not match the CLC BAC plate layout: {mismatches}"
+    return None
+
+
+# CLC BAC schema field -> clc_bac_df column
+CLC_BAC_FIELDS = {
+    "Well96": "well_96",
+    "gRNA - Up": "grna_U",
+    "gRNA - Down": "grna_D",
+    "Receiver Primer pBE45": "rec_primer_D_45",
+    "Receiver Primer pBE48": "rec_primer_U_48",
+    "Receiver Assembly pBE45": "clc_rec_primer_D_45",
+    "Receiver Assembly pBE48": "clc_rec_primer_U_48",
+    "Screening Primer CF": "scr_primer_f",
+    "Screening Primer CR": "scr_primer_r",
+    "Strain": "strain_name",
+}
+
+
+@pipeline_stage("register_clc_bac")
 def register_clc_bac(
     app,
     crrna_df_merge,
     receivers_df_merge,
     screening_df_merge,
     genome_df,
-    mapping_df,
     min_clust,  # TODO this should change to a list/set of all the values so we can skip if not available
     max_clust,
     folder_id,
@@ -835,6 +885,7 @@ def register_clc_bac(
 ):
 
     clc_bac_rows = []
+    bac_wells = clc_bac_wells(range(int(min_clust), int(max_clust) + 1))
 
     for i in range(int(min_clust), int(max_clust) + 1):
         bac_name = "CLC" + str(i).zfill(3)
@@ -895,7 +946,7 @@ def register_clc_bac(
             "primer_b_id",
         ].values[0]
 
-        well = mapping_df.at[i, "96_well_formatted"]
+        well = bac_wells[i]
 
         clc_bac_rows.append(
             {
@@ -974,7 +1025,7 @@ def register_clc_bac(
         "primer_b_id",
     ].values[0]
 
-    well = "G12"  # mapping_df.at[i,'96_well_formatted']
+    well = bac_wells["act"]
 
     clc_bac_rows.append(
         {
@@ -996,85 +1047,62 @@ def register_clc_bac(
 
     clc_bac_df = pd.DataFrame(clc_bac_rows)
     if TESTING:
+        # In the test tenant the BACs are DNA sequences
+        entity_type = "dna"
+        static = {
+            # **clc_bac_clc_receivers_kwargs(),
+            "bases": "",  # not always necessary
+            "is_circular": False,  # also might be unnecessary later
+            **registry_kwargs(registry),
+        }
+    else:
+        entity_type = "custom"
+        static = registry_kwargs(registry)
 
-        def build_entity(row):
-            return DnaSequenceBulkCreate(
-                folder_id=folder_id,
-                name=row["bac_name"],
-                schema_id=schema_id,
-                fields=fields(
-                    {
-                        "Well96": {"value": row["well_96"]},  # row[""]
-                        "gRNA - Up": {"value": row["grna_U"]},
-                        "gRNA - Down": {"value": row["grna_D"]},
-                        "Receiver Primer pBE45": {"value": row["rec_primer_D_45"]},
-                        "Receiver Primer pBE48": {"value": row["rec_primer_U_48"]},
-                        "Receiver Assembly pBE45": {
-                            "value": row["clc_rec_primer_D_45"]
-                        },
-                        "Receiver Assembly pBE48": {
-                            "value": row["clc_rec_primer_U_48"]
-                        },
-                        "Screening Primer CF": {"value": row["scr_primer_f"]},
-                        "Screening Primer CR": {"value": row["scr_primer_r"]},
-                        "Strain": {"value": row["strain_name"]},
-                    }
-                ),
-                # **clc_bac_clc_receivers_kwargs(),
-                bases="",  # not always necessary
-                is_circular=False,  # also might be unnecessary later
-                **registry_kwargs(registry),
-            )
-
-        return bulk_register_entities(
-            app=app,
-            entity_type="dna",
-            df=clc_bac_df,
-            name_column="bac_name",
-            output_column="bac_b_id",
-            folder_id=folder_id,
-            schema_id=schema_id,
-            entity_builder_fn=build_entity,
-        )
+    payload_spec = EntityPayloadSpec(
+        name_column="bac_name",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        fields=CLC_BAC_FIELDS,
+        static=static,
+    )
 
-    else:
+    return bulk_register_entities(
+        app=app,
+        entity_type=entity_type,
+        df=clc_bac_df,
+        name_column="bac_name",
+        output_column="bac_b_id",
+        folder_id=folder_id,
+        schema_id=schema_id,
+        payload_spec=payload_spec,
+    )
 
-        def build_entity(row):
-            return CustomEntityBulkCreate(
-                folder_id=folder_id,
-                name=row["bac_name"],
-                schema_id=schema_id,
-                fields=fields(
-                    {
-                        "Well96": {"value": row["well_96"]},  # row[""]
-                        "gRNA - Up": {"value": row["grna_U"]},
-                        "gRNA - Down": {"value": row["grna_D"]},
-                        "Receiver Primer pBE45": {"value": row["rec_primer_D_45"]},
-                        "Receiver Primer pBE48": {"value": row["rec_primer_U_48"]},
-                        "Receiver Assembly pBE45": {
-                            "value": row["clc_rec_primer_D_45"]
-                        },
-                        "Receiver Assembly pBE48": {
-                            "value": row["clc_rec_primer_U_48"]
-                        },
-                        "Screening Primer CF": {"value": row["scr_primer_f"]},
-                        "Screening Primer CR": {"value": row["scr_primer_r"]},
-                        "Strain": {"value": row["strain_name"]},
-                    }
-                ),
-                **registry_kwargs(registry),
-            )
 
-        return bulk_register_entities(
-            app=app,
-            entity_type="custom",
-            df=clc_bac_df,
-            name_column="bac_name",
-            output_column="bac_b_id",
-            folder_id=folder_id,
-            schema_id=schema_id,
-            entity_builder_fn=build_entity,
+def registration_indexes(config):
+    """
+    (entity type, folder ID, schema ID) of the entity indexes looked up by
+    create_and_register_entities, from the app configuration `config` (config_by_path).
+    """
+    # In the test tenant the receiver assemblies and the BACs are DNA sequences
+    assembly_type = "dna" if TESTING else "custom"
+    indexes = [
+        ("dna", "crRNA storage folder", "gRNA schema"),
+        ("dna", "Primers storage folder", "Primer schema"),
+        (assembly_type, "Receivers assemblies storage folder", "CLC Receiver schema"),
+        ("custom", "CLC strains storage folder", "Strain schema"),
+        ("custom", "NBC strains storage folder", "Strain schema"),
+        ("dna", "DNA fragments storage folder", "DNA fragment schema"),
+        (assembly_type, "BACs storage folder", "CLC BAC schema"),
+    ]
+    return [
+        (
+            entity_type,
+            config([folder]).required().value_str(),
+            config([schema]).required().value_str(),
         )
+        for entity_type, folder, schema in indexes
+    ]
 
 
 def create_and_register_entities(
@@ -1088,6 +1116,21 @@ def create_and_register_entities(
 
     config = app.config_store.config_by_path
 
+    min_clust = pd.to_numeric(crrna_df_merge["BGC_number"], errors="coerce").min()
+    max_clust = pd.to_numeric(crrna_df_merge["BGC_number"], errors="coerce").max()
+
+    # Before registering anything: the uploaded mapping file must agree with the computed wells
+    bac_wells = clc_bac_wells(range(int(min_clust), int(max_clust) + 1))
+    error_mapping = check_plate_location_mapping(bac_wells, mapping_df)
+    if error_mapping:
+        return (
+            pd.DataFrame(),
+            pd.DataFrame(),
+            pd.DataFrame(),
+            pd.DataFrame(),
+            error_mapping,
+        )
+
     crrna_df_merge = register_crrna(
         app=app,
         df=crrna_df_merge,
@@ -1152,9 +1195,6 @@ def create_and_register_entities(
         registry=config(["Registry schema"]).required().value_str(),
     )
 
-    min_clust = pd.to_numeric(crrna_df_merge["BGC_number"], errors="coerce").min()
-    max_clust = pd.to_numeric(crrna_df_merge["BGC_number"], errors="coerce").max()
-
     crrna_df_merge["BGC_number"] = crrna_df_merge["BGC_number"].astype(str)
     receivers_df_merge["BGC_number"] = receivers_df_merge["BGC_number"].astype(str)
     screening_df_merge["BGC_number"] = screening_df_merge["BGC_number"].astype(str)
@@ -1165,7 +1205,6 @@ def create_and_register_entities(
         receivers_df_merge=receivers_df_merge,
         screening_df_merge=screening_df_merge,
         genome_df=genome_df,
-        mapping_df=mapping_df,
         min_clust=min_clust,
         max_clust=max_clust,
         folder_id=config(["BACs storage folder"])
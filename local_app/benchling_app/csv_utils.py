@@ -3,35 +3,52 @@ from pathlib import Path
 from benchling_sdk.models import CustomEntity
 from benchling_sdk.models import CustomEntityCreate
 from benchling_sdk.helpers.serialization_helpers import fields
+import asyncio
 import os
 import pandas as pd
 
 from local_app.lib.logger import get_logger
+from local_app.lib.tracing import annotate, pipeline_stage
 
 logger = get_logger()
 
 
-def download_csv(app: App, entit_id: str, destination_dict) -> None:
+@pipeline_stage("download")
+def download_csv(app: App, entit_id: str, destination_dict, csv_entity=None) -> None:
     """
     Generates a client from an existing App object, and uses this to connect to benchling.
     Finds the ID for the entity, then uses that to get the blob id of the csv, and downloads the CSV.
+    `csv_entity` is the entity when it was already fetched (get_csv_entities).
     """
 
     logger.info("Downloading file with API ID: %s", entit_id)
 
-    benchling_csv_ent = app.benchling.custom_entities.get_by_id(entit_id)
+    benchling_csv_ent = csv_entity or app.benchling.custom_entities.get_by_id(entit_id)
 
     # get the blob ID
     blob_id = benchling_csv_ent.fields["CSV"].value
     blob_file_name = benchling_csv_ent.fields["CSV"].display_value  # display_value=
-    blob_entity_name = benchling_csv_ent.name
 
-    print("Helllooooooo!!!!!")
+    destination_path, error = _csv_destination(benchling_csv_ent, destination_dict)
+    if error:
+        return error
+
+    # Download the csv
+    _ = app.benchling.blobs.download_file(blob_id, destination_path)
+
+    annotate(entity_id=entit_id, bytes=destination_path.stat().st_size)
+    # print("File dowloaded to " + str(destination_path))
+    logger.info("File %s downloaded to: %s", blob_file_name, destination_path)
+    return None
+
 
-    print(blob_file_name)
+def _csv_destination(benchling_csv_ent, destination_dict):
+    """Where the CSV of an entity goes, from its entity name. Returns (path, error)."""
+    blob_file_name = benchling_csv_ent.fields["CSV"].display_value
+    blob_entity_name = benchling_csv_ent.name
 
     if not blob_file_name.endswith(".csv"):
-        return f"Are you sure {blob_file_name} has the correct format?"
+        return None, f"Are you sure {blob_file_name} has the correct format?"
 
     path_value = next(
         (value for key, value in destination_dict.items() if key in blob_entity_name),
@@ -39,20 +56,69 @@ def download_csv(app: App, entit_id: str, destination_dict) -> None:
     )
 
     if not path_value:
-        return f"This file’s entity name doesn’t match any of the predefined naming conventions. Entitiy name: {blob_entity_name}. File: {blob_file_name}"
+        return (
+            None,
+            f"This file’s entity name doesn’t match any of the predefined naming conventions. Entitiy name: {blob_entity_name}. File: {blob_file_name}",
+        )
 
     destination_path = Path(path_value)
 
     destination_path.parent.mkdir(parents=True, exist_ok=True)
+    return destination_path, None
 
-    # Download the csv
-    _ = app.benchling.blobs.download_file(blob_id, destination_path)
 
-    # print("File dowloaded to " + str(destination_path))
-    logger.info("File %s downloaded to: %s", blob_file_name, destination_path)
+@pipeline_stage("download")
+async def download_csv_async(
+    app: App, entit_id: str, destination_dict, http, csv_entity=None
+):
+    """
+    download_csv for the asyncio engine: the entity (unless given as `csv_entity`) and the blob URL
+    are fetched in a worker thread (the SDK is blocking) and the file is streamed with the
+    httpx.AsyncClient `http`.
+    """
+    logger.info("Downloading file with API ID: %s", entit_id)
+
+    benchling_csv_ent = csv_entity or await asyncio.to_thread(
+        app.benchling.custom_entities.get_by_id, entit_id
+    )
+    destination_path, error = _csv_destination(benchling_csv_ent, destination_dict)
+    if error:
+        return error
+
+    blob_id = benchling_csv_ent.fields["CSV"].value
+    blob_url = await asyncio.to_thread(app.benchling.blobs.download_url, blob_id)
+    async with http.stream("GET", blob_url.download_url) as response:
+        response.raise_for_status()
+        with destination_path.open("wb") as f:
+            async for chunk in response.aiter_bytes():
+                f.write(chunk)
+    annotate(entity_id=entit_id, bytes=destination_path.stat().st_size)
+
+    logger.info(
+        "File %s downloaded to: %s",
+        benchling_csv_ent.fields["CSV"].display_value,
+        destination_path,
+    )
     return None
 
 
+def get_csv_entities(app: App, entit_ids):
+    """
+    Fetches all the tagged CSV entities in one request, returns {entity ID: entity}. The downloads
+    reuse them instead of fetching each entity again.
+    """
+    csv_entities = app.benchling.custom_entities.bulk_get(list(entit_ids)) or []
+    return {ent.id: ent for ent in csv_entities}
+
+
+def csv_blob_ids(csv_entities):
+    """
+    Sorted blob IDs of the files of the CSV entities. A new version of a file is a new blob, so
+    this identifies the exact inputs of a run.
+    """
+    return sorted(ent.fields["CSV"].value for ent in csv_entities)
+
+
 def check_all_csv_exist(file_dict):
     missing = []
     for label, path in file_dict.items():
@@ -65,6 +131,7 @@ def check_all_csv_exist(file_dict):
         return None
 
 
+@pipeline_stage("upload_csv")
 def upload_csv(
     app: App,
     df,
@@ -106,7 +173,9 @@ def upload_csv(
     # app.benchling.dna_sequences.bulk_create
 
     created_entity = app.benchling.custom_entities.create(new_entity)
-    print(f"Created entity: {created_entity.name} with ID: {created_entity.id}")
+    logger.info(
+        "Created entity: %s with ID: %s", created_entity.name, created_entity.id
+    )
 
     destination_dict["api_ids"] = path
 
@@ -0,0 +1,229 @@
+"""
+entity_index.py
+Description: Name -> ID indexes of the entities of a folder and schema, used by the registration to find the
+entities that already exist. An index is listed once and kept for ENTITY_INDEX_TTL_SECONDS; each later use
+only lists the entities modified since, so that entities created, renamed or archived meanwhile are seen.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from local_app.benchling_app.pagination_utils import prefetch_pages
+from local_app.lib.logger import get_logger
+from local_app.lib.tracing import annotate, in_current_context
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# How long an index is refreshed with the modified entities before being listed again in full
+ENTITY_INDEX_TTL_SECONDS = float(os.getenv("ENTITY_INDEX_TTL_SECONDS", "900"))
+# The refresh lists the entities modified a bit before the last listing, for clock differences
+_REFRESH_OVERLAP_SECONDS = 60
+
+
+def list_function(app, entity_type):
+    return {
+        "dna": app.benchling.dna_sequences.list,
+        "custom": app.benchling.custom_entities.list,
+    }[entity_type]
+
+
+def _rfc3339(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _read(pages, stop=None, max_pages=None):
+    """{name: id} of the listed entities, or None when `stop` is set or `max_pages` are read first."""
+    names = {}
+    for page in pages:
+        if stop is not None and stop.is_set():
+            return None
+        if max_pages is not None and pages.pages_read > max_pages:
+            return None
+        for item in page:
+            names[item.name] = item.id
+    return names
+
+
+def _read_changes(pages):
+    """(IDs of the listed entities, {name: id} of those that are not archived)."""
+    changed, names = set(), {}
+    for page in pages:
+        for item in page:
+            changed.add(item.id)
+            if getattr(item, "archive_record", None) is None:
+                names[item.name] = item.id
+    return changed, names
+
+
+class EntityIndexCache:
+    """
+    Indexes per (app installation, entity type, folder, schema). `prefetch` lists an index in the
+    background; `name_to_ids` waits for a prefetch already running (and lists itself one that has
+    not started yet), then brings the indexes up to date. Stored indexes are never modified, an
+    update replaces them.
+    """
+
+    def __init__(self, ttl_seconds=None):
+        self.ttl_seconds = (
+            ENTITY_INDEX_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._lock = threading.Lock()
+        self._cache = {}  # key -> (listed at (epoch seconds), expires_at, {name: id})
+        self._in_flight = {}  # key -> Future of the prefetch
+
+    @staticmethod
+    def _key(app, entity_type, folder_id, schema_id):
+        return (getattr(app, "id", None), entity_type, folder_id, schema_id)
+
+    def _cached(self, key):
+        cached = self._cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached
+        self._cache.pop(key, None)
+        return None
+
+    def _store(self, key, listed_at, expires_at, names):
+        with self._lock:
+            self._cache[key] = (listed_at, expires_at, names)
+
+    @staticmethod
+    def _open(app, entity_type, folder_id, schema_id, since=None, **kwargs):
+        if since is not None:
+            kwargs.update(modified_at=f"> {_rfc3339(since)}", archive_reason="ANY")
+        return prefetch_pages(
+            list_function(app, entity_type),
+            folder_id=folder_id,
+            schema_id=schema_id,
+            **kwargs,
+        )
+
+    def prefetch(
+        self,
+        app,
+        entity_type,
+        folder_id,
+        schema_id,
+        executor,
+        stop=None,
+        max_pages=None,
+    ):
+        """
+        Lists the index on `executor` unless it is cached or being listed; the listing gives up
+        when `stop` is set or after `max_pages`. Returns the Future, or None.
+        """
+        key = self._key(app, entity_type, folder_id, schema_id)
+        with self._lock:
+            running = self._in_flight.get(key)
+            if self._cached(key) or (running is not None and not running.done()):
+                return None
+            future = executor.submit(
+                in_current_context(self._prefetch),
+                key,
+                app,
+                (entity_type, folder_id, schema_id),
+                stop,
+                max_pages,
+            )
+            self._in_flight[key] = future
+        return future
+
+    def _prefetch(self, key, app, lookup, stop, max_pages):
+        try:
+            if stop is not None and stop.is_set():
+                return None
+            started = time.time()
+            # One page at a time: the prefetch leaves the connections to the jobs
+            names = _read(self._open(app, *lookup, prefetch=0), stop, max_pages)
+            if names is not None:
+                self._store(key, started, time.monotonic() + self.ttl_seconds, names)
+            return names
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _wait_for(self, key):
+        """The index of `key` if cached, once its prefetch (if running) is over."""
+        with self._lock:
+            entry = self._cached(key)
+            future = self._in_flight.get(key)
+        if entry is not None or future is None:
+            return entry
+        if future.cancel():
+            # Still queued behind other prefetches: listing it right away is faster
+            with self._lock:
+                self._in_flight.pop(key, None)
+            return None
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning("Entity index prefetch failed, listing again: %s", e)
+        with self._lock:
+            return self._cached(key)
+
+    def name_to_ids(self, app, lookups):
+        """
+        [{name: id}] of each (entity type, folder ID, schema ID) of `lookups`. The listings they
+        need start together, so they run at the same time.
+        """
+        keys = [self._key(app, *lookup) for lookup in lookups]
+        entries = [self._wait_for(key) for key in keys]
+        # A cached index is refreshed with the entities modified since it was listed
+        since = [
+            None if entry is None else entry[0] - _REFRESH_OVERLAP_SECONDS
+            for entry in entries
+        ]
+        started = time.time()
+        results = []
+        with ExitStack() as stack:
+            readers = [
+                stack.enter_context(self._open(app, *lookup, since=modified_after))
+                for lookup, modified_after in zip(lookups, since)
+            ]
+            for key, lookup, entry, pages in zip(keys, lookups, entries, readers):
+                names = None
+                if entry is not None:
+                    try:
+                        changed, current = _read_changes(pages)
+                    except Exception as e:
+                        logger.warning(
+                            "Could not refresh the index of folder %s, listing it again: %s",
+                            lookup[1],
+                            e,
+                        )
+                        pages = stack.enter_context(self._open(app, *lookup))
+                    else:
+                        names = {
+                            name: entity_id
+                            for name, entity_id in entry[2].items()
+                            if entity_id not in changed
+                        }
+                        names.update(current)
+                        self._store(key, started, entry[1], names)
+                if names is None:
+                    names = _read(pages)
+                    self._store(
+                        key, started, time.monotonic() + self.ttl_seconds, names
+                    )
+                results.append(names)
+            annotate(
+                pages=sum(pages.pages_read for pages in readers),
+                indexes_refreshed=sum(entry is not None for entry in entries),
+            )
+        return results
+
+    def name_to_id(self, app, entity_type, folder_id, schema_id):
+        return self.name_to_ids(app, [(entity_type, folder_id, schema_id)])[0]
+
+
+entity_index = EntityIndexCache()
@@ -0,0 +1,138 @@
+"""
+entity_payloads.py
+Description: Declarative mapping from DataFrame columns to the request bodies of the Benchling bulk
+create endpoints. The bodies are built column by column, without creating one DnaSequenceBulkCreate /
+CustomEntityBulkCreate (plus its fields(...) wrapper) per row.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+from enum import Enum
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class EntityPayload:
+    """
+    JSON body of one entity in a bulk create request. The SDK only calls `to_dict()` on the items it
+    sends, so this can be passed to dna_sequences.bulk_create / custom_entities.bulk_create in place
+    of the attrs models.
+    """
+
+    __slots__ = ("_body",)
+
+    def __init__(self, body):
+        self._body = body
+
+    def to_dict(self):
+        return self._body
+
+    @property
+    def name(self):
+        return self._body.get("name")
+
+    def __eq__(self, other):
+        return isinstance(other, EntityPayload) and self._body == other._body
+
+    def __repr__(self):
+        return f"EntityPayload({self._body!r})"
+
+
+def _api_body(kwargs):
+    """Converts SDK model keyword arguments (e.g. registry_kwargs(...)) to request body keys."""
+    body = {}
+    for key, value in kwargs.items():
+        head, *tail = key.split("_")
+        body[head + "".join(part.title() for part in tail)] = (
+            value.value if isinstance(value, Enum) else value
+        )
+    return body
+
+
+def _column_values(df, column, converter=None, mask=None):
+    values = df[column].tolist()
+    if converter is None:
+        return values
+    if mask is None:
+        return [converter(value) for value in values]
+    return [converter(value) if keep else None for value, keep in zip(values, mask)]
+
+
+class EntityPayloadSpec:
+    """
+    How to turn each row of a DataFrame into an entity (or assay result) to bulk create.
+
+    name_column:      column with the entity name (None for assay results)
+    folder_id, schema_id: destination of all the entities (folder_id None for assay results)
+    bases_column:     column with the bases (DNA sequences only)
+    fields:           {schema field name: column} or {schema field name: (column, converter)}
+    fields_mask:      optional boolean column (or function of the DataFrame returning one), rows
+                      where it is False are created without fields
+    static:           SDK keyword arguments shared by every entity, e.g. registry_kwargs(registry),
+                      {"bases": "", "is_circular": False}
+    """
+
+    def __init__(
+        self,
+        name_column,
+        folder_id,
+        schema_id,
+        bases_column=None,
+        fields=None,
+        fields_mask=None,
+        static=None,
+    ):
+        self.name_column = name_column
+        self.bases_column = bases_column
+        self.fields = {
+            field: spec if isinstance(spec, tuple) else (spec, None)
+            for field, spec in (fields or {}).items()
+        }
+        self.fields_mask = fields_mask
+        destination = {"folder_id": folder_id, "schema_id": schema_id}
+        self.base_body = _api_body(
+            {
+                **{
+                    key: value
+                    for key, value in destination.items()
+                    if value is not None
+                },
+                **(static or {}),
+            }
+        )
+
+    def build(self, df):
+        """Returns one EntityPayload per row of `df`, in order."""
+        names = (
+            [None] * len(df)
+            if self.name_column is None
+            else df[self.name_column].tolist()
+        )
+        bases = None if self.bases_column is None else df[self.bases_column].tolist()
+        mask = None
+        if callable(self.fields_mask):
+            mask = self.fields_mask(df).tolist()
+        elif self.fields_mask is not None:
+            mask = df[self.fields_mask].tolist()
+        field_values = [
+            (field, _column_values(df, column, converter, mask))
+            for field, (column, converter) in self.fields.items()
+        ]
+
+        payloads = []
+        for i, name in enumerate(names):
+            body = dict(self.base_body)
+            if name is not None:
+                body["name"] = name
+            if bases is not None:
+                body["bases"] = bases[i]
+            if field_values and (mask is None or mask[i]):
+                body["fields"] = {
+                    field: {"value": values[i]} for field, values in field_values
+                }
+            payloads.append(EntityPayload(body))
+        return payloads
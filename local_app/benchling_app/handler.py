@@ -9,16 +9,28 @@ from benchling_sdk.models.webhooks.v0 import (
     CanvasCreatedWebhookV2,
 )
 import os
-from local_app.benchling_app.canvas_interaction import route_interaction_webhook
 from local_app.benchling_app.setup import init_app_from_webhook
 from local_app.benchling_app.views.canvas_initialize import (
     render_text_canvas,
     render_text_canvas_for_created_canvas,
 )
-from local_app.lib.logger import get_logger
+from local_app.lib.lazy_imports import lazy_function
+from local_app.lib.logger import get_logger, log_context
+from local_app.lib.memory import track_job_memory
+from local_app.lib.metrics import JOBS_FAILED
+from local_app.lib.profiling import profile_job
+from local_app.lib.tracing import tracer
 
 logger = get_logger()
 
+# The pipeline (pandas) is only imported by the first interaction, not by the canvas webhooks
+route_interaction_webhook = lazy_function(
+    "local_app.benchling_app.canvas_interaction", "route_interaction_webhook"
+)
+prefetch_for_canvas = lazy_function(
+    "local_app.benchling_app.prefetch", "prefetch_for_canvas"
+)
+
 
 class UnsupportedWebhookError(Exception):
     pass
@@ -27,18 +39,33 @@ class UnsupportedWebhookError(Exception):
 def handle_webhook(webhook_dict: dict[str, Any]) -> None:
     logger.debug("Handling webhook with payload: %s", webhook_dict)
     webhook = WebhookEnvelopeV0.from_dict(webhook_dict)
+    webhook_type = type(webhook.message).__name__
+    canvas_id = getattr(webhook.message, "canvas_id", None)
+    with tracer.span("webhook", type=webhook_type, canvas_id=canvas_id) as span:
+        with log_context(canvas_id=canvas_id, webhook_type=webhook_type):
+            with profile_job(
+                canvas_id, webhook_type=webhook_type, trace_id=span.trace_id
+            ), track_job_memory(canvas_id, webhook_type=webhook_type) as job_memory:
+                _handle_webhook(webhook, webhook_dict)
+            if job_memory is not None:
+                span.set(peak_rss_bytes=job_memory.peak_rss)
+
+
+def _handle_webhook(webhook: WebhookEnvelopeV0, webhook_dict: dict[str, Any]) -> None:
     app = init_app_from_webhook(webhook)
     try:
         if isinstance(webhook.message, CanvasInitializeWebhookV2):
             render_text_canvas(app, webhook.message)
+            # The canvas is created from its resource: its ID is not known yet
+            prefetch_for_canvas(app, webhook.message.resource_id, webhook.base_url)
 
         elif isinstance(webhook.message, CanvasInteractionWebhookV2):
             route_interaction_webhook(app, webhook.message)
-            print(webhook.message)
 
         # Support both stable and beta, just in case:
         elif isinstance(webhook.message, (CanvasCreatedWebhookV2, CanvasCreatedWebhookV2Beta)):
             render_text_canvas_for_created_canvas(app, webhook.message)
+            prefetch_for_canvas(app, webhook.message.canvas_id, webhook.base_url)
 
         else:
             raise UnsupportedWebhookError(
@@ -48,5 +75,6 @@ def handle_webhook(webhook_dict: dict[str, Any]) -> None:
         logger.debug("Successfully completed request for webhook: %s", webhook_dict)
 
     except AppUserFacingError as e:
+        JOBS_FAILED.inc(reason="user_error")
         logger.debug("Exiting with client error: %s", e)
 
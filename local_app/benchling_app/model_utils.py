@@ -0,0 +1,22 @@
+"""
+model_utils.py
+Description: Helpers to read the benchling_sdk models returned by the API.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def present(model, attribute, default=None):
+    """Attribute of a benchling_sdk model, `default` when the API did not return it."""
+    try:
+        value = getattr(model, attribute)
+    except Exception:  # NotPresentError
+        return default
+    return default if value is None else value
@@ -9,11 +9,21 @@ Date: April 11, 2025
 # IMPORTS
 # ==================================
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from benchling_sdk.apps.framework import App
-from benchling_sdk.models import CustomEntity, AssayResultCreate
+from benchling_sdk.models import CustomEntity
 
-from benchling_sdk.helpers.serialization_helpers import fields
+from local_app.benchling_app.checkpoint_utils import NOTEBOOK_CHUNK, input_hash
+from local_app.benchling_app.entity_payloads import EntityPayloadSpec
+from local_app.benchling_app.model_utils import present
+from local_app.benchling_app.pagination_utils import prefetch_pages
+from local_app.lib.logger import get_logger
+from local_app.lib.tracing import annotate, in_current_context, pipeline_stage
+
+logger = get_logger()
 
 
 # ==================================
@@ -22,109 +32,273 @@ from benchling_sdk.helpers.serialization_helpers import fields
 
 # ================================== Find notebook and table ==================================
 
+# How long resolved notebook / results table IDs are reused
+NOTEBOOK_CACHE_TTL_SECONDS = float(os.getenv("NOTEBOOK_CACHE_TTL_SECONDS", "300"))
+
+
+def find_notebook_entry(app: App, notebook_name):
+    """
+    ID of the notebook entry called `notebook_name`. The listing stops at the first exact match;
+    if no entry has exactly that name, the last entry listed is used. None if nothing is listed.
+    """
+    notebook_api_id = None
+    with prefetch_pages(
+        app.benchling.entries.list_entries, name=notebook_name
+    ) as notebook_entries:
+        for page in notebook_entries:
+            for entry in page:
+                if entry.name == notebook_name:
+                    return entry.id
+                notebook_api_id = entry.id
+    return notebook_api_id
+
 
 def find_results_table(app: App, notebook_api_id, CLC_results_table_schema_id):
 
     notebook_entries = app.benchling.entries.get_entry_by_id(notebook_api_id)
     for entry in notebook_entries.days:
         for e in entry.notes:
-            try:
-                if e.type == "results_table":
-                    if e.assay_result_schema_id == CLC_results_table_schema_id:
-                        return e.api_id, False
-                        # CLC_results_table_api_id = e.api_id
-                        # error = False
-            except:
-                pass
-                # return None, True
-                # CLC_results_table_api_id = None
-                # error = True
+            # Only results tables have an assay result schema
+            if (
+                present(e, "type") == "results_table"
+                and present(e, "assay_result_schema_id") == CLC_results_table_schema_id
+            ):
+                return e.api_id, False
 
     return None, True
 
 
+class NotebookResolver:
+    """
+    Resolves (notebook name -> entry ID -> results table ID for a schema) and caches the result
+    for `ttl_seconds`, per app installation. `prefetch` starts the resolution in the background,
+    so it is already done by the time the job reaches the notebook; `resolve` then waits for it
+    instead of listing again. Failed resolutions are never cached.
+    """
+
+    def __init__(self, ttl_seconds=None, max_workers=2):
+        self.ttl_seconds = (
+            NOTEBOOK_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cache = {}  # key -> (expires_at, (entry ID, table ID))
+        self._in_flight = {}  # key -> Future
+
+    @staticmethod
+    def _key(app, notebook_name, schema_id):
+        return (getattr(app, "id", None), notebook_name, schema_id)
+
+    def _lookup(self, app, notebook_name, schema_id):
+        notebook_api_id = find_notebook_entry(app, notebook_name)
+        if notebook_api_id is None:
+            return None, None
+        result_table_api_id, error = find_results_table(app, notebook_api_id, schema_id)
+        return notebook_api_id, None if error else result_table_api_id
+
+    def _cached(self, key):
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        self._cache.pop(key, None)
+        return None
+
+    def _resolve_and_store(self, key, app, notebook_name, schema_id):
+        try:
+            resolved = self._lookup(app, notebook_name, schema_id)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        if resolved[1] is not None:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl_seconds, resolved)
+        return resolved
+
+    def prefetch(self, app, notebook_name, schema_id):
+        """Starts resolving in the background (no-op if cached or already in flight)."""
+        key = self._key(app, notebook_name, schema_id)
+        with self._lock:
+            if self._cached(key) or key in self._in_flight:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="notebook"
+                )
+            self._in_flight[key] = self._executor.submit(
+                in_current_context(self._resolve_and_store),
+                key,
+                app,
+                notebook_name,
+                schema_id,
+            )
+
+    def resolve(self, app, notebook_name, schema_id):
+        """Returns (notebook entry ID, results table ID), None for whatever could not be found."""
+        key = self._key(app, notebook_name, schema_id)
+        with self._lock:
+            cached = self._cached(key)
+            future = self._in_flight.get(key)
+        if cached:
+            return cached
+        if future is not None:
+            try:
+                resolved = future.result()
+            except Exception as e:
+                logger.warning("Background notebook lookup failed, retrying: %s", e)
+            else:
+                if resolved[1] is not None:
+                    return resolved
+        return self._resolve_and_store(key, app, notebook_name, schema_id)
+
+    def invalidate(self, notebook_name=None):
+        """Forgets the resolved IDs of `notebook_name` (of every notebook if None)."""
+        with self._lock:
+            for key in list(self._cache):
+                if notebook_name is None or key[1] == notebook_name:
+                    del self._cache[key]
+
+    def close(self):
+        """Stops the background lookups (worker exit, tests). The pool starts again on the next prefetch()."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._in_flight.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+notebook_resolver = NotebookResolver()
+
+
+# ================================== Fill the results table ==================================
+
+# Results table field -> clc_bac_df column
+RESULT_FIELDS_TESTING = {"sample": "bac_b_id"}
+RESULT_FIELDS = {
+    "bac": "bac_b_id",
+    "well96": "well_96",
+    "grna_up": "grna_U",
+    "grna_down": "grna_D",
+    "receiver_primer_pbe45": "rec_primer_D_45",
+    "receiver_primer_pbe48": "rec_primer_U_48",
+    "receiver_assembly_pbe45": "clc_rec_primer_D_45",
+    "receiver_assembly_pbe48": "clc_rec_primer_U_48",
+    "screening_primer_cf": "scr_primer_f",
+    "screening_primer_cr": "scr_primer_r",
+    "strain": "strain_name",  # register_clc_bac stores the strain entity ID there
+    "dna_fragment": "dna_fragment",
+}
+
+# Results per assay_results.bulk_create request, and requests in flight at the same time
+ASSAY_RESULTS_CHUNK_SIZE = int(os.getenv("ASSAY_RESULTS_CHUNK_SIZE", "200"))
+ASSAY_RESULTS_WORKERS = int(os.getenv("ASSAY_RESULTS_WORKERS", "3"))
+
+
+def write_assay_results(
+    app: App, assay_results, table_id, row_labels, checkpoint=None, checkpoint_key=None
+):
+    """
+    Sends the assay results to the table in chunks of ASSAY_RESULTS_CHUNK_SIZE, ASSAY_RESULTS_WORKERS
+    at a time, and waits for every chunk. Chunks that fail do not stop the others.
+    With a `checkpoint`, each chunk Benchling accepted is recorded under `checkpoint_key`, and recorded
+    chunks are not sent again: a retry after a partial failure only resends the failed ones.
+    Returns None, or an error naming the rows (`row_labels`, one per result) that were not written.
+    """
+
+    def chunk_key(start):
+        end = min(start + ASSAY_RESULTS_CHUNK_SIZE, len(assay_results))
+        return input_hash(checkpoint_key, table_id, start, end)
+
+    def write_chunk(start):
+        task = app.benchling.assay_results.bulk_create(
+            assay_results=assay_results[start : start + ASSAY_RESULTS_CHUNK_SIZE],
+            table_id=table_id,
+        )
+        task.wait_for_response()
+        if checkpoint is not None:
+            checkpoint.save(NOTEBOOK_CHUNK, chunk_key(start), True)
+
+    starts = list(range(0, len(assay_results), ASSAY_RESULTS_CHUNK_SIZE))
+    written = []
+    if checkpoint is not None:
+        written = [s for s in starts if checkpoint.has(NOTEBOOK_CHUNK, chunk_key(s))]
+        if written:
+            logger.info("Results %s+ were already written, skipping them", written)
+        starts = [s for s in starts if s not in written]
+    failed_rows = []
+    errors = set()
+    with ThreadPoolExecutor(max_workers=ASSAY_RESULTS_WORKERS) as executor:
+        futures = [
+            executor.submit(in_current_context(write_chunk), start) for start in starts
+        ]
+        for start, future in zip(starts, futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning("Results %d+ could not be written: %s", start, e)
+                failed_rows += row_labels[start : start + ASSAY_RESULTS_CHUNK_SIZE]
+                errors.add(str(e))
+
+    annotate(
+        results=len(assay_results),
+        chunks=len(starts),
+        skipped_chunks=len(written),
+        failed=len(failed_rows),
+    )
+    if failed_rows:
+        return f"The results of {failed_rows} could not be written to the results table ({len(assay_results) - len(failed_rows)} of {len(assay_results)} were written): {sorted(errors)}"
+    return None
+
+
+@pipeline_stage("process_notebook")
 def process_notebook(
-    app: App, notebook_name: str, clc_bac_df
+    app: App, notebook_name: str, clc_bac_df, checkpoint=None, checkpoint_key=None
 ) -> None:  # , destination_path: Path) -> None:
     """
     Generates a client from an existing App object, and uses this to connect to benchling.
     With the name of a notebook finds its id and maybe goes though it?
+    `checkpoint` and `checkpoint_key` record the chunks written (see write_assay_results).
     """
 
     config = app.config_store.config_by_path
 
-    notebook_entries = app.benchling.entries.list_entries(name=notebook_name)
     TESTING = os.getenv("APP_ENV") == "test"
 
-    # get the noebook ID
-    for entry in notebook_entries:
-        notebook_api_id = entry[0].id
-
-    result_table_api_id, error_find_results_table = find_results_table(
+    # get the noebook ID and its results table (usually already resolved in the background)
+    notebook_api_id, result_table_api_id = notebook_resolver.resolve(
         app,
-        notebook_api_id,
+        notebook_name,
         config(["Result schema"])
         .required()
         .value_str(),  # b_api_ids.CLC_results_table_schema_id
     )
-    if error_find_results_table:
+    if result_table_api_id is None:
         return f"The results table cannot be retreived, Is this {notebook_name} the correct notebook name? Is there a CLC BAC Entities Registration Output results table in this notebook?"
 
-    bulk_entities = []
-
-    for _, row in clc_bac_df.iterrows():
-
-        if TESTING:
-            fields_dict = {
-                "sample": {"value": row["bac_b_id"]},
-            }
-        else:
-            fields_dict = {
-                "bac": {"value": row["bac_b_id"]},
-                "well96": {"value": row["well_96"]},
-                "grna_up": {"value": row["grna_U"]},
-                "grna_down": {"value": row["grna_D"]},
-                "receiver_primer_pbe45": {"value": row["rec_primer_D_45"]},
-                "receiver_primer_pbe48": {"value": row["rec_primer_U_48"]},
-                "receiver_assembly_pbe45": {"value": row["clc_rec_primer_D_45"]},
-                "receiver_assembly_pbe48": {"value": row["clc_rec_primer_U_48"]},
-                "screening_primer_cf": {"value": row["scr_primer_f"]},
-                "screening_primer_cr": {"value": row["scr_primer_r"]},
-                "strain": {"value": row["strain"]},
-                "dna_fragment": {"value": row["dna_fragment"]},
-            }
-
-        entityToCreate = AssayResultCreate(
-            project_id=config(["Project schema"])
+    payload_spec = EntityPayloadSpec(
+        name_column=None,
+        folder_id=None,
+        schema_id=config(["Result schema"])
+        .required()
+        .value_str(),  # b_api_ids.CLC_results_table_schema_id,
+        fields=RESULT_FIELDS_TESTING if TESTING else RESULT_FIELDS,
+        static={
+            "project_id": config(["Project schema"])
             .required()
             .value_str(),  # b_api_ids.project_id,
-            schema_id=config(["Result schema"])
-            .required()
-            .value_str(),  # b_api_ids.CLC_results_table_schema_id,
-            fields=fields(
-                fields_dict
-                # {
-                #     "sample": {"value": row["bac_b_id"]},
-                #     # "bac": {"value": row["bac_b_id"] },
-                #     # "well96": {"value": row["well_96"] },
-                #     # "grna_up": {"value": row["grna_U"] },
-                #     # "grna_down": {"value": row["grna_D"]  },
-                #     # "receiver_primer_pbe45": {"value": row["rec_primer_D_45"]  },
-                #     # "receiver_primer_pbe48": {"value": row["rec_primer_U_48"]  },
-                #     # "receiver_assembly_pbe45": {"value": row["clc_rec_primer_D_45"]  },
-                #     # "receiver_assembly_pbe48": {"value": row["clc_rec_primer_U_48"] },
-                #     # "screening_primer_cf": {"value": row["scr_primer_f"] },
-                #     # "screening_primer_cr": {"value": row["scr_primer_r"] },
-                #     # "strain": {"value": row["strain"] },
-                #     # "dna_fragment": {"value": row["dna_fragment"] },
-                # }
-            ),
-        )
-
-        bulk_entities.append(entityToCreate)
-
-    app.benchling.assay_results.bulk_create(
-        assay_results=bulk_entities, table_id=result_table_api_id
-    )  # dna_sequences.bulk_create(bulk_entities)
+        },
+    )
+    assay_results = payload_spec.build(clc_bac_df)
 
-    return None
+    error_write_assay_results = write_assay_results(
+        app,
+        assay_results,
+        result_table_api_id,
+        clc_bac_df["bac_name"].tolist(),
+        checkpoint=checkpoint,
+        checkpoint_key=checkpoint_key,
+    )
+    if error_write_assay_results:
+        # The table may have been deleted or moved since it was resolved
+        notebook_resolver.invalidate(notebook_name)
+    return error_write_assay_results
@@ -0,0 +1,133 @@
+"""
+pagination_utils.py
+Description: Read-ahead iteration over the paginated Benchling list endpoints, so the next pages are
+already on their way while the current one is processed.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import queue
+import threading
+
+from local_app.lib.tracing import in_current_context
+
+# Pages kept in flight ahead of the caller. 0 disables the background fetching.
+DEFAULT_PREFETCH_PAGES = int(os.getenv("BENCHLING_PREFETCH_PAGES", "2"))
+# Page size sent to the list endpoints. Unset keeps the Benchling default.
+DEFAULT_PAGE_SIZE = (
+    int(os.environ["BENCHLING_PAGE_SIZE"]) if os.getenv("BENCHLING_PAGE_SIZE") else None
+)
+
+_PAGE = "page"
+_ERROR = "error"
+_DONE = "done"
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class PrefetchingPages:
+    """
+    Wraps any iterable of pages (e.g. a benchling_sdk PageIterator) and fetches up to `prefetch`
+    pages ahead in a background thread. Use it as a context manager or call close() to stop early:
+    no new page is requested after close(), a request already in flight is discarded.
+    """
+
+    def __init__(self, pages, prefetch=DEFAULT_PREFETCH_PAGES):
+        self._pages = iter(pages)
+        self._prefetch = max(int(prefetch), 0)
+        self._finished = False
+        self.pages_read = 0
+        self._stop = threading.Event()
+        self._thread = None
+        if self._prefetch:
+            self._queue = queue.Queue(maxsize=self._prefetch)
+            self._thread = threading.Thread(
+                target=in_current_context(self._fetch_ahead),
+                name="benchling-prefetch",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _fetch_ahead(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    page = next(self._pages)
+                except StopIteration:
+                    self._put((_DONE, None))
+                    return
+                self._put((_PAGE, page))
+        except Exception as e:  # surfaced to the consumer on its next read
+            self._put((_ERROR, e))
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        if self._thread is None:
+            try:
+                page = next(self._pages)
+            except StopIteration:
+                self._finished = True
+                raise
+            self.pages_read += 1
+            return page
+
+        kind, value = self._queue.get()
+        if kind == _PAGE:
+            self.pages_read += 1
+            return value
+
+        self._finished = True
+        self._thread.join()
+        if kind == _ERROR:
+            raise value
+        raise StopIteration
+
+    def close(self):
+        """Stop fetching ahead and drop the pages nobody is going to read."""
+        self._finished = True
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        # Don't wait on a slow in-flight request, the daemon thread exits right after it
+        self._thread.join(timeout=0.1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def prefetch_pages(
+    list_func, page_size=DEFAULT_PAGE_SIZE, prefetch=DEFAULT_PREFETCH_PAGES, **kwargs
+):
+    """
+    Calls a Benchling list endpoint (e.g. app.benchling.dna_sequences.list) and returns its pages
+    through a PrefetchingPages reader. `page_size` is only sent when set.
+    """
+    if page_size is not None:
+        kwargs["page_size"] = page_size
+    return PrefetchingPages(list_func(**kwargs), prefetch=prefetch)
@@ -0,0 +1,244 @@
+"""
+plate_layout.py
+Description: Array-backed plate layouts (96, 384 and 1536 wells). Wells are addressed by their
+row-major index, names are normalised in one vectorized lookup and transfer plans are computed
+with index arithmetic instead of DataFrame merges.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import string
+
+import numpy as np
+import pandas as pd
+
+from local_app.benchling_app.model_utils import present
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def row_label(row):
+    """0 -> A, 25 -> Z, 26 -> AA (1536-well plates go up to AF)."""
+    letters = string.ascii_uppercase
+    if row < len(letters):
+        return letters[row]
+    return letters[row // len(letters) - 1] + letters[row % len(letters)]
+
+
+class PlateLayout:
+    """
+    Geometry of a plate: `n_rows` x `n_cols` wells numbered row by row (A01 = 0, A02 = 1...).
+    Every accepted spelling of a well name (A1, A01, a1, a01) is precomputed once, so
+    `indices(names)` normalises a whole column of names at once.
+    """
+
+    __slots__ = ("n_rows", "n_cols", "size", "names", "_spellings", "_spelling_index")
+
+    def __init__(self, n_rows, n_cols):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.size = n_rows * n_cols
+
+        rows = [row_label(r) for r in range(n_rows)]
+        self.names = np.array(
+            [f"{row}{col:02d}" for row in rows for col in range(1, n_cols + 1)],
+            dtype=object,
+        )
+
+        spellings = {}
+        for index, name in enumerate(self.names):
+            row, col = rows[index // n_cols], index % n_cols + 1
+            spellings[name] = index
+            spellings[f"{row}{col}"] = index
+        self._spellings = pd.Index(list(spellings))
+        self._spelling_index = np.fromiter(spellings.values(), dtype=np.int64)
+
+    def __repr__(self):
+        return f"PlateLayout({self.size} wells)"
+
+    def indices(self, well_names):
+        """Row-major index of each well name, -1 for names that are not a well of this plate."""
+        upper = pd.Series(well_names, dtype=object).str.upper()
+        positions = self._spellings.get_indexer(upper)
+        return np.where(positions >= 0, self._spelling_index[positions], -1)
+
+    def normalise(self, well_names):
+        """Canonical names (A01, P24, AF48), None for names that are not a well of this plate."""
+        indices = self.indices(well_names)
+        return np.where(indices >= 0, self.names[indices], None)
+
+    def row_col(self, indices):
+        """(row, column) arrays, both 0-based."""
+        return np.divmod(np.asarray(indices), self.n_cols)
+
+    def index(self, rows, cols):
+        """Row-major index of 0-based (row, column) arrays."""
+        return np.asarray(rows) * self.n_cols + np.asarray(cols)
+
+
+PLATE_96 = PlateLayout(8, 12)
+PLATE_384 = PlateLayout(16, 24)
+PLATE_1536 = PlateLayout(32, 48)
+LAYOUTS = {96: PLATE_96, 384: PLATE_384, 1536: PLATE_1536}
+
+
+def layout_for(well_names):
+    """Smallest standard layout that contains every one of `well_names`."""
+    for layout in LAYOUTS.values():
+        if (layout.indices(well_names) >= 0).all():
+            return layout
+    raise ValueError(
+        f"Wells do not fit a 96, 384 or 1536 well plate: {list(well_names)}"
+    )
+
+
+class PlateWells:
+    """
+    Wells already recorded in a Benchling plate: `well_ids[i]` is the API ID of the well with index
+    i in `layout`, None where the plate has no container. `contents[i]` holds the IDs of the entities
+    already in the well and `quantities[i]` / `units[i]` its current quantity (NaN / None if unknown).
+    """
+
+    __slots__ = ("layout", "well_ids", "contents", "quantities", "units")
+
+    def __init__(self, layout, well_ids, contents=None, quantities=None, units=None):
+        self.layout = layout
+        self.well_ids = well_ids
+        if contents is None:
+            contents = np.empty(layout.size, dtype=object)
+            contents.fill(())
+        self.contents = contents
+        self.quantities = (
+            np.full(layout.size, np.nan) if quantities is None else quantities
+        )
+        self.units = (
+            np.full(layout.size, None, dtype=object) if units is None else units
+        )
+
+    @classmethod
+    def from_plate(cls, plate_info, layout=None):
+        wells = plate_info.wells.additional_properties
+        positions = list(wells)
+        layout = layout or layout_for(positions)
+        plate_wells = cls(layout, np.full(layout.size, None, dtype=object))
+
+        for well, index in zip(wells.values(), layout.indices(positions)):
+            if index < 0:
+                continue
+            plate_wells.well_ids[index] = well.id
+
+            contents = present(well, "contents", [])
+            if isinstance(contents, list):
+                plate_wells.contents[index] = tuple(
+                    present(present(content, "entity"), "id") for content in contents
+                )
+            quantity = present(well, "quantity")
+            value = present(quantity, "value")
+            if isinstance(value, (int, float)):
+                plate_wells.quantities[index] = value
+                units = present(quantity, "units")
+                plate_wells.units[index] = getattr(units, "value", units)
+        return plate_wells
+
+    @property
+    def recorded(self):
+        """Indices of the wells that exist in the plate."""
+        return np.flatnonzero(self.well_ids != None)  # noqa: E711 (element-wise)
+
+    def _planned_rows(self, well_names, entity_ids):
+        """Well index of each source row, and the rows that can be transferred, in plate order."""
+        indices = self.layout.indices(well_names)
+
+        keep = indices >= 0
+        keep[keep] = self.well_ids[indices[keep]] != None  # noqa: E711
+        keep &= ~pd.isna(entity_ids)
+
+        rows = np.flatnonzero(keep)
+        return indices, rows[np.argsort(indices[rows], kind="stable")]
+
+    def diff_transfers(self, well_names, entity_ids, quantities):
+        """
+        Matches source rows to the plate wells: rows whose well exists in the plate and that have an
+        entity, in plate order, minus the wells already filled, so filling a plate twice does not
+        transfer twice. A well that already contains its entity is skipped, whatever its quantity,
+        and only empty wells get a transfer. Raises ValueError naming the wells that hold another
+        entity. Returns (destination well IDs, entity IDs, quantities, number of skipped wells).
+        """
+        entity_ids = np.asarray(entity_ids, dtype=object)
+        quantities = np.asarray(quantities, dtype=object)
+        indices, rows = self._planned_rows(well_names, entity_ids)
+
+        wells = indices[rows]
+        contents = self.contents[wells]
+        already_there = np.fromiter(
+            (entity_id in held for entity_id, held in zip(entity_ids[rows], contents)),
+            dtype=bool,
+            count=len(rows),
+        )
+        empty = np.fromiter(
+            (not held for held in contents), dtype=bool, count=len(rows)
+        )
+        taken = ~already_there & ~empty
+        if taken.any():
+            raise ValueError(
+                "wells already holding another entity: "
+                f"{self.layout.names[wells[taken]].tolist()}"
+            )
+
+        rows = rows[empty]
+        return (
+            self.well_ids[indices[rows]],
+            entity_ids[rows],
+            quantities[rows],
+            int(already_there.sum()),
+        )
+
+
+# ================================== 384 <-> 96 well mappings ==================================
+
+
+def quadrant_384_to_96(indices_384):
+    """
+    Standard interleaved quadrant mapping: well (r, c) of a 384-well plate comes from quadrant
+    (r % 2) * 2 + c % 2, well (r // 2, c // 2) of the 96-well plates. Returns (quadrants, indices_96).
+    """
+    rows, cols = PLATE_384.row_col(indices_384)
+    return (rows % 2) * 2 + cols % 2, PLATE_96.index(rows // 2, cols // 2)
+
+
+def quadrant_96_to_384(quadrants, indices_96):
+    """Inverse of quadrant_384_to_96: A01 of the four 96-well plates are A01, A02, B01 and B02."""
+    rows, cols = PLATE_96.row_col(indices_96)
+    quadrants = np.asarray(quadrants)
+    return PLATE_384.index(rows * 2 + quadrants // 2, cols * 2 + quadrants % 2)
+
+
+# ================================== Fill orders ==================================
+
+
+def fill_order(layout, n_wells, by="row", first_well="A01"):
+    """
+    Indices of `n_wells` consecutive wells of `layout` starting at `first_well`, filling the plate
+    row by row (A01, A02...) or column by column (A01, B01...).
+    """
+    if by not in ("row", "column"):
+        raise ValueError(f"Unknown fill order {by!r}, expected 'row' or 'column'")
+    if by == "row":
+        start = layout.indices([first_well])[0]
+        order = np.arange(layout.size)
+    else:
+        row, col = layout.row_col(layout.indices([first_well])[0])
+        start = col * layout.n_rows + row
+        # k-th well of a column-wise walk -> row-major index
+        cols, rows = np.divmod(np.arange(layout.size), layout.n_rows)
+        order = layout.index(rows, cols)
+
+    if start < 0 or start + n_wells > layout.size:
+        raise ValueError(
+            f"{n_wells} wells from {first_well} do not fit a {layout.size} well plate"
+        )
+    return order[start : start + n_wells]
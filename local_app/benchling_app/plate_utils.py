@@ -15,14 +15,27 @@ from benchling_sdk.models import (
     ContainerQuantityUnits,
     MultipleContainersTransfer,
 )
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
 
+from local_app.benchling_app.plate_layout import PlateWells
+from local_app.lib.logger import get_logger
+from local_app.lib.tracing import annotate, in_current_context, pipeline_stage
+
+logger = get_logger()
+
 # ==================================
 # FUNCTIONS
 # ==================================
 
 
+# Plates fetched / transfer requests submitted at the same time
+PLATE_WORKERS = int(os.getenv("PLATE_WORKERS", "3"))
+# Maximum number of wells in one transfer_into_containers request
+PLATE_TRANSFER_CHUNK_SIZE = int(os.getenv("PLATE_TRANSFER_CHUNK_SIZE", "500"))
+
+
 # ================================== Fill plates ==================================
 # def format_cell(cell):
 #     letter = cell[0].upper()  # Capitalize the letter
@@ -30,42 +43,46 @@ import re
 #     return f"{letter}{number}"
 
 
-def fill_plate(plate_pre_recorded_wells_df, df, keep_columns, quantity_units):
-    df = df[keep_columns]
-
-    plate_pre_recorded_wells_df = pd.merge(
-        plate_pre_recorded_wells_df,
-        df,
-        how="left",
-        left_on="well_position_merge",
-        right_on=keep_columns[0],
-        # ,    suffixes=('', '_idt')  # Left DataFrame keeps original names, right gets '_idt'
-    )
-
-    plate_pre_recorded_wells_df = plate_pre_recorded_wells_df.dropna(
-        subset=[keep_columns[1]]
+def fill_plate(plate_wells, df, keep_columns, quantity_units):
+    """
+    Transfers of the entities in `df` into the empty wells of the plate (a PlateWells), leaving out
+    the wells that already contain their entity. Returns (transfers, number of wells skipped because
+    already filled). Raises ValueError if a well holds another entity.
+    keep_columns: [well name column, entity ID column, quantity column]
+    """
+    well_column, entity_column, quantity_column = keep_columns
+    destination_ids, entity_ids, quantities, n_skipped = plate_wells.diff_transfers(
+        df[well_column], df[entity_column], df[quantity_column]
     )
 
     all_container_transfers = []
 
-    for index, row in plate_pre_recorded_wells_df.iterrows():
+    for destination_id, entity_id, quantity in zip(
+        destination_ids, entity_ids, quantities
+    ):
         container_quantity = ContainerQuantity()
 
         # Populate the _units and _value attributes
         container_quantity._units = quantity_units  # Use a valid unit from the enum
-        container_quantity._value = row[keep_columns[2]]
+        container_quantity._value = quantity
 
         all_container_transfers.append(
             MultipleContainersTransfer(
-                destination_container_id=row["well_api_id"],
-                source_entity_id=row[keep_columns[1]],
+                destination_container_id=destination_id,
+                source_entity_id=entity_id,
                 transfer_quantity=container_quantity,
             )
         )
 
-    return all_container_transfers
+    return all_container_transfers, n_skipped
+
 
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
 
+
+@pipeline_stage("find_and_fill_plates")
 def find_and_fill_plates(
     app: App,
     crrna_df_merge,
@@ -73,91 +90,144 @@ def find_and_fill_plates(
     screening_df_merge,
     plate_list,
     order_number,
+    on_validated=None,
 ):
-    all_plates_suffix = []
-    all_plates_names = []
-    for plate_id in plate_list:
-        """
-        Get plate
-        Confirm the type and the data that needs inside if ends in _REC, _SCR or _crRNA
-
-
-        """
+    """
+    Get the plates, confirm the type and the data that needs inside if ends in _REC, _SCR or _crRNA,
+    and fill them. Every plate is validated before the first transfer is submitted, so a wrong plate
+    never leaves the other ones half filled, and wells that already hold their entity are skipped,
+    so filling the same plates again is harmless. `on_validated()` is called once every plate is
+    validated, before the transfers are submitted.
+    Returns ({plate name: {"submitted": n, "skipped": n}}, error)
+    """
+    plate_ids = [str(plate_id) for plate_id in plate_list]
+
+    # Get all the plates at once
+    with ThreadPoolExecutor(max_workers=PLATE_WORKERS) as executor:
+        futures = [
+            executor.submit(
+                in_current_context(app.benchling.plates.get_by_id), plate_id=plate_id
+            )
+            for plate_id in plate_ids
+        ]
         try:
-            plate_info = app.benchling.plates.get_by_id(plate_id=str(plate_id))
+            plate_infos = [future.result() for future in futures]
         except:
-            return f"Are you sure this plate is from order number {plate_list}"
-        plate_wells = plate_info.wells.additional_properties
-        plate_pre_recorded_wells_data = []
-
-        for key, well in plate_wells.items():
-
-            plate_pre_recorded_wells_data.append(
-                {
-                    "well_position": key,
-                    "barcode": well.barcode,
-                    "well_api_name": well.name,
-                    "well_api_id": well.id,
-                }
-            )
-
-        plate_pre_recorded_wells_df = pd.DataFrame(plate_pre_recorded_wells_data)
-
-        plate_pre_recorded_wells_df[
-            "well_position_merge"
-        ] = plate_pre_recorded_wells_df["well_position"].str[
-            0
-        ].str.upper() + plate_pre_recorded_wells_df[
-            "well_position"
-        ].str[
-            1:
-        ].str.zfill(
-            2
-        )
-
-        # check also the number in the plate
-        pattern = rf"Plate[A-Z]{int(order_number)}"
+            return None, f"Are you sure this plate is from order number {plate_list}"
+
+    # Validate them all
+    plate_data = {
+        "crRNA": (
+            crrna_df_merge,
+            ["well_crrna_idt", "crRNA_b_id", "ug"],
+            ContainerQuantityUnits.UG,
+        ),
+        "REC": (
+            receivers_df_merge,
+            ["well_primer_idt", "receiver_primer_b_id", "ul_primers"],
+            ContainerQuantityUnits.UL,
+        ),
+        "SCR": (
+            screening_df_merge,
+            ["well_primer_idt", "primer_b_id", "ul_primers"],
+            ContainerQuantityUnits.UL,
+        ),
+    }
+    # check also the number in the plate
+    pattern = rf"Plate[A-Z]{int(order_number)}"
 
+    all_plates_suffix = []
+    all_plates_names = []
+    all_plates_wells = []
+    for plate_info in plate_infos:
         if not re.search(pattern, plate_info.name):
-            return f"Are you sure this plate is from order number {order_number}: {plate_info.name}"
+            return (
+                None,
+                f"Are you sure this plate is from order number {order_number}: {plate_info.name}",
+            )
 
         plate_suffix = plate_info.name.rsplit("_", 1)[-1]
+        if plate_suffix not in plate_data:
+            return (
+                None,
+                f"Are you sure you uploaded the correct plate? {plate_info.name} should end with _REC, _SCR or _crRNA",
+            )
 
-        if plate_suffix == "crRNA":
-            plate_df = crrna_df_merge
-            keep_columns = ["well_crrna_idt", "crRNA_b_id", "ug"]
-            quantity_units = ContainerQuantityUnits.UG
-
-        elif plate_suffix == "REC":
-            plate_df = receivers_df_merge
-            keep_columns = ["well_primer_idt", "receiver_primer_b_id", "ul_primers"]
-            quantity_units = ContainerQuantityUnits.UL
+        try:
+            plate_wells = PlateWells.from_plate(plate_info)
+        except ValueError as e:
+            return (
+                None,
+                f"Are you sure you uploaded the correct plate? {plate_info.name}: {e}",
+            )
 
-        elif plate_suffix == "SCR":
-            plate_df = screening_df_merge
-            keep_columns = ["well_primer_idt", "primer_b_id", "ul_primers"]
-            quantity_units = ContainerQuantityUnits.UL
+        all_plates_suffix.append(plate_suffix)
+        all_plates_names.append(plate_info.name)
+        all_plates_wells.append(plate_wells)
 
-        else:
-            return f"Are you sure you uploaded the correct plate? {plate_info.name} should end with _REC, _SCR or _crRNA"
+    # Check that all plates are there
+    if sorted(all_plates_suffix) != sorted(["crRNA", "REC", "SCR"]):
+        return (
+            None,
+            f"Have you uploaded all 3 plates (they need different names and different barcodes). You have uploaded {all_plates_names}",
+        )
 
-        all_container_transfers = fill_plate(
-            plate_pre_recorded_wells_df,
+    def plan_transfers(plate_wells, plate_suffix):
+        plate_df, keep_columns, quantity_units = plate_data[plate_suffix]
+        return fill_plate(
+            plate_wells,
             df=plate_df,
             keep_columns=keep_columns,
             quantity_units=quantity_units,
         )
-        app.benchling.containers.transfer_into_containers(
-            transfer_requests=all_container_transfers
-        )  # [contrainer_transfer_to_do,contrainer_transfer_to_do_2])
 
-        all_plates_suffix.append(plate_suffix)
-        all_plates_names.append(plate_info.name)
-
-    # Check that all plates are filled
-    if sorted(all_plates_suffix) != sorted(["crRNA", "REC", "SCR"]):
-        return f"Have you uploaded all 3 plates (they need different names and different barcodes). You have uploaded {all_plates_names}"
-
-    else:
+    # Plan every plate before submitting anything: a well holding another entity fails the run
+    # without leaving the other plates half filled
+    with ThreadPoolExecutor(max_workers=PLATE_WORKERS) as executor:
+        plans = executor.map(
+            in_current_context(plan_transfers), all_plates_wells, all_plates_suffix
+        )
+        try:
+            plans = list(plans)
+        except ValueError as e:
+            return (
+                None,
+                f"Are you sure you uploaded the correct plates? Some wells are already filled, {e}",
+            )
+    if on_validated is not None:
+        on_validated()
+
+    fill_summary = {}
+    with ThreadPoolExecutor(max_workers=PLATE_WORKERS) as executor:
+        transfer_futures = []
+        for plate_name, (all_container_transfers, n_skipped) in zip(
+            all_plates_names, plans
+        ):
+            fill_summary[plate_name] = {
+                "submitted": len(all_container_transfers),
+                "skipped": n_skipped,
+            }
+            logger.info(
+                "%s: %d transfers submitted, %d wells already filled",
+                plate_name,
+                len(all_container_transfers),
+                n_skipped,
+            )
+            transfer_futures += [
+                executor.submit(
+                    in_current_context(
+                        app.benchling.containers.transfer_into_containers
+                    ),
+                    transfer_requests=chunk,
+                )
+                for chunk in chunked(all_container_transfers, PLATE_TRANSFER_CHUNK_SIZE)
+            ]
+        for future in transfer_futures:
+            future.result()
+    annotate(
+        plates=len(fill_summary),
+        transfers=sum(counts["submitted"] for counts in fill_summary.values()),
+        skipped=sum(counts["skipped"] for counts in fill_summary.values()),
+    )
 
-        return None
+    return fill_summary, None
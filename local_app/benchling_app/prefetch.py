@@ -0,0 +1,143 @@
+"""
+prefetch.py
+Description: Speculative work started by the canvas initialize / created webhooks. Minutes usually pass
+before the user presses Process: meanwhile the OAuth token, the app configuration and the entity indexes
+of the registration are fetched in the background, so the Process job finds them ready. Prefetches run
+on one thread, one page at a time, and give up after PREFETCH_TIMEOUT_SECONDS or when the canvas is
+prefetched again.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from local_app.benchling_app.entity_index import entity_index
+from local_app.benchling_app.warmup import fetch_token
+from local_app.lib.lazy_imports import lazy_function
+from local_app.lib.logger import get_logger
+from local_app.lib.tracing import in_current_context
+
+logger = get_logger()
+
+# Imported by the first prefetch: create_register_entites loads pandas and numpy, which the canvas
+# webhooks do not need
+registration_indexes = lazy_function(
+    "local_app.benchling_app.create_register_entites", "registration_indexes"
+)
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Start prefetching when a canvas is opened
+CANVAS_PREFETCH = os.getenv("CANVAS_PREFETCH", "true").lower() in ("1", "true", "yes")
+# A canvas prefetch is abandoned after this long, and an index listing beyond this many pages
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv("PREFETCH_TIMEOUT_SECONDS", "120"))
+PREFETCH_MAX_PAGES = int(os.getenv("PREFETCH_MAX_PAGES", "200"))
+# Canvases prefetched at the same time by a worker process, the others are not prefetched
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "8"))
+
+
+class CanvasPrefetch:
+    """The prefetch of one canvas. Its listings stop between two pages once it is set."""
+
+    def __init__(self, canvas_id, timeout):
+        self.canvas_id = canvas_id
+        self.futures = []
+        self._deadline = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+
+    def is_set(self):
+        return self._cancelled.is_set() or time.monotonic() > self._deadline
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+
+class Prefetcher:
+    """
+    Runs the canvas prefetches on one background thread, oldest first. At most `max_pending`
+    canvases are prefetched at once; a canvas prefetched again cancels its previous prefetch.
+    """
+
+    def __init__(self, max_pending=None, timeout=None, max_pages=None):
+        self.max_pending = PREFETCH_MAX_PENDING if max_pending is None else max_pending
+        self.timeout = PREFETCH_TIMEOUT_SECONDS if timeout is None else timeout
+        self.max_pages = PREFETCH_MAX_PAGES if max_pages is None else max_pages
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}  # canvas_id -> CanvasPrefetch
+
+    def start(self, app, canvas_id, base_url):
+        """
+        Starts prefetching for the Process job of `canvas_id` (the resource ID of a canvas being
+        initialized). Returns the CanvasPrefetch, or None when too many are pending.
+        """
+        with self._lock:
+            for pending_id, pending in list(self._pending.items()):
+                if pending.done():
+                    del self._pending[pending_id]
+            previous = self._pending.pop(canvas_id, None)
+            if previous is not None:
+                previous.cancel()
+            if len(self._pending) >= self.max_pending:
+                logger.info("Not prefetching: %d canvases pending", len(self._pending))
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="canvas-prefetch"
+                )
+            prefetch = self._pending[canvas_id] = CanvasPrefetch(
+                canvas_id, self.timeout
+            )
+            prefetch.futures.append(
+                self._executor.submit(
+                    in_current_context(self._run), prefetch, app, base_url
+                )
+            )
+        return prefetch
+
+    def _run(self, prefetch, app, base_url):
+        if prefetch.is_set():
+            return
+        try:
+            fetch_token(base_url)
+            # Also fetches (and keeps, see setup.init_app) the configuration of the app
+            indexes = registration_indexes(app.config_store.config_by_path)
+        except Exception as e:
+            logger.warning("Canvas prefetch failed: %s", e)
+            return
+        for entity_type, folder_id, schema_id in indexes:
+            if prefetch.is_set():
+                return
+            future = entity_index.prefetch(
+                app,
+                entity_type,
+                folder_id,
+                schema_id,
+                self._executor,
+                stop=prefetch,
+                max_pages=self.max_pages,
+            )
+            if future is not None:
+                prefetch.futures.append(future)
+
+
+prefetcher = Prefetcher()
+
+
+def prefetch_for_canvas(app, canvas_id, base_url):
+    """Prefetches what the Process job of the canvas needs, if CANVAS_PREFETCH is on."""
+    if CANVAS_PREFETCH:
+        return prefetcher.start(app, canvas_id, base_url)
+    return None
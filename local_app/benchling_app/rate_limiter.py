@@ -0,0 +1,214 @@
+"""
+rate_limiter.py
+Description: Client-side token bucket per Benchling tenant (base URL and app installation), shared by every job of the worker (and,
+optionally, every worker of the host). Requests wait for a token instead of being sent and retried on
+429; the rate is halved on each 429 and creeps back up on success.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import httpx
+
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Requests per second allowed to one tenant, and how many can be sent at once after a quiet period
+BENCHLING_RATE_LIMIT_PER_SECOND = float(
+    os.getenv("BENCHLING_RATE_LIMIT_PER_SECOND", "10")
+)
+BENCHLING_RATE_LIMIT_BURST = float(os.getenv("BENCHLING_RATE_LIMIT_BURST", "10"))
+# Floor of the adapted rate, however many 429s come back
+BENCHLING_RATE_LIMIT_MIN_PER_SECOND = float(
+    os.getenv("BENCHLING_RATE_LIMIT_MIN_PER_SECOND", "1")
+)
+# Directory where the buckets are kept to share them between the workers of the host (unset: per worker)
+BENCHLING_RATE_LIMIT_DIR = os.getenv("BENCHLING_RATE_LIMIT_DIR")
+
+# Fraction of the configured rate won back after each successful response
+_RATE_INCREASE = 0.02
+_RATE_LIMIT_HEADERS = (
+    "retry-after",
+    "x-rate-limit-limit",
+    "x-rate-limit-remaining",
+    "x-rate-limit-reset",
+)
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a Retry-After (or reset) header: a number of seconds or an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up. The rate adapts
+    (halved on 429, +2% of `max_rate` per success) and a Retry-After pauses every caller until
+    then. With `path`, the state lives in a file locked with flock, shared by the processes using it.
+    `rate_limit_headers` holds the last rate limit headers returned by the API.
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        burst=None,
+        min_rate=None,
+        path=None,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.max_rate = BENCHLING_RATE_LIMIT_PER_SECOND if rate is None else rate
+        self.burst = BENCHLING_RATE_LIMIT_BURST if burst is None else burst
+        self.min_rate = (
+            BENCHLING_RATE_LIMIT_MIN_PER_SECOND if min_rate is None else min_rate
+        )
+        self.path = None if path is None else Path(path)
+        self.rate_limit_headers = {}
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._memory = self._initial_state()
+
+    def _initial_state(self):
+        return {
+            "tokens": self.burst,
+            "updated": self._clock(),
+            "rate": self.max_rate,
+            "paused_until": 0.0,
+        }
+
+    @contextmanager
+    def _state(self):
+        with self._lock:
+            if self.path is None:
+                yield self._memory
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read())
+                    except ValueError:
+                        state = self._initial_state()
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+        state["updated"] = now
+
+    @property
+    def rate(self):
+        with self._state() as state:
+            return state["rate"]
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._state() as state:
+                now = self._clock()
+                self._refill(state, now)
+                if now < state["paused_until"]:
+                    wait = state["paused_until"] - now
+                elif state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return
+                else:
+                    wait = (1 - state["tokens"]) / state["rate"]
+            self._sleep(wait)
+
+    def observe(self, status_code, headers):
+        """Adapts the rate to a response of the API."""
+        recorded = {
+            name: headers[name] for name in _RATE_LIMIT_HEADERS if name in headers
+        }
+        if recorded:
+            self.rate_limit_headers = recorded
+
+        with self._state() as state:
+            now = self._clock()
+            self._refill(state, now)
+            pause = None
+            if status_code == 429:
+                state["rate"] = max(self.min_rate, state["rate"] / 2)
+                state["tokens"] = 0.0
+                pause = retry_after_seconds(headers.get("retry-after"), now)
+                logger.warning(
+                    "Benchling rate limit hit, slowing down to %.1f requests/s",
+                    state["rate"],
+                )
+            else:
+                state["rate"] = min(
+                    self.max_rate, state["rate"] + self.max_rate * _RATE_INCREASE
+                )
+                if headers.get("x-rate-limit-remaining") == "0":
+                    pause = retry_after_seconds(headers.get("x-rate-limit-reset"), now)
+            if pause:
+                state["paused_until"] = max(state["paused_until"], now + pause)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(base_url, app_id=None):
+    """The TokenBucket of a tenant (`base_url`, `app_id`), created on first use."""
+    key = (base_url, app_id)
+    with _buckets_lock:
+        if key not in _buckets:
+            path = None
+            if BENCHLING_RATE_LIMIT_DIR:
+                name = hashlib.sha256(f"{base_url} {app_id}".encode("utf-8")).hexdigest()
+                path = Path(BENCHLING_RATE_LIMIT_DIR) / f"{name[:16]}.json"
+            _buckets[key] = TokenBucket(path=path)
+        return _buckets[key]
+
+
+def rate_limited_client(base_url, app_id=None, bucket=None, **kwargs):
+    """httpx.Client whose requests go through the token bucket of the tenant (`base_url`, `app_id`)."""
+    bucket = bucket or bucket_for(base_url, app_id)
+
+    def before_request(request):
+        bucket.acquire()
+
+    def after_response(response):
+        bucket.observe(response.status_code, response.headers)
+
+    return httpx.Client(
+        event_hooks={"request": [before_request], "response": [after_response]},
+        **kwargs,
+    )
@@ -1,15 +1,48 @@
 import os
+import threading
+import time
 from functools import cache
 from pathlib import Path
 
+import httpx
+from benchling_sdk.apps.config.framework import BenchlingConfigProvider, ConfigItemStore
 from benchling_sdk.apps.framework import App
 from benchling_sdk.auth.client_credentials_oauth2 import ClientCredentialsOAuth2
 from benchling_sdk.benchling import Benchling
 from benchling_sdk.models.webhooks.v0 import WebhookEnvelopeV0
 
+from local_app.benchling_app.api_metrics import instrument_client
+from local_app.benchling_app.rate_limiter import rate_limited_client
+
+# The app configuration of a tenant is fetched once and reused by its jobs for this long
+CONFIG_CACHE_TTL_SECONDS = float(os.getenv("CONFIG_CACHE_TTL_SECONDS", "300"))
+
+_config_stores: dict[tuple[str, str], list] = {}
+_config_stores_lock = threading.Lock()
+
 
 def init_app_from_webhook(webhook: WebhookEnvelopeV0) -> App:
-    return App(webhook.app.id, _benchling_from_webhook(webhook))
+    return init_app(webhook.app.id, webhook.base_url)
+
+
+def init_app(app_id: str, base_url: str) -> App:
+    benchling = _benchling(base_url, app_id)
+    return App(
+        app_id, benchling, config_store=_config_store(app_id, base_url, benchling)
+    )
+
+
+def _config_store(app_id: str, base_url: str, benchling: Benchling) -> ConfigItemStore:
+    # Shared by the jobs of an app installation, refetched after CONFIG_CACHE_TTL_SECONDS
+    with _config_stores_lock:
+        entry = _config_stores.get((app_id, base_url))
+        if entry is None:
+            store = ConfigItemStore(BenchlingConfigProvider(benchling, app_id))
+            entry = _config_stores[(app_id, base_url)] = [store, time.monotonic()]
+        elif time.monotonic() - entry[1] > CONFIG_CACHE_TTL_SECONDS:
+            entry[0].invalidate_cache()
+            entry[1] = time.monotonic()
+        return entry[0]
 
 
 @cache
@@ -26,8 +59,19 @@ def app_definition_id() -> str:
     return app_def_id
 
 
-def _benchling_from_webhook(webhook: WebhookEnvelopeV0) -> Benchling:
-    return Benchling(webhook.base_url, _auth_method())
+def _benchling(base_url: str, app_id: str) -> Benchling:
+    return Benchling(
+        base_url,
+        _auth_method(),
+        httpx_client=_rate_limited_client(base_url, app_id),
+    )
+
+
+@cache
+def _rate_limited_client(base_url: str, app_id: str) -> httpx.Client:
+    # One client (and connection pool) per tenant (base URL and app installation), shared by its
+    # jobs: its requests wait for the tenant's token bucket, so parallel jobs do not run into 429s
+    return instrument_client(rate_limited_client(base_url, app_id))
 
 
 @cache
@@ -80,7 +80,7 @@ def input_blocks() -> list[UiBlock]:
         MarkdownUiBlock(
             id="comment2",
             type=MarkdownUiBlockType.MARKDOWN,
-            value="Tag the genome file and the mapping file in the box below",
+            value="Tag the genome file (and optionally the mapping file, used as a cross-check) in the box below",
         ),
         SearchInputMultiValueUiBlock(
             id="input_block_genome_mapping",
@@ -9,4 +9,6 @@ SEARCH_TEXT_ID = "search_text"
 # Keys for canvas data
 CID_KEY = "chemical_cid"
 PROCESS_BUTTON_ID = "process_button"
+# Re-runs the pipeline even if the same inputs were already processed successfully
+FORCE_PROCESS_BUTTON_ID = "force_process_button"
 TEXT_INPUT_ID = "input_text"
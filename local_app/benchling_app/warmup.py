@@ -0,0 +1,153 @@
+"""
+warmup.py
+Description: Work done by a gunicorn worker before its first webhook: import the pipeline, fetch the
+webhook verification keys (kept by JwksCache instead of fetched per webhook), and for each tenant of
+WARMUP_TENANTS the OAuth token, the TLS connection and the app configuration. The SDK and httpx are
+imported in the steps, so that importing this module keeps the worker startup light.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import threading
+import time
+
+from local_app.lib.lazy_imports import PIPELINE_MODULES, import_modules
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Tenants warmed up by each worker: "https://x.benchling.com=app_id,https://y.benchling.com=app_id"
+WARMUP_TENANTS = os.getenv("WARMUP_TENANTS", "")
+# How long the webhook verification keys are reused before being fetched again
+JWKS_CACHE_TTL_SECONDS = float(os.getenv("JWKS_CACHE_TTL_SECONDS", "3600"))
+# A webhook failing verification refetches the keys (rotated keys), at most this often
+JWKS_MIN_REFRESH_SECONDS = 60
+
+
+def parse_tenants(value):
+    """[(base_url, app_id)] of a WARMUP_TENANTS value; entries without an app ID are skipped."""
+    tenants = []
+    for entry in value.split(","):
+        base_url, _, app_id = entry.strip().partition("=")
+        if base_url and app_id:
+            tenants.append((base_url.strip().rstrip("/"), app_id.strip()))
+        elif entry.strip():
+            logger.warning(
+                "Ignoring WARMUP_TENANTS entry %r (expected url=app_id)", entry
+            )
+    return tenants
+
+
+class JwksCache:
+    """
+    jwk_function of benchling_sdk's verify(): the keys of each app definition are fetched once
+    (with one shared HTTP client) and reused for `ttl` seconds.
+    """
+
+    def __init__(self, ttl=None, fetch=None):
+        self.ttl = JWKS_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._fetch = fetch
+        self._client = None
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _fetch_jwks(self, app_definition_id):
+        if self._fetch is not None:
+            return self._fetch(app_definition_id)
+        import httpx
+        from benchling_sdk.apps.helpers.webhook_helpers import jwks_by_app_definition
+
+        if self._client is None:
+            self._client = httpx.Client(
+                transport=httpx.HTTPTransport(retries=3), timeout=10
+            )
+        return jwks_by_app_definition(app_definition_id, httpx_client=self._client)
+
+    def __call__(self, app_definition_id):
+        # Webhooks arriving together wait for one fetch instead of each sending theirs
+        with self._lock:
+            entry = self._keys.get(app_definition_id)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                entry = (self._fetch_jwks(app_definition_id), time.monotonic())
+                self._keys[app_definition_id] = entry
+            return entry[0]
+
+    def refresh_if_stale(self, app_definition_id, min_age=JWKS_MIN_REFRESH_SECONDS):
+        """Forgets keys fetched more than `min_age` seconds ago; True when they were."""
+        with self._lock:
+            entry = self._keys.get(app_definition_id)
+            if entry is None or time.monotonic() - entry[1] < min_age:
+                return False
+            del self._keys[app_definition_id]
+            return True
+
+
+jwks_cache = JwksCache()
+
+
+class WarmUp:
+    """
+    Runs the warm-up steps once, recording the seconds each took or its error in `steps`. A step
+    failing is logged and skipped: the first job then does the work, as without a warm-up. `done`
+    is set once every step ran.
+    """
+
+    def __init__(self, tenants=None, modules=PIPELINE_MODULES, jwks=None):
+        self.tenants = parse_tenants(WARMUP_TENANTS) if tenants is None else tenants
+        self.modules = modules
+        self.jwks = jwks_cache if jwks is None else jwks
+        self.steps = {}
+        self.done = threading.Event()
+
+    def _step(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            self.steps[name] = {"error": str(e)}
+            logger.warning("Warm-up step %s failed: %s", name, e)
+        else:
+            self.steps[name] = {"seconds": round(time.perf_counter() - start, 3)}
+
+    def run(self):
+        try:
+            self._step("imports", import_modules, self.modules)
+            app_definition_id = os.environ.get("APP_DEFINITION_ID")
+            if app_definition_id:
+                self._step("jwks", self.jwks, app_definition_id)
+            for base_url, app_id in self.tenants:
+                self._step(f"token {base_url}", fetch_token, base_url)
+                self._step(f"config {base_url}", fetch_config, app_id, base_url)
+        finally:
+            self.done.set()
+            logger.info("Worker warmed up: %s", self.steps)
+        return self.steps
+
+    def start_in_background(self):
+        thread = threading.Thread(target=self.run, name="worker-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        return {"ready": self.done.is_set(), "steps": dict(self.steps)}
+
+
+def fetch_token(base_url):
+    # The OAuth2 auth method caches its token: the first job does not ask for one
+    from local_app.benchling_app import setup
+
+    setup._auth_method().get_authorization_header(base_url)
+
+
+def fetch_config(app_id, base_url):
+    # Through the rate-limited client of the tenant: opens (and keeps) its TLS connection
+    from local_app.benchling_app import setup
+
+    setup.init_app(app_id, base_url).config_store.configuration_path_dict
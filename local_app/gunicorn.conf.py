@@ -0,0 +1,34 @@
+"""
+gunicorn.conf.py
+Description: Loaded by gunicorn from the working directory (/src/local_app in the container). With
+PIPELINE_PREWARM, the master imports the Benchling SDK, pandas and the pipeline once, before forking
+the workers, which then start with them in memory (shared copy-on-write). Tokens, connections and
+verification keys are fetched by each worker (create_app): sockets are not shared across a fork.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import sys
+
+# app:create_app() is imported as in app.py: local_app is a package of the parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def on_starting(server):
+    from local_app.lib.lazy_imports import PIPELINE_PREWARM, import_modules
+
+    if PIPELINE_PREWARM:
+        import_modules()
+
+
+def worker_exit(server, worker):
+    from local_app.benchling_app.notebook_utils import notebook_resolver
+
+    notebook_resolver.close()
@@ -0,0 +1,252 @@
+"""
+job_queue.py
+Description: Fixed pool of worker threads running the webhook jobs, so a burst of webhooks queues up
+instead of starting one thread each. Jobs go to one of two lanes: quick canvas updates (fast) are never
+stuck behind Process CSV runs (heavy), which are admitted within their own limit and memory budget.
+Within a lane, each tenant (base URL and app ID of the webhook) has its own queue, and the tenants take
+turns in proportion to their weights, so one tenant's large order does not starve the others.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from local_app.lib.logger import get_logger
+from local_app.lib.memory import memory_budget
+from local_app.lib.metrics import (
+    JOB_QUEUE_WAIT_SECONDS,
+    JOB_RUN_SECONDS,
+    JOBS_ACTIVE,
+    JOBS_FAILED,
+    JOBS_QUEUED,
+    TENANT_JOB_WAIT_SECONDS,
+    TENANT_JOBS,
+)
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Webhook jobs run at the same time by one worker process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Extra threads that only run fast jobs, so a render always finds one free
+FAST_LANE_WORKERS = int(os.getenv("FAST_LANE_WORKERS", "1"))
+# Heavy jobs run at the same time (0: up to JOB_WORKERS)
+HEAVY_JOB_LIMIT = int(os.getenv("HEAVY_JOB_LIMIT", "0"))
+
+# Share of the workers of each tenant: "https://x.benchling.com=3,https://y.benchling.com=1" (default 1).
+# Weights are set per base URL: every app installation of that URL is a tenant with that weight
+TENANT_WEIGHTS = os.getenv("TENANT_WEIGHTS", "")
+# Heavy jobs of one tenant run at the same time (0: no limit besides HEAVY_JOB_LIMIT)
+TENANT_HEAVY_JOB_LIMIT = int(os.getenv("TENANT_HEAVY_JOB_LIMIT", "0"))
+
+FAST_LANE = "fast"
+HEAVY_LANE = "heavy"
+
+
+def parse_weights(value):
+    """{base_url: weight} of a TENANT_WEIGHTS value."""
+    weights = {}
+    for entry in value.split(","):
+        base_url, _, weight = entry.strip().rpartition("=")
+        try:
+            weights[base_url.strip().rstrip("/")] = max(float(weight), 0.01)
+        except ValueError:
+            if entry.strip():
+                logger.warning(
+                    "Ignoring TENANT_WEIGHTS entry %r (expected url=weight)", entry
+                )
+    return weights
+
+
+class FairQueue:
+    """
+    Jobs of one lane, in a queue per tenant. The next job comes from the tenant that has been
+    served the least relative to its weight (stride scheduling): a tenant of weight 2 gets twice
+    the turns of a tenant of weight 1 while both have jobs waiting. A tenant whose queue was empty
+    starts level with the others rather than with the turns it did not use.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = {} if weights is None else weights
+        self._queues = {}  # tenant -> deque of jobs
+        self._passes = {}  # tenant -> turns taken / weight
+        self._virtual_time = 0.0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def weight(self, tenant):
+        """Weight of the base URL of `tenant`, a (base URL, app ID) tuple."""
+        return self.weights.get(tenant[0] if tenant else None, 1.0)
+
+    def append(self, tenant, job):
+        if tenant not in self._queues:
+            self._queues[tenant] = deque()
+            self._passes[tenant] = self._virtual_time
+        self._queues[tenant].append(job)
+        self._size += 1
+
+    def has(self, eligible=None):
+        """Whether a job of a tenant for which `eligible(tenant)` is waiting."""
+        return any(eligible is None or eligible(tenant) for tenant in self._queues)
+
+    def pop(self, eligible=None):
+        """(tenant, job) of the next tenant for which `eligible(tenant)`, or None."""
+        tenants = [
+            tenant for tenant in self._queues if eligible is None or eligible(tenant)
+        ]
+        if not tenants:
+            return None
+        tenant = min(tenants, key=self._passes.__getitem__)
+        self._virtual_time = self._passes[tenant]
+        self._passes[tenant] += 1 / self.weight(tenant)
+        queue = self._queues[tenant]
+        job = queue.popleft()
+        if not queue:
+            # Only tenants with jobs waiting are kept
+            del self._queues[tenant]
+            del self._passes[tenant]
+        self._size -= 1
+        return tenant, job
+
+
+class JobQueue:
+    """
+    Jobs run in a FairQueue per lane: in arrival order for each tenant, the tenants taking turns.
+    `workers` threads run the fast jobs first, then the heavy ones while fewer than `heavy_limit`
+    run (`tenant_heavy_limit` per tenant) and their memory budget can be reserved (see
+    memory.MemoryBudget); a heavy job leaves its queue only once admitted. `fast_workers` more
+    threads only run fast jobs. The threads start on the first submit. An exception escaping a job
+    is logged and counted, the worker thread moves on to the
+    next job.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        budget=None,
+        fast_workers=None,
+        heavy_limit=None,
+        weights=None,
+        tenant_heavy_limit=None,
+    ):
+        self.workers = JOB_WORKERS if workers is None else workers
+        self.budget = memory_budget if budget is None else budget
+        self.fast_workers = FAST_LANE_WORKERS if fast_workers is None else fast_workers
+        if heavy_limit is None:
+            heavy_limit = HEAVY_JOB_LIMIT or self.workers
+        self.heavy_limit = heavy_limit
+        self.tenant_heavy_limit = (
+            TENANT_HEAVY_JOB_LIMIT if tenant_heavy_limit is None else tenant_heavy_limit
+        )
+        weights = parse_weights(TENANT_WEIGHTS) if weights is None else weights
+        self._lanes = {FAST_LANE: FairQueue(weights), HEAVY_LANE: FairQueue(weights)}
+        self._heavy_running = 0
+        self._tenant_heavy_running = Counter()
+        self._unfinished = 0
+        self._condition = threading.Condition()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.fast_workers):
+                self._start_thread(f"job-fast-worker-{i}", heavy=False)
+            for i in range(self.workers):
+                self._start_thread(f"job-worker-{i}", heavy=True)
+
+    def _start_thread(self, name, heavy):
+        thread = threading.Thread(
+            target=self._work, args=(heavy,), name=name, daemon=True
+        )
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, fn, *args, lane=HEAVY_LANE, tenant=None):
+        """Queues `fn(*args)` in `lane` for `tenant`, a (base URL, app ID) tuple."""
+        self._start()
+        JOBS_QUEUED.inc()
+        with self._condition:
+            self._lanes[lane].append(tenant, (time.perf_counter(), fn, args))
+            self._unfinished += 1
+            self._condition.notify_all()
+
+    def _below_tenant_limit(self, tenant):
+        return (
+            not self.tenant_heavy_limit
+            or self._tenant_heavy_running[tenant] < self.tenant_heavy_limit
+        )
+
+    def _next_job(self, heavy):
+        """(lane, tenant, job) to run next on a thread that runs heavy jobs too, or only fast ones."""
+        with self._condition:
+            while True:
+                if self._lanes[FAST_LANE]:
+                    return (FAST_LANE, *self._lanes[FAST_LANE].pop())
+                heavy_lane = self._lanes[HEAVY_LANE]
+                if (
+                    heavy
+                    and self._heavy_running < self.heavy_limit
+                    and heavy_lane.has(self._below_tenant_limit)
+                ):
+                    # The job stays queued until its memory is reserved, so the thread can
+                    # run fast jobs meanwhile
+                    if self.budget.try_acquire():
+                        queued = heavy_lane.pop(self._below_tenant_limit)
+                        self._heavy_running += 1
+                        self._tenant_heavy_running[queued[0]] += 1
+                        return (HEAVY_LANE, *queued)
+                    # The RSS going down is not notified, check it again shortly
+                    self._condition.wait(self.budget.poll_seconds)
+                    continue
+                self._condition.wait()
+
+    def _work(self, heavy):
+        while True:
+            lane, tenant, (enqueued_at, fn, args) = self._next_job(heavy)
+            JOBS_QUEUED.dec()
+            waited = time.perf_counter() - enqueued_at
+            JOB_QUEUE_WAIT_SECONDS.observe(waited, lane=lane)
+            base_url, app_id = tenant or ("", "")
+            TENANT_JOB_WAIT_SECONDS.observe(waited, base_url=base_url, app_id=app_id)
+            TENANT_JOBS.inc(base_url=base_url, app_id=app_id, lane=lane)
+            JOBS_ACTIVE.inc()
+            start = time.perf_counter()
+            try:
+                fn(*args)
+            except Exception:
+                JOBS_FAILED.inc(reason="exception")
+                logger.exception("Job %s failed", getattr(fn, "__name__", fn))
+            finally:
+                JOB_RUN_SECONDS.observe(time.perf_counter() - start, lane=lane)
+                JOBS_ACTIVE.dec()
+                if lane == HEAVY_LANE:
+                    self.budget.release()
+                with self._condition:
+                    if lane == HEAVY_LANE:
+                        self._heavy_running -= 1
+                        self._tenant_heavy_running[tenant] -= 1
+                        if not self._tenant_heavy_running[tenant]:
+                            del self._tenant_heavy_running[tenant]
+                    self._unfinished -= 1
+                    self._condition.notify_all()
+
+    def join(self):
+        """Waits until every submitted job has run."""
+        with self._condition:
+            while self._unfinished:
+                self._condition.wait()
+
+
+job_queue = JobQueue()
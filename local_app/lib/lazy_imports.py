@@ -0,0 +1,57 @@
+"""
+lazy_imports.py
+Description: Functions imported from their module on their first call, so a gunicorn worker answers
+/health and acknowledges webhooks without importing pandas and the Benchling SDK first, and the
+import of those modules (run by the master and by the warm-up of each worker, see warmup.py).
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import importlib
+import os
+import time
+
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Import the pipeline modules in the background as soon as the app is created
+PIPELINE_PREWARM = os.getenv("PIPELINE_PREWARM", "true").lower() in ("1", "true", "yes")
+
+# Everything a job needs: the SDK webhook verification and models, pandas and the pipeline
+PIPELINE_MODULES = (
+    "benchling_sdk.apps.helpers.webhook_helpers",
+    "local_app.benchling_app.setup",
+    "local_app.benchling_app.handler",
+    "local_app.benchling_app.canvas_interaction",
+)
+
+
+def lazy_function(module_name, name):
+    """`module_name.name`, imported on the first call (then a sys.modules lookup per call)."""
+
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"{module_name}.{name}, imported on the first call."
+    return call
+
+
+def import_modules(modules=PIPELINE_MODULES):
+    """Imports `modules`, logging how long it took; returns the seconds spent."""
+    start = time.perf_counter()
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            logger.exception("Could not pre-import %s", module_name)
+    elapsed = time.perf_counter() - start
+    logger.info("Imported the pipeline modules in %.2fs", elapsed)
+    return elapsed
@@ -0,0 +1,297 @@
+"""
+leases.py
+Description: Leases that keep the same canvas from being processed by two jobs at once, whether they run in
+the same gunicorn worker, in two workers or in two replicas. A lease is held by one job until released or until it expires, LEASE_TTL_SECONDS after its last
+heartbeat; the holder renews it from a background thread while its job runs, so a worker that dies only
+blocks the canvas until the lease expires. The leases are kept in a SQLite database or in lock files on a
+volume shared by the workers (LEASE_BACKEND), or in memory for a single worker process.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import fcntl
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from local_app.lib.logger import get_logger
+from local_app.lib.metrics import LEASES_BUSY, LEASES_LOST
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Where the leases are kept: "sqlite" or "file" (on a volume shared by the workers), or "memory"
+LEASE_BACKEND = os.getenv("LEASE_BACKEND", "sqlite").lower()
+# The SQLite database ("sqlite") or the directory of the lock files ("file")
+LEASE_PATH = os.getenv("LEASE_PATH", "/processed/leases")
+# A lease not renewed for this long is free again; the holder renews it every third of it
+LEASE_TTL_SECONDS = float(os.getenv("LEASE_TTL_SECONDS", "60"))
+
+
+class LeaseLostError(Exception):
+    pass
+
+
+class MemoryLeases:
+    """Leases of one process: the local stand-in of the shared backends, for tests and one worker."""
+
+    def __init__(self):
+        self._leases = {}  # key -> (owner, expires_at)
+        self._lock = threading.Lock()
+
+    def acquire(self, key, owner, ttl):
+        with self._lock:
+            holder = self._leases.get(key)
+            if holder and holder[0] != owner and holder[1] > time.time():
+                return False
+            self._leases[key] = (owner, time.time() + ttl)
+            return True
+
+    def renew(self, key, owner, ttl):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] != owner:
+                return False
+            self._leases[key] = (owner, time.time() + ttl)
+            return True
+
+    def release(self, key, owner):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+
+class SqliteLeases:
+    """
+    Leases in a SQLite database. Each call opens its own connection (threads and forked workers
+    share nothing) and takes the write lock of the database first, so that reading the holder and
+    replacing it is atomic across processes.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._created = False
+
+    def _connect(self):
+        if not self._created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._created:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases "
+                "(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._created = True
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def acquire(self, key, owner, ttl):
+        with self._transaction() as connection:
+            holder = connection.execute(
+                "SELECT owner, expires_at FROM leases WHERE key = ?", (key,)
+            ).fetchone()
+            if holder and holder[0] != owner and holder[1] > time.time():
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                (key, owner, time.time() + ttl),
+            )
+            return True
+
+    def renew(self, key, owner, ttl):
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ?",
+                (time.time() + ttl, key, owner),
+            )
+            return updated.rowcount == 1
+
+    def release(self, key, owner):
+        with self._transaction() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+            )
+
+
+class FileLeases:
+    """
+    Leases in `<directory>/<key>.lease` files holding their owner and expiry, read and written
+    under an exclusive flock of the file. The volume must support flock across the workers.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @contextmanager
+    def _locked(self, key):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.directory / f"{key}.lease", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(os.dup(fd), "r+") as f:
+                try:
+                    holder = json.loads(f.read() or "null")
+                except ValueError:
+                    holder = None
+
+                def write(entry):
+                    f.seek(0)
+                    f.truncate()
+                    if entry is not None:
+                        f.write(json.dumps(entry))
+                    f.flush()
+
+                yield holder, write
+        finally:
+            os.close(fd)
+
+    def acquire(self, key, owner, ttl):
+        with self._locked(key) as (holder, write):
+            if (
+                holder
+                and holder["owner"] != owner
+                and holder["expires_at"] > time.time()
+            ):
+                return False
+            write({"owner": owner, "expires_at": time.time() + ttl})
+            return True
+
+    def renew(self, key, owner, ttl):
+        with self._locked(key) as (holder, write):
+            if not holder or holder["owner"] != owner:
+                return False
+            write({"owner": owner, "expires_at": time.time() + ttl})
+            return True
+
+    def release(self, key, owner):
+        with self._locked(key) as (holder, write):
+            if holder and holder["owner"] == owner:
+                write(None)
+
+
+def backend_from_env(name=None, path=None):
+    name = LEASE_BACKEND if name is None else name
+    path = LEASE_PATH if path is None else path
+    if name == "memory":
+        return MemoryLeases()
+    if name == "file":
+        return FileLeases(path)
+    if name != "sqlite":
+        logger.warning("Unknown LEASE_BACKEND %r, using sqlite", name)
+    return SqliteLeases(Path(path) / "leases.sqlite3")
+
+
+class Lease:
+    """
+    A lease held by this process: renewed every `ttl / 3` seconds by a background thread until
+    released. When a renewal fails (the lease expired and was taken, or the backend is down),
+    `lost` is set and `check()` raises LeaseLostError.
+    """
+
+    def __init__(self, backend, key, owner, ttl):
+        self.backend = backend
+        self.key = key
+        self.owner = owner
+        self.ttl = ttl
+        self.lost = threading.Event()
+        self._released = threading.Event()
+        self._thread = threading.Thread(
+            target=self._heartbeat, name=f"lease-{key}", daemon=True
+        )
+        self._thread.start()
+
+    def _heartbeat(self):
+        while not self._released.wait(self.ttl / 3):
+            try:
+                renewed = self.backend.renew(self.key, self.owner, self.ttl)
+            except Exception as e:
+                logger.warning("Could not renew the lease of %s: %s", self.key, e)
+                renewed = False
+            if not renewed:
+                LEASES_LOST.inc()
+                logger.error("Lost the lease of %s", self.key)
+                self.lost.set()
+                return
+
+    def check(self):
+        if self.lost.is_set():
+            raise LeaseLostError(f"The lease of {self.key} was lost")
+
+    def release(self):
+        self._released.set()
+        self._thread.join()
+        try:
+            self.backend.release(self.key, self.owner)
+        except Exception as e:
+            # It expires after its TTL anyway
+            logger.warning("Could not release the lease of %s: %s", self.key, e)
+
+
+class LeaseManager:
+    """
+    Hands out the leases of `backend` to the jobs of this process. Each acquire gets its own owner
+    token (the process ID plus a random suffix), so a second job of the same process is refused
+    like a job of another worker, and only the job holding the token renews or releases the lease.
+    """
+
+    def __init__(self, backend=None, ttl=None):
+        self._backend = backend
+        self.ttl = LEASE_TTL_SECONDS if ttl is None else ttl
+        self._owner = None
+
+    @property
+    def owner(self):
+        # Per process: workers forked from a master that imported this module get their own
+        if self._owner is None or self._owner[0] != os.getpid():
+            self._owner = (
+                os.getpid(),
+                f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}",
+            )
+        return self._owner[1]
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = backend_from_env()
+        return self._backend
+
+    def acquire(self, key):
+        """The Lease of `key`, or None when another job (of any process) holds it."""
+        owner = f"{self.owner}:{uuid.uuid4().hex[:8]}"
+        if not self.backend.acquire(key, owner, self.ttl):
+            LEASES_BUSY.inc()
+            return None
+        return Lease(self.backend, key, owner, self.ttl)
+
+    @contextmanager
+    def hold(self, key):
+        """Yields the Lease of `key` (None when held elsewhere) and releases it on exit."""
+        lease = self.acquire(key)
+        try:
+            yield lease
+        finally:
+            if lease is not None:
+                lease.release()
+
+
+leases = LeaseManager()
@@ -1,11 +1,202 @@
+import contextvars
+import json
 import logging
+import logging.handlers
+import numbers
 import os
+import queue
+import reprlib
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
 
-# Enable basic logging for development debugging
-logging.basicConfig(
-    format="%(name)s - %(asctime)s - {%(pathname)s:%(lineno)d} - %(message)s",
-    level=logging.ERROR,
-)
+# json: one JSON object per line, with the correlation IDs of the job; text: the plain lines of before
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Logged messages and fields (a webhook payload, a list of names...) are cut beyond this length
+LOG_FIELD_MAX_CHARS = int(os.getenv("LOG_FIELD_MAX_CHARS", "2000"))
+# Records waiting to be written; when full, records are dropped (and counted) rather than waiting
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = "%(name)s - %(asctime)s - {%(pathname)s:%(lineno)d} - %(message)s"
+
+_context = contextvars.ContextVar("log_context", default={})
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Bounded repr of the containers given as log arguments, so a huge dict is never formatted in full
+_repr = reprlib.Repr()
+_repr.maxlevel = 4
+_repr.maxdict = _repr.maxlist = _repr.maxtuple = _repr.maxset = 50
+_repr.maxstring = _repr.maxother = 200
+
+
+def truncate(value, limit=None):
+    """`value` as logged: numbers as they are, anything else as text of at most `limit` chars."""
+    if isinstance(value, str):
+        text = value
+    elif value is None or isinstance(value, numbers.Number):
+        return value
+    elif isinstance(value, (dict, list, tuple, set, frozenset)):
+        text = _repr.repr(value)
+    else:
+        text = str(value)
+    limit = LOG_FIELD_MAX_CHARS if limit is None else limit
+    if len(text) > limit:
+        text = f"{text[:limit]}... [{len(text) - limit} more chars]"
+    return text
+
+
+def summarize_items(items, limit=5):
+    """Per-row messages logged once: 'a, b, c and 12 more'."""
+    items = list(items)
+    shown = ", ".join(map(str, items[:limit]))
+    if len(items) > limit:
+        shown += f" and {len(items) - limit} more"
+    return shown
+
+
+def new_job_id():
+    return secrets.token_hex(8)
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Adds `fields` (job_id, canvas_id...) to every record logged in the block, including in the
+    worker threads started with tracing.in_current_context.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "source": f"{record.pathname}:{record.lineno}",
+            "thread": record.threadName,
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _STANDARD_ATTRIBUTES
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Writes to the current sys.stderr, even when it was replaced after the setup."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Waits for room in a full queue, so stopping writes every record
+        self.queue.put(self._sentinel)
+
+
+class AsyncLogHandler(logging.handlers.QueueHandler):
+    """
+    The logging thread only cuts the arguments, adds the context and queues the record; a
+    listener thread (one per process, started on the first record so gunicorn workers get theirs)
+    formats and writes it with `handlers`.
+    """
+
+    def __init__(self, *handlers, maxsize=None):
+        super().__init__(queue.Queue(LOG_QUEUE_SIZE if maxsize is None else maxsize))
+        self.handlers = handlers
+        self.dropped = 0
+        self._listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    def prepare(self, record):
+        # A copy: the other handlers of the logger get the record as it was
+        prepared = logging.LogRecord.__new__(logging.LogRecord)
+        fields = prepared.__dict__
+        fields.update(record.__dict__)
+        args = record.args
+        if isinstance(args, dict) and "%(" in str(record.msg):
+            prepared.args = {key: truncate(value) for key, value in args.items()}
+        elif isinstance(args, dict):
+            # A single dict argument ("%s", payload), unpacked by LogRecord
+            prepared.args = (truncate(args),)
+        elif args:
+            prepared.args = tuple(map(truncate, args))
+        prepared.msg = prepared.message = truncate(prepared.getMessage())
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        for key in fields.keys() - _STANDARD_ATTRIBUTES:
+            fields[key] = truncate(fields[key])
+        for key, value in _context.get().items():
+            fields.setdefault(key, value)
+        return prepared
+
+    def enqueue(self, record):
+        if self._listener_pid != os.getpid():
+            self._start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start_listener(self):
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            if self._listener_pid is not None:
+                # Forked from a process logging already: its queue (and lock) stay behind
+                self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = _QueueListener(self.queue, *self.handlers)
+            self._listener.start()
+            self._listener_pid = os.getpid()
+
+    def flush(self):
+        """Writes every queued record (the listener starts again with the next one)."""
+        with self._listener_lock:
+            if self._listener is not None and self._listener_pid == os.getpid():
+                self._listener.stop()
+            self._listener = self._listener_pid = None
+
+
+def _configure():
+    stream_handler = _StderrHandler()
+    stream_handler.setFormatter(
+        JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    handler = AsyncLogHandler(stream_handler)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.ERROR)
+    return handler
+
+
+# Enable logging for development debugging: other libraries only log their errors
+log_handler = _configure()
 
 
 # Get a logger for our App, with a level enabled specifically for our logging but not other libraries
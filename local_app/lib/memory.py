@@ -0,0 +1,335 @@
+"""
+memory.py
+Description: Memory of the webhook jobs. With MEMORY_PROFILING, each job reports its peak RSS and the
+tracemalloc allocations of each pipeline stage in MEMORY_REPORT_DIR/<canvas_id>/. With JOB_MEMORY_BUDGET_MB,
+the job queue only starts a job when its budget fits in the memory left to the process.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from local_app.lib.logger import get_logger
+from local_app.lib.metrics import JOB_PEAK_RSS_BYTES, MEMORY_BUDGET_RESERVED_BYTES
+
+try:
+    import psutil
+except ImportError:  # /proc/self/statm is read instead
+    psutil = None
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+MEMORY_PROFILING = os.getenv("MEMORY_PROFILING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MEMORY_REPORT_DIR = os.getenv("MEMORY_REPORT_DIR", "/processed/memory")
+MEMORY_SAMPLE_INTERVAL_SECONDS = float(
+    os.getenv("MEMORY_SAMPLE_INTERVAL_SECONDS", "0.05")
+)
+# Allocation sites reported per stage, and frames kept per allocation by tracemalloc
+MEMORY_TOP_ALLOCATIONS = int(os.getenv("MEMORY_TOP_ALLOCATIONS", "10"))
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+# Memory reserved by each running job (0: jobs are admitted without looking at memory)
+JOB_MEMORY_BUDGET_MB = int(os.getenv("JOB_MEMORY_BUDGET_MB", "0"))
+# Memory of the worker process shared by its jobs (0: 90% of the container's cgroup limit)
+MEMORY_LIMIT_MB = int(os.getenv("MEMORY_LIMIT_MB", "0"))
+
+MIB = 1024 * 1024
+_CGROUP_LIMIT_FILES = (
+    "/sys/fs/cgroup/memory.max",
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+)
+
+_current_job = contextvars.ContextVar("current_memory_job", default=None)
+_process = None
+
+
+def current_rss():
+    """Resident memory of the process in bytes, or None when it cannot be read."""
+    global _process
+    if psutil is not None:
+        # A worker forked from the gunicorn master measures itself, not the master
+        if _process is None or _process.pid != os.getpid():
+            _process = psutil.Process()
+        return _process.memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def cgroup_memory_limit():
+    """Memory limit of the container in bytes, or None without a limit."""
+    for path in _CGROUP_LIMIT_FILES:
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # cgroup v2 writes "max", v1 a huge number, when there is no limit
+        if value.isdigit() and int(value) < 2**60:
+            return int(value)
+    return None
+
+
+# ================================== Per-job accounting ==================================
+
+
+class _Tracemalloc:
+    """tracemalloc runs while at least one profiled job does."""
+
+    def __init__(self):
+        self._users = 0
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self._users += 1
+            if self._users == 1 and not tracemalloc.is_tracing():
+                tracemalloc.start(MEMORY_TRACE_FRAMES)
+                self._started = True
+
+    def stop(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+
+
+_tracemalloc = _Tracemalloc()
+
+
+class JobMemory:
+    """
+    Peak RSS of the process while the job runs (sampled every `interval`), and per stage the
+    traced memory at its start / end, its traced peak and the allocation sites that grew the
+    most. tracemalloc and the RSS are per process: jobs running at the same time show in each
+    other's numbers.
+    """
+
+    def __init__(self, interval=None, **metadata):
+        self.metadata = metadata
+        self.interval = MEMORY_SAMPLE_INTERVAL_SECONDS if interval is None else interval
+        self.stages = []
+        self.start_rss = self.peak_rss = current_rss()
+        self._start = time.perf_counter()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name="job-memory-sampler", daemon=True
+        )
+
+    def start(self):
+        _tracemalloc.start()
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._sampler.join()
+        self._update_peak()
+        _tracemalloc.stop()
+
+    def _update_peak(self):
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            self._update_peak()
+
+    @contextmanager
+    def stage(self, name):
+        before = tracemalloc.take_snapshot()
+        traced_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            traced_end, traced_peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self._update_peak()
+            self.stages.append(
+                {
+                    "stage": name,
+                    "traced_start_bytes": traced_start,
+                    "traced_end_bytes": traced_end,
+                    "traced_peak_bytes": traced_peak,
+                    "rss_bytes": current_rss(),
+                    "top_allocations": [
+                        {
+                            "where": str(stat.traceback),
+                            "size_diff_bytes": stat.size_diff,
+                            "count_diff": stat.count_diff,
+                        }
+                        for stat in after.compare_to(before, "lineno")[
+                            :MEMORY_TOP_ALLOCATIONS
+                        ]
+                    ],
+                }
+            )
+
+    def report(self):
+        return {
+            **self.metadata,
+            "duration_s": round(time.perf_counter() - self._start, 6),
+            "start_rss_bytes": self.start_rss,
+            "peak_rss_bytes": self.peak_rss,
+            "stages": self.stages,
+        }
+
+    def save(self, directory):
+        path = (
+            Path(directory)
+            / f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}.json"
+        )
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.report(), indent=2, default=str))
+        except OSError as e:
+            logger.warning("Could not write memory report %s: %s", path, e)
+            return None
+        return path
+
+
+@contextmanager
+def track_job_memory(canvas_id, **metadata):
+    """
+    Accounts the memory of the block when MEMORY_PROFILING is on, and saves the report in
+    MEMORY_REPORT_DIR/<canvas_id>/. Yields the JobMemory, or None.
+    """
+    if not MEMORY_PROFILING:
+        yield None
+        return
+    job = JobMemory(canvas_id=canvas_id, **metadata)
+    token = _current_job.set(job)
+    job.start()
+    try:
+        yield job
+    finally:
+        job.stop()
+        _current_job.reset(token)
+        if job.peak_rss is not None:
+            JOB_PEAK_RSS_BYTES.observe(job.peak_rss)
+            logger.info(
+                "Job peaked at %.0f MiB RSS (%+.0f MiB)",
+                job.peak_rss / MIB,
+                (job.peak_rss - (job.start_rss or 0)) / MIB,
+            )
+        job.save(Path(MEMORY_REPORT_DIR) / (canvas_id or "no_canvas"))
+
+
+@contextmanager
+def stage(name):
+    """Records the memory of the pipeline stage `name` in the accounted job, if any."""
+    job = _current_job.get()
+    if job is None:
+        yield
+        return
+    with job.stage(name):
+        yield
+
+
+def staged(name):
+    """Decorator form of `stage` (functions and coroutines)."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ================================== Admission ==================================
+
+
+class MemoryBudget:
+    """
+    Every running job reserves `job_bytes` out of `limit_bytes`. A job is admitted when its
+    reservation fits and, if the RSS can be read, when the RSS plus its reservation fits too. A job
+    alone is always admitted. `try_acquire` never waits: callers retry every `poll_seconds`, doing
+    other work meanwhile.
+    """
+
+    def __init__(self, job_bytes, limit_bytes, rss=current_rss, poll_seconds=0.5):
+        self.job_bytes = job_bytes
+        self.limit_bytes = limit_bytes
+        self.reserved = 0
+        self._rss = rss
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.job_bytes and self.limit_bytes)
+
+    def _fits(self):
+        if self.reserved == 0:
+            return True
+        if self.reserved + self.job_bytes > self.limit_bytes:
+            return False
+        rss = self._rss()
+        return rss is None or rss + self.job_bytes <= self.limit_bytes
+
+    def try_acquire(self):
+        """Reserves the budget of a job if it fits now; False (nothing reserved) otherwise."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if not self._fits():
+                return False
+            self.reserved += self.job_bytes
+            MEMORY_BUDGET_RESERVED_BYTES.set(self.reserved)
+            return True
+
+    def release(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.reserved -= self.job_bytes
+            MEMORY_BUDGET_RESERVED_BYTES.set(self.reserved)
+
+
+def budget_from_env():
+    limit = MEMORY_LIMIT_MB * MIB
+    if not limit and JOB_MEMORY_BUDGET_MB:
+        cgroup_limit = cgroup_memory_limit()
+        limit = int(cgroup_limit * 0.9) if cgroup_limit else 0
+        if not limit:
+            logger.warning("No container memory limit found, set MEMORY_LIMIT_MB")
+    return MemoryBudget(JOB_MEMORY_BUDGET_MB * MIB, limit)
+
+
+memory_budget = budget_from_env()
@@ -0,0 +1,318 @@
+"""
+metrics.py
+Description: Minimal in-process metrics (counters, gauges, histograms) rendered in the Prometheus text
+format by the /metrics endpoint, and the metrics of the webhook service.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# Seconds, from a fast API call to a full registration
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+
+# Bytes, from 64 MiB to 8 GiB
+MEMORY_BUCKETS = tuple(2**i * 1024 * 1024 for i in range(6, 14))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base of the metric types: a value per combination of `labelnames`."""
+
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Cumulative buckets of observed values (seconds by default), plus their sum and count."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][i] += 1
+            counts[1] += value
+            counts[2] += 1
+
+    def count(self, **labels):
+        counts = self._values.get(self._key(labels))
+        return 0 if counts is None else counts[2]
+
+    def sum(self, **labels):
+        counts = self._values.get(self._key(labels))
+        return 0.0 if counts is None else counts[1]
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the `with` block, even when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator observing the duration of every call (functions and coroutines)."""
+
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.time(**labels):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _render_value(self, key, value):
+        bucket_counts, total, count = value
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(bound))])} {n}"
+            for bound, n in zip(self.buckets, bucket_counts)
+        ]
+        lines.append(
+            f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {count}"
+        )
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ================================== Webhook service metrics ==================================
+
+WEBHOOK_ACK_SECONDS = REGISTRY.register(
+    Histogram(
+        "webhook_ack_seconds",
+        "Time from receiving a webhook to acknowledging it",
+        ["status"],
+    )
+)
+WEBHOOK_VERIFY_SECONDS = REGISTRY.register(
+    Histogram("webhook_verify_seconds", "Time spent verifying webhook signatures")
+)
+JOB_QUEUE_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "job_queue_wait_seconds",
+        "Time webhook jobs wait for a free worker thread, by lane (fast / heavy)",
+        ["lane"],
+    )
+)
+JOB_RUN_SECONDS = REGISTRY.register(
+    Histogram(
+        "job_run_seconds",
+        "Time webhook jobs take to run, by lane (fast / heavy)",
+        ["lane"],
+    )
+)
+PIPELINE_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "pipeline_stage_seconds",
+        "Duration of each stage of the Process CSV pipeline",
+        ["stage"],
+    )
+)
+BENCHLING_API_REQUESTS = REGISTRY.register(
+    Counter(
+        "benchling_api_requests_total",
+        "Benchling API requests by endpoint and status code",
+        ["method", "endpoint", "status"],
+    )
+)
+BENCHLING_API_SECONDS = REGISTRY.register(
+    Histogram(
+        "benchling_api_request_seconds",
+        "Latency of the Benchling API requests by endpoint",
+        ["method", "endpoint"],
+    )
+)
+BENCHLING_API_ERRORS = REGISTRY.register(
+    Counter(
+        "benchling_api_errors_total",
+        "Benchling API requests that got no response (timeouts, connection errors) by endpoint",
+        ["method", "endpoint", "error"],
+    )
+)
+JOBS_ACTIVE = REGISTRY.register(Gauge("jobs_active", "Webhook jobs currently running"))
+JOBS_QUEUED = REGISTRY.register(
+    Gauge("jobs_queued", "Webhook jobs waiting for a worker thread")
+)
+JOBS_FAILED = REGISTRY.register(
+    Counter(
+        "jobs_failed_total",
+        "Webhook jobs that failed, shown to the user (user_error) or not (exception)",
+        ["reason"],
+    )
+)
+TENANT_JOBS = REGISTRY.register(
+    Counter(
+        "tenant_jobs_total",
+        "Webhook jobs started, by tenant (base URL, app ID) and lane",
+        ["base_url", "app_id", "lane"],
+    )
+)
+TENANT_JOB_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "tenant_job_wait_seconds",
+        "Time webhook jobs wait for a free worker thread, by tenant",
+        ["base_url", "app_id"],
+    )
+)
+LEASES_BUSY = REGISTRY.register(
+    Counter(
+        "leases_busy_total",
+        "Leases not acquired because another worker or replica holds them",
+    )
+)
+LEASES_LOST = REGISTRY.register(
+    Counter(
+        "leases_lost_total",
+        "Leases that could not be renewed while their job was running",
+    )
+)
+JOB_PEAK_RSS_BYTES = REGISTRY.register(
+    Histogram(
+        "job_peak_rss_bytes",
+        "Peak resident memory of the process while a job ran (MEMORY_PROFILING)",
+        buckets=MEMORY_BUCKETS,
+    )
+)
+MEMORY_BUDGET_RESERVED_BYTES = REGISTRY.register(
+    Gauge(
+        "memory_budget_reserved_bytes",
+        "Memory reserved by the running jobs (JOB_MEMORY_BUDGET_MB)",
+    )
+)
@@ -0,0 +1,454 @@
+"""
+profiling.py
+Description: On-demand profiling of single webhook jobs. A job picked by canvas ID (PROFILE_CANVAS_IDS),
+by PROFILE_JOBS or by the PROFILE_SAMPLE_RATE draw runs under cProfile or a stack sampler, and its profile
+is saved in PROFILE_DIR/<canvas_id>/ next to the timings of its pipeline stages. Summarise the pandas and
+Benchling SDK hot spots of the saved profiles with:
+    python -m local_app.lib.profiling /processed/profiles --top 15
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import abc
+import argparse
+import cProfile
+import contextvars
+import functools
+import inspect
+import json
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from local_app.lib.logger import get_logger
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/processed/profiles")
+# Comma-separated canvas IDs whose jobs are always profiled
+PROFILE_CANVAS_IDS = frozenset(
+    canvas_id.strip()
+    for canvas_id in os.getenv("PROFILE_CANVAS_IDS", "").split(",")
+    if canvas_id.strip()
+)
+PROFILE_JOBS = os.getenv("PROFILE_JOBS", "false").lower() in ("1", "true", "yes")
+# Fraction of the other jobs that are profiled (0.01: one job in a hundred)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# cprofile: every call, exact counts but a slower job; sampling: the stacks every interval
+PROFILER = os.getenv("PROFILER", "cprofile").lower()
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(
+    os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005")
+)
+
+_active_profile = contextvars.ContextVar("active_profile", default=None)
+_current_stage = contextvars.ContextVar("current_stage", default=None)
+
+
+def should_profile(canvas_id):
+    if PROFILE_JOBS or canvas_id in PROFILE_CANVAS_IDS:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class _JobProfile(abc.ABC):
+    """
+    Profile of one job: the job thread and the worker threads it starts with
+    tracing.in_current_context, plus the start and duration of every pipeline stage.
+    """
+
+    profiler = None
+    extension = None
+
+    def __init__(self, **metadata):
+        self.metadata = metadata
+        self.stages = []
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def start(self):
+        self._attach()
+
+    def stop(self):
+        self._detach()
+
+    @contextmanager
+    def thread(self):
+        """Profiles the current thread too, until the end of the block."""
+        if threading.get_ident() in self._threads:
+            yield
+            return
+        self._attach()
+        try:
+            yield
+        finally:
+            self._detach()
+
+    def _attach(self):
+        stage = _current_stage.get()
+        with self._lock:
+            self._threads[threading.get_ident()] = [stage] if stage else []
+
+    def _detach(self):
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+
+    def enter_stage(self, name):
+        stages = self._threads.get(threading.get_ident())
+        if stages is not None:
+            stages.append(name)
+
+    def exit_stage(self, name, start):
+        end = time.perf_counter()
+        stages = self._threads.get(threading.get_ident())
+        if stages:
+            stages.pop()
+        with self._lock:
+            self.stages.append(
+                {
+                    "stage": name,
+                    "thread": threading.current_thread().name,
+                    "start_s": round(start - self._start, 6),
+                    "duration_s": round(end - start, 6),
+                }
+            )
+
+    @abc.abstractmethod
+    def dump(self, path):
+        """Writes the profile of the job threads to `path`."""
+
+    def save(self, directory):
+        """Writes `<job>.prof` (or `.folded`) and `<job>.json`; returns the profile path."""
+        stem = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        path = Path(directory) / f"{stem}{self.extension}"
+        description = {
+            **self.metadata,
+            "profiler": self.profiler,
+            "duration_s": round(time.perf_counter() - self._start, 6),
+            "stages": self.stages,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.dump(path)
+            path.with_suffix(".json").write_text(
+                json.dumps(description, indent=2, default=str)
+            )
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", path, e)
+            return None
+        logger.info("Saved profile of the job in %s", path)
+        return path
+
+
+class CProfileJobProfile(_JobProfile):
+    """Deterministic: a cProfile.Profile per thread, merged into one pstats file."""
+
+    profiler = "cprofile"
+    extension = ".prof"
+
+    def __init__(self, **metadata):
+        super().__init__(**metadata)
+        self._profiles = []
+        self._running = {}
+
+    def _attach(self):
+        super()._attach()
+        profile = cProfile.Profile()
+        self._running[threading.get_ident()] = profile
+        profile.enable()
+
+    def _detach(self):
+        profile = self._running.pop(threading.get_ident(), None)
+        if profile is not None:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+        super()._detach()
+
+    def dump(self, path):
+        stats = pstats.Stats(*self._profiles)
+        stats.dump_stats(path)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class SamplingJobProfile(_JobProfile):
+    """
+    Statistical: a daemon thread records the stacks of the job threads every `interval`, in
+    the folded format of flame graphs, each stack rooted at the stage it was sampled in.
+    """
+
+    profiler = "sampling"
+    extension = ".folded"
+
+    def __init__(self, interval=None, **metadata):
+        self.interval = (
+            PROFILE_SAMPLE_INTERVAL_SECONDS if interval is None else interval
+        )
+        super().__init__(sample_interval_s=self.interval, **metadata)
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name="job-profile-sampler", daemon=True
+        )
+
+    def start(self):
+        super().start()
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._sampler.join()
+        super().stop()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = [
+                    (ident, list(stages)) for ident, stages in self._threads.items()
+                ]
+            for ident, stages in threads:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    root = f"stage:{stages[-1] if stages else 'job'}"
+                    self.samples[";".join([root] + stack[::-1])] += 1
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_job(canvas_id, **metadata):
+    """
+    Runs the block under the profiler if the job is picked by should_profile, and saves the
+    profile in PROFILE_DIR/<canvas_id>/. Yields the profile, or None when not profiled.
+    """
+    if not should_profile(canvas_id):
+        yield None
+        return
+    profile_class = SamplingJobProfile if PROFILER == "sampling" else CProfileJobProfile
+    profile = profile_class(canvas_id=canvas_id, **metadata)
+    token = _active_profile.set(profile)
+    profile.start()
+    try:
+        yield profile
+    except BaseException as e:
+        profile.metadata["error"] = repr(e)[:300]
+        raise
+    finally:
+        profile.stop()
+        _active_profile.reset(token)
+        profile.save(Path(PROFILE_DIR) / (canvas_id or "no_canvas"))
+
+
+def attached():
+    """Profiles the current worker thread while it runs for a profiled job (no-op otherwise)."""
+    profile = _active_profile.get()
+    return nullcontext() if profile is None else profile.thread()
+
+
+@contextmanager
+def stage(name):
+    """Records the block as the pipeline stage `name` of the profiled job, if any."""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    token = _current_stage.set(name)
+    profile.enter_stage(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.exit_stage(name, start)
+        _current_stage.reset(token)
+
+
+def staged(name):
+    """Decorator form of `stage` (functions and coroutines)."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ================================== Summary of the saved profiles ==================================
+
+# Hot spots are reported for these groups of installed packages
+PACKAGE_GROUPS = {
+    "pandas": ("pandas", "numpy"),
+    "sdk": (
+        "benchling_sdk",
+        "benchling_api_client",
+        "httpx",
+        "httpcore",
+        "h11",
+        "attr",
+        "dataclasses_json",
+        "marshmallow",
+    ),
+}
+_SITE_PACKAGE = re.compile(r"[/\\](?:site|dist)-packages[/\\]([^/\\]+)")
+_FOLDED_FRAME = re.compile(r"^(.*) \((.*):(\d+)\)$")
+
+
+def package_group(filename):
+    match = _SITE_PACKAGE.search(filename)
+    if match is None:
+        return None
+    package = match.group(1).removesuffix(".py")
+    for group, packages in PACKAGE_GROUPS.items():
+        if package in packages:
+            return group
+    return None
+
+
+def _load_cprofile(path, functions):
+    for (filename, line, name), (_, calls, self_s, cum_s, _) in pstats.Stats(
+        str(path)
+    ).stats.items():
+        totals = functions[(filename, line, name)]
+        totals[0] += self_s
+        totals[1] += cum_s
+        totals[2] += calls
+
+
+def _load_folded(path, interval, functions):
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            seconds = int(count) * interval
+            frames = []
+            for label in stack.split(";")[1:]:
+                match = _FOLDED_FRAME.match(label)
+                if match:
+                    name, filename, first_line = match.groups()
+                    frames.append((filename, int(first_line), name))
+            for frame in set(frames):
+                functions[frame][1] += seconds
+            if frames:
+                functions[frames[-1]][0] += seconds
+
+
+def summarize(paths, top=15):
+    """Stage durations and the pandas / SDK functions with the most own time, across profiles."""
+    descriptions = []
+    for path in map(Path, paths):
+        descriptions.extend(sorted(path.rglob("*.json")) if path.is_dir() else [path])
+
+    functions = defaultdict(lambda: [0.0, 0.0, 0])
+    stages = defaultdict(list)
+    profilers = Counter()
+    for description_path in descriptions:
+        description = json.loads(description_path.read_text())
+        profiler = description.get("profiler")
+        try:
+            if profiler == "cprofile":
+                _load_cprofile(description_path.with_suffix(".prof"), functions)
+            elif profiler == "sampling":
+                _load_folded(
+                    description_path.with_suffix(".folded"),
+                    description["sample_interval_s"],
+                    functions,
+                )
+            else:
+                continue
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Skipping profile %s: %s", description_path, e)
+            continue
+        profilers[profiler] += 1
+        for record in description["stages"]:
+            stages[record["stage"]].append(record["duration_s"])
+
+    lines = [
+        f"profiles: {sum(profilers.values())} "
+        f"({', '.join(f'{n} {name}' for name, n in sorted(profilers.items())) or 'none'})",
+        "",
+        f"{'stage':<24} {'runs':>5} {'total s':>9} {'mean s':>8}",
+    ]
+    for name, durations in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        lines.append(
+            f"{name:<24} {len(durations):>5} {sum(durations):>9.3f} "
+            f"{sum(durations) / len(durations):>8.3f}"
+        )
+
+    profiled_s = sum(totals[0] for totals in functions.values())
+    for group in PACKAGE_GROUPS:
+        hot_spots = sorted(
+            (
+                (totals, key)
+                for key, totals in functions.items()
+                if package_group(key[0]) == group
+            ),
+            key=lambda item: -item[0][0],
+        )
+        group_s = sum(totals[0] for totals, _ in hot_spots)
+        lines += [
+            "",
+            f"{group} hot spots (own time {group_s:.3f}s of {profiled_s:.3f}s profiled)",
+            f"{'own s':>9} {'cum s':>9} {'calls':>8}  function",
+        ]
+        for (self_s, cum_s, calls), (filename, line, name) in hot_spots[:top]:
+            location = filename[_SITE_PACKAGE.search(filename).start(1) :]
+            lines.append(
+                f"{self_s:>9.3f} {cum_s:>9.3f} {calls or '-':>8}  {name} ({location}:{line})"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarise the pandas and Benchling SDK hot spots of saved job profiles"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[PROFILE_DIR],
+        help="profile folders or .json descriptions",
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    print(summarize(args.paths, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+tracing.py
+Description: Lightweight tracing: nested spans per job, pipeline stage and Benchling API call, exported
+in the background to a rotating local JSONL file or an OTLP/HTTP (JSON) collector. Off by default: until
+TRACING_EXPORTER is set to jsonl or otlp, every span is a no-op.
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import abc
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from local_app.lib import memory, profiling
+from local_app.lib.logger import get_logger
+from local_app.lib.metrics import PIPELINE_STAGE_SECONDS
+
+logger = get_logger()
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# none (default), jsonl (rotating files in TRACE_DIR) or otlp (POST to TRACE_OTLP_ENDPOINT)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACE_DIR = os.getenv("TRACE_DIR", "/processed/traces")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(20 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "5"))
+TRACE_OTLP_ENDPOINT = os.getenv(
+    "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+# Spans waiting to be written; spans are dropped (and counted) rather than blocking a job
+_EXPORT_QUEUE_SIZE = 10000
+_EXPORT_BATCH_SIZE = 512
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "_start",
+    )
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self._start = time.perf_counter_ns()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self):
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._start
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is off, so the callers never check."""
+
+    trace_id = span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ================================== Exporters ==================================
+
+
+class _BackgroundExporter(abc.ABC):
+    """
+    Spans are queued by the jobs and written in batches by one daemon thread, started on the first
+    span of each process (a gunicorn worker forked from a master that imported this module).
+    """
+
+    def __init__(self):
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=_EXPORT_QUEUE_SIZE)
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+
+    def _start_thread(self):
+        with self._thread_lock:
+            if self._thread_pid == os.getpid():
+                return
+            if self._thread_pid is not None:
+                # Forked: the spans queued by the parent are its own to write
+                self._queue = queue.Queue(maxsize=_EXPORT_QUEUE_SIZE)
+            threading.Thread(
+                target=self._run,
+                args=(self._queue,),
+                name=f"{type(self).__name__}",
+                daemon=True,
+            ).start()
+            self._thread_pid = os.getpid()
+
+    def export(self, span):
+        if self._thread_pid != os.getpid():
+            self._start_thread()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Waits until every span exported so far has been written."""
+        self._queue.join()
+
+    def _run(self, spans):
+        while True:
+            batch = [spans.get()]
+            while len(batch) < _EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(spans.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning("Could not export %d spans: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    spans.task_done()
+
+    @abc.abstractmethod
+    def _write(self, spans):
+        """Writes a batch of finished spans."""
+
+
+class JsonlExporter(_BackgroundExporter):
+    """
+    One JSON object per span in `<directory>/spans-<pid>.jsonl` (one file per worker process),
+    rotated to .1, .2... once it exceeds `max_bytes`, keeping `backups` old files.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, backups=None):
+        self.directory = Path(directory or TRACE_DIR)
+        self.max_bytes = TRACE_FILE_MAX_BYTES if max_bytes is None else max_bytes
+        self.backups = TRACE_FILE_BACKUPS if backups is None else backups
+        super().__init__()
+
+    @property
+    def path(self):
+        return self.directory / f"spans-{os.getpid()}.jsonl"
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def _write(self, spans):
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        lines = "".join(
+            json.dumps(span.to_dict(), default=str) + "\n" for span in spans
+        )
+        with path.open("a") as f:
+            f.write(lines)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans, service_name="clc-registration-app"):
+    """Request body of the OTLP/HTTP JSON traces endpoint (POST /v1/traces)."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _otlp_value(service_name)}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "local_app.lib.tracing"},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                "parentSpanId": span.parent_id or "",
+                                "name": span.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(span.start_ns),
+                                "endTimeUnixNano": str(span.end_ns),
+                                "attributes": [
+                                    {"key": key, "value": _otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": {"code": 2 if span.status == "error" else 1},
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class OtlpExporter(_BackgroundExporter):
+    """POSTs the spans, in batches, to an OTLP/HTTP collector accepting JSON."""
+
+    def __init__(self, endpoint=None, client=None):
+        import httpx  # only when exporting to a collector, the app starts without it
+
+        self.endpoint = endpoint or TRACE_OTLP_ENDPOINT
+        self.client = client or httpx.Client(timeout=5)
+        super().__init__()
+
+    def _write(self, spans):
+        self.client.post(self.endpoint, json=otlp_payload(spans)).raise_for_status()
+
+
+def exporter_from_env(name=None):
+    name = TRACING_EXPORTER if name is None else name
+    if name == "jsonl":
+        return JsonlExporter()
+    if name == "otlp":
+        return OtlpExporter()
+    if name not in ("none", "off", ""):
+        logger.warning("Unknown TRACING_EXPORTER %r, tracing is off", name)
+    return None
+
+
+# ================================== Tracer ==================================
+
+
+class Tracer:
+    """
+    Creates the spans and hands the finished ones to `exporter` (None: tracing off). The current
+    span follows the code through contextvars, so a span opened inside another one is its child,
+    including in threads started with `in_current_context`.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_span(self, name, **attributes):
+        """A span that is not made current, for callbacks that cannot use `with` (HTTP hooks)."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(name, _current_span.get(), attributes)
+
+    def end_span(self, span, error=None):
+        if span is NOOP_SPAN:
+            return
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = repr(error)[:300]
+        span.end()
+        self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span, error)
+
+    def traced(self, name=None, **attributes):
+        """Decorator running every call (functions and coroutines) in a span."""
+
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+            if inspect.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, **attributes):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+tracer = Tracer(exporter_from_env())
+
+
+def annotate(**attributes):
+    """Adds attributes (entity counts, pages...) to the current span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def in_current_context(fn):
+    """
+    `fn` bound to a copy of the current context, so spans opened in a worker thread nest (and
+    the thread is profiled with the job, if it is).
+    """
+    context = contextvars.copy_context()
+
+    def run_attached(*args, **kwargs):
+        with profiling.attached():
+            return fn(*args, **kwargs)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(run_attached, *args, **kwargs)
+
+    return wrapper
+
+
+def pipeline_stage(name):
+    """
+    Decorator of the pipeline stages: times them in pipeline_stage_seconds, in a span, and
+    marks them in the profile and the memory report of the job.
+    """
+
+    def decorator(fn):
+        fn = profiling.staged(name)(memory.staged(name)(fn))
+        return PIPELINE_STAGE_SECONDS.timed(stage=name)(
+            tracer.traced(f"stage {name}", stage=name)(fn)
+        )
+
+    return decorator
@@ -1,4 +1,17 @@
 import sys, os
 
+import pytest
+
 root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-sys.path.insert(0, root)
\ No newline at end of file
+sys.path.insert(0, root)
+# No trace files from the test runs (tests/test_tracing.py sets up its own exporters)
+os.environ.setdefault("TRACING_EXPORTER", "none")
+
+from local_app.lib.logger import log_handler
+
+
+@pytest.fixture(autouse=True)
+def flush_logs():
+    # The log lines are written by a background thread: write them while the output is captured
+    yield
+    log_handler.flush()
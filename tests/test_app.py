@@ -5,7 +5,7 @@ import pytest
 from flask import Flask
 from flask.testing import FlaskClient
 
-from local_app.app import create_app
+from local_app.app import create_app, job_lane, job_tenant
 from tests.helpers import load_webhook_json
 
 _TEST_FILES_PATH = Path(__file__).parent.parent / "tests/files"
@@ -45,3 +45,66 @@ class TestApp:
         mock_verify.assert_called_once()
         mock_app_definition_id.assert_called_once()
         mock_enqueue_work.assert_called_once()
+
+    def test_metrics_endpoint(self, client) -> None:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        body = response.get_data(as_text=True)
+        assert "# TYPE pipeline_stage_seconds histogram" in body
+        assert "# TYPE jobs_queued gauge" in body
+
+    @patch("local_app.app._enqueue_work")
+    @patch("local_app.app.jwks_cache")
+    @patch("local_app.app.app_definition_id")
+    @patch("local_app.app.verify")
+    def test_app_verifies_again_with_refreshed_keys(
+        self,
+        mock_verify,
+        mock_app_definition_id,
+        mock_jwks_cache,
+        mock_enqueue_work,
+        client,
+    ) -> None:
+        mock_verify.side_effect = [Exception("Invalid signature"), None]
+        mock_jwks_cache.refresh_if_stale.return_value = True
+        webhook = load_webhook_json(_TEST_FILES_PATH / "canvas_initialize_webhook.json")
+        response = client.post("1/webhooks/canvas", json=webhook.to_dict())
+        assert response.status_code == 200
+        assert mock_verify.call_count == 2
+        mock_enqueue_work.assert_called_once()
+
+    @patch("local_app.app.WarmUp.start_in_background")
+    def test_ready_once_warmed_up(self, mock_start_in_background) -> None:
+        client = create_app().test_client()
+        mock_start_in_background.assert_called_once()
+        assert client.get("/ready").status_code == 503
+        assert client.get("/health").status_code == 200
+
+    @patch("local_app.app.PIPELINE_PREWARM", False)
+    def test_ready_without_warm_up(self) -> None:
+        response = create_app().test_client().get("/ready")
+        assert response.status_code == 200
+        assert response.json == {"ready": True, "steps": {}}
+
+    def test_process_runs_go_to_the_heavy_lane(self) -> None:
+        initialize = load_webhook_json(
+            _TEST_FILES_PATH / "canvas_initialize_webhook.json"
+        ).to_dict()
+        interaction = load_webhook_json(
+            _TEST_FILES_PATH / "canvas_interaction_webhook.json"
+        ).to_dict()
+        assert job_lane(initialize) == "fast"
+        assert job_lane(interaction) == "fast"
+        interaction["message"]["buttonId"] = "process_button"
+        assert job_lane(interaction) == "heavy"
+
+    def test_jobs_are_queued_per_tenant(self) -> None:
+        initialize = load_webhook_json(
+            _TEST_FILES_PATH / "canvas_initialize_webhook.json"
+        ).to_dict()
+        assert job_tenant(initialize) == (
+            "https://non-existent.benchling.com",
+            "app_DRBigxGEyr2BzW4T",
+        )
+        assert job_tenant({}) == ("", "")
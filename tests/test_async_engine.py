@@ -0,0 +1,264 @@
+"""
+test_async_engine.py
+Description: Test the asyncio engine of the Process CSV pipeline
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import asyncio
+import threading
+
+import httpx
+import pandas as pd
+import pytest
+from unittest.mock import ANY, MagicMock, patch
+
+from benchling_sdk.apps.status.errors import AppUserFacingError
+
+from local_app.benchling_app import async_engine, canvas_interaction, csv_utils
+from local_app.benchling_app.views.constants import PROCESS_BUTTON_ID
+from local_app.lib.leases import LeaseManager, MemoryLeases
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+@pytest.fixture
+def engine():
+    engine = async_engine.AsyncEngine(concurrency=4)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "local_app.benchling_app.checkpoint_utils.CHECKPOINT_DIR",
+        str(tmp_path / "checkpoints"),
+    )
+    monkeypatch.setattr(
+        "local_app.benchling_app.checkpoint_utils.MEMO_DIR", str(tmp_path / "memo")
+    )
+
+
+def _csv_entity(name, file_name="metadata.csv"):
+    entity = MagicMock()
+    entity.name = name
+    entity.fields = {"CSV": MagicMock(value=f"blob_{name}", display_value=file_name)}
+    return entity
+
+
+# ================================== Test download_csv_async ==================================
+
+
+def test_download_csv_async_streams_the_blob(tmp_path):
+    app = MagicMock()
+    app.benchling.custom_entities.get_by_id.return_value = _csv_entity(
+        "crRNA_metadata_v2"
+    )
+    app.benchling.blobs.download_url.return_value = MagicMock(
+        download_url="https://blobs.example/crrna"
+    )
+    http = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text="a,b"))
+    )
+    destination = tmp_path / "external" / "crrna_metadata.csv"
+
+    error = asyncio.run(
+        csv_utils.download_csv_async(
+            app, "ent_1", {"crRNA_metadata": str(destination)}, http
+        )
+    )
+
+    assert error is None
+    assert destination.read_text() == "a,b"
+    app.benchling.blobs.download_url.assert_called_once_with("blob_crRNA_metadata_v2")
+
+
+def test_download_csv_async_wrong_format():
+    app = MagicMock()
+    app.benchling.custom_entities.get_by_id.return_value = _csv_entity(
+        "crRNA_metadata", "metadata.xlsx"
+    )
+
+    error = asyncio.run(
+        csv_utils.download_csv_async(app, "ent_1", {"crRNA_metadata": "x"}, None)
+    )
+
+    assert error == "Are you sure metadata.xlsx has the correct format?"
+    app.benchling.blobs.download_url.assert_not_called()
+
+
+# ================================== Test AsyncEngine ==================================
+
+
+def test_engine_limits_the_stages_running_at_once(engine):
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def blocking_call():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        threading.Event().wait(0.02)
+        with lock:
+            in_flight[0] -= 1
+
+    async def many_calls():
+        await asyncio.gather(*(engine.call(blocking_call) for _ in range(12)))
+
+    engine.run(many_calls())
+
+    assert peak[0] == 4
+
+
+def _run(files_apis=("meta_id", "genome_id")):
+    run = MagicMock()
+    run.files_apis = list(files_apis)
+    run.start.return_value = True
+    run.register.return_value = (pd.DataFrame({"bac_name": ["CLC1"]}), 1, 2, 3)
+    run.upload.return_value = (7, "file_id")
+    run.fill_plates.return_value = {"PlateA1": {"submitted": 1, "skipped": 0}}
+    return run
+
+
+@patch.object(async_engine, "download_csv_async")
+def test_process_csv_async_runs_every_stage(mock_download, engine):
+    mock_download.return_value = None
+    run = _run()
+
+    result = engine.run(async_engine.process_csv_async(run, engine))
+
+    assert result == ("file_id", 7, {"PlateA1": {"submitted": 1, "skipped": 0}})
+    assert mock_download.call_count == 2
+    run.check_downloads.assert_called_once()
+    run.fill_plates.assert_called_once()
+    assert run.fill_plates.call_args.args[:2] == (run.register.return_value, 7)
+    run.write_notebook.assert_called_once_with(run.register.return_value[0])
+
+
+@patch.object(async_engine, "download_csv_async")
+def test_process_csv_async_download_error(mock_download, engine):
+    mock_download.side_effect = [None, "This file’s entity name doesn’t match"]
+    run = _run()
+
+    with pytest.raises(AppUserFacingError, match="entity name"):
+        engine.run(async_engine.process_csv_async(run, engine))
+
+    run.check_downloads.assert_not_called()
+
+
+@patch.object(async_engine, "download_csv_async")
+def test_process_csv_async_notebook_not_written_when_plates_are_wrong(
+    mock_download, engine
+):
+    mock_download.return_value = None
+    run = _run()
+    run.fill_plates.side_effect = AppUserFacingError("Plate not found")
+
+    with pytest.raises(AppUserFacingError, match="Plate not found"):
+        engine.run(async_engine.process_csv_async(run, engine))
+
+    run.write_notebook.assert_not_called()
+
+
+@patch.object(async_engine, "download_csv_async")
+def test_process_csv_async_notebook_written_while_plates_fill(mock_download, engine):
+    mock_download.return_value = None
+    run = _run()
+    notebook_written = threading.Event()
+    run.write_notebook.side_effect = lambda clc_bac_df: notebook_written.set()
+
+    def fill_plates(registered_frames, order_number, on_validated):
+        on_validated()
+        # The transfers are still being submitted when the notebook is written
+        assert notebook_written.wait(5)
+        raise AppUserFacingError("Transfer failed")
+
+    run.fill_plates.side_effect = fill_plates
+
+    with pytest.raises(AppUserFacingError, match="Transfer failed"):
+        engine.run(async_engine.process_csv_async(run, engine))
+
+    # Its checkpoint is saved, a retry only fills the plates
+    run.write_notebook.assert_called_once()
+
+
+# ================================== Test route_interaction_webhook ==================================
+
+
+@patch("local_app.benchling_app.canvas_interaction.process_notebook", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.find_and_fill_plates", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.upload_csv", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction.create_and_register_entities",
+    autospec=True,
+)
+@patch("local_app.benchling_app.canvas_interaction.load_and_clean_data", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.check_all_csv_exist", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.delete_csvs", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction._canvas_builder_from_canvas_id",
+    autospec=True,
+)
+@patch.object(async_engine, "download_csv_async")
+def test_route_interaction_webhook_with_asyncio_engine(
+    mock_download,
+    mock_builder_fn,
+    mock_delete_csvs,
+    mock_check_all,
+    mock_load_and_clean,
+    mock_create_and_register,
+    mock_upload_csv,
+    mock_find_and_fill,
+    mock_process_notebook,
+    engine,
+    monkeypatch,
+):
+    monkeypatch.setattr(canvas_interaction, "PIPELINE_ENGINE", "asyncio")
+    monkeypatch.setattr(canvas_interaction, "async_engine", engine)
+    monkeypatch.setattr(canvas_interaction, "leases", LeaseManager(MemoryLeases()))
+
+    fake_app = MagicMock()
+    session = MagicMock()
+    fake_app.create_session_context.return_value.__enter__.return_value = session
+    fake_builder = MagicMock()
+    fake_builder.inputs_to_dict.return_value = {
+        "input_block_metadata": ["meta_id"],
+        "input_block_genome_mapping": ["genome_id"],
+        "input_block_plates": ["plate1", "plate2", "plate3"],
+        "input_block_plate_specs": ["specs_id"],
+        "input_block_notebook_name": "Notebook",
+    }
+    mock_builder_fn.return_value = fake_builder
+    canvas_interaction_webhook = MagicMock(
+        canvas_id="canvas-123", button_id=PROCESS_BUTTON_ID
+    )
+
+    mock_download.return_value = None
+    mock_check_all.return_value = None
+    dfs_out = tuple(pd.DataFrame({c: [1]}) for c in "xyzgm") + (None,)
+    mock_load_and_clean.return_value = dfs_out
+    clc_bac_df = pd.DataFrame({"bac_name": ["CLC1"]})
+    mock_create_and_register.return_value = (clc_bac_df,) + dfs_out[:3] + (None,)
+    mock_upload_csv.return_value = ({}, 7, "file_id")
+    mock_find_and_fill.return_value = ({}, None)
+    mock_process_notebook.return_value = None
+
+    canvas_interaction.route_interaction_webhook(fake_app, canvas_interaction_webhook)
+
+    assert mock_download.call_count == 3
+    mock_find_and_fill.assert_called_once()
+    assert mock_find_and_fill.call_args.kwargs["order_number"] == 7
+    mock_process_notebook.assert_called_once_with(
+        app=fake_app,
+        notebook_name="Notebook",
+        clc_bac_df=clc_bac_df,
+        checkpoint=ANY,
+        checkpoint_key=ANY,
+    )
+    session.app.benchling.apps.update_canvas.assert_called_once()
@@ -0,0 +1,148 @@
+"""
+test_benchling_server.py
+Description: Test the local Benchling stand-in against the SDK calls of the app, and the load benchmark
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+from pathlib import Path
+
+import httpx
+import pytest
+from benchling_sdk.auth.client_credentials_oauth2 import ClientCredentialsOAuth2
+from benchling_sdk.benchling import Benchling
+from benchling_sdk.models import (
+    ContainerQuantity,
+    ContainerQuantityUnits,
+    DnaSequenceBulkCreate,
+    MultipleContainersTransfer,
+)
+
+from benchmarks.bench_server_load import run
+from benchmarks.benchling_server import BenchlingServer, LatencyModel
+from local_app.benchling_app import rate_limiter
+from local_app.benchling_app.plate_layout import PlateWells
+
+_TEST_FILES_PATH = Path(__file__).parent / "files"
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+@pytest.fixture
+def server():
+    with BenchlingServer() as server:
+        yield server
+
+
+@pytest.fixture
+def benchling(server):
+    return Benchling(server.base_url, ClientCredentialsOAuth2("id", "secret"))
+
+
+def test_lists_are_paginated_and_filtered(server, benchling):
+    for i in range(120):
+        server.state.create_entity(
+            "dna", {"name": f"seq{i}", "folderId": "lib_a", "schemaId": "ts_a"}
+        )
+    server.state.create_entity(
+        "dna", {"name": "other", "folderId": "lib_b", "schemaId": "ts_a"}
+    )
+
+    pages = list(benchling.dna_sequences.list(folder_id="lib_a", page_size=50))
+
+    assert [len(page) for page in pages] == [50, 50, 20]
+    assert pages[0][0].name == "seq0"
+
+
+def test_bulk_create_is_a_task(benchling):
+    task = benchling.dna_sequences.bulk_create(
+        [
+            DnaSequenceBulkCreate(
+                name="crRNA", folder_id="lib_a", schema_id="ts_a", bases=""
+            )
+        ]
+    )
+
+    created = task.wait_for_response().dna_sequences
+    assert [sequence.name for sequence in created] == ["crRNA"]
+    listed = [s.id for page in benchling.dna_sequences.list() for s in page]
+    assert listed == [created[0].id]
+
+
+def test_csv_entity_blob_is_downloaded(server, benchling, tmp_path):
+    entity = server.state.add_csv_entity(
+        "crRNA_metadata_1", "crrna.csv", b"a,b\n1,2\n", "lib_csv", "ts_csv"
+    )
+
+    fetched = benchling.custom_entities.get_by_id(entity["id"])
+    path = benchling.blobs.download_file(fetched.fields["CSV"].value, tmp_path / "f")
+
+    assert fetched.fields["CSV"].display_value == "crrna.csv"
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+
+def test_transfers_fill_the_plate(server, benchling):
+    plate = server.state.add_plate("PlateA10000_crRNA", ["A1", "A2"])
+    crrna = server.state.create_entity(
+        "dna", {"name": "crRNA", "folderId": "lib_a", "schemaId": "ts_a"}
+    )
+    quantity = ContainerQuantity(units=ContainerQuantityUnits.UG, value=2.0)
+
+    benchling.containers.transfer_into_containers(
+        [
+            MultipleContainersTransfer(
+                destination_container_id=plate["wells"]["A2"]["id"],
+                source_entity_id=crrna["id"],
+                transfer_quantity=quantity,
+            )
+        ]
+    )
+
+    wells = PlateWells.from_plate(benchling.plates.get_by_id(plate["id"]))
+    index = wells.layout.indices(["A2"])[0]
+    assert wells.contents[index] == (crrna["id"],)
+    assert wells.quantities[index] == 2.0
+
+
+def test_requests_beyond_the_rate_limit_get_429():
+    with BenchlingServer(rate_limit=1, burst=1, retry_after=3) as server:
+        headers = {"Authorization": "Bearer token"}
+        url = f"{server.base_url}/api/v2/entries"
+
+        assert httpx.get(url, headers=headers).status_code == 200
+        throttled = httpx.get(url, headers=headers)
+
+    assert throttled.status_code == 429
+    assert throttled.headers["Retry-After"] == "3"
+    assert server.throttled["list_entries"] == 1
+
+
+def test_latency_model_parse():
+    model = LatencyModel.parse("lognormal:0.05:0.5")
+    samples = [model.sample() for _ in range(200)]
+
+    assert (model.distribution, model.mean, model.spread) == ("lognormal", 0.05, 0.5)
+    assert min(samples) > 0 and max(samples) > 0.05 > min(samples)
+    assert LatencyModel.parse("0.2").sample() == 0.2
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:0.1")
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_process_webhooks_run_against_the_stand_in(engine, monkeypatch):
+    monkeypatch.setenv("CLIENT_ID", "clientId")
+    monkeypatch.setenv(
+        "CLIENT_SECRET_FILE", str(_TEST_FILES_PATH / "test_client_secret")
+    )
+    monkeypatch.setattr(rate_limiter, "BENCHLING_RATE_LIMIT_PER_SECOND", 1000)
+    monkeypatch.setattr(rate_limiter, "BENCHLING_RATE_LIMIT_BURST", 1000)
+
+    result = run(engine, n_jobs=2, concurrency=2, n_clusters=5, server_options={})
+
+    assert result["succeeded"] == 2
+    assert result["throttled"] == 0
@@ -10,8 +10,12 @@ import pandas as pd
 from benchling_sdk.apps.status.errors import AppUserFacingError
 
 
-from local_app.benchling_app.views.constants import PROCESS_BUTTON_ID
+from local_app.benchling_app.views.constants import (
+    FORCE_PROCESS_BUTTON_ID,
+    PROCESS_BUTTON_ID,
+)
 from benchling_sdk.models.webhooks.v0 import CanvasInteractionWebhookV2
+from local_app.lib.leases import LeaseManager, MemoryLeases
 
 # ==================================
 # FUNCTIONS
@@ -44,6 +48,21 @@ def test_canvas_builder_from_canvas_id_calls_and_returns_builder():
 
 
 # ================================== testing route_interaction_webhook ==================================
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    # Keep the pipeline checkpoints and run memo of each test in its own temporary folder
+    monkeypatch.setattr(
+        "local_app.benchling_app.checkpoint_utils.CHECKPOINT_DIR",
+        str(tmp_path / "checkpoints"),
+    )
+    monkeypatch.setattr(
+        "local_app.benchling_app.checkpoint_utils.MEMO_DIR", str(tmp_path / "memo")
+    )
+    # And the canvas leases in memory
+    monkeypatch.setattr(canvas_interaction, "leases", LeaseManager(MemoryLeases()))
+    return tmp_path / "checkpoints"
+
+
 @pytest.fixture
 def dummy_canvas_interaction():
     ci = MagicMock(spec=CanvasInteractionWebhookV2)
@@ -153,7 +172,10 @@ def test_route_interaction_webhook_happy_path(
     mock_upload_csv.return_value = (new_dest, 1, "id1234")
 
     # 7) find_and_fill_plates & process_notebook succeed
-    mock_find_and_fill.return_value = None
+    mock_find_and_fill.return_value = (
+        {"PlateA1_crRNA": {"submitted": 80, "skipped": 0}},
+        None,
+    )
     mock_process_notebook.return_value = None
 
     # 8) Call the function
@@ -176,10 +198,10 @@ def test_route_interaction_webhook_happy_path(
     # D) We downloaded each of the two file IDs
     assert mock_download.call_count == 5  # 2
     mock_download.assert_any_call(
-        app=fake_app, entit_id="meta_id", destination_dict=ANY
+        app=fake_app, entit_id="meta_id", destination_dict=ANY, csv_entity=None
     )
     mock_download.assert_any_call(
-        app=fake_app, entit_id="genome_id", destination_dict=ANY
+        app=fake_app, entit_id="genome_id", destination_dict=ANY, csv_entity=None
     )
 
     # E) We checked all CSVs, loaded/cleaned data, registered entities, uploaded CSVs
@@ -209,11 +231,16 @@ def test_route_interaction_webhook_happy_path(
         screening_df_merge=dfs_out[2],
         plate_list=["plate1", "plate2", "plate3"],
         order_number=1,
+        on_validated=None,
     )
 
     # H) We processed the notebook
     mock_process_notebook.assert_called_once_with(
-        app=fake_app, notebook_name="notebook.ipynb", clc_bac_df=clc_bac_df
+        app=fake_app,
+        notebook_name="notebook.ipynb",
+        clc_bac_df=clc_bac_df,
+        checkpoint=ANY,
+        checkpoint_key=ANY,
     )
 
     # I) We updated the canvas via session.app.benchling.apps.update_canvas
@@ -263,5 +290,187 @@ def test_route_interaction_webhook_download_error_raises(
 
     # 5) Also verify we tried to download the first ID
     mock_download.assert_called_once_with(
-        app=fake_app, entit_id="meta_id", destination_dict=ANY
+        app=fake_app, entit_id="meta_id", destination_dict=ANY, csv_entity=None
+    )
+
+
+@patch("local_app.benchling_app.canvas_interaction.delete_csvs", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.download_csv", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.check_all_csv_exist", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.load_and_clean_data", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction.create_and_register_entities",
+    autospec=True,
+)
+@patch("local_app.benchling_app.canvas_interaction.upload_csv", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.find_and_fill_plates", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.process_notebook", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction._canvas_builder_from_canvas_id",
+    autospec=True,
+)
+def test_route_interaction_webhook_retry_resumes_after_failed_stage(
+    mock_builder_fn,
+    mock_process_notebook,
+    mock_find_and_fill,
+    mock_upload_csv,
+    mock_create_and_register,
+    mock_load_and_clean,
+    mock_check_all,
+    mock_download,
+    mock_delete_csvs,
+    dummy_canvas_interaction,
+    dummy_session,
+    checkpoint_dir,
+):
+    fake_app = MagicMock()
+    create_session_cm, fake_session = dummy_session
+    fake_app.create_session_context.return_value = create_session_cm
+
+    canvas_inputs = {
+        "input_block_metadata": ["meta_id"],
+        "input_block_genome_mapping": ["genome_id"],
+        "input_block_plates": ["plate1", "plate2", "plate3"],
+        "input_block_plate_specs": ["specs_id"],
+        "input_block_notebook_name": "Wrong notebook",
+    }
+    fake_builder = MagicMock()
+    fake_builder.inputs_to_dict.side_effect = lambda: dict(canvas_inputs)
+    mock_builder_fn.return_value = fake_builder
+
+    mock_download.return_value = None
+    mock_check_all.return_value = None
+    dfs_out = tuple(pd.DataFrame({c: [1]}) for c in "xyzgm") + (None,)
+    mock_load_and_clean.return_value = dfs_out
+    clc_bac_df = pd.DataFrame({"bac_b_id": ["bac1"]})
+    mock_create_and_register.return_value = (clc_bac_df,) + dfs_out[:3] + (None,)
+    mock_upload_csv.return_value = ({}, 7, "file_id")
+    mock_find_and_fill.return_value = ({}, None)
+    mock_process_notebook.side_effect = ["notebook not found", None]
+
+    # First run fails at the very last stage
+    with pytest.raises(AppUserFacingError):
+        canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+
+    # The user fixes the notebook name and presses Process again
+    canvas_inputs["input_block_notebook_name"] = "Right notebook"
+    canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+
+    # Only the notebook stage ran twice
+    assert mock_download.call_count == 3
+    mock_load_and_clean.assert_called_once()
+    mock_create_and_register.assert_called_once()
+    mock_upload_csv.assert_called_once()
+    mock_find_and_fill.assert_called_once()
+    assert mock_process_notebook.call_count == 2
+    assert mock_process_notebook.call_args.kwargs["notebook_name"] == "Right notebook"
+    assert mock_process_notebook.call_args.kwargs["clc_bac_df"].equals(clc_bac_df)
+
+    # And the checkpoints are gone once the run succeeded
+    assert not checkpoint_dir.exists() or not any(checkpoint_dir.iterdir())
+
+
+@patch("local_app.benchling_app.canvas_interaction.delete_csvs", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.download_csv", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.check_all_csv_exist", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.load_and_clean_data", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction.create_and_register_entities",
+    autospec=True,
+)
+@patch("local_app.benchling_app.canvas_interaction.upload_csv", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.find_and_fill_plates", autospec=True)
+@patch("local_app.benchling_app.canvas_interaction.process_notebook", autospec=True)
+@patch(
+    "local_app.benchling_app.canvas_interaction._canvas_builder_from_canvas_id",
+    autospec=True,
+)
+def test_route_interaction_webhook_identical_rerun_is_memoized(
+    mock_builder_fn,
+    mock_process_notebook,
+    mock_find_and_fill,
+    mock_upload_csv,
+    mock_create_and_register,
+    mock_load_and_clean,
+    mock_check_all,
+    mock_download,
+    mock_delete_csvs,
+    dummy_canvas_interaction,
+    dummy_session,
+):
+    fake_app = MagicMock()
+    create_session_cm, fake_session = dummy_session
+    fake_app.create_session_context.return_value = create_session_cm
+
+    fake_builder = MagicMock()
+    fake_builder.inputs_to_dict.return_value = {
+        "input_block_metadata": ["meta_id"],
+        "input_block_genome_mapping": ["genome_id"],
+        "input_block_plates": ["plate1", "plate2", "plate3"],
+        "input_block_plate_specs": ["specs_id"],
+        "input_block_notebook_name": "Notebook",
+    }
+    mock_builder_fn.return_value = fake_builder
+
+    mock_download.return_value = None
+    mock_check_all.return_value = None
+    dfs_out = tuple(pd.DataFrame({c: [1]}) for c in "xyzgm") + (None,)
+    mock_load_and_clean.return_value = dfs_out
+    mock_create_and_register.return_value = (
+        (pd.DataFrame({"bac_b_id": ["bac1"]}),) + dfs_out[:3] + (None,)
+    )
+    mock_upload_csv.return_value = ({}, 7, "file_id")
+    mock_find_and_fill.return_value = ({}, None)
+    mock_process_notebook.return_value = None
+
+    canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+    # Same files, plates and notebook again
+    canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+
+    mock_create_and_register.assert_called_once()
+    mock_upload_csv.assert_called_once()
+    mock_find_and_fill.assert_called_once()
+    mock_process_notebook.assert_called_once()
+
+    # The previous results were shown again, with the same API-ID file and a way to force
+    appended_blocks = fake_builder.blocks.append.call_args[0][0]
+    block_ids = [block.id for block in appended_blocks]
+    assert "file_with_apis" in block_ids
+    assert FORCE_PROCESS_BUTTON_ID in block_ids
+    chip = appended_blocks[block_ids.index("file_with_apis")]
+    assert chip.value == "file_id"
+    assert "7" in appended_blocks[block_ids.index("results_display")].value
+    assert fake_session.app.benchling.apps.update_canvas.call_count == 2
+
+    # Forcing runs everything again
+    dummy_canvas_interaction.button_id = FORCE_PROCESS_BUTTON_ID
+    canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+
+    assert mock_create_and_register.call_count == 2
+    assert mock_process_notebook.call_count == 2
+
+
+@patch(
+    "local_app.benchling_app.canvas_interaction._canvas_builder_from_canvas_id",
+    autospec=True,
+)
+def test_route_interaction_webhook_skips_a_canvas_processed_elsewhere(
+    mock_builder_fn,
+    dummy_canvas_interaction,
+):
+    # Another worker holds the lease of the canvas
+    canvas_interaction.leases.backend.acquire("canvas-123", "other-worker", 60)
+    fake_app = MagicMock()
+    fake_builder = MagicMock()
+    mock_builder_fn.return_value = fake_builder
+
+    canvas_interaction.route_interaction_webhook(fake_app, dummy_canvas_interaction)
+
+    fake_app.create_session_context.assert_not_called()
+    # The user is told and the canvas enabled again, nothing else is run
+    appended_blocks = fake_builder.blocks.append.call_args[0][0]
+    assert [block.id for block in appended_blocks] == ["already_processing"]
+    fake_builder.with_enabled.assert_called_once_with()
+    fake_app.benchling.apps.update_canvas.assert_called_once_with(
+        "canvas-123", fake_builder.with_enabled.return_value.to_update.return_value
     )
@@ -0,0 +1,145 @@
+"""
+test_checkpoint_utils.py
+Description: Test the checkpoints of the Process CSV pipeline stages
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import os
+import time
+
+import pandas as pd
+
+from local_app.benchling_app import checkpoint_utils
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+# ================================== testing input_hash ==================================
+
+
+def test_input_hash_is_stable_and_input_sensitive():
+    assert checkpoint_utils.input_hash(["a", "b"], "x") == checkpoint_utils.input_hash(
+        ["a", "b"], "x"
+    )
+    assert checkpoint_utils.input_hash(["a", "b"]) != checkpoint_utils.input_hash(
+        ["a", "c"]
+    )
+
+
+# ================================== testing PipelineCheckpoint ==================================
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = checkpoint_utils.PipelineCheckpoint("canvas-1", root=tmp_path)
+    df = pd.DataFrame({"bac_b_id": ["bac1", "bac2"]})
+
+    assert checkpoint.load(checkpoint_utils.REGISTRATION, "key1") is None
+    checkpoint.save(checkpoint_utils.REGISTRATION, "key1", (df, "file_id"))
+
+    loaded_df, loaded_id = checkpoint.load(checkpoint_utils.REGISTRATION, "key1")
+    assert loaded_df.equals(df)
+    assert loaded_id == "file_id"
+    assert checkpoint.has(checkpoint_utils.REGISTRATION, "key1")
+    # Other inputs are another checkpoint
+    assert not checkpoint.has(checkpoint_utils.REGISTRATION, "key2")
+
+
+def test_checkpoint_unreadable_file_is_ignored(tmp_path):
+    checkpoint = checkpoint_utils.PipelineCheckpoint("canvas-1", root=tmp_path)
+    checkpoint.directory.mkdir(parents=True)
+    (checkpoint.directory / "upload-key1.pkl").write_bytes(b"not a pickle")
+
+    assert checkpoint.load(checkpoint_utils.UPLOAD, "key1", default="missing") == "missing"
+
+
+def test_checkpoint_clear_only_drops_its_canvas(tmp_path):
+    first = checkpoint_utils.PipelineCheckpoint("canvas-1", root=tmp_path)
+    second = checkpoint_utils.PipelineCheckpoint("canvas-2", root=tmp_path)
+    first.save(checkpoint_utils.PLATES, "key", True)
+    second.save(checkpoint_utils.PLATES, "key", True)
+
+    first.clear()
+
+    assert not first.has(checkpoint_utils.PLATES, "key")
+    assert second.has(checkpoint_utils.PLATES, "key")
+
+
+
+def test_checkpoint_save_evicts_stale_canvases(tmp_path):
+    abandoned = checkpoint_utils.PipelineCheckpoint("canvas-1", root=tmp_path)
+    abandoned.save(checkpoint_utils.PLATES, "key", True)
+    stamp = time.time() - 120
+    os.utime(abandoned.directory, (stamp, stamp))
+
+    current = checkpoint_utils.PipelineCheckpoint(
+        "canvas-2", root=tmp_path, ttl_seconds=60
+    )
+    current.save(checkpoint_utils.PLATES, "key", True)
+
+    assert not abandoned.directory.exists()
+    assert current.has(checkpoint_utils.PLATES, "key")
+
+# ================================== testing snapshot_files / restore_files ==================================
+
+
+def test_snapshot_and_restore_files(tmp_path):
+    csv_path = tmp_path / "external" / "crrna_metadata.csv"
+    csv_path.parent.mkdir()
+    csv_path.write_text("crRNA_id,Order ID\nCLC113,4\n")
+
+    files = checkpoint_utils.snapshot_files(
+        {"crRNA_metadata": str(csv_path), "missing": str(tmp_path / "nope.csv")}
+    )
+    csv_path.unlink()
+    checkpoint_utils.restore_files(files)
+
+    assert list(files) == [str(csv_path)]
+    assert csv_path.read_text() == "crRNA_id,Order ID\nCLC113,4\n"
+
+
+# ================================== testing RunMemo ==================================
+
+
+def test_run_memo_records_and_returns_results(tmp_path):
+    memo = checkpoint_utils.RunMemo(root=tmp_path)
+
+    assert memo.get("run1") is None
+    memo.record("run1", api_file_id="bfi_123", order_number="4")
+
+    entry = memo.get("run1")
+    assert entry["api_file_id"] == "bfi_123"
+    assert entry["order_number"] == "4"
+
+
+def test_run_memo_stale_entries_are_ignored(tmp_path):
+    memo = checkpoint_utils.RunMemo(root=tmp_path, ttl_seconds=60)
+    memo.record("run1", api_file_id="bfi_123", order_number="4")
+
+    entry_path = tmp_path / "run1.json"
+    entry_path.write_text(
+        entry_path.read_text().replace(
+            str(memo.get("run1")["completed_at"]), str(time.time() - 120)
+        )
+    )
+
+    assert memo.get("run1") is None
+    assert not entry_path.exists()
+
+
+def test_run_memo_evicts_oldest_entries(tmp_path):
+    memo = checkpoint_utils.RunMemo(root=tmp_path, max_entries=2)
+    for i, key in enumerate(["run1", "run2", "run3"]):
+        memo.record(key, api_file_id=key, order_number="4")
+        # Make the write order visible to the eviction
+        stamp = time.time() - 100 + i
+        os.utime(tmp_path / f"{key}.json", (stamp, stamp))
+    memo.evict()
+
+    assert memo.get("run1") is None
+    assert memo.get("run2") is not None
+    assert memo.get("run3") is not None
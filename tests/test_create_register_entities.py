@@ -13,7 +13,11 @@ import pytest
 
 from unittest.mock import patch, MagicMock
 
+from benchling_sdk.helpers.serialization_helpers import fields
+from benchling_sdk.models import DnaSequenceBulkCreate, NamingStrategy
+
 from local_app.benchling_app import create_register_entites
+from local_app.benchling_app.entity_payloads import EntityPayloadSpec
 
 
 # ==================================
@@ -431,15 +435,49 @@ def test_cleaning_screening_validation_fails(mock_validate):
     assert "Sequence mismatch" in error
 
 
+@patch("local_app.benchling_app.create_register_entites.validate_plate")
+def test_cleaning_screening_reads_clusters_from_1000(mock_validate):
+    screening_df = pd.DataFrame(
+        {
+            "locus tag": ["CLC999C", "CLC1000C"],
+            "f_primer_name": ["P1", "P3"],
+            "f_primer_sequences(5-3)": ["ATCG", "GGCC"],
+            "f_well_position": ["A1", "A2"],
+            "r_primer_name": ["P2", "P4"],
+            "r_primer_sequences(5-3)": ["CGTA", "CCGG"],
+            "r_well_position": ["B1", "B2"],
+        }
+    )
+    primers_plate_specs_df = pd.DataFrame(
+        {
+            "primer_id": ["P1", "P2", "P3", "P4"],
+            "primer_seq_idt": ["ATCG", "CGTA", "GGCC", "CCGG"],
+            "well_primer_idt": ["A1", "B1", "A2", "B2"],
+        }
+    )
+    mock_validate.return_value = (True, "")
+
+    cleaned_df, error = create_register_entites.cleaning_screening(
+        screening_df, primers_plate_specs_df, only_make_idt_excel_for_C_primers=True
+    )
+
+    assert error == ""
+    assert set(cleaned_df["BGC_number"]) == {"999", "1000"}
+
+
 # ================================== testing load_and_clean_data
 
 
+@patch(
+    "local_app.benchling_app.create_register_entites.os.path.isfile",
+    return_value=True,
+)
 @patch("local_app.benchling_app.create_register_entites.cleaning_screening")
 @patch("local_app.benchling_app.create_register_entites.cleaning_receivers")
 @patch("local_app.benchling_app.create_register_entites.cleaning_crrna")
 @patch("local_app.benchling_app.create_register_entites.read_and_basic_qc")
 def test_load_and_clean_data_success(
-    mock_read, mock_crrna, mock_receivers, mock_screening
+    mock_read, mock_crrna, mock_receivers, mock_screening, mock_isfile
 ):
     # Set up mock return values for each read
     mock_read.side_effect = [
@@ -487,6 +525,40 @@ def test_load_and_clean_data_success(
     assert not mapping_df.empty
 
 
+@patch("local_app.benchling_app.create_register_entites.cleaning_screening")
+@patch("local_app.benchling_app.create_register_entites.cleaning_receivers")
+@patch("local_app.benchling_app.create_register_entites.cleaning_crrna")
+@patch("local_app.benchling_app.create_register_entites.read_and_basic_qc")
+def test_load_and_clean_data_without_mapping_file(
+    mock_read, mock_crrna, mock_receivers, mock_screening
+):
+    # Six files read, the mapping file was not uploaded
+    mock_read.side_effect = [(pd.DataFrame({"mock": [1]}), None)] * 6
+    mock_crrna.return_value = (pd.DataFrame({"crRNA_id": ["A"]}), "")
+    mock_receivers.return_value = (
+        pd.DataFrame({"receiver_primer_id": ["P1"]}),
+        pd.DataFrame(),
+        "",
+    )
+    mock_screening.return_value = (pd.DataFrame({"primer_name": ["P1"]}), "")
+
+    result = create_register_entites.load_and_clean_data(
+        {
+            "crRNA_metadata": "dummy/path/crrna.csv",
+            "receiver_primers_metadata": "dummy/path/rec.csv",
+            "screening_primers_metadata": "dummy/path/scr.csv",
+            "crRNA_plate_specs": "dummy/path/crrna_specs.csv",
+            "primers_plate_specs": "dummy/path/primers_specs.csv",
+            "strain_names_mapping": "dummy/path/genome.csv",
+            "plate_location_mapping": "dummy/path/does_not_exist.csv",
+        }
+    )
+
+    assert result[-1] is None
+    assert result[4].empty
+    assert mock_read.call_count == 6
+
+
 @patch("local_app.benchling_app.create_register_entites.cleaning_screening")
 @patch("local_app.benchling_app.create_register_entites.cleaning_receivers")
 @patch("local_app.benchling_app.create_register_entites.cleaning_crrna")
@@ -618,6 +690,45 @@ def test_bulk_register_entities_mixed():
     app.benchling.custom_entities.bulk_create.assert_called_once()
 
 
+def test_bulk_register_entities_payload_spec_builds_only_new_rows():
+    df = pd.DataFrame({"name": ["E1", "E3"], "seq": ["AAAA", "CCCC"]})
+
+    app = MagicMock()
+    mock_e1 = MagicMock()
+    mock_e1.name = "E1"
+    mock_e1.id = "id_e1"
+    app.benchling.dna_sequences.list.return_value = [[mock_e1]]
+
+    mock_entity = MagicMock()
+    mock_entity.name = "E3"
+    mock_entity.id = "id_e3"
+    task = MagicMock()
+    task.wait_for_response.return_value = MagicMock(dna_sequences=[mock_entity])
+    app.benchling.dna_sequences.bulk_create.return_value = task
+
+    payload_spec = EntityPayloadSpec(
+        name_column="name",
+        folder_id="folder123",
+        schema_id="schema123",
+        bases_column="seq",
+    )
+
+    updated_df = create_register_entites.bulk_register_entities(
+        app=app,
+        entity_type="dna",
+        df=df.copy(),
+        name_column="name",
+        output_column="registered_id",
+        folder_id="folder123",
+        schema_id="schema123",
+        payload_spec=payload_spec,
+    )
+
+    assert updated_df["registered_id"].tolist() == ["id_e1", "id_e3"]
+    (sent,) = app.benchling.dna_sequences.bulk_create.call_args[0]
+    assert [entity.to_dict()["bases"] for entity in sent] == ["CCCC"]
+
+
 def test_bulk_register_entities_empty_bulk_create_response():
     df = pd.DataFrame({"name": ["E1"]})
 
@@ -698,15 +809,38 @@ def test_register_crrna_mixed(mock_bulk_register):
     assert args[4] == "crRNA_b_id"
     assert args[5] == folder_id
     assert args[6] == schema_id
-    assert callable(args[7])  # entity_builder_fn
+    assert isinstance(kwargs["payload_spec"], EntityPayloadSpec)
 
-    # Bonus: test the actual build_entity logic through the passed function
-    builder_fn = args[7]
-    act_entity = builder_fn(input_df.iloc[0])
+    # Bonus: the payloads match what the SDK models would send
+    act_entity, nonact_entity = kwargs["payload_spec"].build(input_df)
     assert act_entity.name == "CLCactX"
+    assert act_entity.to_dict() == (
+        DnaSequenceBulkCreate(
+            folder_id=folder_id,
+            name="CLCactX",
+            schema_id=schema_id,
+            bases="ATCG",
+            is_circular=False,
+            registry_id=registry,
+            naming_strategy=NamingStrategy.NEW_IDS,
+        ).to_dict()
+    )
 
-    nonact_entity = builder_fn(input_df.iloc[1])
     assert nonact_entity.name == "nonActY"
+    assert nonact_entity.to_dict() == (
+        DnaSequenceBulkCreate(
+            folder_id=folder_id,
+            name="nonActY",
+            schema_id=schema_id,
+            bases="GCTA",
+            is_circular=False,
+            fields=fields(
+                {"Target strand": {"value": "-"}, "Target position": {"value": 456}}
+            ),
+            registry_id=registry,
+            naming_strategy=NamingStrategy.NEW_IDS,
+        ).to_dict()
+    )
 
 
 # ================================== testing register_receivers
@@ -753,16 +887,15 @@ def test_register_receivers_success(mock_bulk_register):
     assert kwargs["output_column"] == "receiver_primer_b_id"
     assert kwargs["folder_id"] == folder_id
     assert kwargs["schema_id"] == schema_id
-    assert callable(kwargs["entity_builder_fn"])
+    assert isinstance(kwargs["payload_spec"], EntityPayloadSpec)
 
-    # Check the builder builds the expected DnaSequenceBulkCreate
-    builder_fn = kwargs["entity_builder_fn"]
-    built_entity = builder_fn(input_df.iloc[0])
-    assert built_entity.name == "P1"
-    assert built_entity.bases == "ATCG"
-    assert built_entity.folder_id == folder_id
-    assert built_entity.schema_id == schema_id
-    assert built_entity.is_circular is False
+    # Check the spec builds the expected DnaSequenceBulkCreate body
+    built_entity = kwargs["payload_spec"].build(input_df)[0].to_dict()
+    assert built_entity["name"] == "P1"
+    assert built_entity["bases"] == "ATCG"
+    assert built_entity["folderId"] == folder_id
+    assert built_entity["schemaId"] == schema_id
+    assert built_entity["isCircular"] is False
 
 
 # ================================== testing register_clc_receivers
@@ -810,15 +943,17 @@ def test_register_clc_receivers_success(mock_b_api_ids, mock_bulk_register):
     assert "clc_receiver_name" in kwargs["df"].columns
     assert list(kwargs["df"]["clc_receiver_name"]) == ["pBE48-R1", "pBE45-R2"]
 
-    # Check build_entity behavior
-    builder_fn = kwargs["entity_builder_fn"]
-    row_u = kwargs["df"].iloc[0]
-    entity_u = builder_fn(row_u)
+    # Check the payloads
+    entity_u, entity_d = kwargs["payload_spec"].build(kwargs["df"])
     assert entity_u.name == "pBE48-R1"
+    assert entity_u.to_dict()["fields"] == {
+        "Backbone": {"value": "plasmid_48_id"},
+        "Backbone primer": {"value": "primer_48_id"},
+        "Homology primer": {"value": "b_id1"},
+    }
 
-    row_d = kwargs["df"].iloc[1]
-    entity_d = builder_fn(row_d)
     assert entity_d.name == "pBE45-R2"
+    assert entity_d.to_dict()["fields"]["Backbone"] == {"value": "plasmid_45_id"}
 
 
 # ================================== testing register_screening
@@ -861,16 +996,15 @@ def test_register_screening_success(mock_bulk_register):
     assert kwargs["output_column"] == "primer_b_id"
     assert kwargs["folder_id"] == folder_id
     assert kwargs["schema_id"] == schema_id
-    assert callable(kwargs["entity_builder_fn"])
+    assert isinstance(kwargs["payload_spec"], EntityPayloadSpec)
 
-    # Test builder function directly
-    builder_fn = kwargs["entity_builder_fn"]
-    built_entity = builder_fn(input_df.iloc[0])
-    assert built_entity.name == "S1"
-    assert built_entity.bases == "ATCG"
-    assert built_entity.folder_id == folder_id
-    assert built_entity.schema_id == schema_id
-    assert built_entity.is_circular is False
+    # Test the payload spec directly
+    built_entity = kwargs["payload_spec"].build(input_df)[0].to_dict()
+    assert built_entity["name"] == "S1"
+    assert built_entity["bases"] == "ATCG"
+    assert built_entity["folderId"] == folder_id
+    assert built_entity["schemaId"] == schema_id
+    assert built_entity["isCircular"] is False
 
 
 # ================================== testing find_genomes
@@ -977,16 +1111,15 @@ def test_register_dna_fragments_success(mock_bulk_register):
     assert kwargs["output_column"] == "dna_fragment_b_id"
     assert kwargs["folder_id"] == folder_id
     assert kwargs["schema_id"] == schema_id
-    assert callable(kwargs["entity_builder_fn"])
+    assert isinstance(kwargs["payload_spec"], EntityPayloadSpec)
 
-    # Test builder function
-    builder_fn = kwargs["entity_builder_fn"]
-    built_entity = builder_fn(kwargs["df"].iloc[0])
-    assert built_entity.name == "GenomeA gDNA"
-    assert built_entity.schema_id == schema_id
-    assert built_entity.folder_id == folder_id
-    # assert built_entity.fields["Template strains"]["value"] == ["gen_id_A"]
-    assert built_entity.bases == ""
+    # Test the payload spec
+    built_entity = kwargs["payload_spec"].build(kwargs["df"])[0].to_dict()
+    assert built_entity["name"] == "GenomeA gDNA"
+    assert built_entity["schemaId"] == schema_id
+    assert built_entity["folderId"] == folder_id
+    assert built_entity["fields"]["Template strains"]["value"] == ["gen_id_A"]
+    assert built_entity["bases"] == ""
 
 
 # ================================== testing register_clc_bac
@@ -1042,10 +1175,6 @@ def test_register_clc_bac_success(mock_bulk_register):
         }
     )
 
-    mapping_df = pd.DataFrame(
-        {"BGC_number": [1], "96_well_formatted": ["A01"]}
-    ).set_index("BGC_number")
-
     app = MagicMock()
 
     result = create_register_entites.register_clc_bac(
@@ -1054,7 +1183,6 @@ def test_register_clc_bac_success(mock_bulk_register):
         receivers_df_merge=receivers_df,
         screening_df_merge=screening_df,
         genome_df=genome_df,
-        mapping_df=mapping_df,
         min_clust=min_clust,
         max_clust=max_clust,
         folder_id="folder123",
@@ -1075,19 +1203,19 @@ def test_register_clc_bac_success(mock_bulk_register):
     assert kwargs["output_column"] == "bac_b_id"
     assert kwargs["folder_id"] == "folder123"
     assert kwargs["schema_id"] == "schema456"
-    assert callable(kwargs["entity_builder_fn"])
+    assert isinstance(kwargs["payload_spec"], EntityPayloadSpec)
 
     df = kwargs["df"]
     assert "bac_name" in df.columns
     assert "grna_U" in df.columns
     assert df.shape[0] == 2  # one normal BGC and one "act"
 
-    # Test entity builder logic
+    # Test the payload spec
     row = df.iloc[0]
-    built_entity = kwargs["entity_builder_fn"](row)
-    assert built_entity.name == row["bac_name"]
-    # assert built_entity.fields["Well96"]["value"] == row["well_96"]
-    # assert built_entity.fields["gRNA - Up"]["value"] == row["grna_U"]
+    built_entity = kwargs["payload_spec"].build(df)[0].to_dict()
+    assert built_entity["name"] == row["bac_name"]
+    assert built_entity["fields"]["Well96"]["value"] == row["well_96"]
+    assert built_entity["fields"]["gRNA - Up"]["value"] == row["grna_U"]
 
 
 # ================================== testing create_and_register_entities
@@ -1210,3 +1338,74 @@ def test_create_and_register_entities_genome_error(
     )
 
     assert result[-1] == "some genome error"
+
+
+@patch("local_app.benchling_app.create_register_entites.register_crrna")
+def test_create_and_register_entities_mapping_mismatch(mock_register_crrna):
+    app = MagicMock()
+    dummy_df = pd.DataFrame({"BGC_number": ["113", "114", "act"]})
+
+    result = create_register_entites.create_and_register_entities(
+        app,
+        crrna_df_merge=dummy_df.copy(),
+        receivers_df_merge=dummy_df.copy(),
+        screening_df_merge=dummy_df.copy(),
+        genomes_df=pd.DataFrame(),
+        mapping_df=pd.DataFrame(
+            {"BGC_number": [113, 114], "96_well_formatted": ["A01", "B01"]}
+        ),
+    )
+
+    assert "114: B01 (expected A02)" in result[-1]
+    # Nothing is registered
+    mock_register_crrna.assert_not_called()
+
+
+# ================================== testing clc_bac_wells
+
+
+def test_clc_bac_wells_default_layout():
+    wells = create_register_entites.clc_bac_wells(range(113, 196))
+
+    assert wells[113] == "A01"
+    assert wells[125] == "B01"
+    assert wells[195] == "G11"
+    assert wells["act"] == "G12"
+
+
+def test_clc_bac_wells_configurable_layout():
+    wells = create_register_entites.clc_bac_wells(
+        [1, 2, 9], first_cluster=1, per_plate=8, by="column"
+    )
+
+    assert wells == {1: "A01", 2: "B01", 9: "A01", "act": "A02"}
+
+
+def test_clc_bac_layout_starts_at_the_lowest_cluster_of_the_order():
+    wells, plates = create_register_entites.clc_bac_layout(range(1, 90))
+
+    assert (wells[1], wells[83], wells["act"]) == ("A01", "G11", "G12")
+    # Clusters beyond one plate continue on the next one
+    assert (wells[84], wells[89]) == ("A01", "A06")
+    assert (plates[1], plates[83], plates[84]) == (0, 0, 1)
+
+
+@patch("local_app.benchling_app.create_register_entites.register_crrna")
+def test_create_and_register_entities_accepts_any_cluster_numbers(
+    mock_register_crrna,
+):
+    mock_register_crrna.side_effect = RuntimeError("registering")
+    dummy_df = pd.DataFrame({"BGC_number": ["001", "002", "act"]})
+
+    # The mapping file agrees with the layout from cluster 1, registration starts
+    with pytest.raises(RuntimeError, match="registering"):
+        create_register_entites.create_and_register_entities(
+            MagicMock(),
+            crrna_df_merge=dummy_df.copy(),
+            receivers_df_merge=dummy_df.copy(),
+            screening_df_merge=dummy_df.copy(),
+            genomes_df=pd.DataFrame(),
+            mapping_df=pd.DataFrame(
+                {"BGC_number": [1, 2], "96_well_formatted": ["A01", "A02"]}
+            ),
+        )
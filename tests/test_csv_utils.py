@@ -73,6 +73,27 @@ def test_download_csv_no_match(mock_app):
     assert result.startswith("This file’s entity name")
 
 
+def test_download_csv_reuses_fetched_entity(mock_app, tmp_path):
+    entity = mock_app.benchling.custom_entities.get_by_id.return_value
+    entity.id = "ent_1"
+    mock_app.benchling.custom_entities.bulk_get.return_value = [entity]
+    mock_app.benchling.blobs.download_file.side_effect = (
+        lambda blob_id, path: path.write_text("a,b\n")
+    )
+    csv_entities = csv_utils.get_csv_entities(mock_app, ["ent_1"])
+
+    result = csv_utils.download_csv(
+        mock_app,
+        "ent_1",
+        {"crRNA_metadata": str(tmp_path / "crrna.csv")},
+        csv_entity=csv_entities["ent_1"],
+    )
+
+    assert result is None
+    assert csv_utils.csv_blob_ids(csv_entities.values()) == ["fake_blob_id"]
+    mock_app.benchling.custom_entities.get_by_id.assert_not_called()
+
+
 @pytest.fixture
 def mock_app_bad():
     # Create a fake app structure with mocked services
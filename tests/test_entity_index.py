@@ -0,0 +1,124 @@
+"""
+test_entity_index.py
+Description: Test the cached name -> ID indexes of the existing entities
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from local_app.benchling_app.entity_index import EntityIndexCache
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def entity(name, id, archived=False):
+    return SimpleNamespace(name=name, id=id, archive_record="x" if archived else None)
+
+
+class FakeFolder:
+    """list endpoint: every entity, or the `modified` ones when asked for recent changes."""
+
+    def __init__(self, entities, modified=(), page_size=2):
+        self.entities = list(entities)
+        self.modified = list(modified)
+        self.page_size = page_size
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        items = self.modified if "modified_at" in kwargs else self.entities
+        return [
+            items[i : i + self.page_size] for i in range(0, len(items), self.page_size)
+        ]
+
+
+def fake_app(folder):
+    app = MagicMock()
+    app.id = "app_1"
+    app.benchling.dna_sequences.list = folder
+    return app
+
+
+def test_index_is_listed_once_then_refreshed_with_the_changes():
+    folder = FakeFolder([entity("A", "id_a"), entity("B", "id_b"), entity("C", "id_c")])
+    app = fake_app(folder)
+    cache = EntityIndexCache(ttl_seconds=60)
+
+    assert cache.name_to_id(app, "dna", "lib_1", "ts_1") == {
+        "A": "id_a",
+        "B": "id_b",
+        "C": "id_c",
+    }
+
+    # B was renamed, C archived and D created since
+    folder.modified = [
+        entity("B2", "id_b"),
+        entity("C", "id_c", True),
+        entity("D", "id_d"),
+    ]
+    assert cache.name_to_id(app, "dna", "lib_1", "ts_1") == {
+        "A": "id_a",
+        "B2": "id_b",
+        "D": "id_d",
+    }
+    refresh = folder.calls[-1]
+    assert refresh["modified_at"].startswith("> ")
+    assert refresh["archive_reason"] == "ANY"
+    assert "modified_at" not in folder.calls[0]
+
+
+def test_expired_index_is_listed_again():
+    folder = FakeFolder([entity("A", "id_a")])
+    cache = EntityIndexCache(ttl_seconds=0)
+    cache.name_to_id(fake_app(folder), "dna", "lib_1", "ts_1")
+    cache.name_to_id(fake_app(folder), "dna", "lib_1", "ts_1")
+    assert not any("modified_at" in call for call in folder.calls)
+
+
+def test_lookups_wait_for_a_running_prefetch():
+    release = threading.Event()
+    folder = FakeFolder([entity("A", "id_a")])
+
+    def slow_list(**kwargs):
+        release.wait(1)
+        return folder(**kwargs)
+
+    app = fake_app(slow_list)
+    cache = EntityIndexCache(ttl_seconds=60)
+    with ThreadPoolExecutor(1) as executor:
+        future = cache.prefetch(app, "dna", "lib_1", "ts_1", executor)
+        # Already being listed
+        assert cache.prefetch(app, "dna", "lib_1", "ts_1", executor) is None
+        release.set()
+        assert cache.name_to_id(app, "dna", "lib_1", "ts_1") == {"A": "id_a"}
+    assert future.result() == {"A": "id_a"}
+    # One listing, then one refresh
+    assert ["modified_at" in call for call in folder.calls] == [False, True]
+
+
+def test_stopped_prefetch_is_not_kept():
+    folder = FakeFolder([entity(f"E{i}", f"id_{i}") for i in range(10)], page_size=1)
+    app = fake_app(folder)
+    cache = EntityIndexCache(ttl_seconds=60)
+    with ThreadPoolExecutor(1) as executor:
+        assert (
+            cache.prefetch(app, "dna", "lib_1", "ts_1", executor, max_pages=3).result()
+            is None
+        )
+        stop = threading.Event()
+        stop.set()
+        assert (
+            cache.prefetch(app, "dna", "lib_2", "ts_1", executor, stop=stop).result()
+            is None
+        )
+    cache.name_to_id(app, "dna", "lib_1", "ts_1")
+    assert "modified_at" not in folder.calls[-1]
@@ -0,0 +1,86 @@
+"""
+test_entity_payloads.py
+Description: Test the columnar builder of bulk create request bodies
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import pandas as pd
+
+from benchling_sdk.helpers.serialization_helpers import fields
+from benchling_sdk.models import CustomEntityBulkCreate, DnaSequenceBulkCreate
+
+from local_app.benchling_app.create_register_entites import registry_kwargs
+from local_app.benchling_app.entity_payloads import EntityPayload, EntityPayloadSpec
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def test_spec_matches_dna_sequence_model():
+    df = pd.DataFrame({"name": ["P1", "P2"], "seq": ["ATCG", "CGTA"]})
+    spec = EntityPayloadSpec(
+        name_column="name",
+        folder_id="lib_1",
+        schema_id="ts_1",
+        bases_column="seq",
+        static={"is_circular": False, **registry_kwargs("src_1")},
+    )
+
+    payloads = spec.build(df)
+
+    assert [p.name for p in payloads] == ["P1", "P2"]
+    assert payloads[1].to_dict() == (
+        DnaSequenceBulkCreate(
+            folder_id="lib_1",
+            name="P2",
+            schema_id="ts_1",
+            bases="CGTA",
+            is_circular=False,
+            **registry_kwargs("src_1"),
+        ).to_dict()
+    )
+
+
+def test_spec_fields_converters_and_mask():
+    df = pd.DataFrame(
+        {
+            "name": ["A", "B"],
+            "loc": [1.0, 2.0],
+            "with_fields": [True, False],
+        }
+    )
+    spec = EntityPayloadSpec(
+        name_column="name",
+        folder_id="lib_1",
+        schema_id="ts_1",
+        fields={"Position": ("loc", int), "Name copy": "name"},
+        fields_mask="with_fields",
+    )
+
+    with_fields, without_fields = spec.build(df)
+
+    assert with_fields.to_dict() == (
+        CustomEntityBulkCreate(
+            folder_id="lib_1",
+            name="A",
+            schema_id="ts_1",
+            fields=fields({"Position": {"value": 1}, "Name copy": {"value": "A"}}),
+        ).to_dict()
+    )
+    assert "fields" not in without_fields.to_dict()
+
+
+def test_spec_on_empty_frame():
+    spec = EntityPayloadSpec(name_column="name", folder_id="lib_1", schema_id="ts_1")
+
+    assert spec.build(pd.DataFrame({"name": []})) == []
+
+
+def test_payloads_compare_by_body():
+    assert EntityPayload({"name": "A"}) == EntityPayload({"name": "A"})
+    assert EntityPayload({"name": "A"}) != EntityPayload({"name": "B"})
@@ -13,16 +13,20 @@ _TEST_FILES_PATH = Path(__file__).parent.parent / "tests/files"
 
 class TestWebhookHandler:
 
+    @patch("local_app.benchling_app.handler.prefetch_for_canvas")
     @patch("local_app.benchling_app.handler.render_text_canvas")
     @patch("local_app.benchling_app.handler.init_app_from_webhook")
     def test_handle_webhook_canvas_initialize(
-        self, mock_init_app_from_webhook, mock_render_text_canvas
+        self, mock_init_app_from_webhook, mock_render_text_canvas, mock_prefetch
     ) -> None:
         webhook = load_webhook_json(_TEST_FILES_PATH / "canvas_initialize_webhook.json")
         mock_app = MagicMock(App)
         mock_init_app_from_webhook.return_value = mock_app
         handle_webhook(webhook.to_dict())
         mock_render_text_canvas.assert_called_once_with(mock_app, webhook.message)
+        mock_prefetch.assert_called_once_with(
+            mock_app, webhook.message.resource_id, webhook.base_url
+        )
 
     @patch("local_app.benchling_app.handler.route_interaction_webhook")
     @patch("local_app.benchling_app.handler.init_app_from_webhook")
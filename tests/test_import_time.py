@@ -0,0 +1,68 @@
+"""
+test_import_time.py
+Description: Guard the startup path of the app against eager imports of pandas and the SDK
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from local_app.lib import lazy_imports
+
+ROOT = Path(__file__).parent.parent
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def modules_imported_by(module):
+    code = (
+        f"import json, sys, {module}; "
+        "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout))
+
+
+def test_app_starts_without_pandas_or_the_sdk():
+    imported = modules_imported_by("local_app.app")
+    assert imported.isdisjoint(
+        {"pandas", "numpy", "benchling_sdk", "benchling_api_client", "httpx"}
+    )
+
+
+def test_canvas_webhooks_are_handled_without_pandas():
+    imported = modules_imported_by("local_app.benchling_app.handler")
+    assert "benchling_sdk" in imported
+    assert imported.isdisjoint({"pandas", "numpy"})
+
+
+def test_lazy_function_imports_on_first_call(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    rgb_to_hsv = lazy_imports.lazy_function("colorsys", "rgb_to_hsv")
+    assert "colorsys" not in sys.modules
+
+    assert rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert rgb_to_hsv.__name__ == "rgb_to_hsv"
+
+
+@pytest.mark.parametrize("module", lazy_imports.PIPELINE_MODULES)
+def test_pipeline_modules_exist(module):
+    assert lazy_imports.import_modules([module]) >= 0
+    assert module in sys.modules
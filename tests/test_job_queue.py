@@ -0,0 +1,211 @@
+"""
+test_job_queue.py
+Description: Test the worker pool running the webhook jobs
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import threading
+import time
+
+from local_app.lib import metrics
+from local_app.lib.job_queue import (
+    FAST_LANE,
+    HEAVY_LANE,
+    FairQueue,
+    JobQueue,
+    parse_weights,
+)
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def test_jobs_run_on_a_fixed_number_of_threads():
+    jobs = JobQueue(workers=2)
+    threads = set()
+    lock = threading.Lock()
+
+    def job(i):
+        with lock:
+            threads.add(threading.current_thread().name)
+
+    for i in range(10):
+        jobs.submit(job, i)
+    jobs.join()
+
+    assert threads <= {"job-worker-0", "job-worker-1"}
+
+
+def test_failed_job_is_counted_and_the_worker_keeps_going():
+    jobs = JobQueue(workers=1)
+    failed_before = metrics.JOBS_FAILED.value(reason="exception")
+    done = []
+
+    def failing_job():
+        raise RuntimeError("boom")
+
+    jobs.submit(failing_job)
+    jobs.submit(done.append, "next job")
+    jobs.join()
+
+    assert done == ["next job"]
+    assert metrics.JOBS_FAILED.value(reason="exception") == failed_before + 1
+    assert metrics.JOBS_QUEUED.value() == 0
+    assert metrics.JOBS_ACTIVE.value() == 0
+
+
+def test_fast_jobs_do_not_wait_behind_heavy_ones():
+    jobs = JobQueue(workers=1, fast_workers=1)
+    release = threading.Event()
+    heavy_started = threading.Event()
+    order = []
+
+    def heavy():
+        heavy_started.set()
+        release.wait(1)
+        order.append("heavy")
+
+    jobs.submit(heavy, lane=HEAVY_LANE)
+    jobs.submit(lambda: order.append("heavy queued"), lane=HEAVY_LANE)
+    heavy_started.wait(1)
+    rendered = threading.Event()
+    jobs.submit(lambda: (order.append("render"), rendered.set()), lane=FAST_LANE)
+    assert rendered.wait(1)
+    release.set()
+    jobs.join()
+
+    assert order == ["render", "heavy", "heavy queued"]
+    assert metrics.JOB_RUN_SECONDS.count(lane=FAST_LANE) >= 1
+    assert metrics.JOB_QUEUE_WAIT_SECONDS.count(lane=HEAVY_LANE) >= 2
+
+
+def test_heavy_jobs_are_admitted_within_their_limit():
+    jobs = JobQueue(workers=3, fast_workers=0, heavy_limit=1)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def heavy():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    for _ in range(3):
+        jobs.submit(heavy, lane=HEAVY_LANE)
+    # The other threads stay free for the fast lane
+    done = threading.Event()
+    jobs.submit(done.set, lane=FAST_LANE)
+    assert done.wait(1)
+    jobs.join()
+
+    assert max(peak) == 1
+
+
+def test_tenants_take_turns_in_proportion_to_their_weights():
+    big, small = ("https://big.benchling.com", "app_1"), (
+        "https://small.benchling.com",
+        "app_2",
+    )
+    queue = FairQueue({"https://small.benchling.com": 2})
+    for i in range(6):
+        queue.append(big, f"big {i}")
+    for i in range(4):
+        queue.append(small, f"small {i}")
+
+    order = [queue.pop()[1] for _ in range(len(queue))]
+
+    # The order of the big tenant does not hold up the small one, which has twice its share
+    assert order[:6] == ["big 0", "small 0", "small 1", "big 1", "small 2", "small 3"]
+    assert order[6:] == ["big 2", "big 3", "big 4", "big 5"]
+
+
+def test_a_returning_tenant_does_not_get_the_turns_it_did_not_use():
+    busy, idle = ("https://a.benchling.com", "app_a"), (
+        "https://b.benchling.com",
+        "app_b",
+    )
+    queue = FairQueue()
+    for i in range(4):
+        queue.append(busy, i)
+    queue.pop(), queue.pop(), queue.pop()
+    queue.append(idle, "idle 0")
+    queue.append(idle, "idle 1")
+
+    order = [queue.pop()[1] for _ in range(len(queue))]
+
+    assert order in (["idle 0", 3, "idle 1"], [3, "idle 0", "idle 1"])
+
+
+def test_tenants_with_no_jobs_waiting_are_forgotten():
+    queue = FairQueue()
+    for i in range(100):
+        queue.append((f"https://{i}.benchling.com", "app"), i)
+
+    while queue:
+        queue.pop()
+
+    assert queue._queues == {} and queue._passes == {}
+
+    # Nor are their running heavy jobs counted once done
+    jobs = JobQueue(workers=2, fast_workers=0)
+    for i in range(10):
+        jobs.submit(lambda: None, tenant=(f"https://{i}.benchling.com", "app"))
+    jobs.join()
+    assert jobs._tenant_heavy_running == {}
+    assert jobs._lanes[HEAVY_LANE]._passes == {}
+
+
+def test_weights_apply_to_every_app_of_a_base_url():
+    queue = FairQueue({"https://x.benchling.com": 3})
+
+    assert queue.weight(("https://x.benchling.com", "app_1")) == 3
+    assert queue.weight(("https://x.benchling.com", "app_2")) == 3
+    assert queue.weight(("https://y.benchling.com", "app_1")) == 1
+
+def test_heavy_jobs_of_a_tenant_are_admitted_within_its_limit():
+    jobs = JobQueue(workers=2, fast_workers=0, tenant_heavy_limit=1)
+    big, small = ("https://big.benchling.com", "app_1"), (
+        "https://small.benchling.com",
+        "app_2",
+    )
+    release = threading.Event()
+    order = []
+
+    def job(name):
+        order.append(name)
+        if name == "big 0":
+            release.wait(1)
+
+    for i in range(3):
+        jobs.submit(job, f"big {i}", lane=HEAVY_LANE, tenant=big)
+    small_done = threading.Event()
+    jobs.submit(lambda: (order.append("small"), small_done.set()), tenant=small)
+    # The second thread runs the small tenant's job instead of a second big one
+    assert small_done.wait(1)
+    release.set()
+    jobs.join()
+
+    assert order == ["big 0", "small", "big 1", "big 2"]
+    assert (
+        metrics.TENANT_JOBS.value(
+            base_url="https://small.benchling.com", app_id="app_2", lane=HEAVY_LANE
+        )
+        >= 1
+    )
+
+
+def test_parse_weights():
+    assert parse_weights("https://x.benchling.com/=3, https://y.benchling.com=0.5") == {
+        "https://x.benchling.com": 3.0,
+        "https://y.benchling.com": 0.5,
+    }
+    assert parse_weights("") == {}
+    assert parse_weights("https://x.benchling.com=heavy") == {}
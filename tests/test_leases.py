@@ -0,0 +1,138 @@
+"""
+test_leases.py
+Description: Test the leases keeping a canvas from being processed twice at once
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import multiprocessing
+import time
+
+import pytest
+
+from local_app.lib import metrics
+from local_app.lib.leases import (
+    FileLeases,
+    LeaseLostError,
+    LeaseManager,
+    MemoryLeases,
+    SqliteLeases,
+)
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryLeases()
+    if request.param == "sqlite":
+        return SqliteLeases(tmp_path / "leases.sqlite3")
+    return FileLeases(tmp_path / "leases")
+
+
+def test_a_lease_has_one_owner_until_released(backend):
+    assert backend.acquire("cnvs_1", "worker-a", 60)
+    assert not backend.acquire("cnvs_1", "worker-b", 60)
+    # Other canvases are independent, the owner can take its lease again
+    assert backend.acquire("cnvs_2", "worker-b", 60)
+    assert backend.acquire("cnvs_1", "worker-a", 60)
+
+    # Only the owner releases or renews it
+    backend.release("cnvs_1", "worker-b")
+    assert not backend.renew("cnvs_1", "worker-b", 60)
+    assert not backend.acquire("cnvs_1", "worker-b", 60)
+    backend.release("cnvs_1", "worker-a")
+    assert backend.acquire("cnvs_1", "worker-b", 60)
+
+
+def test_an_expired_lease_can_be_taken_and_its_owner_cannot_renew_it(backend):
+    assert backend.acquire("cnvs_1", "worker-a", 0.05)
+    time.sleep(0.1)
+
+    assert backend.acquire("cnvs_1", "worker-b", 60)
+    assert not backend.renew("cnvs_1", "worker-a", 60)
+
+
+def test_heartbeats_keep_the_lease_past_its_ttl():
+    backend = MemoryLeases()
+    manager = LeaseManager(backend, ttl=0.15)
+
+    with manager.hold("cnvs_1") as lease:
+        time.sleep(0.3)
+        assert not backend.acquire("cnvs_1", "worker-b", 60)
+        lease.check()
+    # Released on exit
+    assert backend.acquire("cnvs_1", "worker-b", 60)
+
+
+def test_a_lease_taken_over_is_lost():
+    backend = MemoryLeases()
+    lost_before = metrics.LEASES_LOST.value()
+    lease = LeaseManager(backend, ttl=0.06).acquire("cnvs_1")
+    # As if the heartbeats had stalled past the TTL and another worker took the canvas
+    backend.release("cnvs_1", lease.owner)
+    backend.acquire("cnvs_1", "worker-b", 60)
+
+    assert lease.lost.wait(1)
+    with pytest.raises(LeaseLostError):
+        lease.check()
+    lease.release()
+    assert metrics.LEASES_LOST.value() == lost_before + 1
+    # Releasing a lost lease leaves the new owner's lease alone
+    assert not backend.acquire("cnvs_1", "worker-c", 60)
+
+
+def test_a_held_lease_is_not_handed_out_again():
+    manager = LeaseManager(MemoryLeases())
+    busy_before = metrics.LEASES_BUSY.value()
+    manager.backend.acquire("cnvs_1", "worker-b", 60)
+
+    with manager.hold("cnvs_1") as lease:
+        assert lease is None
+    assert metrics.LEASES_BUSY.value() == busy_before + 1
+
+
+def test_two_jobs_of_one_process_do_not_share_a_lease(backend):
+    # Two job threads of the same worker pressing Process on the same canvas
+    manager = LeaseManager(backend)
+
+    with manager.hold("cnvs_1") as first:
+        with manager.hold("cnvs_1") as second:
+            assert first is not None and second is None
+        # The refused job released nothing
+        assert not backend.acquire("cnvs_1", "worker-b", 60)
+    with manager.hold("cnvs_1") as third:
+        assert third is not None
+
+def _try_acquire(path, owner, results):
+    results.put(SqliteLeases(path).acquire("cnvs_1", owner, 60))
+
+
+def test_one_process_gets_the_lease(tmp_path):
+    # Worker processes racing for the same canvas through the shared database
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_try_acquire,
+            args=(tmp_path / "leases.sqlite3", f"worker-{i}", results),
+        )
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+
+    assert sorted(results.get(timeout=5) for _ in processes) == [
+        False,
+        False,
+        False,
+        True,
+    ]
@@ -1,6 +1,27 @@
+import io
+import json
 import logging
+import threading
 
-from local_app.lib.logger import get_logger
+from local_app.lib.logger import (
+    AsyncLogHandler,
+    JsonFormatter,
+    get_logger,
+    log_context,
+    summarize_items,
+)
+from local_app.lib.tracing import in_current_context
+
+
+def json_logger(name, stream, **handler_kwargs):
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+    handler = AsyncLogHandler(stream_handler, **handler_kwargs)
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, handler
 
 
 class TestLogger:
@@ -15,3 +36,69 @@ class TestLogger:
             logger = get_logger()
         assert logger.name == "clc-registration-app"
         assert logger.level == logging.DEBUG
+
+    def test_json_lines_carry_the_job_context(self) -> None:
+        stream = io.StringIO()
+        logger, handler = json_logger("test-json-context", stream)
+
+        with log_context(job_id="job1", canvas_id="cnvs_1"):
+            logger.info("Registered %d %s", 3, "crRNAs")
+            thread = threading.Thread(
+                target=in_current_context(lambda: logger.warning("From a worker"))
+            )
+            thread.start()
+            thread.join()
+        logger.info("Outside the job")
+        handler.flush()
+
+        first, second, third = map(json.loads, stream.getvalue().splitlines())
+        assert first["message"] == "Registered 3 crRNAs"
+        assert first["level"] == "INFO"
+        assert (first["job_id"], first["canvas_id"]) == ("job1", "cnvs_1")
+        assert second["job_id"] == "job1"
+        assert "job_id" not in third
+
+    def test_large_arguments_are_truncated(self) -> None:
+        stream = io.StringIO()
+        logger, handler = json_logger("test-json-truncate", stream)
+
+        payload = {"rows": [{"bac_name": f"BAC{i}"} for i in range(100000)]}
+        logger.info("Webhook data: %s", payload)
+        logger.info("Name: %s", "x" * 10000, extra={"notebook": "n" * 10000})
+        try:
+            raise ValueError("bad plate")
+        except ValueError:
+            logger.exception("Failed")
+        handler.flush()
+
+        webhook, name, failed = map(json.loads, stream.getvalue().splitlines())
+        assert len(webhook["message"]) < 3000
+        assert webhook["message"].startswith(
+            "Webhook data: {'rows': [{'bac_name': 'BAC0'}"
+        )
+        assert name["message"].endswith("more chars]")
+        assert len(name["notebook"]) < 2100
+        assert "ValueError: bad plate" in failed["exc"]
+
+    def test_full_queue_drops_records_instead_of_blocking(self) -> None:
+        release = threading.Event()
+
+        class SlowHandler(logging.Handler):
+            def emit(self, record):
+                release.wait(5)
+
+        handler = AsyncLogHandler(SlowHandler(), maxsize=1)
+        logger = logging.getLogger("test-json-full")
+        logger.handlers = [handler]
+        logger.propagate = False
+
+        for i in range(5):
+            logger.error("Record %d", i)
+        release.set()
+        handler.flush()
+
+        assert handler.dropped >= 2
+
+    def test_summarize_items(self) -> None:
+        assert summarize_items(["a", "b"]) == "a, b"
+        assert summarize_items(range(8), limit=3) == "0, 1, 2 and 5 more"
@@ -0,0 +1,129 @@
+"""
+test_memory.py
+Description: Test the memory reports of the jobs and the memory budget of the job queue
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import json
+import threading
+import time
+
+import pytest
+
+from local_app.lib import memory
+from local_app.lib.job_queue import FAST_LANE, JobQueue
+from local_app.lib.memory import MemoryBudget, track_job_memory
+from local_app.lib.tracing import pipeline_stage
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+kept_alive = []
+
+
+@pipeline_stage("load_and_clean_data")
+def allocating_stage():
+    kept_alive.append([bytearray(1024) for _ in range(2000)])
+
+
+@pytest.fixture
+def report_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_REPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(memory, "MEMORY_PROFILING", True)
+    yield tmp_path
+    kept_alive.clear()
+
+
+def test_memory_is_not_tracked_by_default(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_PROFILING", False)
+    with track_job_memory("cnvs_1") as job:
+        allocating_stage()
+    assert job is None
+
+
+def test_job_report_has_peak_rss_and_stage_allocations(report_dir):
+    with track_job_memory("cnvs_1", webhook_type="CanvasInteractionWebhookV2") as job:
+        allocating_stage()
+
+    (report_path,) = (report_dir / "cnvs_1").glob("*.json")
+    report = json.loads(report_path.read_text())
+    assert report["webhook_type"] == "CanvasInteractionWebhookV2"
+    assert report["peak_rss_bytes"] == job.peak_rss >= report["start_rss_bytes"]
+
+    (stage,) = report["stages"]
+    assert stage["stage"] == "load_and_clean_data"
+    assert stage["traced_end_bytes"] - stage["traced_start_bytes"] > 2000 * 1024
+    assert "test_memory.py" in stage["top_allocations"][0]["where"]
+    assert stage["top_allocations"][0]["size_diff_bytes"] > 2000 * 1024
+
+
+def test_budget_admits_jobs_while_they_fit():
+    budget = MemoryBudget(job_bytes=100, limit_bytes=250, rss=lambda: None)
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    budget.release()
+    assert budget.try_acquire()
+    assert budget.reserved == 200
+
+
+def test_budget_checks_the_rss_but_always_admits_one_job():
+    rss = [1000]
+    budget = MemoryBudget(job_bytes=100, limit_bytes=1000, rss=lambda: rss[0])
+    # Alone, a job runs whatever the RSS
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    rss[0] = 500
+    assert budget.try_acquire()
+    assert budget.reserved == 200
+
+
+def test_job_queue_runs_the_jobs_its_budget_allows():
+    jobs = JobQueue(
+        workers=3, budget=MemoryBudget(job_bytes=100, limit_bytes=100, rss=lambda: None)
+    )
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    for _ in range(4):
+        jobs.submit(job)
+    jobs.join()
+
+    assert max(peak) == 1
+    assert jobs.budget.reserved == 0
+
+
+def test_heavy_job_waiting_for_memory_leaves_its_thread_to_fast_jobs():
+    jobs = JobQueue(
+        workers=1,
+        fast_workers=0,
+        budget=MemoryBudget(
+            job_bytes=100, limit_bytes=100, rss=lambda: None, poll_seconds=0.01
+        ),
+    )
+    assert jobs.budget.try_acquire()  # another job's reservation
+    fast_done = threading.Event()
+
+    jobs.submit(lambda: None)
+    jobs.submit(fast_done.set, lane=FAST_LANE)
+
+    assert fast_done.wait(1)
+    jobs.budget.release()
+    jobs.join()
+    assert jobs.budget.reserved == 0
@@ -0,0 +1,137 @@
+"""
+test_metrics.py
+Description: Test the metrics of the webhook service and their Prometheus rendering
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import asyncio
+
+import httpx
+import pytest
+
+from local_app.benchling_app.api_metrics import endpoint_label, instrument_client
+from local_app.lib import metrics
+from local_app.lib.metrics import Counter, Gauge, Histogram, Registry
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ["status"]))
+    jobs = registry.register(Gauge("jobs_active", "Active jobs"))
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1))
+    )
+
+    requests.inc(status=200)
+    requests.inc(2, status=200)
+    jobs.inc()
+    jobs.inc()
+    jobs.dec()
+    latency.observe(0.05, stage='load "x"')
+    latency.observe(0.5, stage='load "x"')
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{status="200"} 3\n'
+        "# HELP jobs_active Active jobs\n"
+        "# TYPE jobs_active gauge\n"
+        "jobs_active 1\n"
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{stage="load \\"x\\"",le="0.1"} 1\n'
+        'latency_seconds_bucket{stage="load \\"x\\"",le="1"} 2\n'
+        'latency_seconds_bucket{stage="load \\"x\\"",le="+Inf"} 2\n'
+        'latency_seconds_sum{stage="load \\"x\\""} 0.55\n'
+        'latency_seconds_count{stage="load \\"x\\""} 2\n'
+    )
+
+
+def test_metric_rejects_wrong_labels():
+    counter = Counter("c", "c", ["status"])
+    with pytest.raises(ValueError):
+        counter.inc(endpoint="/plates")
+
+
+def test_timed_observes_functions_coroutines_and_failures():
+    histogram = Histogram("stage_seconds", "Stages", ["stage"])
+
+    @histogram.timed(stage="sync")
+    def sync_stage():
+        raise RuntimeError("failed")
+
+    @histogram.timed(stage="async")
+    async def async_stage():
+        return 42
+
+    with pytest.raises(RuntimeError):
+        sync_stage()
+    assert asyncio.run(async_stage()) == 42
+
+    assert histogram.count(stage="sync") == 1
+    assert histogram.count(stage="async") == 1
+    assert 0 < histogram.sum(stage="sync") < 1
+    assert histogram.sum(stage="unknown") == 0
+    assert async_stage.__name__ == "async_stage"
+
+
+@pytest.mark.parametrize(
+    "path, endpoint",
+    [
+        ("/api/v2/plates/plt_Xy12ab", "/plates/{id}"),
+        ("/api/v2/dna-sequences:bulk-create", "/dna-sequences:bulk-create"),
+        ("/api/v2/tasks/3f8a2c1e-1234-4abc-9def-0123456789ab", "/tasks/{id}"),
+        ("/api/v2-beta/app-canvases/cnvs_1:archive", "/app-canvases/{id}:archive"),
+        ("/api/v2/entries", "/entries"),
+    ],
+)
+def test_endpoint_label(path, endpoint):
+    assert endpoint_label(path) == endpoint
+
+
+def test_instrument_client_counts_and_times_requests():
+    metrics.BENCHLING_API_REQUESTS.clear()
+    metrics.BENCHLING_API_SECONDS.clear()
+    client = instrument_client(
+        httpx.Client(transport=httpx.MockTransport(lambda r: httpx.Response(404)))
+    )
+
+    client.get("https://tenant.benchling.com/api/v2/plates/plt_1")
+    client.get("https://tenant.benchling.com/api/v2/plates/plt_2")
+
+    assert (
+        metrics.BENCHLING_API_REQUESTS.value(
+            method="GET", endpoint="/plates/{id}", status=404
+        )
+        == 2
+    )
+    assert (
+        metrics.BENCHLING_API_SECONDS.count(method="GET", endpoint="/plates/{id}") == 2
+    )
+
+
+def test_instrument_client_counts_requests_without_response():
+    metrics.BENCHLING_API_ERRORS.clear()
+
+    def timeout(request):
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    client = instrument_client(httpx.Client(transport=httpx.MockTransport(timeout)))
+
+    with pytest.raises(httpx.ConnectTimeout):
+        client.get("https://tenant.benchling.com/api/v2/plates/plt_1")
+
+    assert (
+        metrics.BENCHLING_API_ERRORS.value(
+            method="GET", endpoint="/plates/{id}", error="ConnectTimeout"
+        )
+        == 1
+    )
@@ -0,0 +1,34 @@
+"""
+test_model_utils.py
+Description: Test the helpers reading the benchling_sdk models
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+from local_app.benchling_app.model_utils import present
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class Model:
+    name = "CLC113"
+    volume = None
+
+    @property
+    def schema_id(self):
+        raise AttributeError("Not present")
+
+
+def test_present_returns_the_attribute():
+    assert present(Model(), "name") == "CLC113"
+
+
+def test_present_falls_back_to_the_default():
+    assert present(Model(), "schema_id", "ts_1") == "ts_1"
+    assert present(Model(), "volume", 0) == 0
+    assert present(None, "name") is None
@@ -8,11 +8,18 @@ Date: April 28, 2025
 # ==================================
 # IMPORTS
 # ==================================
+import threading
+
 import pandas as pd
 
 from unittest.mock import patch, MagicMock
 
+from benchling_sdk.helpers.serialization_helpers import fields
+from benchling_sdk.models import AssayResultCreate, ResultsTableNotePart
+
 from local_app.benchling_app import notebook_utils
+from local_app.benchling_app.checkpoint_utils import PipelineCheckpoint
+from local_app.benchling_app.entity_payloads import EntityPayloadSpec
 
 
 # ==================================
@@ -83,6 +90,123 @@ def test_find_results_table_no_match():
     assert error is True
 
 
+def test_find_results_table_skips_notes_without_schema():
+    app = MagicMock()
+    # The API left out the schema of the first table: reading it raises NotPresentError
+    no_schema = ResultsTableNotePart.from_dict({"type": "results_table", "apiId": "t0"})
+    table = ResultsTableNotePart.from_dict(
+        {"type": "results_table", "apiId": "t1", "assayResultSchemaId": "schema123"}
+    )
+    app.benchling.entries.get_entry_by_id.return_value = MagicMock(
+        days=[MagicMock(notes=[no_schema, table])]
+    )
+
+    assert notebook_utils.find_results_table(app, "notebook123", "schema123") == (
+        "t1",
+        False,
+    )
+
+
+# ================================== testing find_notebook_entry
+
+
+def make_entry(name, id):
+    entry = MagicMock(id=id)
+    entry.name = name
+    return entry
+
+
+def test_find_notebook_entry_stops_at_first_exact_match():
+    app = MagicMock()
+    pages_read = []
+
+    def pages():
+        yield [make_entry("CLC notebook v2", "etr_0")]
+        yield [make_entry("CLC notebook", "etr_1")]
+        for i in range(2, 100):
+            pages_read.append(i)
+            yield [make_entry("CLC notebook", f"etr_{i}")]
+
+    app.benchling.entries.list_entries.return_value = pages()
+
+    assert notebook_utils.find_notebook_entry(app, "CLC notebook") == "etr_1"
+    # At most the read-ahead window was fetched past the match
+    assert len(pages_read) <= 4
+
+
+def test_find_notebook_entry_without_exact_match_uses_last():
+    app = MagicMock()
+    app.benchling.entries.list_entries.return_value = [
+        [make_entry("clc notebook", "etr_0"), make_entry("CLC Notebook", "etr_1")]
+    ]
+
+    assert notebook_utils.find_notebook_entry(app, "CLC notebook") == "etr_1"
+
+
+# ================================== testing NotebookResolver
+
+
+@patch("local_app.benchling_app.notebook_utils.find_results_table")
+@patch("local_app.benchling_app.notebook_utils.find_notebook_entry")
+def test_resolver_caches_until_ttl_or_invalidation(mock_find_entry, mock_find_table):
+    mock_find_entry.return_value = "etr_1"
+    mock_find_table.return_value = ("tbl_1", False)
+    resolver = notebook_utils.NotebookResolver(ttl_seconds=60)
+    app = MagicMock()
+
+    assert resolver.resolve(app, "CLC notebook", "schema") == ("etr_1", "tbl_1")
+    assert resolver.resolve(app, "CLC notebook", "schema") == ("etr_1", "tbl_1")
+    assert mock_find_entry.call_count == 1
+
+    resolver.invalidate("CLC notebook")
+    resolver.resolve(app, "CLC notebook", "schema")
+    assert mock_find_entry.call_count == 2
+
+    expired = notebook_utils.NotebookResolver(ttl_seconds=0)
+    expired.resolve(app, "CLC notebook", "schema")
+    expired.resolve(app, "CLC notebook", "schema")
+    assert mock_find_entry.call_count == 4
+
+
+@patch("local_app.benchling_app.notebook_utils.find_results_table")
+@patch("local_app.benchling_app.notebook_utils.find_notebook_entry")
+def test_resolver_does_not_cache_failures(mock_find_entry, mock_find_table):
+    mock_find_entry.return_value = "etr_1"
+    mock_find_table.return_value = (None, True)
+    resolver = notebook_utils.NotebookResolver(ttl_seconds=60)
+    app = MagicMock()
+
+    assert resolver.resolve(app, "CLC notebook", "schema") == ("etr_1", None)
+    resolver.resolve(app, "CLC notebook", "schema")
+    assert mock_find_entry.call_count == 2
+
+
+@patch("local_app.benchling_app.notebook_utils.find_results_table")
+@patch("local_app.benchling_app.notebook_utils.find_notebook_entry")
+def test_resolver_prefetch_is_reused_by_resolve(mock_find_entry, mock_find_table):
+    release = threading.Event()
+
+    def slow_find_entry(app, notebook_name):
+        release.wait(5)
+        return "etr_1"
+
+    mock_find_entry.side_effect = slow_find_entry
+    mock_find_table.return_value = ("tbl_1", False)
+    resolver = notebook_utils.NotebookResolver(ttl_seconds=60)
+    app = MagicMock()
+
+    resolver.prefetch(app, "CLC notebook", "schema")
+    resolver.prefetch(app, "CLC notebook", "schema")  # already in flight
+    release.set()
+
+    assert resolver.resolve(app, "CLC notebook", "schema") == ("etr_1", "tbl_1")
+    assert mock_find_entry.call_count == 1
+
+    executor = resolver._executor
+    resolver.close()
+    assert executor._shutdown and resolver._executor is None
+
+
 # ================================== testing process_notebook
 # @pytest.fixture(autouse=True)
 # def set_app_env_to_test(monkeypatch):
@@ -90,11 +214,7 @@ def test_find_results_table_no_match():
 
 
 @patch("local_app.benchling_app.notebook_utils.find_results_table")
-@patch("local_app.benchling_app.notebook_utils.fields")
-@patch("local_app.benchling_app.notebook_utils.AssayResultCreate")
-def test_process_notebook_success(
-    mock_AssayResultCreate, mock_fields, mock_find_results_table, monkeypatch
-):
+def test_process_notebook_success(mock_find_results_table, monkeypatch):
     # ensure TESTING=True
     monkeypatch.setenv("APP_ENV", "test")
 
@@ -116,15 +236,10 @@ def test_process_notebook_success(
     # Mock result table finding
     mock_find_results_table.return_value = ("result_table_456", False)
 
-    # Mock fields() return
-    mock_fields.return_value = {"sample": {"value": "dummy_value"}}
-
-    # Mock AssayResultCreate return
-    mock_assay_result = MagicMock()
-    mock_AssayResultCreate.return_value = mock_assay_result
-
     # Dummy CLC BAC dataframe
-    clc_bac_df = pd.DataFrame({"bac_b_id": ["bac1", "bac2"]})
+    clc_bac_df = pd.DataFrame(
+        {"bac_name": ["CLC113", "CLC114"], "bac_b_id": ["bac1", "bac2"]}
+    )
 
     # Run the function
     result = notebook_utils.process_notebook(
@@ -147,7 +262,102 @@ def test_process_notebook_success(
     assert isinstance(bulk_args["assay_results"], list)
     assert len(bulk_args["assay_results"]) == 2  # one per row
     assert bulk_args["table_id"] == "result_table_456"
+    assert bulk_args["assay_results"][1].to_dict() == (
+        AssayResultCreate(
+            project_id="dummy_Project schema",
+            schema_id="dummy_Result schema",
+            fields=fields({"sample": {"value": "bac2"}}),
+        ).to_dict()
+    )
+
+
+@patch("local_app.benchling_app.notebook_utils.ASSAY_RESULTS_CHUNK_SIZE", 2)
+def test_write_assay_results_reports_failed_chunks():
+    app = MagicMock()
+
+    def bulk_create(assay_results, table_id):
+        task = MagicMock()
+        if "bad" in [
+            result.to_dict()["fields"]["sample"]["value"] for result in assay_results
+        ]:
+            task.wait_for_response.side_effect = RuntimeError("task failed")
+        return task
+
+    app.benchling.assay_results.bulk_create.side_effect = bulk_create
+    spec = EntityPayloadSpec(
+        name_column=None,
+        folder_id=None,
+        schema_id="schema",
+        fields={"sample": "bac_b_id"},
+    )
+    df = pd.DataFrame(
+        {
+            "bac_name": ["CLC1", "CLC2", "CLC3", "CLC4", "CLC5"],
+            "bac_b_id": ["b1", "b2", "bad", "b4", "b5"],
+        }
+    )
+
+    error = notebook_utils.write_assay_results(
+        app, spec.build(df), "tbl_1", df["bac_name"].tolist()
+    )
+
+    # 3 chunks (2 + 2 + 1), only the second one failed
+    assert app.benchling.assay_results.bulk_create.call_count == 3
+    assert "['CLC3', 'CLC4']" in error
+    assert "3 of 5 were written" in error
+    assert "task failed" in error
+
+
+
+@patch("local_app.benchling_app.notebook_utils.ASSAY_RESULTS_CHUNK_SIZE", 2)
+def test_write_assay_results_retry_resends_only_failed_chunks(tmp_path):
+    app = MagicMock()
+    written = []
+    failing = {"b3"}
+
+    def bulk_create(assay_results, table_id):
+        samples = [
+            result.to_dict()["fields"]["sample"]["value"] for result in assay_results
+        ]
+        task = MagicMock()
+        if failing & set(samples):
+            task.wait_for_response.side_effect = RuntimeError("task failed")
+        else:
+            written.extend(samples)
+        return task
+
+    app.benchling.assay_results.bulk_create.side_effect = bulk_create
+    spec = EntityPayloadSpec(
+        name_column=None,
+        folder_id=None,
+        schema_id="schema",
+        fields={"sample": "bac_b_id"},
+    )
+    df = pd.DataFrame(
+        {
+            "bac_name": ["CLC1", "CLC2", "CLC3", "CLC4", "CLC5"],
+            "bac_b_id": ["b1", "b2", "b3", "b4", "b5"],
+        }
+    )
+    checkpoint = PipelineCheckpoint("canvas-1", root=tmp_path)
+
+    def write():
+        return notebook_utils.write_assay_results(
+            app,
+            spec.build(df),
+            "tbl_1",
+            df["bac_name"].tolist(),
+            checkpoint=checkpoint,
+            checkpoint_key="notebook-key",
+        )
+
+    assert "['CLC3', 'CLC4']" in write()
+    failing.clear()
+    assert write() is None
 
+    # The retry only sent the chunk that failed: every row is in the table once
+    assert app.benchling.assay_results.bulk_create.call_count == 4
+    assert sorted(written) == ["b1", "b2", "b3", "b4", "b5"]
 
 def test_process_notebook_no_table_found():
     app = MagicMock()
@@ -165,7 +375,7 @@ def test_process_notebook_no_table_found():
         result = notebook_utils.process_notebook(
             app=app,
             notebook_name="Fake Notebook",
-            clc_bac_df=pd.DataFrame({"bac_b_id": ["bac1"]}),
+            clc_bac_df=pd.DataFrame({"bac_name": ["CLC1"], "bac_b_id": ["bac1"]}),
         )
 
     assert "The results table cannot be retreived" in result
@@ -0,0 +1,96 @@
+"""
+test_pagination_utils.py
+Description: Test the read-ahead reader for paginated Benchling list calls
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import pytest
+
+from unittest.mock import MagicMock
+
+from local_app.benchling_app import pagination_utils
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class CountingPages:
+    """Page source that records how many pages were requested."""
+
+    def __init__(self, n_pages, fail_at=None):
+        self.n_pages = n_pages
+        self.fail_at = fail_at
+        self.fetched = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.fetched == self.fail_at:
+            raise RuntimeError("page failed")
+        if self.fetched >= self.n_pages:
+            raise StopIteration
+        self.fetched += 1
+        return [f"item_{self.fetched}"]
+
+
+# ================================== testing PrefetchingPages ==================================
+
+
+def test_prefetching_pages_returns_all_pages_in_order():
+    with pagination_utils.PrefetchingPages(CountingPages(5), prefetch=2) as pages:
+        result = list(pages)
+
+    assert result == [[f"item_{i}"] for i in range(1, 6)]
+
+
+def test_prefetching_pages_without_prefetch_reads_inline():
+    pages = pagination_utils.PrefetchingPages(CountingPages(3), prefetch=0)
+
+    assert pages._thread is None
+    assert list(pages) == [["item_1"], ["item_2"], ["item_3"]]
+
+
+def test_prefetching_pages_raises_page_errors_to_the_caller():
+    pages = pagination_utils.PrefetchingPages(CountingPages(5, fail_at=2), prefetch=2)
+
+    assert next(pages) == ["item_1"]
+    assert next(pages) == ["item_2"]
+    with pytest.raises(RuntimeError, match="page failed"):
+        next(pages)
+
+
+def test_prefetching_pages_close_stops_fetching():
+    source = CountingPages(1000)
+
+    with pagination_utils.PrefetchingPages(source, prefetch=2) as pages:
+        assert next(pages) == ["item_1"]
+
+    fetched_at_close = source.fetched
+    # Only the read-ahead window (plus one in flight) was ever requested
+    assert fetched_at_close <= 1 + 2 + 2
+    with pytest.raises(StopIteration):
+        next(pages)
+
+
+# ================================== testing prefetch_pages ==================================
+
+
+def test_prefetch_pages_passes_page_size_only_when_set():
+    list_func = MagicMock(return_value=[[]])
+
+    with pagination_utils.prefetch_pages(list_func, folder_id="lib_1") as pages:
+        list(pages)
+    list_func.assert_called_once_with(folder_id="lib_1")
+
+    list_func.reset_mock()
+    with pagination_utils.prefetch_pages(
+        list_func, page_size=50, folder_id="lib_1"
+    ) as pages:
+        list(pages)
+    list_func.assert_called_once_with(folder_id="lib_1", page_size=50)
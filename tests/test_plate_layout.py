@@ -0,0 +1,184 @@
+"""
+test_plate_layout.py
+Description: Test the array-backed plate layouts
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import numpy as np
+import pytest
+
+from unittest.mock import MagicMock
+
+from benchling_sdk.models import (
+    Container,
+    ContainerContent,
+    ContainerQuantity,
+    ContainerQuantityUnits,
+    DnaSequence,
+)
+
+from local_app.benchling_app import plate_layout
+from local_app.benchling_app.plate_layout import (
+    PLATE_96,
+    PLATE_384,
+    PLATE_1536,
+    PlateWells,
+)
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def make_plate(well_ids):
+    plate_info = MagicMock()
+    plate_info.wells.additional_properties = {
+        name: MagicMock(id=well_id) for name, well_id in well_ids.items()
+    }
+    return plate_info
+
+
+# ================================== testing PlateLayout
+
+
+def test_layout_sizes_and_corner_names():
+    assert (PLATE_96.size, PLATE_384.size, PLATE_1536.size) == (96, 384, 1536)
+    assert PLATE_96.names[[0, 11, 95]].tolist() == ["A01", "A12", "H12"]
+    assert PLATE_384.names[-1] == "P24"
+    assert PLATE_1536.names[-1] == "AF48"
+
+
+def test_indices_normalise_every_spelling():
+    assert PLATE_96.indices(["a1", "A01", "b12", "H12"]).tolist() == [0, 0, 23, 95]
+    assert PLATE_96.normalise(["c3", "I1", "A13", "xx"]).tolist() == [
+        "C03",
+        None,
+        None,
+        None,
+    ]
+    assert PLATE_1536.indices(["aa1", "AF48"]).tolist() == [26 * 48, 1535]
+
+
+def test_row_col_arithmetic_round_trip():
+    rows, cols = PLATE_384.row_col([0, 25, 383])
+
+    assert rows.tolist() == [0, 1, 15]
+    assert cols.tolist() == [0, 1, 23]
+    assert PLATE_384.index(rows, cols).tolist() == [0, 25, 383]
+
+
+def test_layout_for_picks_smallest_plate():
+    assert plate_layout.layout_for(["A1", "H12"]) is PLATE_96
+    assert plate_layout.layout_for(["A1", "P24"]) is PLATE_384
+    assert plate_layout.layout_for(["AF1"]) is PLATE_1536
+    with pytest.raises(ValueError):
+        plate_layout.layout_for(["AG1"])
+
+
+# ================================== testing PlateWells
+
+
+def test_plate_wells_from_plate():
+    plate_wells = PlateWells.from_plate(make_plate({"b1": "w_b1", "a2": "w_a2"}))
+
+    assert plate_wells.layout is PLATE_96
+    assert plate_wells.recorded.tolist() == [1, 12]
+    assert plate_wells.well_ids[12] == "w_b1"
+
+
+def test_diff_transfers_skips_missing_wells_and_entities():
+    plate_wells = PlateWells.from_plate(
+        make_plate({"A1": "w_a1", "A2": "w_a2", "B1": "w_b1"})
+    )
+
+    destinations, entities, quantities, _ = plate_wells.diff_transfers(
+        ["B01", "A01", "C01", "A02"],
+        ["e_b1", "e_a1", "e_c1", None],
+        [3.0, 1.0, 4.0, 2.0],
+    )
+
+    assert destinations.tolist() == ["w_a1", "w_b1"]
+    assert entities.tolist() == ["e_a1", "e_b1"]
+    assert quantities.tolist() == [1.0, 3.0]
+
+
+def test_plate_wells_reads_current_contents():
+    well = Container(
+        id="w_a1",
+        contents=[ContainerContent(entity=DnaSequence(id="seq_1"))],
+        quantity=ContainerQuantity(units=ContainerQuantityUnits.UL, value=2.0),
+    )
+    plate_info = MagicMock()
+    plate_info.wells.additional_properties = {"A1": well, "A2": Container(id="w_a2")}
+
+    plate_wells = PlateWells.from_plate(plate_info)
+
+    assert plate_wells.contents[:2].tolist() == [("seq_1",), ()]
+    assert plate_wells.quantities[0] == 2.0
+    assert np.isnan(plate_wells.quantities[1])
+    assert plate_wells.units[0] == "uL"
+
+
+def test_diff_transfers_skips_filled_wells():
+    plate_wells = PlateWells.from_plate(
+        make_plate({"A1": "w_a1", "A2": "w_a2", "A3": "w_a3"})
+    )
+    plate_wells.contents[:2] = [("e1",), ("e2",)]
+    plate_wells.quantities[:2] = [2.0, 1.0]
+    plate_wells.units[:2] = ["uL", "uL"]
+
+    destinations, entities, quantities, n_skipped = plate_wells.diff_transfers(
+        ["A1", "A2", "A3"], ["e1", "e2", "e3"], [2.0, 3.0, 1.0]
+    )
+
+    # A1 and A2 already hold their entity (whatever the quantity), only A3 is empty
+    assert destinations.tolist() == ["w_a3"]
+    assert entities.tolist() == ["e3"]
+    assert quantities.tolist() == [1.0]
+    assert n_skipped == 2
+
+
+def test_diff_transfers_rejects_wells_holding_another_entity():
+    plate_wells = PlateWells.from_plate(make_plate({"A1": "w_a1", "A2": "w_a2"}))
+    plate_wells.contents[1] = ("other",)
+
+    with pytest.raises(ValueError, match=r"\['A02'\]"):
+        plate_wells.diff_transfers(["A1", "A2"], ["e1", "e2"], [1.0, 1.0])
+
+
+# ================================== testing 384 <-> 96 mappings
+
+
+def test_quadrant_mapping_round_trip():
+    indices_384 = np.arange(384)
+    quadrants, indices_96 = plate_layout.quadrant_384_to_96(indices_384)
+
+    # A01, A02, B01, B02 of the 384 plate are A01 of the four 96 plates
+    assert quadrants[PLATE_384.indices(["A1", "A2", "B1", "B2"])].tolist() == [
+        0,
+        1,
+        2,
+        3,
+    ]
+    assert set(indices_96[PLATE_384.indices(["A1", "A2", "B1", "B2"])]) == {0}
+    assert PLATE_96.names[indices_96[PLATE_384.indices(["P24"])]].tolist() == ["H12"]
+    assert (plate_layout.quadrant_96_to_384(quadrants, indices_96) == indices_384).all()
+
+
+# ================================== testing fill_order
+
+
+def test_fill_order_row_and_column():
+    assert PLATE_96.names[plate_layout.fill_order(PLATE_96, 3)].tolist() == [
+        "A01",
+        "A02",
+        "A03",
+    ]
+    assert PLATE_96.names[
+        plate_layout.fill_order(PLATE_96, 3, by="column", first_well="H01")
+    ].tolist() == ["H01", "A02", "B02"]
+    with pytest.raises(ValueError):
+        plate_layout.fill_order(PLATE_96, 2, first_well="H12")
@@ -13,7 +13,16 @@ import pandas as pd
 
 from unittest.mock import patch, MagicMock
 
+from benchling_sdk.models import (
+    Container,
+    ContainerContent,
+    ContainerQuantity,
+    ContainerQuantityUnits,
+    DnaSequence,
+)
+
 from local_app.benchling_app import plate_utils
+from local_app.benchling_app.plate_layout import PlateWells
 
 # ==================================
 # FUNCTIONS
@@ -26,19 +35,19 @@ from local_app.benchling_app import plate_utils
 @patch("local_app.benchling_app.plate_utils.ContainerQuantity")
 @patch("local_app.benchling_app.plate_utils.MultipleContainersTransfer")
 def test_fill_plate_success(mock_MultipleContainersTransfer, mock_ContainerQuantity):
-    # Create dummy input DataFrames
-    plate_pre_recorded_wells_df = pd.DataFrame(
-        {
-            "well_position_merge": ["A1", "A2"],
-            "well_api_id": ["well1", "well2"],
-        }
-    )
+    # Plate with two recorded wells, and the entities to put in them
+    plate_info = MagicMock()
+    plate_info.wells.additional_properties = {
+        "A1": MagicMock(id="well1"),
+        "A2": MagicMock(id="well2"),
+    }
+    plate_wells = PlateWells.from_plate(plate_info)
 
     df = pd.DataFrame(
         {
-            "Well Position": ["A1", "A2"],
-            "Entity ID": ["entity1", "entity2"],
-            "Quantity": [5, 10],
+            "Well Position": ["A02", "A01", "B01", "A03"],
+            "Entity ID": ["entity2", "entity1", "entity3", None],
+            "Quantity": [10, 5, 1, 1],
         }
     )
 
@@ -53,8 +62,8 @@ def test_fill_plate_success(mock_MultipleContainersTransfer, mock_ContainerQuant
     mock_MultipleContainersTransfer.return_value = mock_transfer_instance
 
     # Call the function
-    result = plate_utils.fill_plate(
-        plate_pre_recorded_wells_df=plate_pre_recorded_wells_df,
+    result, n_skipped = plate_utils.fill_plate(
+        plate_wells=plate_wells,
         df=df,
         keep_columns=keep_columns,
         quantity_units=quantity_units,
@@ -62,6 +71,7 @@ def test_fill_plate_success(mock_MultipleContainersTransfer, mock_ContainerQuant
 
     # Verify the results
     assert len(result) == 2
+    assert n_skipped == 0
 
     # Check container quantity called correctly
     assert mock_ContainerQuantity.call_count == 2
@@ -77,6 +87,12 @@ def test_fill_plate_success(mock_MultipleContainersTransfer, mock_ContainerQuant
     mock_ContainerQuantity.assert_called()
     mock_MultipleContainersTransfer.assert_called()
 
+    # Only the wells in the plate, with an entity, in plate order
+    assert [
+        (call.kwargs["destination_container_id"], call.kwargs["source_entity_id"])
+        for call in mock_MultipleContainersTransfer.call_args_list
+    ] == [("well1", "entity1"), ("well2", "entity2")]
+
 
 # ================================== Test find_and_fill_plates
 
@@ -108,7 +124,7 @@ def test_find_and_fill_plates_success(mock_fill_plate):
     app.benchling.plates.get_by_id.side_effect = plate_infos
 
     # 4. Mock fill_plate to return a dummy transfer list
-    mock_fill_plate.return_value = ["tx1", "tx2"]
+    mock_fill_plate.return_value = (["tx1", "tx2"], 0)
 
     # 5. Minimal DataFrames for each branch
     crrna_df = pd.DataFrame(
@@ -144,7 +160,9 @@ def test_find_and_fill_plates_success(mock_fill_plate):
     )
 
     # 7. Should succeed
-    assert result is None
+    fill_summary, error = result
+    assert error is None
+    assert fill_summary["PlateA1_crRNA"] == {"submitted": 2, "skipped": 0}
 
     # 8. plates.get_by_id called once per plate
     assert app.benchling.plates.get_by_id.call_count == 3
@@ -157,10 +175,10 @@ def test_find_and_fill_plates_success(mock_fill_plate):
     # 10. transfer_into_containers called once per plate
     assert app.benchling.containers.transfer_into_containers.call_count == 3
 
-    # 11. Spot‑check the first DataFrame passed to fill_plate
-    first_df = mock_fill_plate.call_args_list[0][0][0]
-    assert "well_position_merge" in first_df.columns
-    assert first_df["well_position_merge"].tolist() == ["A01", "B01"]
+    # 11. Spot‑check the first plate passed to fill_plate
+    first_plate = mock_fill_plate.call_args_list[0][0][0]
+    assert first_plate.layout.size == 96
+    assert first_plate.layout.names[first_plate.recorded].tolist() == ["A01", "B01"]
 
 
 @pytest.fixture
@@ -185,7 +203,7 @@ def test_find_and_fill_plates_invalid_order(mock_fill_plate, dummy_dfs):
 
     app.benchling.plates.get_by_id.return_value = bad_plate
 
-    msg = plate_utils.find_and_fill_plates(
+    _, msg = plate_utils.find_and_fill_plates(
         app=app,
         crrna_df_merge=dummy_dfs[0],
         receivers_df_merge=dummy_dfs[1],
@@ -210,7 +228,7 @@ def test_find_and_fill_plates_bad_suffix(mock_fill_plate, dummy_dfs):
 
     app.benchling.plates.get_by_id.return_value = bad_plate
 
-    msg = plate_utils.find_and_fill_plates(
+    _, msg = plate_utils.find_and_fill_plates(
         app=app,
         crrna_df_merge=dummy_dfs[0],
         receivers_df_merge=dummy_dfs[1],
@@ -241,7 +259,7 @@ def test_find_and_fill_plates_missing_some(mock_fill_plate, dummy_dfs):
     app.benchling.plates.get_by_id.side_effect = [pi1, pi2]
 
     # Mock fill_plate so it doesn’t error
-    mock_fill_plate.return_value = []
+    mock_fill_plate.return_value = ([], 0)
 
     crrna_df = dummy_dfs[0]
     receivers_df = pd.DataFrame(
@@ -253,7 +271,7 @@ def test_find_and_fill_plates_missing_some(mock_fill_plate, dummy_dfs):
     )
     screening_df = dummy_dfs[2]
 
-    msg = plate_utils.find_and_fill_plates(
+    _, msg = plate_utils.find_and_fill_plates(
         app=app,
         crrna_df_merge=crrna_df,
         receivers_df_merge=receivers_df,
@@ -263,5 +281,175 @@ def test_find_and_fill_plates_missing_some(mock_fill_plate, dummy_dfs):
     )
 
     assert "Have you uploaded all 3 plates" in msg
-    # fill_plate should have been called twice (once per plate)
-    assert mock_fill_plate.call_count == 2
+    # Nothing is filled until the three plates are there
+    mock_fill_plate.assert_not_called()
+    app.benchling.containers.transfer_into_containers.assert_not_called()
+
+
+def make_plate(name):
+    plate = MagicMock()
+    plate.name = name
+    plate.wells.additional_properties = {
+        "a1": MagicMock(barcode="b", name="n", id="i"),
+    }
+    return plate
+
+
+@patch("local_app.benchling_app.plate_utils.fill_plate")
+def test_find_and_fill_plates_wrong_last_plate_fills_nothing(
+    mock_fill_plate, dummy_dfs
+):
+    app = MagicMock()
+    plates = {
+        "p1": make_plate("PlateA1_crRNA"),
+        "p2": make_plate("PlateA1_REC"),
+        "p3": make_plate("PlateA1_SCRX"),
+    }
+    app.benchling.plates.get_by_id.side_effect = lambda plate_id: plates[plate_id]
+    mock_fill_plate.return_value = (["tx1"], 0)
+
+    _, msg = plate_utils.find_and_fill_plates(
+        app=app,
+        crrna_df_merge=dummy_dfs[0],
+        receivers_df_merge=dummy_dfs[1],
+        screening_df_merge=dummy_dfs[2],
+        plate_list=["p1", "p2", "p3"],
+        order_number=1,
+    )
+
+    assert "PlateA1_SCRX should end with _REC, _SCR or _crRNA" in msg
+    mock_fill_plate.assert_not_called()
+    app.benchling.containers.transfer_into_containers.assert_not_called()
+
+
+@patch("local_app.benchling_app.plate_utils.PLATE_TRANSFER_CHUNK_SIZE", 2)
+@patch("local_app.benchling_app.plate_utils.fill_plate")
+def test_find_and_fill_plates_chunks_transfers(mock_fill_plate, dummy_dfs):
+    app = MagicMock()
+    plates = {
+        "p1": make_plate("PlateA1_crRNA"),
+        "p2": make_plate("PlateA1_REC"),
+        "p3": make_plate("PlateA1_SCR"),
+    }
+    app.benchling.plates.get_by_id.side_effect = lambda plate_id: plates[plate_id]
+    mock_fill_plate.side_effect = [(["a", "b", "c"], 0), (["d"], 0), ([], 0)]
+
+    _, msg = plate_utils.find_and_fill_plates(
+        app=app,
+        crrna_df_merge=dummy_dfs[0],
+        receivers_df_merge=dummy_dfs[1],
+        screening_df_merge=dummy_dfs[2],
+        plate_list=["p1", "p2", "p3"],
+        order_number=1,
+    )
+
+    assert msg is None
+    submitted = sorted(
+        call.kwargs["transfer_requests"]
+        for call in app.benchling.containers.transfer_into_containers.call_args_list
+    )
+    # 3 + 1 wells in chunks of 2, the empty plate sends no request
+    assert submitted == [["a", "b"], ["c"], ["d"]]
+
+
+def test_find_and_fill_plates_fetch_error(dummy_dfs):
+    app = MagicMock()
+    app.benchling.plates.get_by_id.side_effect = RuntimeError("not found")
+
+    _, msg = plate_utils.find_and_fill_plates(
+        app=app,
+        crrna_df_merge=dummy_dfs[0],
+        receivers_df_merge=dummy_dfs[1],
+        screening_df_merge=dummy_dfs[2],
+        plate_list=["p1", "p2", "p3"],
+        order_number=1,
+    )
+
+    assert "Are you sure this plate is from order number" in msg
+    app.benchling.containers.transfer_into_containers.assert_not_called()
+
+
+def test_find_and_fill_plates_twice_only_submits_missing_wells(dummy_dfs):
+    """Wells that already hold their entity are not transferred again."""
+    app = MagicMock()
+    plates = {
+        "p1": make_plate("PlateA1_crRNA"),
+        "p2": make_plate("PlateA1_REC"),
+        "p3": make_plate("PlateA1_SCR"),
+    }
+    # The crRNA well was filled by a previous run (Benchling records it as a volume)
+    plates["p1"].wells.additional_properties = {
+        "A1": Container(
+            id="i",
+            contents=[ContainerContent(entity=DnaSequence(id="crrna1"))],
+            quantity=ContainerQuantity(units=ContainerQuantityUnits.UL, value=20.0),
+        )
+    }
+    app.benchling.plates.get_by_id.side_effect = lambda plate_id: plates[plate_id]
+
+    crrna_df = pd.DataFrame(
+        {"well_crrna_idt": ["A01"], "crRNA_b_id": ["crrna1"], "ug": [5.0]}
+    )
+    primers_df = pd.DataFrame(
+        {
+            "well_primer_idt": ["A01"],
+            "receiver_primer_b_id": ["r1"],
+            "primer_b_id": ["s1"],
+            "ul_primers": [1.0],
+        }
+    )
+
+    fill_summary, error = plate_utils.find_and_fill_plates(
+        app=app,
+        crrna_df_merge=crrna_df,
+        receivers_df_merge=primers_df,
+        screening_df_merge=primers_df,
+        plate_list=["p1", "p2", "p3"],
+        order_number=1,
+    )
+
+    assert error is None
+    assert fill_summary == {
+        "PlateA1_crRNA": {"submitted": 0, "skipped": 1},
+        "PlateA1_REC": {"submitted": 1, "skipped": 0},
+        "PlateA1_SCR": {"submitted": 1, "skipped": 0},
+    }
+    assert app.benchling.containers.transfer_into_containers.call_count == 2
+
+
+def test_find_and_fill_plates_fails_on_well_holding_another_entity(dummy_dfs):
+    app = MagicMock()
+    plates = {
+        "p1": make_plate("PlateA1_crRNA"),
+        "p2": make_plate("PlateA1_REC"),
+        "p3": make_plate("PlateA1_SCR"),
+    }
+    plates["p3"].wells.additional_properties = {
+        "A1": Container(
+            id="i", contents=[ContainerContent(entity=DnaSequence(id="other"))]
+        )
+    }
+    app.benchling.plates.get_by_id.side_effect = lambda plate_id: plates[plate_id]
+    primers_df = pd.DataFrame(
+        {
+            "well_primer_idt": ["A01"],
+            "receiver_primer_b_id": ["r1"],
+            "primer_b_id": ["s1"],
+            "ul_primers": [1.0],
+        }
+    )
+
+    fill_summary, error = plate_utils.find_and_fill_plates(
+        app=app,
+        crrna_df_merge=pd.DataFrame(
+            {"well_crrna_idt": ["A01"], "crRNA_b_id": ["crrna1"], "ug": [5.0]}
+        ),
+        receivers_df_merge=primers_df,
+        screening_df_merge=primers_df,
+        plate_list=["p1", "p2", "p3"],
+        order_number=1,
+    )
+
+    assert fill_summary is None
+    assert "['A01']" in error
+    app.benchling.containers.transfer_into_containers.assert_not_called()
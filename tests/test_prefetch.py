@@ -0,0 +1,98 @@
+"""
+test_prefetch.py
+Description: Test the prefetch started when a canvas is opened
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from local_app.benchling_app import prefetch
+from local_app.benchling_app.entity_index import EntityIndexCache
+from local_app.benchling_app.prefetch import Prefetcher
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = EntityIndexCache(ttl_seconds=60)
+    monkeypatch.setattr(prefetch, "entity_index", index)
+    monkeypatch.setattr(prefetch, "fetch_token", lambda base_url: None)
+
+    def registration_indexes(config):
+        config(["crRNA storage folder"])
+        return [("dna", "lib_1", "ts_1"), ("custom", "lib_2", "ts_2")]
+
+    monkeypatch.setattr(prefetch, "registration_indexes", registration_indexes)
+    return index
+
+
+def test_canvas_prefetch_lists_the_registration_indexes(index):
+    app = MagicMock()
+    app.id = "app_1"
+    app.benchling.dna_sequences.list.return_value = [[MagicMock(id="id_a")]]
+    app.benchling.custom_entities.list.return_value = [[]]
+
+    canvas = Prefetcher().start(app, "cnvs_1", "https://a.benchling.com")
+    # The indexes are queued by the first step
+    canvas.futures[0].result()
+    for future in canvas.futures:
+        future.result()
+
+    assert canvas.done()
+    assert len(canvas.futures) == 3
+    app.benchling.dna_sequences.list.assert_called_once_with(
+        folder_id="lib_1", schema_id="ts_1"
+    )
+    assert index._cached(("app_1", "custom", "lib_2", "ts_2"))[2] == {}
+
+
+def test_cancelled_canvas_prefetch_stops(index):
+    started = threading.Event()
+    release = threading.Event()
+    app = MagicMock()
+
+    def config_by_path(path):
+        started.set()
+        release.wait(1)
+        return MagicMock()
+
+    app.config_store.config_by_path = config_by_path
+    prefetcher = Prefetcher()
+    canvas = prefetcher.start(app, "cnvs_1", "https://a.benchling.com")
+    started.wait(1)
+    canvas.cancel()
+    release.set()
+    canvas.futures[0].result()
+
+    assert canvas.is_set()
+    assert len(canvas.futures) == 1
+    app.benchling.dna_sequences.list.assert_not_called()
+
+
+def test_canvas_prefetches_are_bounded(index):
+    release = threading.Event()
+    app = MagicMock()
+    app.config_store.config_by_path = lambda path: release.wait(1)
+    prefetcher = Prefetcher(max_pending=1)
+
+    first = prefetcher.start(app, "cnvs_1", "https://a.benchling.com")
+    assert prefetcher.start(app, "cnvs_2", "https://a.benchling.com") is None
+    # The same canvas again replaces its prefetch
+    again = prefetcher.start(app, "cnvs_1", "https://a.benchling.com")
+    assert first.is_set() and not again.is_set()
+    release.set()
+
+
+def test_canvas_prefetch_times_out():
+    canvas = prefetch.CanvasPrefetch("cnvs_1", timeout=0)
+    assert canvas.is_set()
@@ -0,0 +1,135 @@
+"""
+test_profiling.py
+Description: Test the per-job profiles and their summary
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from local_app.lib import profiling
+from local_app.lib.profiling import profile_job, should_profile, summarize
+from local_app.lib.tracing import in_current_context, pipeline_stage
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_CANVAS_IDS", frozenset({"cnvs_slow"}))
+    return tmp_path
+
+
+@pipeline_stage("clean")
+def clean_stage():
+    frame = pd.DataFrame({"bac_name": [f"BAC{i}" for i in range(2000)]})
+    return frame["bac_name"].str.upper().tolist()
+
+
+@pipeline_stage("plates")
+def plates_stage():
+    results = []
+
+    def worker():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            results.append(sum(range(100)))
+
+    thread = threading.Thread(target=in_current_context(worker))
+    thread.start()
+    thread.join()
+    return results
+
+
+def run_job():
+    clean_stage()
+    plates_stage()
+
+
+def test_should_profile(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_CANVAS_IDS", frozenset({"cnvs_slow"}))
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+    assert should_profile("cnvs_slow")
+    assert not should_profile("cnvs_other")
+    assert not should_profile(None)
+
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1)
+    assert should_profile("cnvs_other")
+
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiling, "PROFILE_JOBS", True)
+    assert should_profile(None)
+
+
+def test_jobs_not_picked_are_not_profiled(profile_dir):
+    with profile_job("cnvs_other") as profile:
+        run_job()
+
+    assert profile is None
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_cprofile_saves_the_job_and_its_stages(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILER", "cprofile")
+
+    with profile_job("cnvs_slow", webhook_type="CanvasInteractionWebhookV2"):
+        run_job()
+
+    (description_path,) = (profile_dir / "cnvs_slow").glob("*.json")
+    description = json.loads(description_path.read_text())
+    assert description["canvas_id"] == "cnvs_slow"
+    assert description["webhook_type"] == "CanvasInteractionWebhookV2"
+    assert [stage["stage"] for stage in description["stages"]] == ["clean", "plates"]
+
+    stats = profiling.pstats.Stats(str(description_path.with_suffix(".prof")))
+    profiled = {name for _, _, name in stats.stats}
+    # The worker thread started by the plates stage is in the profile of the job
+    assert {"clean_stage", "worker"} <= profiled
+
+
+def test_sampling_roots_the_stacks_at_their_stage(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILER", "sampling")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_INTERVAL_SECONDS", 0.001)
+
+    with profile_job("cnvs_slow"):
+        run_job()
+
+    (folded_path,) = (profile_dir / "cnvs_slow").glob("*.folded")
+    stacks = folded_path.read_text().splitlines()
+    assert any(
+        line.startswith("stage:plates;") and "worker (" in line for line in stacks
+    )
+
+
+def test_errors_are_recorded_and_raised(profile_dir):
+    with pytest.raises(ValueError):
+        with profile_job("cnvs_slow"):
+            raise ValueError("bad plate")
+
+    (description_path,) = (profile_dir / "cnvs_slow").glob("*.json")
+    assert "bad plate" in json.loads(description_path.read_text())["error"]
+
+
+def test_summarize_reports_stages_and_pandas_hot_spots(profile_dir, monkeypatch):
+    for profiler in ("cprofile", "sampling"):
+        monkeypatch.setattr(profiling, "PROFILER", profiler)
+        with profile_job("cnvs_slow"):
+            run_job()
+
+    summary = summarize([profile_dir], top=5)
+
+    assert summary.startswith("profiles: 2 (1 cprofile, 1 sampling)")
+    assert "\nclean " in summary and "\nplates " in summary
+    pandas_section = summary.split("pandas hot spots")[1].split("sdk hot spots")[0]
+    assert "pandas/" in pandas_section
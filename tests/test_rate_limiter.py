@@ -0,0 +1,148 @@
+"""
+test_rate_limiter.py
+Description: Test the client-side rate limiter of the Benchling API calls
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import httpx
+import pytest
+
+from local_app.benchling_app import rate_limiter
+from local_app.benchling_app.rate_limiter import TokenBucket
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_bucket(clock, **kwargs):
+    kwargs = {"rate": 10, "burst": 2, "min_rate": 1, **kwargs}
+    return TokenBucket(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_bucket_spends_the_burst_then_waits_for_tokens(clock):
+    bucket = make_bucket(clock)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    # 2 tokens saved up, the third request waits one token at 10/s
+    assert clock.slept == [pytest.approx(0.1)]
+
+
+def test_bucket_halves_the_rate_and_pauses_on_429(clock):
+    bucket = make_bucket(clock)
+
+    bucket.observe(429, {"retry-after": "3"})
+
+    assert bucket.rate == 5
+    bucket.acquire()
+    assert sum(clock.slept) >= 3
+
+
+def test_bucket_rate_recovers_on_success_and_has_a_floor(clock):
+    bucket = make_bucket(clock)
+    for _ in range(10):
+        bucket.observe(429, {})
+    assert bucket.rate == 1
+
+    for _ in range(10):
+        bucket.observe(200, {})
+    assert bucket.rate == pytest.approx(3)
+
+    for _ in range(100):
+        bucket.observe(200, {})
+    assert bucket.rate == 10
+
+
+def test_bucket_records_rate_limit_headers_and_pauses_when_none_remain(clock):
+    bucket = make_bucket(clock)
+
+    bucket.observe(
+        200,
+        {
+            "x-rate-limit-limit": "60",
+            "x-rate-limit-remaining": "0",
+            "x-rate-limit-reset": "2",
+            "content-type": "application/json",
+        },
+    )
+
+    assert bucket.rate_limit_headers == {
+        "x-rate-limit-limit": "60",
+        "x-rate-limit-remaining": "0",
+        "x-rate-limit-reset": "2",
+    }
+    bucket.acquire()
+    assert sum(clock.slept) == pytest.approx(2)
+
+
+def test_retry_after_http_date():
+    assert rate_limiter.retry_after_seconds(
+        "Wed, 21 Oct 2015 07:28:05 GMT", now=1445412480
+    ) == pytest.approx(5)
+    assert rate_limiter.retry_after_seconds("soon") is None
+
+
+def test_shared_bucket_state_is_kept_in_a_file(clock, tmp_path):
+    path = tmp_path / "tenant.json"
+    worker_1 = make_bucket(clock, path=path)
+    worker_2 = make_bucket(clock, path=path)
+
+    worker_1.acquire()
+    worker_2.acquire()
+    worker_1.acquire()
+
+    # The two workers spent the same burst of 2
+    assert clock.slept == [pytest.approx(0.1)]
+    worker_2.observe(429, {})
+    assert worker_1.rate == 5
+
+
+def test_rate_limited_client_goes_through_the_bucket(clock):
+    bucket = make_bucket(clock)
+    responses = iter(
+        [httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200)]
+    )
+    client = rate_limiter.rate_limited_client(
+        "https://tenant.benchling.com",
+        bucket=bucket,
+        transport=httpx.MockTransport(lambda request: next(responses)),
+    )
+
+    assert client.get("https://tenant.benchling.com/api/v2/plates").status_code == 429
+    assert client.get("https://tenant.benchling.com/api/v2/plates").status_code == 200
+
+    assert clock.slept == [pytest.approx(1)]
+    assert bucket.rate_limit_headers == {"retry-after": "1"}
+
+
+def test_bucket_for_is_shared_per_tenant():
+    first = rate_limiter.bucket_for("https://a.benchling.com", "app_1")
+
+    assert rate_limiter.bucket_for("https://a.benchling.com", "app_1") is first
+    assert rate_limiter.bucket_for("https://b.benchling.com", "app_1") is not first
+    # Another app installation on the same base URL
+    assert rate_limiter.bucket_for("https://a.benchling.com", "app_2") is not first
@@ -5,7 +5,9 @@ from benchling_sdk.apps.framework import App
 
 from local_app.benchling_app.setup import (
     _auth_method,
+    _rate_limited_client,
     app_definition_id,
+    init_app,
     init_app_from_webhook,
 )
 from tests.helpers import load_webhook_json
@@ -29,6 +31,28 @@ class TestBenchlingAppSetup:
             result = init_app_from_webhook(webhook)
             assert isinstance(result, App)
 
+    def test_init_app_shares_the_configuration_of_a_tenant(self, monkeypatch) -> None:
+        with monkeypatch.context() as context:
+            context.setenv("CLIENT_ID", "clientId")
+            context.setenv(
+                "CLIENT_SECRET_FILE", str(_TEST_FILES_PATH / "test_client_secret")
+            )
+            first = init_app("app_1", "https://a.benchling.com")
+            assert (
+                init_app("app_1", "https://a.benchling.com").config_store
+                is first.config_store
+            )
+            assert (
+                init_app("app_2", "https://a.benchling.com").config_store
+                is not first.config_store
+            )
+
+    def test_each_app_installation_has_its_own_client(self) -> None:
+        first = _rate_limited_client("https://a.benchling.com", "app_1")
+
+        assert _rate_limited_client("https://a.benchling.com", "app_1") is first
+        assert _rate_limited_client("https://a.benchling.com", "app_2") is not first
+
     def test_init_app_from_webhook_missing_client_id(self, monkeypatch) -> None:
         webhook = load_webhook_json(_TEST_FILES_PATH / "canvas_initialize_webhook.json")
         with monkeypatch.context() as context:
@@ -0,0 +1,76 @@
+"""
+test_synthetic_order.py
+Description: Test the synthetic orders of the benchmarks against the cleaning and the registration
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.bench_pipeline import STAGES, new_registry, run_once
+from benchmarks.synthetic_order import generate_order, write_order
+from local_app.benchling_app import create_register_entites
+from local_app.benchling_app.create_register_entites import (
+    create_and_register_entities,
+    load_and_clean_data,
+)
+from local_app.benchling_app.entity_index import EntityIndexCache
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+def register(order, tmp_path):
+    registry = new_registry(order, 0, tmp_path.name)
+    *frames, errors = load_and_clean_data(write_order(order, tmp_path))
+    assert errors is None
+    with patch.object(create_register_entites, "entity_index", EntityIndexCache()):
+        *registered, error = create_and_register_entities(registry.app, *frames)
+    assert error is None
+    return registered[0]
+
+
+def test_same_seed_same_order():
+    first, second = generate_order(12, seed=3), generate_order(12, seed=3)
+    assert all(first[key].equals(second[key]) for key in first)
+    assert not first["crRNA_metadata"].equals(
+        generate_order(12, seed=4)["crRNA_metadata"]
+    )
+
+
+def test_an_order_is_registered_with_its_act_control(tmp_path):
+    clc_bac_df = register(generate_order(12), tmp_path)
+
+    assert clc_bac_df["bac_name"].tolist() == [
+        f"CLC{cluster}" for cluster in range(113, 125)
+    ] + ["CLCact_001"]
+    assert clc_bac_df["bac_b_id"].notna().all()
+    assert clc_bac_df["strain_name"].notna().all()
+
+
+def test_every_stage_is_timed():
+    timings = run_once(5, latency=0, seed=0)
+    assert set(timings) == set(STAGES) | {"total"}
+    assert all(timings[stage] > 0 for stage in STAGES)
+
+
+def test_clusters_beyond_999(tmp_path):
+    clc_bac_df = register(generate_order(4, first_cluster=997), tmp_path)
+
+    assert clc_bac_df["bac_name"].tolist()[:4] == [
+        "CLC997",
+        "CLC998",
+        "CLC999",
+        "CLC1000",
+    ]
+    assert clc_bac_df["scr_primer_f"].notna().all()
+
+
+def test_cluster_numbers_below_100_are_refused():
+    with pytest.raises(ValueError):
+        generate_order(5, first_cluster=1)
@@ -0,0 +1,183 @@
+"""
+test_tracing.py
+Description: Test the spans of the pipeline and their exporters
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+import json
+import threading
+
+import httpx
+import pytest
+
+from local_app.benchling_app.api_metrics import instrument_client
+from local_app.lib import metrics, tracing
+from local_app.lib.tracing import (
+    NOOP_SPAN,
+    JsonlExporter,
+    OtlpExporter,
+    Tracer,
+    annotate,
+    in_current_context,
+)
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracing.tracer, "exporter", exporter)
+    return exporter.spans
+
+
+def test_spans_nest_and_record_errors(exported):
+    tracer = tracing.tracer
+
+    with tracer.span("job", canvas_id="cnvs_1") as job:
+        with tracer.span("stage") as stage:
+            annotate(rows=3)
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("bad plate")
+
+    by_name = {span.name: span for span in exported}
+    assert [span.name for span in exported] == ["stage", "failing", "job"]
+    assert by_name["stage"].parent_id == job.span_id
+    assert by_name["stage"].trace_id == job.trace_id
+    assert by_name["stage"].attributes == {"rows": 3}
+    assert by_name["job"].parent_id is None
+    assert by_name["failing"].status == "error"
+    assert "bad plate" in by_name["failing"].attributes["error"]
+    assert stage.duration_ms >= 0
+
+
+def test_spans_nest_across_worker_threads(exported):
+    with tracing.tracer.span("job") as job:
+
+        def worker():
+            with tracing.tracer.span("transfer"):
+                pass
+
+        thread = threading.Thread(target=in_current_context(worker))
+        thread.start()
+        thread.join()
+
+    assert exported[0].name == "transfer"
+    assert exported[0].parent_id == job.span_id
+
+
+def test_disabled_tracer_is_a_no_op():
+    tracer = Tracer(exporter=None)
+
+    with tracer.span("job") as span:
+        annotate(rows=3)
+
+    assert span is NOOP_SPAN
+    assert tracer.start_span("GET /plates") is NOOP_SPAN
+
+
+def test_pipeline_stage_times_and_traces(exported):
+    @tracing.pipeline_stage("test_stage")
+    def stage_fn(x):
+        annotate(rows=x)
+        return x * 2
+
+    count_before = metrics.PIPELINE_STAGE_SECONDS.count(stage="test_stage")
+
+    assert stage_fn(21) == 42
+    assert metrics.PIPELINE_STAGE_SECONDS.count(stage="test_stage") == count_before + 1
+    assert exported[0].name == "stage test_stage"
+    assert exported[0].attributes == {"stage": "test_stage", "rows": 21}
+
+
+def test_api_calls_are_child_spans(exported):
+    client = instrument_client(
+        httpx.Client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=b"{}")
+            )
+        )
+    )
+
+    with tracing.tracer.span("stage") as stage:
+        client.get("https://tenant.benchling.com/api/v2/plates/plt_1")
+
+    api_span = exported[0]
+    assert api_span.name == "GET /plates/{id}"
+    assert api_span.parent_id == stage.span_id
+    assert api_span.attributes["status"] == 200
+    assert api_span.attributes["response_bytes"] == 2
+
+
+def test_api_call_without_response_ends_its_span(exported):
+    def reset(request):
+        raise httpx.ReadError("connection reset", request=request)
+
+    client = instrument_client(httpx.Client(transport=httpx.MockTransport(reset)))
+
+    with pytest.raises(httpx.ReadError):
+        client.get("https://tenant.benchling.com/api/v2/plates/plt_1")
+
+    assert exported[0].name == "GET /plates/{id}"
+    assert exported[0].status == "error"
+    assert "connection reset" in exported[0].attributes["error"]
+
+
+def test_jsonl_exporter_writes_and_rotates(tmp_path):
+    exporter = JsonlExporter(tmp_path, max_bytes=200, backups=2)
+    tracer = Tracer(exporter)
+
+    for i in range(10):
+        with tracer.span("stage", index=i):
+            pass
+        exporter.flush()
+
+    files = sorted(path.name for path in tmp_path.iterdir())
+    assert files == [
+        exporter.path.name,
+        f"{exporter.path.name}.1",
+        f"{exporter.path.name}.2",
+    ]
+    last = json.loads(exporter.path.read_text().splitlines()[-1])
+    assert last["name"] == "stage"
+    assert last["attributes"] == {"index": 9}
+
+
+def test_otlp_exporter_posts_the_spans():
+    received = []
+
+    def collector(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    exporter = OtlpExporter(
+        "http://collector:4318/v1/traces",
+        client=httpx.Client(transport=httpx.MockTransport(collector)),
+    )
+    tracer = Tracer(exporter)
+    with tracer.span("job", canvas_id="cnvs_1", rows=3):
+        pass
+    exporter.flush()
+
+    span = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "job"
+    assert {"key": "rows", "value": {"intValue": "3"}} in span["attributes"]
+    assert {"key": "canvas_id", "value": {"stringValue": "cnvs_1"}} in span[
+        "attributes"
+    ]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
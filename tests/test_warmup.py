@@ -0,0 +1,98 @@
+"""
+test_warmup.py
+Description: Test the warm-up of the workers and the cache of the webhook verification keys
+Date: October 19, 2026
+"""
+
+# ==================================
+# IMPORTS
+# ==================================
+from local_app.benchling_app import warmup
+from local_app.benchling_app.warmup import JwksCache, WarmUp, parse_tenants
+
+
+# ==================================
+# FUNCTIONS
+# ==================================
+
+
+class CountingFetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, app_definition_id):
+        self.calls.append(app_definition_id)
+        return f"keys {len(self.calls)}"
+
+
+def test_parse_tenants():
+    assert parse_tenants(
+        " https://a.benchling.com/=app_1, https://b.benchling.com=app_2,,nope"
+    ) == [("https://a.benchling.com", "app_1"), ("https://b.benchling.com", "app_2")]
+
+
+def test_jwks_are_fetched_once_per_ttl():
+    fetch = CountingFetch()
+    cache = JwksCache(ttl=60, fetch=fetch)
+    assert cache("appdef_1") == cache("appdef_1") == "keys 1"
+    assert cache("appdef_2") == "keys 2"
+
+    expired = JwksCache(ttl=0, fetch=fetch)
+    expired("appdef_1")
+    expired("appdef_1")
+    assert len(fetch.calls) == 4
+
+
+def test_jwks_refresh_is_rate_limited():
+    fetch = CountingFetch()
+    cache = JwksCache(ttl=60, fetch=fetch)
+    cache("appdef_1")
+    assert not cache.refresh_if_stale("appdef_1", min_age=60)
+    assert cache.refresh_if_stale("appdef_1", min_age=0)
+    assert cache("appdef_1") == "keys 2"
+
+
+def test_warm_up_runs_every_step_and_records_failures(monkeypatch):
+    monkeypatch.setenv("APP_DEFINITION_ID", "appdef_1")
+    calls = []
+    monkeypatch.setattr(
+        warmup, "fetch_token", lambda url: calls.append(("token", url))
+    )
+
+    def failing_config(app_id, url):
+        raise RuntimeError("config unavailable")
+
+    monkeypatch.setattr(warmup, "fetch_config", failing_config)
+    fetch = CountingFetch()
+    warm_up = WarmUp(
+        tenants=[("https://a.benchling.com", "app_1")],
+        modules=("json",),
+        jwks=JwksCache(fetch=fetch),
+    )
+    assert not warm_up.status()["ready"]
+
+    warm_up.start_in_background().join()
+
+    status = warm_up.status()
+    assert status["ready"]
+    assert set(status["steps"]) == {
+        "imports",
+        "jwks",
+        "token https://a.benchling.com",
+        "config https://a.benchling.com",
+    }
+    assert status["steps"]["config https://a.benchling.com"] == {
+        "error": "config unavailable"
+    }
+    assert "seconds" in status["steps"]["jwks"]
+    assert fetch.calls == ["appdef_1"]
+    assert calls == [("token", "https://a.benchling.com")]
+
+
+def test_warm_up_without_app_definition_id_skips_the_keys(monkeypatch):
+    monkeypatch.delenv("APP_DEFINITION_ID", raising=False)
+    fetch = CountingFetch()
+    steps = WarmUp(tenants=[], modules=(), jwks=JwksCache(fetch=fetch)).run()
+    assert list(steps) == ["imports"]
+    assert not fetch.calls
+